@@ -1,3 +1,5 @@
+from .chunk_manifests import *
 from .cloud_files import *
+from .content_objects import *
 from .folders import *
 from .share_link import *
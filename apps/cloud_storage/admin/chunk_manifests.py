@@ -0,0 +1,31 @@
+from django.contrib import admin
+
+from apps.cloud_storage.models import ChunkManifest, ManifestChunk
+
+
+class ManifestChunkInline(admin.TabularInline):
+    model = ManifestChunk
+    extra = 0
+    can_delete = False
+    fields = ("index", "offset", "size", "content_object")
+    readonly_fields = fields
+
+
+@admin.register(ChunkManifest)
+class ChunkManifestAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "cloud_file",
+        "chunk_count",
+        "materialized_at",
+        "created_at",
+    )
+    list_per_page = 25
+    readonly_fields = (
+        "chunk_count",
+        "materialized_at",
+        "created_at",
+        "updated_at",
+    )
+    raw_id_fields = ("cloud_file",)
+    inlines = [ManifestChunkInline]
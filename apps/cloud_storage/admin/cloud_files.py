@@ -18,6 +18,8 @@ class CloudFilesAdmin(admin.ModelAdmin):
     readonly_fields = (
         "size",
         "s3_key",
+        "region",
+        "bucket_name",
         "created_at",
         "updated_at",
         "deleted_at",
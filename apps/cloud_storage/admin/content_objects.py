@@ -0,0 +1,25 @@
+from django.contrib import admin
+
+from apps.cloud_storage.models import ContentObject
+
+
+@admin.register(ContentObject)
+class ContentObjectAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "sha256",
+        "user",
+        "size",
+        "ref_count",
+        "status",
+    )
+    list_per_page = 25
+    readonly_fields = (
+        "sha256",
+        "s3_key",
+        "size",
+        "ref_count",
+        "created_at",
+        "updated_at",
+    )
+    raw_id_fields = ("user",)
@@ -12,6 +12,7 @@ class ShareLinkAdmin(admin.ModelAdmin):
         "owner",
         "revoked_at",
         "expires_at",
+        "use_cdn",
         "created_at",
     )
     list_per_page = 25
@@ -0,0 +1,14 @@
+from rest_framework.views import exception_handler
+
+from apps.cloud_storage.domain.exceptions.exceptions import StorageServiceUnavailable
+from apps.cloud_storage.domain.exceptions.storage import StorageUnavailableError
+
+
+def storage_exception_handler(exc, context):
+    """
+    DRF exception handler that answers 503 when S3 is degraded or its
+    circuit breaker is open, instead of a generic 500.
+    """
+    if isinstance(exc, StorageUnavailableError):
+        exc = StorageServiceUnavailable()
+    return exception_handler(exc, context)
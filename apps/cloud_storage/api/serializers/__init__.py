@@ -1,13 +1,18 @@
-from .cloud_files import CloudFilesSerializer, CloudFileMetaPatchSerializer, CloudFileUpdateSerializer
+from .archive_export_serializer import ArchiveExportSerializer
+from .cloud_files import CloudFilesSerializer, CloudFileMetaPatchSerializer, CloudFileUpdateSerializer, \
+    CloudFileBatchFinalizeSerializer
 from .folder_serializer import FolderParentSerializer, FolderSerializer, FolderDetailSerializer, SimpleFolderSerializer
 from .public_share_serializer import PublicShareLinkDetailSerializer, ShareLinkPasswordSerializer, \
     PublicShareFolderDetailSerializer
 from .share_link_serializer import ShareLinkSerializer
+from .upload_session_serializer import UploadSessionSerializer
 
 __all__ = [
+    "ArchiveExportSerializer",
     "CloudFilesSerializer",
     "CloudFileMetaPatchSerializer",
     "CloudFileUpdateSerializer",
+    "CloudFileBatchFinalizeSerializer",
     "FolderParentSerializer",
     "FolderSerializer",
     "FolderDetailSerializer",
@@ -16,4 +21,5 @@ __all__ = [
     "ShareLinkPasswordSerializer",
     "PublicShareFolderDetailSerializer",
     "ShareLinkSerializer",
+    "UploadSessionSerializer",
 ]
@@ -0,0 +1,47 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.models import ArchiveExport
+from apps.cloud_storage.services.accounts.archive_export import get_archive_download_url
+
+
+class ArchiveExportSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField(
+        help_text=_("Share of the account's bytes written to the archive, in percent."),
+    )
+    download_url = serializers.SerializerMethodField(
+        help_text=_("Presigned URL of the archive once it is complete; null before and after it expires."),
+    )
+
+    class Meta:
+        model = ArchiveExport
+        fields = (
+            "id",
+            "status",
+            "total_files",
+            "total_bytes",
+            "exported_files",
+            "exported_bytes",
+            "skipped_files",
+            "progress",
+            "archive_size",
+            "download_url",
+            "error_message",
+            "created_at",
+            "completed_at",
+            "expires_at",
+        )
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        if obj.completed_at is not None:
+            return 100
+        if not obj.total_bytes:
+            return 0
+        return min(99, obj.exported_bytes * 100 // obj.total_bytes)
+
+    def get_download_url(self, obj):
+        if not obj.is_available:
+            return None
+        return get_archive_download_url(get_storage(), obj)
@@ -1,14 +1,22 @@
 import logging
 import mimetypes
 
+from django.conf import settings
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 
 from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
 from apps.cloud_storage.constants.cloud_files import SUCCESS, FAILED
-from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.domain.exceptions.storage import StorageUnavailableError
+from apps.cloud_storage.integrations.backends import get_storage
 from apps.cloud_storage.models import CloudFile, Folder
+from apps.cloud_storage.services.files.download_urls import generate_download_url, get_decoded_download_url
+from apps.cloud_storage.services.files.file_access import prepare_file_download
+from apps.cloud_storage.services.files.metadata_export import EXPORT_CONTENT_TYPES, NDJSON
+from apps.cloud_storage.services.files.thumbnails import get_thumbnail_urls
+from apps.cloud_storage.services.files.upload_tickets import load_upload_ticket
 from apps.cloud_storage.utils.path_utils import build_object_path
 from apps.cloud_storage.utils.size_utils import get_user_used_bytes
 
@@ -22,12 +30,30 @@ S3_TO_INTERNAL_CODES = {
 class CloudFilesSerializer(serializers.ModelSerializer):
     path = serializers.CharField(read_only=True)
     url = serializers.SerializerMethodField(read_only=True)
+    thumbnails = serializers.SerializerMethodField(
+        read_only=True,
+        help_text=_("Thumbnail URL per width (file preview plans), or null when there are none."),
+    )
+    media = serializers.SerializerMethodField(
+        read_only=True,
+        help_text=_(
+            "Dimensions and camera details of images, page count of PDFs, duration of audio and video; "
+            "null until read."
+        ),
+    )
+    captured_at = serializers.DateTimeField(read_only=True)
     folder = serializers.PrimaryKeyRelatedField(
         queryset=Folder.objects.all(),
         required=False,
         allow_null=True,
         write_only=True,
     )
+    sha256 = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$",
+        required=False,
+        write_only=True,
+        help_text=_("Hex SHA-256 of the file bytes; lets the server reuse an identical stored file."),
+    )
 
     class Meta:
         model = CloudFile
@@ -35,10 +61,14 @@ class CloudFilesSerializer(serializers.ModelSerializer):
             "id",
             "file_name",
             "folder",
+            "sha256",
             "size",
             "content_type",
             "path",
             "url",
+            "thumbnails",
+            "media",
+            "captured_at",
             "created_at",
             "deleted_at",
         )
@@ -120,6 +150,9 @@ class CloudFilesSerializer(serializers.ModelSerializer):
 
         return value
 
+    def validate_sha256(self, value):
+        return value.lower()
+
     def validate(self, data):
         user = self.context["request"].user
         if not user:
@@ -135,6 +168,7 @@ class CloudFilesSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context["request"].user
         validated_data["user"] = user
+        validated_data.pop("sha256", None)
 
         file_name = validated_data.get("file_name")
         validated_data["content_type"], _encoding_type = mimetypes.guess_type(file_name)
@@ -148,14 +182,29 @@ class CloudFilesSerializer(serializers.ModelSerializer):
 
     def get_url(self, obj):
         """Only add extra_info when retrieving a single object"""
+        if "download_url" in self.context:
+            # Already resolved by the caller (async views)
+            return self.context["download_url"]
+
         if self.context.get("is_detail", False):
-            s3_service = S3StorageClient()
+            manifest = getattr(obj, "manifest", None)
+            if manifest is not None and manifest.materialized_at is None:
+                # Not assembled yet: served by streaming the chunks
+                return self.context["request"].build_absolute_uri(
+                    reverse("storage-chunked-download", args=[obj.pk])
+                )
+            if obj.content_encoding:
+                # Stored compressed: served decoded by the proxy
+                return get_decoded_download_url(self.context["request"], obj)
+
+            s3_service = get_storage()
+            prepare_file_download(s3_service, obj)
 
             try:
-                download_url = s3_service.generate_presigned_download_url(
-                    object_name=obj.s3_key
-                )
+                download_url = generate_download_url(s3_service, obj)
 
+            except StorageUnavailableError:
+                raise
             except Exception as e:
                 logger.error(
                     f"Error generating presigned URL for file '{obj.path}': {str(e)}",
@@ -176,6 +225,15 @@ class CloudFilesSerializer(serializers.ModelSerializer):
         return None
 
 
+    def get_thumbnails(self, obj):
+        if not obj.thumbnails:
+            return None
+        return get_thumbnail_urls(get_storage(), obj)
+
+    def get_media(self, obj):
+        return (obj.metadata or {}).get("media")
+
+
 class CloudFileMetaPatchSerializer(serializers.ModelSerializer):
     status = serializers.ChoiceField(required=True, choices=[SUCCESS, FAILED])
     error_code = serializers.CharField(required=False, allow_blank=True)
@@ -249,3 +307,78 @@ class CloudFileUpdateSerializer(serializers.ModelSerializer):
         instance.save()
 
         return instance
+
+
+class CloudFileBatchFinalizeSerializer(serializers.Serializer):
+    file_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.CLOUD_STORAGE_FINALIZE_BATCH_MAX_FILES,
+    )
+
+    def validate_file_ids(self, value):
+        # Keep the client's order, drop duplicates
+        return list(dict.fromkeys(value))
+
+
+class CloudFileTicketFinalizeSerializer(serializers.Serializer):
+    ticket = serializers.CharField(help_text=_("Ticket returned with the presigned upload."))
+
+    def validate_ticket(self, value):
+        ticket = load_upload_ticket(value, max_age=settings.CLOUD_STORAGE_UPLOAD_TICKET_SECONDS)
+        if ticket is None or ticket["user_id"] != self.context["request"].user.id:
+            raise serializers.ValidationError(_("This upload ticket is invalid or has expired."))
+        return ticket
+
+
+class CloudFileExportSerializer(serializers.Serializer):
+    output = serializers.ChoiceField(
+        choices=list(EXPORT_CONTENT_TYPES),
+        default=NDJSON,
+        help_text=_("`ndjson` (one JSON object per line) or `csv`."),
+    )
+
+
+class CloudFileCopySerializer(serializers.Serializer):
+    folder = serializers.PrimaryKeyRelatedField(
+        queryset=Folder.objects.all(),
+        required=False,
+        allow_null=True,
+        help_text=_("Folder receiving the copy; null for the root. Defaults to the original's folder."),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        user = self.context["request"].user
+        self.fields["folder"].queryset = Folder.objects.filter(user=user)
+
+
+class FileChunkSerializer(serializers.Serializer):
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$")
+    size = serializers.IntegerField(min_value=1, max_value=settings.CLOUD_STORAGE_CHUNK_MAX_BYTES)
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+
+class CloudFileChunkedUploadSerializer(CloudFilesSerializer):
+    sha256 = None
+    chunks = FileChunkSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.CLOUD_STORAGE_CHUNKED_MAX_CHUNKS,
+        write_only=True,
+    )
+
+    class Meta(CloudFilesSerializer.Meta):
+        fields = tuple(name for name in CloudFilesSerializer.Meta.fields if name != "sha256") + ("chunks",)
+
+    def validate(self, data):
+        data = super().validate(data)
+        if sum(chunk["size"] for chunk in data["chunks"]) != data.get("size"):
+            raise serializers.ValidationError(_("The chunk sizes do not add up to the file size."))
+        return data
+
+    def create(self, validated_data):
+        validated_data.pop("chunks", None)
+        return super().create(validated_data)
@@ -5,7 +5,7 @@ from rest_framework import serializers
 
 from apps.cloud_storage.api.serializers import CloudFilesSerializer
 from apps.cloud_storage.models import Folder
-from apps.cloud_storage.tasks.file_path_updates import update_folder_file_paths_task
+from apps.cloud_storage.tasks.file_path_updates import schedule_folder_path_rewrite
 from apps.features.choices.feature_code_choices import FeatureCodeChoices
 
 
@@ -102,7 +102,7 @@ class FolderSerializer(serializers.ModelSerializer):
         parent_changed = "parent" in validated_data and updated_folder.parent_id != old_parent_id
 
         if name_changed or parent_changed:
-            update_folder_file_paths_task.delay(updated_folder.id)
+            schedule_folder_path_rewrite(updated_folder)
 
         return updated_folder
 
@@ -113,6 +113,23 @@ class FolderSerializer(serializers.ModelSerializer):
         return obj.files.all().count()
 
 
+class FolderCopySerializer(FolderSerializer):
+    """Where a folder is copied to; the name defaults to the original's (`folder` in the context)."""
+
+    parent = None
+    subfolders_count = None
+    files_count = None
+
+    class Meta(FolderSerializer.Meta):
+        fields = ["name", "parent_id"]
+        read_only_fields = []
+        extra_kwargs = {"name": {"required": False}}
+
+    def validate(self, attrs):
+        attrs.setdefault("name", self.context["folder"].name)
+        return super().validate(attrs)
+
+
 class FolderDetailSerializer(serializers.ModelSerializer):
     parent = FolderParentSerializer(read_only=True)
     subfolders = serializers.SerializerMethodField()
@@ -0,0 +1,51 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from apps.cloud_storage.models import Folder, UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    folder = serializers.PrimaryKeyRelatedField(
+        queryset=Folder.objects.all(),
+        required=False,
+        allow_null=True,
+        help_text=_("Folder the uploaded files are placed in; null for the root."),
+    )
+    max_bytes = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text=_("Total bytes to upload. Capped by the server and by the remaining quota."),
+    )
+    is_open = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = (
+            "id",
+            "folder",
+            "key_prefix",
+            "max_bytes",
+            "used_bytes",
+            "file_count",
+            "rejected_count",
+            "expires_at",
+            "closed_at",
+            "is_open",
+            "created_at",
+        )
+        read_only_fields = (
+            "id",
+            "key_prefix",
+            "used_bytes",
+            "file_count",
+            "rejected_count",
+            "expires_at",
+            "closed_at",
+            "created_at",
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is not None:
+            self.fields["folder"].queryset = Folder.objects.filter(user=request.user)
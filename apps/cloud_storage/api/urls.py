@@ -3,13 +3,24 @@ from rest_framework.routers import DefaultRouter
 
 from apps.cloud_storage.api.views import CloudStorageViewSet
 from apps.cloud_storage.api.views import (
+    AsyncCloudFileBatchFinalizeView,
+    AsyncCloudFileCreateView,
+    AsyncCloudFileDetailView,
+    AsyncPublicShareLinkFileDownloadView,
     PublicShareLinkDetail,
+    PublicShareLinkFileContentView,
     PublicShareLinkFileDownloadView,
+    PublicShareLinkFilePreviewView,
     PublicShareLinkAuthView,
     PublicShareLinkFolderView,
+    S3EventWebhookView,
+    SignedStorageDownloadView,
+    SignedStorageUploadView,
 )
+from apps.cloud_storage.api.views.archive_export import ArchiveExportViewSet
 from apps.cloud_storage.api.views.folder import FolderViewSet
 from apps.cloud_storage.api.views.share_link import ShareLinkViewSet
+from apps.cloud_storage.api.views.upload_session import UploadSessionViewSet
 
 urlpatterns = [
     path(
@@ -27,16 +38,64 @@ urlpatterns = [
         PublicShareLinkFileDownloadView.as_view(),
         name="public-share-file-download",
     ),
+    path(
+        "share/<str:token>/files/<int:file_id>/content/",
+        PublicShareLinkFileContentView.as_view(),
+        name="public-share-file-content",
+    ),
+    path(
+        "share/<str:token>/files/<int:file_id>/preview/",
+        PublicShareLinkFilePreviewView.as_view(),
+        name="public-share-file-preview",
+    ),
     path(
         "share/<str:token>/folders/<int:folder_id>/",
         PublicShareLinkFolderView.as_view(),
         name="public-sharelink-folder-detail",
     ),
+    path(
+        "storage-events/s3/",
+        S3EventWebhookView.as_view(),
+        name="storage-events-s3",
+    ),
+    path(
+        "signed-storage/upload/",
+        SignedStorageUploadView.as_view(),
+        name="signed-storage-upload",
+    ),
+    path(
+        "signed-storage/download/",
+        SignedStorageDownloadView.as_view(),
+        name="signed-storage-download",
+    ),
+    # Async (ASGI) versions of the storage-bound endpoints
+    path(
+        "async/files/",
+        AsyncCloudFileCreateView.as_view(),
+        name="async-storage-create",
+    ),
+    path(
+        "async/files/finalize/",
+        AsyncCloudFileBatchFinalizeView.as_view(),
+        name="async-storage-batch-finalize",
+    ),
+    path(
+        "async/files/<int:pk>/",
+        AsyncCloudFileDetailView.as_view(),
+        name="async-storage-detail",
+    ),
+    path(
+        "async/share/<str:token>/files/<int:file_id>/download/",
+        AsyncPublicShareLinkFileDownloadView.as_view(),
+        name="async-public-share-file-download",
+    ),
 ]
 
 router = DefaultRouter()
 router.register(r"folders", FolderViewSet, basename="folders")
 router.register(r"share-links", ShareLinkViewSet, basename="share-links")
+router.register(r"upload-sessions", UploadSessionViewSet, basename="upload-sessions")
+router.register(r"archive-exports", ArchiveExportViewSet, basename="archive-exports")
 router.register(r"", CloudStorageViewSet, basename="storage")
 
 urlpatterns += router.urls
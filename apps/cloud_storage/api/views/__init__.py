@@ -1,15 +1,32 @@
+from .archive_export import ArchiveExportViewSet
+from .async_storage import AsyncCloudFileBatchFinalizeView, AsyncCloudFileCreateView, AsyncCloudFileDetailView, \
+    AsyncPublicShareLinkFileDownloadView
 from .cloud_storage import CloudStorageViewSet
 from .folder import FolderViewSet
-from .public_share import PublicShareLinkDetail, PublicShareLinkAuthView, PublicShareLinkFileDownloadView, \
-    PublicShareLinkFolderView
+from .public_share import PublicShareLinkDetail, PublicShareLinkAuthView, PublicShareLinkFileContentView, \
+    PublicShareLinkFileDownloadView, PublicShareLinkFilePreviewView, PublicShareLinkFolderView
 from .share_link import ShareLinkViewSet
+from .signed_storage import SignedStorageDownloadView, SignedStorageUploadView
+from .storage_events import S3EventWebhookView
+from .upload_session import UploadSessionViewSet
 
 __all__ = [
+    "ArchiveExportViewSet",
+    "AsyncCloudFileBatchFinalizeView",
+    "AsyncCloudFileCreateView",
+    "AsyncCloudFileDetailView",
+    "AsyncPublicShareLinkFileDownloadView",
     "CloudStorageViewSet",
     "FolderViewSet",
     "PublicShareLinkDetail",
     "PublicShareLinkAuthView",
+    "PublicShareLinkFileContentView",
     "PublicShareLinkFileDownloadView",
+    "PublicShareLinkFilePreviewView",
     "PublicShareLinkFolderView",
     "ShareLinkViewSet",
+    "S3EventWebhookView",
+    "SignedStorageDownloadView",
+    "SignedStorageUploadView",
+    "UploadSessionViewSet",
 ]
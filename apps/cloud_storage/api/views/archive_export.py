@@ -0,0 +1,43 @@
+from django.db import transaction
+from drf_spectacular.utils import extend_schema
+from rest_framework import authentication, mixins, permissions, status, viewsets
+from rest_framework.response import Response
+
+from apps.cloud_storage.api.pagination import ShareLinkPagination
+from apps.cloud_storage.api.serializers import ArchiveExportSerializer
+from apps.cloud_storage.models import ArchiveExport
+from apps.cloud_storage.services.accounts.archive_export import request_archive_export
+from apps.cloud_storage.tasks.archive_exports import process_archive_export
+
+
+@extend_schema(tags=["API - Archive Exports"])
+class ArchiveExportViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    ZIP archives of the whole account, written in the background. Poll an
+    export for its progress; `download_url` is set once it is complete.
+    """
+
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ArchiveExportSerializer
+    pagination_class = ShareLinkPagination
+
+    def get_queryset(self):
+        return ArchiveExport.objects.filter(user=self.request.user).order_by("-created_at")
+
+    @extend_schema(request=None, responses={202: ArchiveExportSerializer})
+    def create(self, request, *args, **kwargs):
+        """
+        Start an export of every uploaded file, or return the one already
+        running. Files in archival storage classes are left out.
+        """
+        export, created = request_archive_export(request.user)
+        if created:
+            transaction.on_commit(lambda: process_archive_export.delay(export.id))
+
+        return Response(self.get_serializer(export).data, status=status.HTTP_202_ACCEPTED)
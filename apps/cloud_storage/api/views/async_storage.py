@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+    NotFound,
+    ParseError,
+    ValidationError,
+)
+
+from apps.cloud_storage.api.serializers import CloudFilesSerializer
+from apps.cloud_storage.api.serializers.cloud_files import CloudFileBatchFinalizeSerializer
+from apps.cloud_storage.api.views.mixins.finalize import FinalizeResultsMixin
+from apps.cloud_storage.api.views.mixins.share_link import (
+    ShareLinkAccessMixin,
+    ShareLinkMixin,
+)
+from apps.cloud_storage.domain.exceptions.exceptions import StorageServiceUnavailable
+from apps.cloud_storage.domain.exceptions.storage import StorageUnavailableError
+from apps.cloud_storage.integrations.async_storage import AsyncStorage
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.batch_file_upload_finalizer_service import (
+    BatchFileUploadFinalizerService,
+)
+from apps.cloud_storage.services.files.create_presigned_upload import (
+    aprepare_file_upload,
+    save_prepared_upload,
+)
+from apps.cloud_storage.services.files.download_urls import get_cdn_download_url, get_decoded_download_url
+from apps.cloud_storage.services.files.file_access import prepare_file_download
+from apps.cloud_storage.tasks.file_processing import schedule_file_processing, schedule_outcome_processing
+from apps.cloud_storage.utils.region_utils import get_upload_region
+
+logger = logging.getLogger("aerobox")
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    """
+    Base for async (ASGI) endpoints that wait on storage.
+
+    DRF views are synchronous, so these are plain Django async views that
+    reuse the DRF serializers and exceptions: token authentication, JSON
+    parsing and APIException -> JSON error responses are handled here.
+    """
+
+    authentication_required = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if self.authentication_required:
+                request.user = await self.authenticate(request)
+
+            response = super().dispatch(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        except StorageUnavailableError:
+            return self.error_response(StorageServiceUnavailable())
+        except APIException as exc:
+            return self.error_response(exc)
+
+    @staticmethod
+    async def authenticate(request):
+        """Async equivalent of DRF's TokenAuthentication."""
+        auth = request.headers.get("Authorization", "").split()
+        if not auth or auth[0].lower() != "token":
+            raise NotAuthenticated()
+        if len(auth) != 2:
+            raise AuthenticationFailed(_("Invalid token header."))
+
+        try:
+            token = await Token.objects.select_related("user").aget(key=auth[1])
+        except Token.DoesNotExist:
+            raise AuthenticationFailed(_("Invalid token."))
+
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+
+        return token.user
+
+    @staticmethod
+    def error_response(exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        return JsonResponse(data, status=exc.status_code, safe=False)
+
+    @staticmethod
+    def parse_json(request):
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except ValueError:
+            raise ParseError()
+
+
+class AsyncCloudFileCreateView(AsyncAPIView):
+    """Async version of `CloudStorageViewSet.create`."""
+
+    async def post(self, request, *args, **kwargs):
+        serializer = CloudFilesSerializer(
+            data=self.parse_json(request), context={"request": request}
+        )
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+        result = await aprepare_file_upload(
+            storage=AsyncStorage(),
+            user=request.user,
+            file_name=serializer.validated_data["file_name"],
+            content_type=serializer.validated_data["content_type"],
+            sha256=serializer.validated_data.get("sha256"),
+            region=get_upload_region(request),
+        )
+
+        await sync_to_async(save_prepared_upload)(serializer, result)
+        if result.deduplicated:
+            await sync_to_async(schedule_file_processing)([serializer.instance.id])
+        data = await sync_to_async(lambda: serializer.data)()
+
+        return JsonResponse(
+            {
+                "presigned-url": result.presigned_url,
+                "deduplicated": result.deduplicated,
+                "file": data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AsyncCloudFileDetailView(AsyncAPIView):
+    """Async version of `CloudStorageViewSet.retrieve`, including the download URL."""
+
+    async def get(self, request, pk, *args, **kwargs):
+        try:
+            cloud_file = await CloudFile.not_deleted.aget(user=request.user, pk=pk)
+        except CloudFile.DoesNotExist:
+            raise NotFound()
+
+        storage = AsyncStorage(get_storage(cloud_file.region))
+        await sync_to_async(prepare_file_download)(storage.storage, cloud_file)
+        download_url = (
+            get_decoded_download_url(request, cloud_file)
+            or await sync_to_async(get_cdn_download_url)(cloud_file)
+            or await storage.generate_presigned_download_url(cloud_file.s3_key)
+        )
+        if not download_url:
+            raise NotFound(
+                _(
+                    "Unable to generate download URL. The file may not exist or there was an error with the storage service."
+                )
+            )
+
+        serializer = CloudFilesSerializer(
+            cloud_file,
+            context={"request": request, "is_detail": True, "download_url": download_url},
+        )
+        data = await sync_to_async(lambda: serializer.data)()
+        return JsonResponse(data)
+
+
+class AsyncCloudFileBatchFinalizeView(FinalizeResultsMixin, AsyncAPIView):
+    """Async version of `CloudStorageViewSet.batch_finalize`."""
+
+    async def post(self, request, *args, **kwargs):
+        serializer = CloudFileBatchFinalizeSerializer(data=self.parse_json(request))
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        file_ids = serializer.validated_data["file_ids"]
+
+        outcomes = await BatchFileUploadFinalizerService().afinalize(request.user, file_ids)
+        await sync_to_async(schedule_outcome_processing)(outcomes)
+        results = self.build_finalize_results(file_ids, outcomes)
+
+        return JsonResponse({"results": results}, status=status.HTTP_200_OK)
+
+
+class AsyncPublicShareLinkFileDownloadView(ShareLinkMixin, ShareLinkAccessMixin, AsyncAPIView):
+    """Async version of `PublicShareLinkFileDownloadView`."""
+
+    authentication_required = False
+
+    def get_shared_file(self, request, file_id):
+        share_link = self.get_object()
+        self.validate_share_link(share_link)
+        self.require_valid_access(request, share_link)
+
+        file_obj = CloudFile.objects.select_related("folder").filter(id=file_id).first()
+        if not file_obj or not share_link.can_access_file(file_obj):
+            raise NotFound(_("File not found for this share link."))
+        return share_link, file_obj
+
+    async def post(self, request, token, file_id, *args, **kwargs):
+        share_link, file_obj = await sync_to_async(self.get_shared_file)(request, file_id)
+
+        storage = AsyncStorage(get_storage(file_obj.region))
+        await sync_to_async(prepare_file_download)(storage.storage, file_obj)
+        try:
+            download_url = (
+                get_decoded_download_url(request, file_obj, share_link)
+                or await sync_to_async(get_cdn_download_url)(file_obj, share_link)
+                or await storage.generate_presigned_download_url(file_obj.s3_key)
+            )
+        except StorageUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(
+                "Failed to generate S3 presigned URL for file_id=%s token=%s error=%s",
+                file_id,
+                token,
+                str(e),
+                exc_info=True,
+            )
+            raise ValidationError(
+                {"error": _("Could not generate download URL. Please try again later.")}
+            )
+
+        return JsonResponse({"url": download_url}, status=status.HTTP_200_OK)
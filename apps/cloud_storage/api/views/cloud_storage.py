@@ -1,11 +1,14 @@
 import logging
 
+from django.conf import settings
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django_filters import rest_framework
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, status, filters
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
@@ -14,37 +17,70 @@ from apps.cloud_storage.api.filters.cloud_file_filter import CloudFileFilter
 from apps.cloud_storage.api.pagination import CloudFilesPagination
 from apps.cloud_storage.api.serializers import CloudFilesSerializer
 from apps.cloud_storage.api.serializers.cloud_files import (
+    CloudFileBatchFinalizeSerializer,
+    CloudFileChunkedUploadSerializer,
+    CloudFileCopySerializer,
+    CloudFileExportSerializer,
     CloudFileMetaPatchSerializer,
+    CloudFileTicketFinalizeSerializer,
     CloudFileUpdateSerializer,
 )
-from apps.cloud_storage.constants.cloud_files import SUCCESS, FAILED
+from apps.cloud_storage.api.views.mixins.finalize import FinalizeResultsMixin
+from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS, FAILED
 from apps.cloud_storage.domain.exceptions.file import FileNotDeletedError
-from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_storage
 from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.chunked_uploads import (
+    ChunkSpec,
+    complete_chunked_upload,
+    prepare_chunked_upload,
+)
+from apps.cloud_storage.services.files.copy_files import (
+    execute_copy_plan,
+    get_copy_job,
+    get_copyable_files,
+    plan_file_copy,
+    start_copy_job,
+)
 from apps.cloud_storage.services.files.create_presigned_upload import (
     prepare_file_upload,
+    save_prepared_upload,
 )
 from apps.cloud_storage.services.files.delete_file import (
     permanent_delete_file,
 )
+from apps.cloud_storage.services.files.file_access import prepare_file_download, record_file_access
+from apps.cloud_storage.services.files.metadata_export import build_metadata_export_response
+from apps.cloud_storage.services.files.proxy_download import build_file_download_response
+from apps.cloud_storage.services.files.text_preview import get_file_preview
+from apps.cloud_storage.services.files.upload_tickets import finalize_ticket_upload, prepare_ticket_upload
+from apps.cloud_storage.services.files.batch_file_upload_finalizer_service import (
+    BatchFileUploadFinalizerService,
+)
 from apps.cloud_storage.services.files.file_upload_finalizer_service import (
     FileUploadFinalizerService,
 )
+from apps.cloud_storage.tasks.chunked_files import materialize_chunked_file_task
 from apps.cloud_storage.tasks.delete_files import clear_all_deleted_files_from_user
+from apps.cloud_storage.tasks.file_copies import copy_files_task, schedule_copy_materialization
+from apps.cloud_storage.tasks.file_processing import schedule_file_processing, schedule_outcome_processing
+from apps.cloud_storage.utils.region_utils import get_upload_region
 from config.api_docs.openapi_schemas import RESPONSE_SCHEMA_GET_PRESIGNED_URL
 
 logger = logging.getLogger("aerobox")
 
 
 @extend_schema(tags=["API - Cloud Storage"])
-class CloudStorageViewSet(viewsets.ModelViewSet):
+class CloudStorageViewSet(FinalizeResultsMixin, viewsets.ModelViewSet):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = CloudFilesSerializer
     queryset = CloudFile.not_deleted.all()
     filter_backends = [filters.OrderingFilter, rest_framework.DjangoFilterBackend]
     filterset_class = CloudFileFilter
-    ordering_fields = ["file_name", "size", "content_type", "created_at"]
+    ordering_fields = ["file_name", "size", "content_type", "created_at", "captured_at"]
     ordering = ["id"]
     pagination_class = CloudFilesPagination
 
@@ -67,8 +103,18 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == "partial_update":
             return CloudFileMetaPatchSerializer
+        elif self.action == "batch_finalize":
+            return CloudFileBatchFinalizeSerializer
         elif self.action == "update":
             return CloudFileUpdateSerializer
+        elif self.action == "chunked_create":
+            return CloudFileChunkedUploadSerializer
+        elif self.action == "copy_file":
+            return CloudFileCopySerializer
+        elif self.action == "export_metadata":
+            return CloudFileExportSerializer
+        elif self.action == "ticket_finalize":
+            return CloudFileTicketFinalizeSerializer
         return CloudFilesSerializer
 
     @extend_schema(
@@ -77,30 +123,51 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         """
         Save file info on DB and get a presigned URL to upload on cloud.
+
+        When `sha256` matches bytes the user already stored, no upload is
+        needed: the file is created ready and `presigned-url` is null.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        storage = S3StorageClient()
+        storage = get_storage()
         result = prepare_file_upload(
             storage=storage,
             user=request.user,
             file_name=serializer.validated_data["file_name"],
             content_type=serializer.validated_data["content_type"],
+            sha256=serializer.validated_data.get("sha256"),
+            region=get_upload_region(request),
         )
 
         # Save file metadata in DB
-        serializer.validated_data["s3_key"] = result.file_path
-        self.perform_create(serializer)
+        save_prepared_upload(serializer, result)
+        if result.deduplicated:
+            schedule_file_processing([serializer.instance.id])
 
         return Response(
-            {"presigned-url": result.presigned_url, "file": serializer.data},
+            {
+                "presigned-url": result.presigned_url,
+                "deduplicated": result.deduplicated,
+                "file": serializer.data,
+            },
             status=status.HTTP_201_CREATED,
         )
 
     def list(self, request):
         return super(CloudStorageViewSet, self).list(request)
 
+    @extend_schema(parameters=[CloudFileExportSerializer])
+    @action(detail=False, methods=["get"], url_path="export")
+    def export_metadata(self, request):
+        """
+        Stream the metadata of every file, trashed ones included, as NDJSON
+        or CSV in a single response instead of paging through the list.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return build_metadata_export_response(request.user, serializer.validated_data["output"])
+
     def retrieve(self, request, *args, **kwargs):
         """
         Retrieve a file info by ID
@@ -153,9 +220,237 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
                     },
                     status=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 )
+            schedule_file_processing([instance.id])
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["post"], url_path="finalize")
+    def batch_finalize(self, request):
+        """
+        Finalize many uploads at once. Returns one outcome per requested file id.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        file_ids = serializer.validated_data["file_ids"]
+
+        finalizer = BatchFileUploadFinalizerService()
+        outcomes = finalizer.finalize(request.user, file_ids)
+        schedule_outcome_processing(outcomes)
+        results = self.build_finalize_results(file_ids, outcomes)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        responses={200: RESPONSE_SCHEMA_GET_PRESIGNED_URL},
+    )
+    @action(detail=False, methods=["post"], url_path="tickets")
+    def ticket_create(self, request):
+        """
+        Get a presigned URL and a signed upload ticket without saving the
+        file yet. The file is created once the upload lands: on
+        `tickets/finalize`, or when storage reports the new object.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = prepare_ticket_upload(
+            storage=get_storage(),
+            user=request.user,
+            file_name=serializer.validated_data["file_name"],
+            content_type=serializer.validated_data["content_type"],
+            folder=serializer.validated_data.get("folder"),
+            region=get_upload_region(request),
+        )
+
+        return Response(
+            {"presigned-url": result.presigned_url, "ticket": result.ticket},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["post"], url_path="tickets/finalize")
+    def ticket_finalize(self, request):
+        """
+        Create the file of an uploaded ticket. Safe to repeat: the file is
+        returned as is when it was already created.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            cloud_file, created = finalize_ticket_upload(
+                get_storage(), request.user, serializer.validated_data["ticket"]
+            )
+        except ObjectNotFoundError:
+            code = CloudFileErrorCode.FILE_NOT_FOUND_IN_S3.value
+            return Response(
+                {"detail": get_error_message(code), "code": code},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        if created:
+            schedule_file_processing([cloud_file.id])
+
+        return Response(
+            CloudFilesSerializer(cloud_file, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="chunked")
+    def chunked_create(self, request):
+        """
+        Start a chunked (delta) upload from the ordered list of chunk hashes.
+        Presigned POSTs are returned only for chunks not stored yet.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        chunks = [ChunkSpec(**chunk) for chunk in serializer.validated_data["chunks"]]
+        result = prepare_chunked_upload(get_storage(), serializer, chunks, get_upload_region(request))
+
+        return Response(
+            {"missing-chunks": result.missing_chunks, "file": serializer.data},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(request=None)
+    @action(detail=True, methods=["post"], url_path="chunked/complete")
+    def chunked_complete(self, request, pk=None):
+        """
+        Verify the chunks of a chunked upload and mark the file as uploaded.
+        """
+        cloud_file = self.get_object()
+        if not hasattr(cloud_file, "manifest"):
+            return Response(
+                {"detail": _("This file was not uploaded in chunks.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if cloud_file.status != PENDING:
+            return Response({"status": cloud_file.status}, status=status.HTTP_200_OK)
+
+        outcome = complete_chunked_upload(get_storage(), cloud_file)
+
+        if outcome.status == PENDING:
+            return Response(
+                {
+                    "detail": get_error_message(outcome.error_code),
+                    "code": outcome.error_code,
+                    "missing-chunks": outcome.missing_chunks,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if outcome.status == FAILED:
+            return Response(
+                {
+                    "detail": get_error_message(outcome.error_code),
+                    "code": outcome.error_code,
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        if settings.CLOUD_STORAGE_CHUNKED_MATERIALIZE:
+            transaction.on_commit(lambda: materialize_chunked_file_task.delay(cloud_file.id))
+        schedule_file_processing([cloud_file.id])
+
+        return Response({"status": outcome.status}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"], url_path="chunked/download")
+    def chunked_download(self, request, pk=None):
+        """
+        Stream a chunked file straight from its chunks.
+        """
+        cloud_file = self.get_object()
+        if not hasattr(cloud_file, "manifest") or cloud_file.status != SUCCESS:
+            raise NotFound()
+
+        record_file_access(cloud_file)
+        return build_file_download_response(get_storage(), cloud_file, request)
+
+    @action(detail=True, methods=["get"], url_path="download")
+    def proxy_download(self, request, pk=None):
+        """
+        Stream the file through the API, for clients that cannot reach the
+        object store. Supports `Range`/`If-Range` for resumable downloads.
+        Enabled with CLOUD_STORAGE_PROXY_DOWNLOADS; compressed files are
+        always served here, as their download URL points here.
+        """
+        cloud_file = self.get_object()
+        if cloud_file.status != SUCCESS:
+            raise NotFound()
+        if not settings.CLOUD_STORAGE_PROXY_DOWNLOADS and not cloud_file.content_encoding:
+            raise NotFound()
+
+        storage = get_storage()
+        prepare_file_download(storage, cloud_file)
+        try:
+            return build_file_download_response(storage, cloud_file, request)
+        except ObjectNotFoundError:
+            raise NotFound(_("File not found in storage."))
+
+    @action(detail=True, methods=["get"], url_path="preview")
+    def preview(self, request, pk=None):
+        """
+        First lines of a text, CSV or JSON file, read from the start of the
+        object only. CSVs come back as a header and rows.
+        """
+        cloud_file = self.get_object()
+        try:
+            preview = get_file_preview(get_storage(), cloud_file)
+        except ObjectNotFoundError:
+            raise NotFound(_("File not found in storage."))
+        return Response(preview, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="copy")
+    def copy_file(self, request, pk=None):
+        """
+        Copy a file server-side, into `folder` or next to the original.
+
+        Large files are copied in the background: the response is then 202
+        with a `job` to poll at `copies/{job}`.
+        """
+        source = self.get_object()
+        if source.status != SUCCESS:
+            return Response(
+                {"detail": _("Only uploaded files can be copied.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target_folder = serializer.validated_data.get("folder", source.folder)
+
+        plan = plan_file_copy(request.user, get_copyable_files(request.user).filter(id=source.id), target_folder)
+        if plan.runs_in_background:
+            job_id = start_copy_job(plan)
+            copy_files_task.delay(job_id, request.user.id, [source.id], getattr(target_folder, "id", None))
+            return Response({"job": job_id}, status=status.HTTP_202_ACCEPTED)
+
+        result = execute_copy_plan(get_storage(), plan)
+        if not result.files:
+            raise NotFound(_("The file content could not be found in storage."))
+
+        schedule_copy_materialization(result)
+        schedule_file_processing([cloud_file.id for cloud_file in result.files])
+        return Response(
+            {"file": CloudFilesSerializer(result.files[0], context=self.get_serializer_context()).data},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(request=None)
+    @action(detail=False, methods=["get"], url_path=r"copies/(?P<job_id>[0-9a-f]{32})")
+    def copy_job(self, request, job_id=None):
+        """
+        Progress of a background copy: `status`, `copied` of `total` files,
+        and once done the ids of the copies.
+        """
+        job = get_copy_job(request.user, job_id)
+        if job is None:
+            raise NotFound()
+
+        job.pop("user_id")
+        return Response(job, status=status.HTTP_200_OK)
+
     def destroy(self, request, *args, **kwargs):
         """Soft delete the file by setting 'deleted_at' instead of deleting it."""
         instance = self.get_object()
@@ -209,7 +504,7 @@ class CloudStorageViewSet(viewsets.ModelViewSet):
         """
         file = self.get_object()
 
-        s3_service = S3StorageClient()
+        s3_service = get_storage()
         permanent_delete_file(s3_service, file)
 
         return Response(
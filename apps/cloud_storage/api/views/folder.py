@@ -3,14 +3,20 @@ from django_filters import rest_framework
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import viewsets, filters, status
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.cloud_storage.api.filters.folder_filter import FolderFilter
 from apps.cloud_storage.api.serializers import FolderSerializer, FolderDetailSerializer
+from apps.cloud_storage.api.serializers.folder_serializer import FolderCopySerializer
 from apps.cloud_storage.domain.exceptions.folder import FolderContainsFilesOrSubfoldersError
+from apps.cloud_storage.integrations.backends import get_storage
 from apps.cloud_storage.models import Folder
+from apps.cloud_storage.services.files.copy_files import execute_copy_plan, plan_folder_copy, start_copy_job
 from apps.cloud_storage.services.folders.delete_folder import delete_folder
+from apps.cloud_storage.tasks.file_copies import copy_folder_task, schedule_copy_materialization
+from apps.cloud_storage.tasks.file_processing import schedule_file_processing
 
 
 @extend_schema_view(
@@ -46,6 +52,8 @@ class FolderViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self, *args, **kwargs):
         if self.action == "retrieve":
             return FolderDetailSerializer
+        if self.action == "copy_folder":
+            return FolderCopySerializer
         return FolderSerializer
 
     def destroy(self, request, *args, **kwargs):
@@ -67,3 +75,35 @@ class FolderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         return Response(status=204)
+
+    @action(detail=True, methods=["post"], url_path="copy")
+    def copy_folder(self, request, pk=None):
+        """
+        Copy a folder with all its subfolders and files server-side, under
+        `parent_id` (root when null) and named `name` (the original's by default).
+
+        Large folders are copied in the background: the response is then 202
+        with a `job` to poll at `/api/cloud/copies/{job}`.
+        """
+        folder = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "folder": folder},
+        )
+        serializer.is_valid(raise_exception=True)
+        parent = serializer.validated_data.get("parent")
+        name = serializer.validated_data["name"]
+
+        plan = plan_folder_copy(request.user, folder, parent, name)
+        if plan.runs_in_background:
+            job_id = start_copy_job(plan)
+            copy_folder_task.delay(job_id, request.user.id, folder.id, getattr(parent, "id", None), name)
+            return Response({"job": job_id}, status=status.HTTP_202_ACCEPTED)
+
+        result = execute_copy_plan(get_storage(), plan)
+        schedule_copy_materialization(result)
+        schedule_file_processing([cloud_file.id for cloud_file in result.files])
+        return Response(
+            FolderSerializer(result.folder, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED,
+        )
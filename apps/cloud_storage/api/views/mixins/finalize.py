@@ -0,0 +1,38 @@
+from django.utils.translation import gettext_lazy as _
+
+from apps.cloud_storage.api.error_messages import get_error_message
+from apps.cloud_storage.constants.cloud_files import FAILED
+
+
+class FinalizeResultsMixin:
+
+    @staticmethod
+    def build_finalize_results(file_ids, outcomes):
+        """One result per requested id, in request order."""
+        outcomes_by_id = {outcome.file_id: outcome for outcome in outcomes}
+
+        results = []
+        for file_id in file_ids:
+            outcome = outcomes_by_id.get(file_id)
+            if not outcome:
+                results.append(
+                    {
+                        "id": file_id,
+                        "status": None,
+                        "code": "file_not_pending",
+                        "detail": _("File not found or already finalized."),
+                    }
+                )
+            elif outcome.status == FAILED:
+                results.append(
+                    {
+                        "id": file_id,
+                        "status": outcome.status,
+                        "code": outcome.error_code,
+                        "detail": get_error_message(outcome.error_code),
+                    }
+                )
+            else:
+                results.append({"id": file_id, "status": outcome.status})
+
+        return results
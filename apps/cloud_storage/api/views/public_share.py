@@ -1,5 +1,6 @@
 import logging
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular.utils import extend_schema
@@ -17,8 +18,14 @@ from apps.cloud_storage.api.views.mixins.share_link import (
     ShareLinkMixin,
     ShareLinkAccessMixin,
 )
-from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError, StorageUnavailableError
+from apps.cloud_storage.integrations.backends import get_storage
 from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.download_urls import generate_download_url, get_decoded_download_url
+from apps.cloud_storage.services.files.file_access import prepare_file_download
+from apps.cloud_storage.services.files.proxy_download import build_file_download_response
+from apps.cloud_storage.services.files.text_preview import get_file_preview
 
 logger = logging.getLogger("aerobox")
 
@@ -101,11 +108,14 @@ class PublicShareLinkFileDownloadView(ShareLinkMixin, ShareLinkAccessMixin, APIV
         if not share_link.can_access_file(file_obj):
             raise NotFound(_("File not found for this share link."))
 
-        s3_service = S3StorageClient()
+        s3_service = get_storage()
+        prepare_file_download(s3_service, file_obj)
         try:
-            download_url = s3_service.generate_presigned_download_url(
-                object_name=file_obj.s3_key
+            download_url = get_decoded_download_url(request, file_obj, share_link) or generate_download_url(
+                s3_service, file_obj, share_link
             )
+        except StorageUnavailableError:
+            raise
         except Exception as e:
             logger.error(
                 "Failed to generate S3 presigned URL for file_id=%s token=%s error=%s",
@@ -121,6 +131,64 @@ class PublicShareLinkFileDownloadView(ShareLinkMixin, ShareLinkAccessMixin, APIV
         return Response({"url": download_url}, status=status.HTTP_200_OK)
 
 
+@extend_schema(tags=["API - Share Links / Public"])
+class PublicShareLinkFileContentView(ShareLinkMixin, ShareLinkAccessMixin, APIView):
+    """
+    Public endpoint streaming a file belonging to a ShareLink through the
+    API, with `Range` support. Enabled with CLOUD_STORAGE_PROXY_DOWNLOADS;
+    compressed files are always served here.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token, file_id):
+        share_link = self.get_object()
+        self.validate_share_link(share_link)
+        self.require_valid_access(request, share_link)
+
+        file_obj = get_object_or_404(
+            CloudFile.not_deleted.select_related("folder"), id=file_id, status=SUCCESS
+        )
+        if not share_link.can_access_file(file_obj):
+            raise NotFound(_("File not found for this share link."))
+        if not settings.CLOUD_STORAGE_PROXY_DOWNLOADS and not file_obj.content_encoding:
+            raise NotFound()
+
+        storage = get_storage()
+        prepare_file_download(storage, file_obj)
+        try:
+            return build_file_download_response(storage, file_obj, request)
+        except ObjectNotFoundError:
+            raise NotFound(_("File not found in storage."))
+
+
+@extend_schema(tags=["API - Share Links / Public"])
+class PublicShareLinkFilePreviewView(ShareLinkMixin, ShareLinkAccessMixin, APIView):
+    """
+    Public endpoint to preview the first lines of a text, CSV or JSON file
+    belonging to a ShareLink.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, token, file_id):
+        share_link = self.get_object()
+        self.validate_share_link(share_link)
+        self.require_valid_access(request, share_link)
+
+        file_obj = get_object_or_404(
+            CloudFile.objects.select_related("folder"), id=file_id
+        )
+        if not share_link.can_access_file(file_obj):
+            raise NotFound(_("File not found for this share link."))
+
+        try:
+            preview = get_file_preview(get_storage(), file_obj)
+        except ObjectNotFoundError:
+            raise NotFound(_("File not found in storage."))
+        return Response(preview, status=status.HTTP_200_OK)
+
+
 @extend_schema(tags=["API - Share Links / Public"])
 class PublicShareLinkFolderView(ShareLinkMixin, ShareLinkAccessMixin, APIView):
     """
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.integrations.s3.events import build_object_created_payload
+from apps.cloud_storage.integrations.signed_urls import (
+    DOWNLOAD_SALT,
+    UPLOAD_SALT,
+    load_signed_token,
+    load_upload_policy_token,
+)
+from apps.cloud_storage.services.files.proxy_download import (
+    build_etag,
+    build_streaming_response,
+    stream_object,
+)
+from apps.cloud_storage.services.files.upload_tickets import TICKET_METADATA_KEY
+from apps.cloud_storage.tasks.finalize_uploads import finalize_uploads_from_s3_events_task
+from apps.cloud_storage.utils.region_utils import get_region_bucket
+
+logger = logging.getLogger("aerobox")
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class SignedStorageUploadView(View):
+    """
+    Receives presigned POST uploads for backends that have no HTTP endpoint
+    of their own (local disk, in-memory). Mirrors S3: form fields from the
+    presign response plus the file under `file`, 204 on success.
+
+    Upload policy tokens (upload sessions) accept any key under their
+    prefix. Like S3, session and ticket uploads are reported with an
+    ObjectCreated event, since no PENDING file is waiting for them.
+    """
+
+    def post(self, request, *args, **kwargs):
+        token = request.POST.get("token", "")
+        policy = load_upload_policy_token(token)
+        if policy is not None:
+            return self.post_policy_upload(request, policy)
+
+        payload = load_signed_token(token, UPLOAD_SALT)
+        if payload is None:
+            return JsonResponse({"error": "Invalid or expired upload token."}, status=403)
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return JsonResponse({"error": "Missing file."}, status=400)
+
+        if request.POST.get("key") != payload["key"]:
+            return JsonResponse({"error": "Key does not match the upload token."}, status=403)
+
+        if request.POST.get("Content-Type") != payload["content_type"]:
+            return JsonResponse({"error": "Content-Type does not match the upload token."}, status=403)
+
+        if upload.size > payload["max_bytes"]:
+            return JsonResponse({"error": "File exceeds the maximum allowed size."}, status=400)
+
+        if payload.get("sha256") and self.get_sha256(upload) != payload["sha256"]:
+            return JsonResponse({"error": "File does not match the expected SHA-256 checksum."}, status=400)
+
+        get_storage(payload.get("region")).save(
+            payload["key"],
+            upload,
+            content_type=payload["content_type"],
+            metadata={**payload.get("metadata", {}), "user-id": str(payload["user_id"])},
+        )
+        if TICKET_METADATA_KEY in payload.get("metadata", {}):
+            finalize_uploads_from_s3_events_task.delay(
+                build_object_created_payload(
+                    payload["key"], upload.size, payload["content_type"], get_region_bucket(payload.get("region", ""))
+                )
+            )
+        return JsonResponse({}, status=204)
+
+    def post_policy_upload(self, request, policy):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return JsonResponse({"error": "Missing file."}, status=400)
+
+        key_prefix = policy["key_prefix"]
+        key = (request.POST.get("key") or "").replace("${filename}", upload.name)
+        name = key[len(key_prefix):]
+        if not key.startswith(key_prefix) or not name or ".." in name.split("/"):
+            return JsonResponse({"error": "Key is outside the upload policy."}, status=403)
+
+        if upload.size > policy["max_bytes"]:
+            return JsonResponse({"error": "File exceeds the maximum allowed size."}, status=400)
+
+        content_type = request.POST.get("Content-Type") or "application/octet-stream"
+        get_storage(policy.get("region")).save(
+            key,
+            upload,
+            content_type=content_type,
+            metadata={"user-id": str(policy["user_id"])},
+        )
+        finalize_uploads_from_s3_events_task.delay(
+            build_object_created_payload(key, upload.size, content_type, get_region_bucket(policy.get("region", "")))
+        )
+        return JsonResponse({}, status=204)
+
+    @staticmethod
+    def get_sha256(upload) -> str:
+        digest = hashlib.sha256()
+        for chunk in upload.chunks():
+            digest.update(chunk)
+        upload.seek(0)
+        return digest.hexdigest()
+
+
+class SignedStorageDownloadView(View):
+    """Serves objects behind a signed, expiring download token, with byte ranges."""
+
+    def get(self, request, *args, **kwargs):
+        payload = load_signed_token(request.GET.get("token", ""), DOWNLOAD_SALT)
+        if payload is None:
+            return JsonResponse({"error": "Invalid or expired download token."}, status=403)
+
+        key, region = payload["key"], payload.get("region", "")
+        storage = get_storage(region)
+        head = storage.head(key)
+        if head is None:
+            return JsonResponse({"error": "File not found."}, status=404)
+
+        get_local_path = getattr(storage, "get_local_path", None)
+        try:
+            return build_streaming_response(
+                request,
+                lambda start, length: stream_object(storage, key, start, length),
+                size=head["size"],
+                content_type=head.get("content_type") or "application/octet-stream",
+                etag=build_etag(region, key, head["size"], head.get("content_encoding") or ""),
+                local_path=get_local_path(key) if get_local_path else None,
+                # Like a presigned URL: compressed objects are sent as stored
+                content_encoding=head.get("content_encoding"),
+            )
+        except ObjectNotFoundError:
+            return JsonResponse({"error": "File not found."}, status=404)
@@ -0,0 +1,41 @@
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from apps.cloud_storage.tasks.finalize_uploads import finalize_uploads_from_s3_events_task
+
+logger = logging.getLogger("aerobox")
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class S3EventWebhookView(View):
+    """
+    Receives S3 ObjectCreated notifications (native, SNS-wrapped or EventBridge)
+    and finalizes the matching uploads in the background.
+
+    Requests must carry the shared secret in the `X-Aerobox-Events-Token` header.
+    """
+
+    token_header_name = "X-Aerobox-Events-Token"
+
+    def post(self, request, *args, **kwargs):
+        secret = settings.CLOUD_STORAGE_EVENTS_WEBHOOK_SECRET
+        token = request.headers.get(self.token_header_name) or ""
+
+        if not secret or not hmac.compare_digest(token.encode(), secret.encode()):
+            return JsonResponse({"error": "Invalid storage events token."}, status=403)
+
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON payload."}, status=400)
+
+        finalize_uploads_from_s3_events_task.delay(payload)
+
+        return JsonResponse({"status": "accepted"}, status=202)
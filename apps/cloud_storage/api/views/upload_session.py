@@ -0,0 +1,73 @@
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.utils import extend_schema
+from rest_framework import authentication, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from apps.cloud_storage.api.pagination import ShareLinkPagination
+from apps.cloud_storage.api.serializers import UploadSessionSerializer
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.models import UploadSession
+from apps.cloud_storage.services.files.upload_sessions import close_upload_session, create_upload_session
+from apps.cloud_storage.utils.region_utils import get_upload_region
+
+
+@extend_schema(tags=["API - Upload Sessions"])
+class UploadSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Upload sessions for clients pushing many files: one presigned POST
+    policy for any key under the session's prefix, instead of one `create`
+    call per file. Uploaded objects become files once storage reports them.
+    """
+
+    authentication_classes = [authentication.TokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = UploadSessionSerializer
+    pagination_class = ShareLinkPagination
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user).order_by("-created_at")
+
+    def create(self, request, *args, **kwargs):
+        """
+        Open a session. `policy` is returned once: POST each file to its
+        `url` with its `fields`, setting `key` to `key_prefix` plus the
+        file's name, until `expires_at`.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = create_upload_session(
+            get_storage(),
+            request.user,
+            folder=serializer.validated_data.get("folder"),
+            max_bytes=serializer.validated_data.get("max_bytes"),
+            region=get_upload_region(request),
+        )
+
+        return Response(
+            {"policy": result.policy, "session": self.get_serializer(result.session).data},
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(request=None)
+    @action(detail=True, methods=["post"], url_path="close")
+    def close(self, request, pk=None):
+        """
+        Stop the session early. The policy cannot be revoked in storage, so
+        objects uploaded afterwards are deleted instead of registered.
+        """
+        session = self.get_object()
+        if session.closed_at is not None:
+            return Response(
+                {"detail": _("This upload session is already closed.")},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        close_upload_session(session)
+        return Response(self.get_serializer(session).data, status=status.HTTP_200_OK)
@@ -0,0 +1,8 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ContentEncoding(models.TextChoices):
+    IDENTITY = "", _("Stored as uploaded")
+    GZIP = "gzip", _("gzip")
+    ZSTD = "zstd", _("Zstandard")
@@ -0,0 +1,7 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class KeyLayout(models.IntegerChoices):
+    FLAT = 1, _("users/{id}/{name}")
+    SHARDED = 2, _("users/{id}/{shard}/{name}")
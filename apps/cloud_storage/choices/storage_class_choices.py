@@ -0,0 +1,14 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class StorageClass(models.TextChoices):
+    STANDARD = "STANDARD", _("Standard")
+    STANDARD_IA = "STANDARD_IA", _("Standard - Infrequent Access")
+    GLACIER_IR = "GLACIER_IR", _("Glacier Instant Retrieval")
+    GLACIER = "GLACIER", _("Glacier Flexible Retrieval")
+    DEEP_ARCHIVE = "DEEP_ARCHIVE", _("Glacier Deep Archive")
+
+
+# Objects in these classes must be restored before they can be read
+RESTORE_REQUIRED_STORAGE_CLASSES = {StorageClass.GLACIER, StorageClass.DEEP_ARCHIVE}
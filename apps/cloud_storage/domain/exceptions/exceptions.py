@@ -28,3 +28,45 @@ class Gone(APIException):
     status_code = status.HTTP_410_GONE
     default_detail = _("This link is no longer available.")
     default_code = "gone"
+
+
+class StorageQuotaExceeded(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = _("Upload exceeds your plan’s storage limit.")
+    default_code = "storage_quota_exceeded"
+
+
+class FileRestoreInProgress(APIException):
+    status_code = status.HTTP_202_ACCEPTED
+    default_detail = _(
+        "This file is archived and is being restored. It will be available to download in a few hours."
+    )
+    default_code = "file_restoring"
+    # Sent as Retry-After
+    wait = 60 * 15
+
+
+class StorageServiceUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Storage is temporarily unavailable. Please try again shortly.")
+    default_code = "storage_unavailable"
+
+
+class UnknownStorageRegion(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = _("This storage region is not available.")
+    default_code = "unknown_storage_region"
+
+
+class CopySourceArchived(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _(
+        "Some of these files are archived and cannot be copied. Download them to restore them first."
+    )
+    default_code = "copy_source_archived"
+
+
+class FilePreviewUnavailable(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = _("This file cannot be previewed.")
+    default_code = "file_preview_unavailable"
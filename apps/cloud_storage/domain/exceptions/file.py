@@ -9,3 +9,8 @@ class FileError(DomainError):
 class FileNotDeletedError(FileError):
     default_message = "File not deleted."
     default_code = "file_not_deleted"
+
+
+class RangeNotSatisfiableError(FileError):
+    default_message = "Requested range starts past the end of the file."
+    default_code = "range_not_satisfiable"
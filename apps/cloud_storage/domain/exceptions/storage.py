@@ -0,0 +1,21 @@
+from config.exceptions import DomainError
+
+
+class StorageError(DomainError):
+    default_message = "Storage request failed."
+    default_code = "storage_error"
+
+
+class StorageUnavailableError(StorageError):
+    default_message = "Storage is temporarily unavailable."
+    default_code = "storage_unavailable"
+
+
+class ObjectNotFoundError(StorageError):
+    default_message = "Object not found in storage."
+    default_code = "object_not_found"
+
+
+class RangeReadLimitExceeded(StorageError):
+    default_message = "Ranged reads went past the allowed number of bytes."
+    default_code = "range_read_limit_exceeded"
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+from apps.cloud_storage.integrations.backends import get_storage
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool dedicated to blocking storage I/O from async views.
+
+    Kept apart from asgiref's sync_to_async pool, so slow S3 calls cannot
+    starve ORM work, and rebuilt after a fork.
+    """
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CLOUD_STORAGE_ASYNC_MAX_WORKERS,
+                    thread_name_prefix="storage-io",
+                )
+                _executor_pid = pid
+    return _executor
+
+
+class AsyncStorage:
+    """
+    Awaitable facade over the configured storage backend.
+
+    botocore has no native asyncio support, so each call runs on the storage
+    executor; the event loop stays free while the request waits on S3.
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage or get_storage()
+
+    async def run(self, func, *args, **kwargs):
+        """Run any blocking callable on the storage executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_storage_executor(), partial(func, *args, **kwargs))
+
+    async def create_presigned_post_url(
+            self, object_key, user_id, max_bytes, content_type, checksum_sha256=None, metadata=None
+    ):
+        return await self.run(
+            self.storage.create_presigned_post_url,
+            object_key=object_key,
+            user_id=user_id,
+            max_bytes=max_bytes,
+            content_type=content_type,
+            checksum_sha256=checksum_sha256,
+            metadata=metadata,
+        )
+
+    async def generate_presigned_download_url(self, object_name):
+        return await self.run(self.storage.generate_presigned_download_url, object_name=object_name)
+
+    async def head(self, key):
+        return await self.run(self.storage.head, key)
+
+    async def delete_file(self, object_name):
+        return await self.run(self.storage.delete_file, object_name)
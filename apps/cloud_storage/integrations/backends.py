@@ -0,0 +1,119 @@
+from typing import BinaryIO, List, Optional, Protocol, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from apps.cloud_storage.utils.region_utils import is_default_region
+
+
+class StorageBackend(Protocol):
+    """
+    What the cloud_storage app needs from an object store.
+
+    Keys are full object keys (e.g. "users/1/<hash>.pdf"). Missing objects are
+    reported as None by `head` and `generate_presigned_download_url` (unless
+    called with `check_exists=False`, which skips the lookup);
+    `head` also reports the object's `content_encoding`, its `storage_class`
+    and, for archived objects, whether a restored copy is readable
+    (`restore_ready`);
+    `read_range` returns fewer bytes (or none) past the end of the object;
+    `open` from `start` may yield more than `length` bytes, callers stop
+    reading at `length`. Multipart uploads take parts of 5 MB or more,
+    except the last one, and are assembled from the (part number, ETag)
+    pairs `upload_part` returned. Backends on local disk also offer
+    `get_local_path(key)` for zero-copy responses.
+    StorageUnavailableError means the backend itself is unhealthy.
+
+    A backend instance serves one region (`region`, empty for the default
+    one); objects record the region they were stored in.
+    """
+
+    region: str
+
+    def create_presigned_post_url(
+            self,
+            object_key: str,
+            user_id: int,
+            max_bytes: int,
+            content_type: str,
+            checksum_sha256: Optional[str] = None,
+            metadata: Optional[dict] = None,
+    ) -> Optional[dict]:
+        ...
+
+    def create_presigned_prefix_post(
+            self, key_prefix: str, user_id: int, max_bytes: int, expires_in: int
+    ) -> Optional[dict]:
+        ...
+
+    def generate_presigned_download_url(self, object_name: str, check_exists: bool = True) -> Optional[str]:
+        ...
+
+    def head(self, key: str) -> Optional[dict]:
+        ...
+
+    def delete_file(self, object_name: str) -> None:
+        ...
+
+    def delete_files(self, object_names: List[str]) -> List[str]:
+        ...
+
+    def list_keys(
+            self, prefix: str, start_after: str = None, max_keys: int = 1000
+    ) -> Tuple[List[str], bool]:
+        ...
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        ...
+
+    def set_storage_class(self, key: str, storage_class: str) -> None:
+        ...
+
+    def restore(self, key: str, days: int) -> None:
+        ...
+
+    def open(self, key: str, start: int = 0, length: int = None) -> BinaryIO:
+        ...
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        ...
+
+    def save(
+            self,
+            key: str,
+            fileobj,
+            content_type: str = None,
+            metadata: dict = None,
+            content_encoding: str = None,
+    ) -> None:
+        ...
+
+    def create_multipart_upload(self, key: str, content_type: str = None) -> str:
+        ...
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        ...
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        ...
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        ...
+
+
+def get_storage(region: str = None) -> StorageBackend:
+    """Instantiate the backend configured in CLOUD_STORAGE_BACKEND for `region`."""
+    backend = import_string(settings.CLOUD_STORAGE_BACKEND)
+    if is_default_region(region):
+        return backend()
+    return backend(region=region)
+
+
+def get_region_storage(storage: StorageBackend, region: str) -> StorageBackend:
+    """
+    Backend for objects stored in `region`. `storage` is the default-region
+    backend callers pass around; it is reused when it already serves `region`.
+    """
+    if is_default_region(region) or getattr(storage, "region", None) == region:
+        return storage
+    return get_storage(region)
@@ -0,0 +1,21 @@
+from typing import Optional, Protocol
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class CDNSigner(Protocol):
+    """
+    Signs edge URLs for stored objects. Signing is local: no network call
+    is made, so it is cheap enough to run on every download request.
+    """
+
+    def sign_download_url(self, key: str, expires_in: int = None) -> str:
+        ...
+
+
+def get_cdn_signer() -> Optional[CDNSigner]:
+    """Instantiate the signer configured in CLOUD_STORAGE_CDN_SIGNER, if any."""
+    if not settings.CLOUD_STORAGE_CDN_SIGNER:
+        return None
+    return import_string(settings.CLOUD_STORAGE_CDN_SIGNER)()
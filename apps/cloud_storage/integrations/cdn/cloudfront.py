@@ -0,0 +1,52 @@
+"""
+CloudFront signed URLs (canned policy) for objects served from the bucket.
+
+The distribution's trusted key group holds the public keys; we keep the
+matching private keys in CLOUD_STORAGE_CDN_KEYS ({key id: PEM}) and sign
+with CLOUD_STORAGE_CDN_ACTIVE_KEY_ID. To rotate: add the new public key to
+the key group and its private key here, switch the active id, and drop the
+old key once the URLs it signed have expired.
+"""
+
+from datetime import timedelta
+from functools import lru_cache
+from urllib.parse import quote
+
+from botocore.signers import CloudFrontSigner
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+
+@lru_cache(maxsize=8)
+def load_private_key(pem: str):
+    return serialization.load_pem_private_key(pem.encode(), password=None)
+
+
+def build_rsa_signer(pem: str):
+    """CloudFront signatures are RSA-SHA1 with PKCS#1 v1.5 padding."""
+    private_key = load_private_key(pem)
+    return lambda message: private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())
+
+
+class CloudFrontURLSigner:
+
+    def __init__(self):
+        self.domain = settings.CLOUD_STORAGE_CDN_DOMAIN
+        self.key_id = settings.CLOUD_STORAGE_CDN_ACTIVE_KEY_ID
+        pem = settings.CLOUD_STORAGE_CDN_KEYS.get(self.key_id)
+        if not self.domain or not pem:
+            raise ImproperlyConfigured(
+                "CloudFront signing needs CLOUD_STORAGE_CDN_DOMAIN and a private key "
+                "for CLOUD_STORAGE_CDN_ACTIVE_KEY_ID in CLOUD_STORAGE_CDN_KEYS."
+            )
+        self.signer = CloudFrontSigner(self.key_id, build_rsa_signer(pem))
+
+    def sign_download_url(self, key: str, expires_in: int = None) -> str:
+        expires_in = expires_in or settings.CLOUD_STORAGE_CDN_URL_EXPIRATION
+        url = f"https://{self.domain}/{quote(key)}"
+        return self.signer.generate_presigned_url(
+            url, date_less_than=timezone.now() + timedelta(seconds=expires_in)
+        )
@@ -0,0 +1,216 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError, StorageError
+from apps.cloud_storage.integrations.signed_urls import SignedURLStorageMixin
+
+logger = logging.getLogger("aerobox")
+
+
+class LocalStorageClient(SignedURLStorageMixin):
+    """
+    Stores objects as files under CLOUD_STORAGE_LOCAL_ROOT, for development,
+    on-prem installs and offline benchmarks. Object bytes live in `objects/`,
+    content type and metadata in a JSON sidecar under `meta/`, parts of
+    unfinished multipart uploads under `uploads/`. Regions other than the
+    default one get their own tree under `regions/`.
+    """
+
+    def __init__(self, root=None, region=None):
+        self.region = region or ""
+        self.root = Path(root or settings.CLOUD_STORAGE_LOCAL_ROOT).resolve()
+        if self.region:
+            self.root = self.root / "regions" / self.region
+        self.objects_root = self.root / "objects"
+        self.meta_root = self.root / "meta"
+        self.uploads_root = self.root / "uploads"
+
+    def _object_path(self, key: str) -> Path:
+        path = (self.objects_root / key).resolve()
+        if self.objects_root not in path.parents:
+            raise StorageError(f"Invalid object key '{key}'.")
+        return path
+
+    def _meta_path(self, key: str) -> Path:
+        return self.meta_root / f"{key}.json"
+
+    def save(
+            self,
+            key: str,
+            fileobj,
+            content_type: str = None,
+            metadata: dict = None,
+            content_encoding: str = None,
+    ) -> None:
+        path = self._object_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as destination:
+            shutil.copyfileobj(fileobj, destination)
+
+        meta_path = self._meta_path(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(
+            json.dumps(
+                {"content_type": content_type, "metadata": metadata or {}, "content_encoding": content_encoding}
+            )
+        )
+
+    def open(self, key: str, start: int = 0, length: int = None):
+        try:
+            fileobj = open(self._object_path(key), "rb")
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError() from e
+        # Not cut at `length`; callers stop reading themselves
+        fileobj.seek(start)
+        return fileobj
+
+    def get_local_path(self, key: str) -> Optional[Path]:
+        """Path of the object on disk, for zero-copy responses; None if it does not exist."""
+        path = self._object_path(key)
+        return path if path.is_file() else None
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        with self.open(key) as body:
+            body.seek(start)
+            return body.read(length)
+
+    def head(self, key: str):
+        path = self._object_path(key)
+        if not path.is_file():
+            return None
+
+        meta = {}
+        meta_path = self._meta_path(key)
+        if meta_path.is_file():
+            meta = json.loads(meta_path.read_text())
+
+        return {
+            "size": path.stat().st_size,
+            "content_type": meta.get("content_type"),
+            "metadata": meta.get("metadata", {}),
+            "content_encoding": meta.get("content_encoding"),
+            "storage_class": "STANDARD",
+            "restore_ready": False,
+        }
+
+    def delete_file(self, object_name, *args, **kwargs) -> None:
+        try:
+            self._object_path(object_name).unlink(missing_ok=True)
+            self._meta_path(object_name).unlink(missing_ok=True)
+        except OSError as e:
+            logger.error(
+                "Failed to delete file from local storage.",
+                extra={"object_key": object_name, "error": str(e)},
+            )
+            raise StorageError("Failed to permanently delete file.") from e
+
+    def delete_files(self, object_names) -> list:
+        failed = []
+        for key in object_names:
+            try:
+                self.delete_file(key)
+            except StorageError:
+                failed.append(key)
+        return failed
+
+    def _iter_keys(self, directory: Path, directory_key: str, prefix: str, start_after: Optional[str]):
+        """
+        Keys under `directory` in S3 order, skipping subtrees outside
+        `prefix` or wholly at or before `start_after`. Sorting a directory's
+        subdirectories as "name/" puts their keys where S3 would list them.
+        """
+        try:
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        entries = [(entry.name + "/" if entry.is_dir() else entry.name, entry) for entry in entries]
+
+        for name, entry in sorted(entries, key=lambda item: item[0]):
+            key = directory_key + name
+            if not (key.startswith(prefix) or prefix.startswith(key)):
+                continue
+            if entry.is_dir():
+                if start_after is not None and key < start_after and not start_after.startswith(key):
+                    continue
+                yield from self._iter_keys(Path(entry.path), key, prefix, start_after)
+            elif start_after is None or key > start_after:
+                yield key
+
+    def list_keys(self, prefix: str, start_after: str = None, max_keys: int = 1000):
+        # Walk from the deepest directory the prefix names, lazily, so a page
+        # costs about the keys it returns rather than the whole tree
+        directory_key = prefix[:prefix.rfind("/") + 1]
+        keys = list(itertools.islice(
+            self._iter_keys(self.objects_root / directory_key, directory_key, prefix, start_after),
+            max_keys + 1,
+        ))
+        return keys[:max_keys], len(keys) > max_keys
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        head = self.head(source_key)
+        if head is None:
+            raise ObjectNotFoundError()
+
+        with self.open(source_key) as source:
+            self.save(dest_key, source, head["content_type"], head["metadata"], head["content_encoding"])
+
+    def set_storage_class(self, key: str, storage_class: str) -> None:
+        # A local disk has a single tier; objects always report STANDARD
+        if self.head(key) is None:
+            raise ObjectNotFoundError()
+
+    def restore(self, key: str, days: int) -> None:
+        pass
+
+    def _upload_path(self, upload_id: str) -> Path:
+        path = (self.uploads_root / upload_id).resolve()
+        if path.parent != self.uploads_root.resolve():
+            raise StorageError(f"Invalid upload id '{upload_id}'.")
+        return path
+
+    def create_multipart_upload(self, key: str, content_type: str = None) -> str:
+        self._object_path(key)
+        upload_id = uuid.uuid4().hex
+        path = self._upload_path(upload_id)
+        path.mkdir(parents=True)
+        (path / "upload.json").write_text(json.dumps({"key": key, "content_type": content_type}))
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        path = self._upload_path(upload_id)
+        if not path.is_dir():
+            raise StorageError(f"No multipart upload '{upload_id}' for '{key}'.")
+        (path / f"{part_number:05d}").write_bytes(data)
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        path = self._upload_path(upload_id)
+        if not path.is_dir():
+            raise StorageError(f"No multipart upload '{upload_id}' for '{key}'.")
+        upload = json.loads((path / "upload.json").read_text())
+
+        object_path = self._object_path(key)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(object_path, "wb") as destination:
+            for number, _etag in parts:
+                with open(path / f"{number:05d}", "rb") as part:
+                    shutil.copyfileobj(part, destination)
+
+        meta_path = self._meta_path(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(
+            json.dumps({"content_type": upload["content_type"], "metadata": {}, "content_encoding": None})
+        )
+        shutil.rmtree(path, ignore_errors=True)
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        shutil.rmtree(self._upload_path(upload_id), ignore_errors=True)
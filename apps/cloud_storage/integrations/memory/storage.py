@@ -0,0 +1,185 @@
+import hashlib
+import io
+import random
+import uuid
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError, StorageError
+from apps.cloud_storage.integrations.signed_urls import SignedURLStorageMixin
+
+
+class InMemoryStorageClient(SignedURLStorageMixin):
+    """
+    Process-local object store for tests, benchmarks and load tests.
+
+    Every operation sleeps for CLOUD_STORAGE_MEMORY_LATENCY_SECONDS plus a
+    random jitter of up to CLOUD_STORAGE_MEMORY_LATENCY_JITTER_SECONDS, to
+    approximate a remote store without a network.
+    """
+
+    _objects = {}
+    # Objects of the other regions, {region: {key: object}}
+    _region_objects = {}
+    # Unfinished multipart uploads, {upload_id: {"key", "content_type", "parts"}}
+    _multipart_uploads = {}
+    _lock = threading.Lock()
+
+    def __init__(
+            self,
+            latency: Optional[float] = None,
+            jitter: Optional[float] = None,
+            region: Optional[str] = None,
+    ):
+        self.latency = settings.CLOUD_STORAGE_MEMORY_LATENCY_SECONDS if latency is None else latency
+        self.jitter = settings.CLOUD_STORAGE_MEMORY_LATENCY_JITTER_SECONDS if jitter is None else jitter
+        self.region = region or ""
+        if self.region:
+            with self._lock:
+                self._objects = self._region_objects.setdefault(self.region, {})
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._objects.clear()
+            cls._region_objects.clear()
+            cls._multipart_uploads.clear()
+
+    def _simulate_latency(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def save(
+            self,
+            key: str,
+            fileobj,
+            content_type: str = None,
+            metadata: dict = None,
+            content_encoding: str = None,
+    ) -> None:
+        self._simulate_latency()
+        data = fileobj.read()
+        with self._lock:
+            self._objects[key] = {
+                "data": data,
+                "content_type": content_type,
+                "metadata": metadata or {},
+                "content_encoding": content_encoding,
+            }
+
+    def open(self, key: str, start: int = 0, length: int = None):
+        self._simulate_latency()
+        with self._lock:
+            obj = self._objects.get(key)
+        if obj is None:
+            raise ObjectNotFoundError()
+        end = None if length is None else start + length
+        return io.BytesIO(obj["data"][start:end])
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        self._simulate_latency()
+        with self._lock:
+            obj = self._objects.get(key)
+        if obj is None:
+            raise ObjectNotFoundError()
+        return obj["data"][start:start + length]
+
+    def head(self, key: str):
+        self._simulate_latency()
+        with self._lock:
+            obj = self._objects.get(key)
+        if obj is None:
+            return None
+        return {
+            "size": len(obj["data"]),
+            "content_type": obj["content_type"],
+            "metadata": dict(obj["metadata"]),
+            "content_encoding": obj.get("content_encoding"),
+            "storage_class": obj.get("storage_class", "STANDARD"),
+            "restore_ready": obj.get("restore_ready", False),
+        }
+
+    def delete_file(self, object_name, *args, **kwargs) -> None:
+        self._simulate_latency()
+        with self._lock:
+            self._objects.pop(object_name, None)
+
+    def delete_files(self, object_names) -> list:
+        self._simulate_latency()
+        with self._lock:
+            for key in object_names:
+                self._objects.pop(key, None)
+        return []
+
+    def list_keys(self, prefix: str, start_after: str = None, max_keys: int = 1000):
+        self._simulate_latency()
+        with self._lock:
+            keys = sorted(
+                key for key in self._objects
+                if key.startswith(prefix) and (start_after is None or key > start_after)
+            )
+        return keys[:max_keys], len(keys) > max_keys
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        self._simulate_latency()
+        with self._lock:
+            obj = self._objects.get(source_key)
+            if obj is None:
+                raise ObjectNotFoundError()
+            self._objects[dest_key] = dict(obj)
+
+    def set_storage_class(self, key: str, storage_class: str) -> None:
+        self._simulate_latency()
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is None:
+                raise ObjectNotFoundError()
+            obj["storage_class"] = storage_class
+            obj["restore_ready"] = False
+
+    def restore(self, key: str, days: int) -> None:
+        # Restores complete immediately
+        self._simulate_latency()
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is None:
+                raise ObjectNotFoundError()
+            obj["restore_ready"] = True
+
+    def create_multipart_upload(self, key: str, content_type: str = None) -> str:
+        self._simulate_latency()
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._multipart_uploads[upload_id] = {"key": key, "content_type": content_type, "parts": {}}
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        self._simulate_latency()
+        with self._lock:
+            upload = self._multipart_uploads.get(upload_id)
+            if upload is None or upload["key"] != key:
+                raise StorageError(f"No multipart upload '{upload_id}' for '{key}'.")
+            upload["parts"][part_number] = bytes(data)
+        return hashlib.md5(data).hexdigest()
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        self._simulate_latency()
+        with self._lock:
+            upload = self._multipart_uploads.pop(upload_id, None)
+            if upload is None or upload["key"] != key:
+                raise StorageError(f"No multipart upload '{upload_id}' for '{key}'.")
+            self._objects[key] = {
+                "data": b"".join(upload["parts"][number] for number, _etag in parts),
+                "content_type": upload["content_type"],
+                "metadata": {},
+                "content_encoding": None,
+            }
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        self._simulate_latency()
+        with self._lock:
+            self._multipart_uploads.pop(upload_id, None)
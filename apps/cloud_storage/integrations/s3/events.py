@@ -0,0 +1,113 @@
+import json
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import quote_plus, unquote_plus
+
+logger = logging.getLogger("aerobox")
+
+OBJECT_CREATED_PREFIX = "ObjectCreated:"
+EVENTBRIDGE_OBJECT_CREATED = "Object Created"
+
+
+@dataclass(frozen=True)
+class S3ObjectCreatedEvent:
+    key: str
+    size: int
+    content_type: Optional[str] = None
+    etag: Optional[str] = None
+    bucket: Optional[str] = None
+
+
+def parse_s3_object_created_events(payload) -> List[S3ObjectCreatedEvent]:
+    """
+    Extract ObjectCreated events from a notification payload.
+
+    Accepts the native S3 notification format ({"Records": [...]}), an SNS
+    envelope wrapping it, an EventBridge "Object Created" event, or a list of
+    any of those. Anything else is skipped.
+
+    S3 notifications do not carry the object's Content-Type; `contentType`
+    is read when a producer adds it (e.g. the local stand-in), otherwise the
+    value validated when the upload was presigned is kept.
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+
+    if isinstance(payload, list):
+        events = []
+        for item in payload:
+            events.extend(parse_s3_object_created_events(item))
+        return events
+
+    if not isinstance(payload, dict):
+        logger.warning("Ignoring S3 event payload with unexpected type.", extra={"payload": payload})
+        return []
+
+    # SNS envelope
+    if payload.get("Type") == "Notification" and "Message" in payload:
+        return parse_s3_object_created_events(payload["Message"])
+
+    # EventBridge
+    if payload.get("detail-type") == EVENTBRIDGE_OBJECT_CREATED:
+        return _parse_eventbridge_event(payload)
+
+    events = []
+    for record in payload.get("Records") or []:
+        event = _parse_notification_record(record)
+        if event:
+            events.append(event)
+    return events
+
+
+def build_object_created_payload(
+        key: str, size: int, content_type: Optional[str] = None, bucket: Optional[str] = None
+) -> dict:
+    """Native S3 notification for one new object, as the local stand-ins emit it."""
+    obj = {"key": quote_plus(key), "size": size}
+    if content_type:
+        obj["contentType"] = content_type
+    return {
+        "Records": [
+            {
+                "eventName": f"{OBJECT_CREATED_PREFIX}Post",
+                "s3": {"bucket": {"name": bucket}, "object": obj},
+            }
+        ]
+    }
+
+
+def _parse_notification_record(record: dict) -> Optional[S3ObjectCreatedEvent]:
+    event_name = record.get("eventName") or ""
+    if not event_name.startswith(OBJECT_CREATED_PREFIX):
+        return None
+
+    s3 = record.get("s3") or {}
+    obj = s3.get("object") or {}
+    bucket = (s3.get("bucket") or {}).get("name")
+    return _build_event(obj, bucket)
+
+
+def _parse_eventbridge_event(payload: dict) -> List[S3ObjectCreatedEvent]:
+    detail = payload.get("detail") or {}
+    obj = detail.get("object") or {}
+    bucket = (detail.get("bucket") or {}).get("name")
+    event = _build_event(obj, bucket)
+    return [event] if event else []
+
+
+def _build_event(obj: dict, bucket: Optional[str]) -> Optional[S3ObjectCreatedEvent]:
+    key = obj.get("key")
+    size = obj.get("size")
+    if not key or size is None:
+        logger.warning("Skipping S3 event without key or size.", extra={"object": obj})
+        return None
+
+    return S3ObjectCreatedEvent(
+        # Keys in S3 notifications are URL-encoded
+        key=unquote_plus(key),
+        size=int(size),
+        content_type=obj.get("contentType"),
+        etag=obj.get("eTag") or obj.get("etag"),
+        bucket=bucket,
+    )
@@ -1,16 +1,99 @@
+import base64
 import logging
+from contextlib import closing
+from typing import List, Optional, Tuple
 
-from botocore.exceptions import NoCredentialsError, ClientError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import (
+    BotoCoreError,
+    ClientError,
+    ConnectionError,
+    HTTPClientError,
+    NoCredentialsError,
+)
 from django.conf import settings
 
+from apps.cloud_storage.domain.exceptions.storage import (
+    ObjectNotFoundError,
+    StorageError,
+    StorageUnavailableError,
+)
+from apps.cloud_storage.utils.region_utils import (
+    get_default_region,
+    get_region_bucket,
+    is_default_region,
+)
 from apps.integrations.aws.aws_client import AWSClient
+from apps.integrations.aws.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger("aerobox")
 
+NOT_FOUND_CODES = {"404", "NoSuchKey", "NotFound"}
+THROTTLING_CODES = {"SlowDown", "Throttling", "ThrottlingException", "RequestTimeout"}
+
+
+def is_s3_degraded(exc: Exception) -> bool:
+    """Errors that say S3 itself is unhealthy, as opposed to a bad request."""
+    if isinstance(exc, (ConnectionError, HTTPClientError)):
+        return True
+    if isinstance(exc, ClientError):
+        error = exc.response.get("Error", {})
+        status_code = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return status_code >= 500 or error.get("Code") in THROTTLING_CODES
+    return False
+
+
+def get_copy_transfer_config() -> TransferConfig:
+    """
+    Managed copies use a single CopyObject up to the threshold and a
+    multipart UploadPartCopy above it (CopyObject is capped at 5 GB).
+    """
+    return TransferConfig(
+        multipart_threshold=settings.AWS_S3_MULTIPART_COPY_THRESHOLD,
+        multipart_chunksize=settings.AWS_S3_MULTIPART_COPY_PART_BYTES,
+    )
+
+
+def is_not_found(exc: Exception) -> bool:
+    return isinstance(exc, ClientError) and exc.response.get("Error", {}).get("Code") in NOT_FOUND_CODES
+
 
 class S3StorageClient:
-    def __init__(self):
-        self.s3_client = AWSClient("s3").get_client()
+    def __init__(self, region: str = None):
+        """
+        Client for the bucket of `region` (the default bucket when empty).
+        Each region has its own pooled boto3 client and circuit breaker, so
+        one degraded region does not fail the others.
+        """
+        self.region = region or get_default_region()
+        self.bucket_name = get_region_bucket(self.region)
+        self.s3_client = AWSClient("s3", self.region or None).get_client()
+        self.breaker = CircuitBreaker.get(
+            "s3" if is_default_region(self.region) else f"s3:{self.region}",
+            failure_threshold=settings.AWS_S3_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.AWS_S3_CIRCUIT_RESET_SECONDS,
+            is_failure=is_s3_degraded,
+        )
+
+    def _call(self, operation: str, **params):
+        """
+        Run an S3 API call through the circuit breaker.
+
+        Raises StorageUnavailableError when S3 is degraded or the circuit is
+        open. Any other error is re-raised as is, for the caller to handle.
+        """
+        try:
+            return self.breaker.call(getattr(self.s3_client, operation), **params)
+        except CircuitOpenError as e:
+            raise StorageUnavailableError() from e
+        except (BotoCoreError, ClientError) as e:
+            if is_s3_degraded(e):
+                logger.error(
+                    "S3 request failed.",
+                    extra={"operation": operation, "error": str(e)},
+                )
+                raise StorageUnavailableError() from e
+            raise
 
     def create_presigned_post_url(
         self,
@@ -18,10 +101,16 @@ class S3StorageClient:
             user_id: int,
             max_bytes: int,
             content_type: str,
+            checksum_sha256: Optional[str] = None,
+            metadata: Optional[dict] = None,
     ):
         """
         Generate a presigned POST for direct-to-S3 uploads with a hard size cap.
 
+        With `checksum_sha256` (hex) S3 verifies the uploaded bytes against it
+        and rejects the upload on mismatch. `metadata` is stored as user
+        metadata on the object, with the exact values required by the policy.
+
         Returns dict: {
           "url": str,
           "fields": dict,  # send these back to the browser (with the file) as form-data
@@ -44,10 +133,21 @@ class S3StorageClient:
             ["content-length-range", 0, int(max_bytes)],
         ]
 
+        if checksum_sha256:
+            checksum = base64.b64encode(bytes.fromhex(checksum_sha256)).decode()
+            fields["x-amz-checksum-algorithm"] = "SHA256"
+            fields["x-amz-checksum-sha256"] = checksum
+            conditions.append({"x-amz-checksum-algorithm": "SHA256"})
+            conditions.append({"x-amz-checksum-sha256": checksum})
+
+        for name, value in (metadata or {}).items():
+            fields[f"x-amz-meta-{name}"] = value
+            conditions.append({f"x-amz-meta-{name}": value})
+
         try:
 
             presigned = self.s3_client.generate_presigned_post(
-                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Bucket=self.bucket_name,
                 Key=object_key,
                 Fields=fields,
                 Conditions=conditions,
@@ -62,9 +162,46 @@ class S3StorageClient:
             "fields": presigned["fields"],  # forward these verbatim to the browser
         }
 
+    def create_presigned_prefix_post(self, key_prefix: str, user_id: int, max_bytes: int, expires_in: int):
+        """
+        Generate one presigned POST policy for many uploads: any key starting
+        with `key_prefix`, any content type, each object up to `max_bytes`.
+
+        Clients set the `key` field to `key_prefix` plus their own name, or
+        leave the `${filename}` placeholder for S3 to fill in.
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0")
+
+        fields = {"x-amz-meta-user-id": str(user_id)}
+        conditions: list = [
+            {"x-amz-meta-user-id": str(user_id)},
+            ["starts-with", "$Content-Type", ""],
+            ["content-length-range", 0, int(max_bytes)],
+        ]
+
+        try:
+            # A key ending in ${filename} gets a `starts-with` key condition
+            presigned = self.s3_client.generate_presigned_post(
+                Bucket=self.bucket_name,
+                Key=f"{key_prefix}${{filename}}",
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=expires_in,
+            )
+        except (NoCredentialsError, ClientError) as e:
+            logger.exception(f"Error generating presigned upload policy: {e}")
+            return None
+
+        return {
+            "url": presigned["url"],
+            "fields": presigned["fields"],
+        }
+
     def generate_presigned_download_url(
-            self, object_name, bucket_name=settings.AWS_STORAGE_BUCKET_NAME,
-            expiration=settings.AWS_PRESIGNED_EXPIRATION_TIME
+            self, object_name, bucket_name=None,
+            expiration=settings.AWS_PRESIGNED_EXPIRATION_TIME,
+            check_exists=True,
     ):
         """
         Generates a presigned URL for downloading a file from S3.
@@ -72,12 +209,15 @@ class S3StorageClient:
         :param bucket_name: Name of the S3 bucket
         :param object_name: S3 key (file path) in the bucket
         :param expiration: Time in seconds for the presigned URL to remain valid
+        :param check_exists: HEAD the object first; skip it for objects known to exist
         :return: Presigned URL as a string or None if the file does not exist or there is an error
         """
+        bucket_name = bucket_name or self.bucket_name
         try:
 
             # Check if the file exists first
-            self.s3_client.head_object(Bucket=bucket_name, Key=object_name)
+            if check_exists:
+                self._call("head_object", Bucket=bucket_name, Key=object_name)
 
             presigned_url = self.s3_client.generate_presigned_url(
                 ClientMethod="get_object",
@@ -91,7 +231,7 @@ class S3StorageClient:
 
         except ClientError as e:
 
-            if e.response["Error"]["Code"] == "404":
+            if is_not_found(e):
                 logger.error(
                     f"File '{object_name}' not found in S3 bucket '{bucket_name}'."
                 )
@@ -104,9 +244,12 @@ class S3StorageClient:
             logger.critical("AWS credentials not found.")
             return None
 
-    def delete_file(self, object_name, bucket_name=settings.AWS_STORAGE_BUCKET_NAME):
+    def delete_file(self, object_name, bucket_name=None):
+        bucket_name = bucket_name or self.bucket_name
         try:
-            self.s3_client.delete_object(Bucket=bucket_name, Key=object_name)
+            self._call("delete_object", Bucket=bucket_name, Key=object_name)
+        except StorageUnavailableError:
+            raise
         except Exception as e:
             logger.error(
                 "Failed to delete file from S3.",
@@ -117,15 +260,256 @@ class S3StorageClient:
                 }
             )
 
-            raise Exception("Failed to permanently delete file.")
+            raise StorageError("Failed to permanently delete file.") from e
 
     def head(self, key: str) -> dict:
+        """
+        Return size, content type and metadata of an object, or None if it
+        does not exist. Raises StorageUnavailableError when S3 is degraded,
+        so callers never mistake an outage for a missing object.
+        """
         try:
-            resp = self.s3_client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
-            return {
-                "size": resp["ContentLength"],
-                "content_type": resp.get("ContentType"),
-                "metadata": resp.get("Metadata", {}),
-            }
-        except Exception:
-            return None
+            resp = self._call("head_object", Bucket=self.bucket_name, Key=key)
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if is_not_found(e):
+                return None
+            raise StorageError(str(e)) from e
+        except BotoCoreError as e:
+            raise StorageError(str(e)) from e
+
+        return {
+            "size": resp["ContentLength"],
+            "content_type": resp.get("ContentType"),
+            "metadata": resp.get("Metadata", {}),
+            "content_encoding": resp.get("ContentEncoding"),
+            # S3 omits StorageClass for STANDARD objects
+            "storage_class": resp.get("StorageClass", "STANDARD"),
+            # Archived objects: a temporary readable copy exists
+            "restore_ready": 'ongoing-request="false"' in resp.get("Restore", ""),
+        }
+
+    def list_keys(self, prefix: str, start_after: str = None, max_keys: int = 1000):
+        """
+        List up to `max_keys` object keys under `prefix`, in key order,
+        starting after `start_after`. Returns (keys, is_truncated).
+        """
+        params = {
+            "Bucket": self.bucket_name,
+            "Prefix": prefix,
+            "MaxKeys": max_keys,
+        }
+        if start_after:
+            params["StartAfter"] = start_after
+
+        resp = self._call("list_objects_v2", **params)
+        keys = [obj["Key"] for obj in resp.get("Contents", [])]
+        return keys, resp.get("IsTruncated", False)
+
+    def delete_files(self, object_names) -> list:
+        """
+        Delete up to 1000 objects with a single DeleteObjects call.
+        Returns the keys that could not be deleted.
+        """
+        if not object_names:
+            return []
+
+        resp = self._call(
+            "delete_objects",
+            Bucket=self.bucket_name,
+            Delete={
+                "Objects": [{"Key": key} for key in object_names],
+                "Quiet": True,
+            },
+        )
+
+        errors = resp.get("Errors", [])
+        for error in errors:
+            logger.error(
+                "Failed to delete file from S3.",
+                extra={
+                    "object_key": error.get("Key"),
+                    "error_code": error.get("Code"),
+                    "error": error.get("Message"),
+                },
+            )
+        return [error["Key"] for error in errors]
+
+    def open(self, key: str, start: int = 0, length: int = None):
+        """Return a streaming, file-like body for the object, from byte `start` for `length` bytes if given."""
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if start or length is not None:
+            params["Range"] = f"bytes={start}-{'' if length is None else start + length - 1}"
+        try:
+            resp = self._call("get_object", **params)
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if is_not_found(e):
+                raise ObjectNotFoundError() from e
+            raise StorageError(str(e)) from e
+        return resp["Body"]
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        """Read `length` bytes from offset `start`; short or empty past the end of the object."""
+        try:
+            resp = self._call(
+                "get_object", Bucket=self.bucket_name, Key=key, Range=f"bytes={start}-{start + length - 1}"
+            )
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if is_not_found(e):
+                raise ObjectNotFoundError() from e
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                return b""
+            raise StorageError(str(e)) from e
+        with closing(resp["Body"]) as body:
+            return body.read()
+
+    def save(
+            self,
+            key: str,
+            fileobj,
+            content_type: str = None,
+            metadata: dict = None,
+            content_encoding: str = None,
+    ) -> None:
+        """Stream `fileobj` into the object; large bodies go up as a multipart upload."""
+        extra_args = {"Metadata": metadata or {}}
+        if content_type:
+            extra_args["ContentType"] = content_type
+        if content_encoding:
+            extra_args["ContentEncoding"] = content_encoding
+
+        try:
+            self._call(
+                "upload_fileobj",
+                Fileobj=fileobj,
+                Bucket=self.bucket_name,
+                Key=key,
+                ExtraArgs=extra_args,
+            )
+        except StorageUnavailableError:
+            raise
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(str(e)) from e
+
+    def set_storage_class(self, key: str, storage_class: str) -> None:
+        """
+        Move an object to another storage class by copying it onto itself.
+        Uses the managed copy, which switches to multipart above 5 GB.
+        """
+        bucket_name = self.bucket_name
+        try:
+            self._call(
+                "copy",
+                CopySource={"Bucket": bucket_name, "Key": key},
+                Bucket=bucket_name,
+                Key=key,
+                ExtraArgs={"StorageClass": storage_class, "MetadataDirective": "COPY"},
+                Config=get_copy_transfer_config(),
+            )
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if is_not_found(e):
+                raise ObjectNotFoundError() from e
+            raise StorageError(str(e)) from e
+
+    def restore(self, key: str, days: int) -> None:
+        """Request a temporary readable copy of an archived object."""
+        try:
+            self._call(
+                "restore_object",
+                Bucket=self.bucket_name,
+                Key=key,
+                RestoreRequest={
+                    "Days": days,
+                    "GlacierJobParameters": {"Tier": settings.CLOUD_STORAGE_RESTORE_TIER},
+                },
+            )
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "RestoreAlreadyInProgress":
+                return
+            if is_not_found(e):
+                raise ObjectNotFoundError() from e
+            raise StorageError(str(e)) from e
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        """
+        Server-side copy of an object within the bucket. Uses the managed
+        copy, so objects over 5 GB are copied part by part.
+        """
+        bucket_name = self.bucket_name
+        try:
+            self._call(
+                "copy",
+                CopySource={"Bucket": bucket_name, "Key": source_key},
+                Bucket=bucket_name,
+                Key=dest_key,
+                Config=get_copy_transfer_config(),
+            )
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if is_not_found(e):
+                raise ObjectNotFoundError() from e
+            raise StorageError(str(e)) from e
+
+    def create_multipart_upload(self, key: str, content_type: str = None) -> str:
+        """Start a multipart upload to `key`; returns its upload id."""
+        extra_args = {"ContentType": content_type} if content_type else {}
+        try:
+            response = self._call("create_multipart_upload", Bucket=self.bucket_name, Key=key, **extra_args)
+        except StorageUnavailableError:
+            raise
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(str(e)) from e
+        return response["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part (5 MB or more, except the last one); returns its ETag."""
+        try:
+            response = self._call(
+                "upload_part",
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data,
+            )
+        except StorageUnavailableError:
+            raise
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(str(e)) from e
+        return response["ETag"]
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+        """Assemble the object from `parts`, (part number, ETag) pairs in order."""
+        try:
+            self._call(
+                "complete_multipart_upload",
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [{"PartNumber": number, "ETag": etag} for number, etag in parts]},
+            )
+        except StorageUnavailableError:
+            raise
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(str(e)) from e
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Drop an unfinished multipart upload and the parts stored for it."""
+        try:
+            self._call("abort_multipart_upload", Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+        except StorageUnavailableError:
+            raise
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "NoSuchUpload":
+                return
+            raise StorageError(str(e)) from e
@@ -0,0 +1,128 @@
+import time
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+UPLOAD_SALT = "cloud_storage.signed_upload"
+UPLOAD_POLICY_SALT = "cloud_storage.signed_upload_policy"
+DOWNLOAD_SALT = "cloud_storage.signed_download"
+
+
+def build_signed_url(url_name: str, token: Optional[str] = None) -> str:
+    url = settings.CLOUD_STORAGE_SIGNED_URL_BASE.rstrip("/") + reverse(url_name)
+    if token:
+        url = f"{url}?{urlencode({'token': token})}"
+    return url
+
+
+def sign_upload(
+        object_key: str,
+        user_id: int,
+        max_bytes: int,
+        content_type: str,
+        checksum_sha256: Optional[str] = None,
+        region: str = "",
+        metadata: Optional[dict] = None,
+) -> str:
+    return signing.dumps(
+        {
+            "key": object_key,
+            "user_id": user_id,
+            "max_bytes": max_bytes,
+            "content_type": content_type,
+            "sha256": checksum_sha256,
+            "region": region,
+            "metadata": metadata or {},
+        },
+        salt=UPLOAD_SALT,
+    )
+
+
+def sign_upload_policy(key_prefix: str, user_id: int, max_bytes: int, expires_in: int, region: str = "") -> str:
+    return signing.dumps(
+        {
+            "key_prefix": key_prefix,
+            "user_id": user_id,
+            "max_bytes": max_bytes,
+            "expires_at": int(time.time()) + expires_in,
+            "region": region,
+        },
+        salt=UPLOAD_POLICY_SALT,
+    )
+
+
+def sign_download(object_key: str, region: str = "") -> str:
+    return signing.dumps({"key": object_key, "region": region}, salt=DOWNLOAD_SALT)
+
+
+def load_signed_token(token: str, salt: str) -> Optional[dict]:
+    """Return the signed payload, or None if it is forged or expired."""
+    try:
+        return signing.loads(token, salt=salt, max_age=settings.AWS_PRESIGNED_EXPIRATION_TIME)
+    except signing.BadSignature:
+        return None
+
+
+def load_upload_policy_token(token: str) -> Optional[dict]:
+    """Return the signed upload policy, or None if it is forged or expired."""
+    try:
+        payload = signing.loads(token, salt=UPLOAD_POLICY_SALT)
+    except signing.BadSignature:
+        return None
+    return payload if time.time() < payload["expires_at"] else None
+
+
+class SignedURLStorageMixin:
+    """
+    Presigned POST/GET emulation for backends without their own HTTP endpoint.
+
+    URLs point to SignedStorageUploadView / SignedStorageDownloadView, which
+    check the signature and call the backend's `save` / `open` in the region
+    named in the token. The POST keeps the S3 contract: clients send `fields`
+    plus the file as form-data.
+    """
+
+    def create_presigned_post_url(
+            self,
+            object_key: str,
+            user_id: int,
+            max_bytes: int,
+            content_type: str,
+            checksum_sha256: Optional[str] = None,
+            metadata: Optional[dict] = None,
+    ):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0")
+
+        fields = {
+            "key": object_key,
+            "Content-Type": content_type,
+            "x-amz-meta-user-id": str(user_id),
+        }
+        for name, value in (metadata or {}).items():
+            fields[f"x-amz-meta-{name}"] = value
+        fields["token"] = sign_upload(
+            object_key, user_id, max_bytes, content_type, checksum_sha256, self.region, metadata
+        )
+        return {"url": build_signed_url("signed-storage-upload"), "fields": fields}
+
+    def create_presigned_prefix_post(self, key_prefix: str, user_id: int, max_bytes: int, expires_in: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0")
+
+        return {
+            "url": build_signed_url("signed-storage-upload"),
+            "fields": {
+                "key": f"{key_prefix}${{filename}}",
+                "x-amz-meta-user-id": str(user_id),
+                "token": sign_upload_policy(key_prefix, user_id, max_bytes, expires_in, self.region),
+            },
+        }
+
+    def generate_presigned_download_url(self, object_name, *args, check_exists=True, **kwargs):
+        if check_exists and self.head(object_name) is None:
+            return None
+        return build_signed_url("signed-storage-download", sign_download(object_name, self.region))
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.files.thumbnails import (
+    generate_thumbnails_batch,
+    get_thumbnail_candidates,
+)
+from apps.cloud_storage.tasks.thumbnails import backfill_thumbnails_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Render thumbnails for existing images whose owner's plan includes "
+        "file preview, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CLOUD_STORAGE_THUMBNAIL_BATCH_SIZE,
+            help="Files rendered per batch.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Enqueue the backfill as a chain of Celery tasks and exit.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many files have no thumbnails yet.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["dry_run"]:
+            self.stdout.write(f"{get_thumbnail_candidates().count()} image(s) without thumbnails.")
+            return
+
+        if options["background"]:
+            backfill_thumbnails_task.delay(batch_size=batch_size)
+            self.stdout.write("Thumbnail backfill enqueued.")
+            return
+
+        storage = get_storage()
+        after_id, rendered = 0, 0
+        while after_id is not None:
+            batch = generate_thumbnails_batch(storage, after_id=after_id, batch_size=batch_size)
+            rendered += batch.rendered
+            after_id = batch.last_id
+        self.stdout.write(self.style.SUCCESS(f"Rendered thumbnails for {rendered} file(s)."))
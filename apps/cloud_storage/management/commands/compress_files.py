@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.files.compression import (
+    compress_files_batch,
+    get_compression_candidates,
+)
+from apps.cloud_storage.tasks.compression import backfill_compression_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress existing text-like files with CLOUD_STORAGE_COMPRESSION, "
+        "in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CLOUD_STORAGE_COMPRESSION_BATCH_SIZE,
+            help="Files compressed per batch.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Enqueue the backfill as a chain of Celery tasks and exit.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many files have not been considered yet.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["dry_run"]:
+            self.stdout.write(f"{get_compression_candidates().count()} file(s) not considered for compression.")
+            return
+
+        if not settings.CLOUD_STORAGE_COMPRESSION:
+            raise CommandError("Compression is disabled; set CLOUD_STORAGE_COMPRESSION.")
+
+        if options["background"]:
+            backfill_compression_task.delay(batch_size=batch_size)
+            self.stdout.write("Compression backfill enqueued.")
+            return
+
+        storage = get_storage()
+        after_id, compressed = 0, 0
+        while after_id is not None:
+            batch = compress_files_batch(storage, after_id=after_id, batch_size=batch_size)
+            compressed += batch.compressed
+            after_id = batch.last_id
+        self.stdout.write(self.style.SUCCESS(f"Compressed {compressed} file(s)."))
@@ -0,0 +1,120 @@
+import json
+import logging
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.integrations.s3.events import parse_s3_object_created_events
+from apps.cloud_storage.services.files.finalize_uploads import finalize_uploads_from_events
+from apps.cloud_storage.services.files.upload_sessions import register_session_uploads
+from apps.cloud_storage.services.files.upload_tickets import register_ticket_events
+from apps.integrations.aws.aws_client import AWSClient
+
+logger = logging.getLogger("aerobox")
+
+SQS_MAX_MESSAGES = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Finalize uploads from S3 ObjectCreated notifications, read from an SQS queue "
+        "or, as a local stand-in, from a file of JSON payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue-url",
+            default=settings.CLOUD_STORAGE_EVENTS_QUEUE_URL,
+            help="SQS queue URL receiving the bucket notifications.",
+        )
+        parser.add_argument(
+            "--from-file",
+            help="Read payloads from this file ('-' for stdin) instead of SQS. "
+                 "Accepts one JSON document or one payload per line.",
+        )
+        parser.add_argument(
+            "--wait-time",
+            type=int,
+            default=20,
+            help="SQS long polling wait time in seconds.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process a single SQS receive and exit.",
+        )
+
+    def handle(self, *args, **options):
+        storage = get_storage()
+
+        if options["from_file"]:
+            self.consume_file(storage, options["from_file"])
+            return
+
+        if not options["queue_url"]:
+            raise CommandError("Provide --queue-url or set CLOUD_STORAGE_EVENTS_QUEUE_URL.")
+
+        self.consume_queue(storage, options["queue_url"], options["wait_time"], options["once"])
+
+    def consume_file(self, storage, path):
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            content = stream.read()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        try:
+            payloads = [json.loads(content)]
+        except ValueError:
+            payloads = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+        events = parse_s3_object_created_events(payloads)
+        outcomes = finalize_uploads_from_events(storage=storage, events=events)
+        outcomes += register_session_uploads(storage, events)
+        outcomes += register_ticket_events(storage, events)
+        self.stdout.write(self.style.SUCCESS(f"Finalized {len(outcomes)} file(s) from {len(events)} event(s)."))
+
+    def consume_queue(self, storage, queue_url, wait_time, once):
+        sqs = AWSClient("sqs").get_client()
+
+        while True:
+            response = sqs.receive_message(
+                QueueUrl=queue_url,
+                MaxNumberOfMessages=SQS_MAX_MESSAGES,
+                WaitTimeSeconds=wait_time,
+            )
+            messages = response.get("Messages", [])
+
+            events = []
+            processed = []
+            for message in messages:
+                try:
+                    events.extend(parse_s3_object_created_events(message["Body"]))
+                except ValueError:
+                    # Left on the queue so the redrive policy can move it aside
+                    logger.error(
+                        "Could not parse S3 event message.",
+                        extra={"message_id": message.get("MessageId")},
+                    )
+                    continue
+                processed.append(message)
+
+            if events:
+                finalize_uploads_from_events(storage=storage, events=events)
+                register_session_uploads(storage, events)
+                register_ticket_events(storage, events)
+
+            if processed:
+                sqs.delete_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[
+                        {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"]}
+                        for i, message in enumerate(processed)
+                    ],
+                )
+
+            if once:
+                return
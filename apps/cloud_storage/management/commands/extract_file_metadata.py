@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.files.media_metadata import (
+    extract_metadata_batch,
+    get_metadata_candidates,
+)
+from apps.cloud_storage.tasks.media_metadata import backfill_metadata_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Read image, PDF and audio/video metadata of existing files with "
+        "ranged reads, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CLOUD_STORAGE_METADATA_BATCH_SIZE,
+            help="Files read per batch.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Enqueue the backfill as a chain of Celery tasks and exit.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many files have not been read yet.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["dry_run"]:
+            self.stdout.write(f"{get_metadata_candidates().count()} file(s) without media metadata.")
+            return
+
+        if options["background"]:
+            backfill_metadata_task.delay(batch_size=batch_size)
+            self.stdout.write("Metadata backfill enqueued.")
+            return
+
+        storage = get_storage()
+        after_id, extracted = 0, 0
+        while after_id is not None:
+            batch = extract_metadata_batch(storage, after_id=after_id, batch_size=batch_size)
+            extracted += batch.extracted
+            after_id = batch.last_id
+        self.stdout.write(self.style.SUCCESS(f"Extracted metadata for {extracted} file(s)."))
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.storage.key_layout_migration import (
+    get_content_objects_to_migrate,
+    get_files_to_migrate,
+    migrate_content_objects_batch,
+    migrate_files_batch,
+)
+from apps.cloud_storage.tasks.key_layout import migrate_key_layout_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy stored objects to the key layout configured for new uploads "
+        "(CLOUD_STORAGE_KEY_LAYOUT) in batches, repointing their rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CLOUD_STORAGE_KEY_LAYOUT_BATCH_SIZE,
+            help="Objects moved per batch.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Enqueue the migration as a chain of Celery tasks and exit.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many objects would be moved.",
+        )
+
+    def handle(self, *args, **options):
+        layout = settings.CLOUD_STORAGE_KEY_LAYOUT
+        batch_size = options["batch_size"]
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{get_files_to_migrate(layout).count()} file(s) and "
+                f"{get_content_objects_to_migrate(layout).count()} content object(s) "
+                f"to move to key layout {layout}."
+            )
+            return
+
+        if options["background"]:
+            migrate_key_layout_task.delay(batch_size=batch_size)
+            self.stdout.write("Key layout migration enqueued.")
+            return
+
+        storage = get_storage()
+        for label, migrate_batch in (
+                ("files", migrate_files_batch),
+                ("content objects", migrate_content_objects_batch),
+        ):
+            after_id, moved = 0, 0
+            while after_id is not None:
+                batch = migrate_batch(storage, after_id=after_id, batch_size=batch_size)
+                moved += batch.moved
+                after_id = batch.last_id
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} {label} to key layout {layout}."))
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.storage.region_migration import (
+    get_user_content_objects_to_move,
+    get_user_files_to_move,
+    move_user_content_objects_batch,
+    move_user_files_batch,
+    start_user_region_move,
+)
+from apps.cloud_storage.tasks.region_migration import move_user_region_task
+from apps.cloud_storage.utils.region_utils import is_storage_region
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a user's stored objects to another region in batches, repointing "
+        "their rows, and send the user's new uploads there."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("user_id", type=int)
+        parser.add_argument("region", help="Target region, one of the configured storage regions.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.CLOUD_STORAGE_REGION_MOVE_BATCH_SIZE,
+            help="Objects moved per batch.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Enqueue the move as a chain of Celery tasks and exit.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many objects would be moved.",
+        )
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"]
+        region = options["region"]
+        batch_size = options["batch_size"]
+
+        if not is_storage_region(region):
+            raise CommandError(f"Unknown storage region '{region}'.")
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{get_user_files_to_move(user_id, region).count()} file(s) and "
+                f"{get_user_content_objects_to_move(user_id, region).count()} content object(s) "
+                f"to move to region {region}."
+            )
+            return
+
+        start_user_region_move(user_id, region)
+
+        if options["background"]:
+            move_user_region_task.delay(user_id, region, batch_size=batch_size)
+            self.stdout.write("Region move enqueued.")
+            return
+
+        storage = get_storage()
+        for label, move_batch in (
+                ("files", move_user_files_batch),
+                ("content objects", move_user_content_objects_batch),
+        ):
+            after_id, moved = 0, 0
+            while after_id is not None:
+                batch = move_batch(storage, user_id, region, after_id=after_id, batch_size=batch_size)
+                moved += batch.moved
+                after_id = batch.last_id
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} {label} to region {region}."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.cloud_storage.services.files.object_cache import (
+    get_object_cache_stats,
+    reset_object_cache_stats,
+)
+
+
+class Command(BaseCommand):
+    help = "Report hits and misses of the object cache, across all hosts, and the share of bytes it served."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Clear the counters after reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        stats = get_object_cache_stats()
+        self.stdout.write(
+            f"Hits: {stats['hits']} ({stats['hit_bytes']} bytes), "
+            f"misses: {stats['misses']} ({stats['miss_bytes']} bytes)."
+        )
+        self.stdout.write(
+            f"Hit ratio: {stats['hit_ratio']:.1%}, bytes offloaded: {stats['offload_ratio']:.1%}."
+        )
+
+        if options["reset"]:
+            reset_object_cache_stats()
+            self.stdout.write("Counters reset.")
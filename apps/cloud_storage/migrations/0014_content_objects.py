@@ -0,0 +1,86 @@
+# Generated by Django 4.2.15 on 2026-10-19 01:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("cloud_storage", "0013_alter_cloudfile_path"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="cloudfile",
+            name="s3_key",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Full S3 object key path. Shared by files pointing at the same content object.",
+                max_length=1024,
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="ContentObject",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("sha256", models.CharField(max_length=64)),
+                ("s3_key", models.CharField(max_length=1024, unique=True)),
+                ("size", models.BigIntegerField(default=0)),
+                ("ref_count", models.PositiveIntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("success", "Success")],
+                        default="pending",
+                        help_text="Success once the bytes have been uploaded and verified.",
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="content_objects",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Content Object",
+                "verbose_name_plural": "Content Objects",
+            },
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="content_object",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Set when the file's bytes are stored content-addressed (deduplicated).",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="files",
+                to="cloud_storage.contentobject",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="contentobject",
+            constraint=models.UniqueConstraint(
+                fields=("user", "sha256"), name="unique_user_content_sha256"
+            ),
+        ),
+    ]
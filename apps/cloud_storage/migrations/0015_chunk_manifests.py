@@ -0,0 +1,93 @@
+# Generated by Django 4.2.15 on 2026-10-19 01:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0014_content_objects"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChunkManifest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("chunk_count", models.PositiveIntegerField()),
+                (
+                    "materialized_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the chunks were assembled into a single object.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "cloud_file",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="manifest",
+                        to="cloud_storage.cloudfile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Chunk Manifest",
+                "verbose_name_plural": "Chunk Manifests",
+            },
+        ),
+        migrations.CreateModel(
+            name="ManifestChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("index", models.PositiveIntegerField()),
+                ("offset", models.BigIntegerField()),
+                ("size", models.BigIntegerField()),
+                (
+                    "content_object",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="manifest_chunks",
+                        to="cloud_storage.contentobject",
+                    ),
+                ),
+                (
+                    "manifest",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunks",
+                        to="cloud_storage.chunkmanifest",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["manifest", "index"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="manifestchunk",
+            constraint=models.UniqueConstraint(
+                fields=("manifest", "index"), name="unique_manifest_chunk_index"
+            ),
+        ),
+    ]
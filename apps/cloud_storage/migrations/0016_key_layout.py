@@ -0,0 +1,31 @@
+# Generated by Django 4.2.15 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0015_chunk_manifests"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cloudfile",
+            name="key_layout",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "users/{id}/{name}"), (2, "users/{id}/{shard}/{name}")],
+                default=1,
+                help_text="Layout `s3_key` was built with.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contentobject",
+            name="key_layout",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "users/{id}/{name}"), (2, "users/{id}/{shard}/{name}")],
+                default=1,
+                help_text="Layout `s3_key` was built with.",
+            ),
+        ),
+    ]
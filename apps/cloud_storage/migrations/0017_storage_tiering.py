@@ -0,0 +1,56 @@
+# Generated by Django 4.2.15 on 2026-10-19 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0016_key_layout"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cloudfile",
+            name="last_accessed_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Last download, recorded write-behind (approximate).",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="restore_requested_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Set while an archived object is being restored.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="storage_class",
+            field=models.CharField(
+                choices=[
+                    ("STANDARD", "Standard"),
+                    ("STANDARD_IA", "Standard - Infrequent Access"),
+                    ("GLACIER_IR", "Glacier Instant Retrieval"),
+                    ("GLACIER", "Glacier Flexible Retrieval"),
+                    ("DEEP_ARCHIVE", "Glacier Deep Archive"),
+                ],
+                default="STANDARD",
+                help_text="Storage class of the object behind `s3_key`.",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="tiered_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the object was moved to a colder storage class.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.15 on 2026-10-19 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0017_storage_tiering"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sharelink",
+            name="use_cdn",
+            field=models.BooleanField(
+                blank=True,
+                help_text="Serve downloads from the CDN. Empty follows the owner's plan.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.15 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0018_share_link_use_cdn"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cloudfile",
+            name="bucket_name",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Bucket holding the object. Empty means the default bucket.",
+                max_length=63,
+            ),
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="region",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Region of the bucket holding the object. Empty means the default bucket.",
+                max_length=32,
+            ),
+        ),
+        migrations.AddField(
+            model_name="contentobject",
+            name="bucket_name",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Bucket holding the object. Empty means the default bucket.",
+                max_length=63,
+            ),
+        ),
+        migrations.AddField(
+            model_name="contentobject",
+            name="region",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Region of the bucket holding the object. Empty means the default bucket.",
+                max_length=32,
+            ),
+        ),
+    ]
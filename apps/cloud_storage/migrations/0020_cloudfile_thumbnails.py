@@ -0,0 +1,22 @@
+# Generated by Django 4.2.15 on 2026-10-19 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0019_region_placement"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cloudfile",
+            name="thumbnails",
+            field=models.JSONField(
+                blank=True,
+                help_text="Rendered thumbnails, {'format': ..., 'sizes': [widths]}. Empty when none can be made.",
+                null=True,
+            ),
+        ),
+    ]
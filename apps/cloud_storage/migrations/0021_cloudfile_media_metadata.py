@@ -0,0 +1,33 @@
+# Generated by Django 4.2.15 on 2026-10-19 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0020_cloudfile_thumbnails"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cloudfile",
+            name="captured_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the photo was taken, from its EXIF data.", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="metadata_extracted_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When media metadata was read from the object into `metadata['media']`.",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cloudfile",
+            index=models.Index(fields=["user", "captured_at"], name="cloud_stora_user_id_5eb244_idx"),
+        ),
+    ]
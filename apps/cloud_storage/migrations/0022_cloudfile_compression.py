@@ -0,0 +1,33 @@
+# Generated by Django 4.2.15 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0021_cloudfile_media_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cloudfile",
+            name="stored_size",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="Bytes the object takes in storage after compression. Null until compression was considered.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="cloudfile",
+            name="content_encoding",
+            field=models.CharField(
+                blank=True,
+                choices=[("", "Stored as uploaded"), ("gzip", "gzip"), ("zstd", "Zstandard")],
+                default="",
+                help_text="Content-Encoding the object is stored with; `size` is always the decoded size.",
+                max_length=8,
+            ),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 4.2.15 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("cloud_storage", "0022_cloudfile_compression"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "key_prefix",
+                    models.CharField(
+                        help_text="Object keys the policy allows start with this prefix.",
+                        max_length=255,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "key_layout",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "users/{id}/{name}"), (2, "users/{id}/{shard}/{name}")],
+                        default=1,
+                        help_text="Layout `key_prefix` was built with.",
+                    ),
+                ),
+                (
+                    "region",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Region of the bucket uploads go to. Empty means the default bucket.",
+                        max_length=32,
+                    ),
+                ),
+                ("max_bytes", models.BigIntegerField(help_text="Total bytes the session may register.")),
+                (
+                    "used_bytes",
+                    models.BigIntegerField(default=0, help_text="Bytes of the files registered so far."),
+                ),
+                ("file_count", models.PositiveIntegerField(default=0)),
+                (
+                    "rejected_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Uploads deleted because they did not fit the budget or the quota.",
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(help_text="When the policy stops accepting uploads.")),
+                (
+                    "closed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the user closed the session; later uploads are rejected.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "folder",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Folder the uploaded files are placed in. Empty means the root.",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="upload_sessions",
+                        to="cloud_storage.folder",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Upload Session",
+                "verbose_name_plural": "Upload Sessions",
+                "indexes": [
+                    models.Index(fields=["user", "-created_at"], name="uploadsession_user_created_idx"),
+                ],
+            },
+        ),
+    ]
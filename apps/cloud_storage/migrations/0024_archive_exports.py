@@ -0,0 +1,161 @@
+# Generated by Django 4.2.15 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("cloud_storage", "0023_upload_sessions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveExport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("s3_key", models.CharField(max_length=1024)),
+                (
+                    "region",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Region of the bucket the archive is written to. Empty means the default bucket.",
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "upload_id",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Multipart upload the archive is written with.",
+                        max_length=1024,
+                    ),
+                ),
+                ("total_files", models.PositiveIntegerField(default=0)),
+                ("total_bytes", models.BigIntegerField(default=0)),
+                ("exported_files", models.PositiveIntegerField(default=0)),
+                ("exported_bytes", models.BigIntegerField(default=0)),
+                (
+                    "skipped_files",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Archived files and files whose object was missing, left out of the archive.",
+                    ),
+                ),
+                ("parts_uploaded", models.PositiveIntegerField(default=0)),
+                ("checkpoint", models.JSONField(blank=True, default=dict)),
+                ("archive_size", models.BigIntegerField(blank=True, null=True)),
+                ("error_message", models.TextField(blank=True, null=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "expires_at",
+                    models.DateTimeField(blank=True, help_text="When the archive is deleted.", null=True),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archive_exports",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archive Export",
+                "verbose_name_plural": "Archive Exports",
+                "indexes": [
+                    models.Index(fields=["user", "-created_at"], name="archiveexport_user_created_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchiveExportPart",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("etag", models.CharField(max_length=255)),
+                (
+                    "export",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="parts",
+                        to="cloud_storage.archiveexport",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("export", "number"), name="archiveexportpart_export_number_uniq"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchiveExportEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("file_id", models.BigIntegerField()),
+                ("name", models.CharField(max_length=2048)),
+                ("crc32", models.BigIntegerField()),
+                ("size", models.BigIntegerField()),
+                ("header_offset", models.BigIntegerField()),
+                ("modified_at", models.DateTimeField()),
+                (
+                    "export",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="cloud_storage.archiveexport",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("export", "file_id"), name="archiveexportentry_export_file_uniq"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.15 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cloud_storage", "0024_archive_exports"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="cloudfile",
+            name="content_object",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Set when the file's bytes are stored content-addressed (deduplicated).",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="files",
+                to="cloud_storage.contentobject",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="manifestchunk",
+            name="content_object",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="manifest_chunks",
+                to="cloud_storage.contentobject",
+            ),
+        ),
+    ]
@@ -1,3 +1,7 @@
+from .content_objects import ContentObject
 from .cloud_files import CloudFile
+from .chunk_manifests import ChunkManifest, ManifestChunk
 from .folders import Folder
 from .share_link import ShareLink
+from .upload_sessions import UploadSession
+from .archive_exports import ArchiveExport, ArchiveExportEntry, ArchiveExportPart
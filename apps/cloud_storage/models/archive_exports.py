@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.cloud_storage.choices.archive_export_choices import ArchiveExportStatus
+from config.models.timestampable import Timestampable
+
+
+class ArchiveExport(Timestampable):
+    """
+    A ZIP64 archive of every file of a user, written to `s3_key` as a
+    multipart upload by a background job.
+
+    `checkpoint` holds the writer state as of the last uploaded part, so a
+    job picked up by another worker carries on from there.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="archive_exports",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=ArchiveExportStatus.choices,
+        default=ArchiveExportStatus.PENDING.value,
+    )
+    s3_key = models.CharField(max_length=1024)
+    region = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text=_("Region of the bucket the archive is written to. Empty means the default bucket."),
+    )
+    upload_id = models.CharField(
+        max_length=1024,
+        blank=True,
+        default="",
+        help_text=_("Multipart upload the archive is written with."),
+    )
+    total_files = models.PositiveIntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+    exported_files = models.PositiveIntegerField(default=0)
+    exported_bytes = models.BigIntegerField(default=0)
+    skipped_files = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Archived files and files whose object was missing, left out of the archive."),
+    )
+    parts_uploaded = models.PositiveIntegerField(default=0)
+    checkpoint = models.JSONField(default=dict, blank=True)
+    archive_size = models.BigIntegerField(null=True, blank=True)
+    error_message = models.TextField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the archive is deleted."),
+    )
+
+    class Meta:
+        verbose_name = _("Archive Export")
+        verbose_name_plural = _("Archive Exports")
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="archiveexport_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archive export {self.id} of {self.user_id} - {self.status}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (ArchiveExportStatus.COMPLETED.value, ArchiveExportStatus.FAILED.value)
+
+    @property
+    def is_available(self) -> bool:
+        return (
+            self.status == ArchiveExportStatus.COMPLETED.value
+            and (self.expires_at is None or timezone.now() < self.expires_at)
+        )
+
+
+class ArchiveExportPart(models.Model):
+    """A part of the archive's multipart upload, kept until the upload is complete."""
+
+    export = models.ForeignKey(ArchiveExport, related_name="parts", on_delete=models.CASCADE)
+    number = models.PositiveIntegerField()
+    etag = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["export", "number"], name="archiveexportpart_export_number_uniq"),
+        ]
+
+
+class ArchiveExportEntry(models.Model):
+    """Central directory record of a file written to an archive, kept until the archive is complete."""
+
+    export = models.ForeignKey(ArchiveExport, related_name="entries", on_delete=models.CASCADE)
+    file_id = models.BigIntegerField()
+    name = models.CharField(max_length=2048)
+    crc32 = models.BigIntegerField()
+    size = models.BigIntegerField()
+    header_offset = models.BigIntegerField()
+    modified_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["export", "file_id"], name="archiveexportentry_export_file_uniq"),
+        ]
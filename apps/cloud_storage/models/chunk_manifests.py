@@ -0,0 +1,61 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from config.models.timestampable import Timestampable
+
+
+class ChunkManifest(Timestampable):
+    """
+    Ordered list of content-addressed chunks making up a CloudFile uploaded
+    in chunked (delta) mode.
+
+    Chunks are ContentObjects, so a new version of a file only uploads the
+    chunks that changed. `materialized_at` is set once the chunks have been
+    concatenated into a single object at the file's `s3_key`.
+    """
+
+    cloud_file = models.OneToOneField(
+        "cloud_storage.CloudFile",
+        related_name="manifest",
+        on_delete=models.CASCADE,
+    )
+    chunk_count = models.PositiveIntegerField()
+    materialized_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the chunks were assembled into a single object."),
+    )
+
+    class Meta:
+        verbose_name = _("Chunk Manifest")
+        verbose_name_plural = _("Chunk Manifests")
+
+    def __str__(self):
+        return f"Manifest of file {self.cloud_file_id} ({self.chunk_count} chunks)"
+
+
+class ManifestChunk(models.Model):
+    """One chunk of a manifest; holds one reference on its ContentObject."""
+
+    manifest = models.ForeignKey(
+        ChunkManifest,
+        related_name="chunks",
+        on_delete=models.CASCADE,
+    )
+    content_object = models.ForeignKey(
+        "cloud_storage.ContentObject",
+        related_name="manifest_chunks",
+        on_delete=models.CASCADE,
+    )
+    index = models.PositiveIntegerField()
+    offset = models.BigIntegerField()
+    size = models.BigIntegerField()
+
+    class Meta:
+        ordering = ["manifest", "index"]
+        constraints = [
+            models.UniqueConstraint(fields=["manifest", "index"], name="unique_manifest_chunk_index"),
+        ]
+
+    def __str__(self):
+        return f"Chunk {self.index} of manifest {self.manifest_id}"
@@ -4,6 +4,9 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.choices.content_encoding_choices import ContentEncoding
+from apps.cloud_storage.choices.key_layout_choices import KeyLayout
+from apps.cloud_storage.choices.storage_class_choices import StorageClass
 from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS, FAILED
 from apps.cloud_storage.domain.exceptions.file import FileNotDeletedError
 from apps.cloud_storage.models.managers.cloud_file import CloudFileManager, DeletedCloudFileManager
@@ -35,10 +38,54 @@ class CloudFile(Timestampable, SoftDeleteModel):
         max_length=255,
         help_text=_("The path where the file is stored.")
     )
-    s3_key = models.CharField(max_length=1024, unique=True, null=True, blank=True, help_text="Full S3 object key path")
+    s3_key = models.CharField(
+        max_length=1024,
+        db_index=True,
+        null=True,
+        blank=True,
+        help_text="Full S3 object key path. Shared by files pointing at the same content object."
+    )
+    key_layout = models.PositiveSmallIntegerField(
+        choices=KeyLayout.choices,
+        default=KeyLayout.FLAT,
+        help_text=_("Layout `s3_key` was built with."),
+    )
+    region = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text=_("Region of the bucket holding the object. Empty means the default bucket."),
+    )
+    bucket_name = models.CharField(
+        max_length=63,
+        blank=True,
+        default="",
+        help_text=_("Bucket holding the object. Empty means the default bucket."),
+    )
+    content_object = models.ForeignKey(
+        "cloud_storage.ContentObject",
+        null=True,
+        blank=True,
+        related_name="files",
+        # Only goes away with its user; references are released before any other delete
+        on_delete=models.SET_NULL,
+        help_text=_("Set when the file's bytes are stored content-addressed (deduplicated).")
+    )
     size = models.BigIntegerField(
         help_text=_("The size of the file in bytes. This can be updated after the file is uploaded.")
     )
+    stored_size = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text=_("Bytes the object takes in storage after compression. Null until compression was considered."),
+    )
+    content_encoding = models.CharField(
+        max_length=8,
+        choices=ContentEncoding.choices,
+        blank=True,
+        default=ContentEncoding.IDENTITY,
+        help_text=_("Content-Encoding the object is stored with; `size` is always the decoded size."),
+    )
     content_type = models.CharField(
         max_length=50,
         help_text=_("The MIME type of the file (e.g., 'image/jpeg', 'application/pdf').")
@@ -67,11 +114,47 @@ class CloudFile(Timestampable, SoftDeleteModel):
         null=True,
         help_text=_("Any error message encountered during the file upload process.")
     )
+    last_accessed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Last download, recorded write-behind (approximate)."),
+    )
+    storage_class = models.CharField(
+        max_length=16,
+        choices=StorageClass.choices,
+        default=StorageClass.STANDARD,
+        help_text=_("Storage class of the object behind `s3_key`."),
+    )
+    tiered_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the object was moved to a colder storage class."),
+    )
+    restore_requested_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Set while an archived object is being restored."),
+    )
+    thumbnails = models.JSONField(
+        blank=True,
+        null=True,
+        help_text=_("Rendered thumbnails, {'format': ..., 'sizes': [widths]}. Empty when none can be made."),
+    )
     metadata = models.JSONField(
         blank=True, 
         null=True,
         help_text=_("Additional metadata related to the file, stored as a JSON object.")
     )
+    captured_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the photo was taken, from its EXIF data."),
+    )
+    metadata_extracted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When media metadata was read from the object into `metadata['media']`."),
+    )
 
     objects = models.Manager()
     not_deleted = CloudFileManager()
@@ -83,6 +166,7 @@ class CloudFile(Timestampable, SoftDeleteModel):
         indexes = [
             models.Index(fields=["user"]),
             models.Index(fields=["file_name"]),
+            models.Index(fields=["user", "captured_at"]),
         ]
 
     def __str__(self):
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.cloud_storage.choices.key_layout_choices import KeyLayout
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS
+from config.models.timestampable import Timestampable
+
+
+class ContentObject(Timestampable):
+    """
+    One stored object, addressed by the SHA-256 of its bytes, shared by every
+    CloudFile of the same user with that content.
+
+    `ref_count` is the number of CloudFile rows pointing at it; the object is
+    removed from storage when the last of them is permanently deleted.
+    """
+
+    STATUS = (
+        (PENDING, _("Pending")),
+        (SUCCESS, _("Success")),
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="content_objects",
+        on_delete=models.CASCADE,
+    )
+    sha256 = models.CharField(max_length=64)
+    s3_key = models.CharField(max_length=1024, unique=True)
+    key_layout = models.PositiveSmallIntegerField(
+        choices=KeyLayout.choices,
+        default=KeyLayout.FLAT,
+        help_text=_("Layout `s3_key` was built with."),
+    )
+    region = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text=_("Region of the bucket holding the object. Empty means the default bucket."),
+    )
+    bucket_name = models.CharField(
+        max_length=63,
+        blank=True,
+        default="",
+        help_text=_("Bucket holding the object. Empty means the default bucket."),
+    )
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(
+        max_length=8,
+        choices=STATUS,
+        default=PENDING,
+        help_text=_("Success once the bytes have been uploaded and verified."),
+    )
+
+    class Meta:
+        verbose_name = _("Content Object")
+        verbose_name_plural = _("Content Objects")
+        constraints = [
+            models.UniqueConstraint(fields=["user", "sha256"], name="unique_user_content_sha256"),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.user_id}, refs={self.ref_count})"
@@ -66,6 +66,12 @@ class ShareLink(Timestampable):
         help_text=_("Hashed password required to access this link, if enabled."),
     )
 
+    use_cdn = models.BooleanField(
+        null=True,
+        blank=True,
+        help_text=_("Serve downloads from the CDN. Empty follows the owner's plan."),
+    )
+
     class Meta:
         indexes = [
             models.Index(
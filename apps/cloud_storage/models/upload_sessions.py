@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.cloud_storage.choices.key_layout_choices import KeyLayout
+from config.models.timestampable import Timestampable
+
+
+class UploadSession(Timestampable):
+    """
+    One presigned POST policy a client reuses for many uploads under
+    `key_prefix`, until `expires_at`.
+
+    No file rows exist until objects arrive: each upload is registered as a
+    file in `folder` from its ObjectCreated event, as long as the session's
+    byte budget and the user's quota hold.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="upload_sessions",
+        on_delete=models.CASCADE,
+    )
+    folder = models.ForeignKey(
+        "cloud_storage.Folder",
+        null=True,
+        blank=True,
+        related_name="upload_sessions",
+        on_delete=models.SET_NULL,
+        help_text=_("Folder the uploaded files are placed in. Empty means the root."),
+    )
+    key_prefix = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text=_("Object keys the policy allows start with this prefix."),
+    )
+    key_layout = models.PositiveSmallIntegerField(
+        choices=KeyLayout.choices,
+        default=KeyLayout.FLAT,
+        help_text=_("Layout `key_prefix` was built with."),
+    )
+    region = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text=_("Region of the bucket uploads go to. Empty means the default bucket."),
+    )
+    max_bytes = models.BigIntegerField(
+        help_text=_("Total bytes the session may register."),
+    )
+    used_bytes = models.BigIntegerField(
+        default=0,
+        help_text=_("Bytes of the files registered so far."),
+    )
+    file_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_("Uploads deleted because they did not fit the budget or the quota."),
+    )
+    expires_at = models.DateTimeField(
+        help_text=_("When the policy stops accepting uploads."),
+    )
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("When the user closed the session; later uploads are rejected."),
+    )
+
+    class Meta:
+        verbose_name = _("Upload Session")
+        verbose_name_plural = _("Upload Sessions")
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="uploadsession_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Upload session {self.key_prefix}"
+
+    @property
+    def is_open(self) -> bool:
+        return self.closed_at is None and timezone.now() < self.expires_at
+
+    @property
+    def remaining_bytes(self) -> int:
+        return max(self.max_bytes - self.used_bytes, 0)
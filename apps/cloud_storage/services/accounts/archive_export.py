@@ -0,0 +1,515 @@
+"""
+Full-account archive exports.
+
+Every readable file of a user is streamed, with its original bytes, into a
+ZIP64 archive that keeps the folder structure. The archive goes to storage
+as a multipart upload, so nothing touches local disk and memory holds about
+one part.
+
+Entries are stored (not deflated) with their sizes and CRC after the data,
+so the archive bytes only depend on the files. The writer state after each
+part is enough to carry on after a worker restart: the offset, the file
+being written, how much of it was read and its running CRC. Central
+directory records are kept in ArchiveExportEntry until the directory is
+written at the end.
+"""
+
+import itertools
+import logging
+import math
+import posixpath
+import secrets
+import struct
+import zlib
+from contextlib import closing
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterator, List, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+
+from apps.cloud_storage.choices.archive_export_choices import ArchiveExportStatus
+from apps.cloud_storage.choices.storage_class_choices import RESTORE_REQUIRED_STORAGE_CLASSES
+from apps.cloud_storage.constants.cloud_files import SUCCESS, USER_PREFIX
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError, StorageError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import ArchiveExport, ArchiveExportEntry, ArchiveExportPart, CloudFile
+from apps.cloud_storage.services.files.compression import open_decoded
+from apps.cloud_storage.services.files.proxy_download import skip, stream_chunks
+
+logger = logging.getLogger("aerobox")
+
+# S3 takes at most 10,000 parts; parts grow past the configured size to fit
+MAX_PARTS = 9000
+# Headers, data descriptor and directory record of one entry, beside its name
+ENTRY_OVERHEAD_BYTES = 512
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+DATA_DESCRIPTOR = struct.Struct("<IIQQ")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+ZIP64_LOCAL_EXTRA = struct.Struct("<HHQQ")
+ZIP64_CENTRAL_EXTRA = struct.Struct("<HHQQQ")
+ZIP64_END = struct.Struct("<IQHHIIQQQQ")
+ZIP64_LOCATOR = struct.Struct("<IIQI")
+END = struct.Struct("<IHHHHIIH")
+
+ZIP_VERSION = 45
+# CRC and sizes follow the data (bit 3), names are UTF-8 (bit 11)
+ZIP_FLAGS = 0x0808
+ZIP64_EXTRA_ID = 0x0001
+MAX_UINT16 = 0xFFFF
+MAX_UINT32 = 0xFFFFFFFF
+
+
+class ArchiveExportSuperseded(Exception):
+    """Another worker checkpointed the export first; this one stops."""
+
+
+def get_export_files(user):
+    """Files that go into an archive: uploaded, not trashed and readable without a restore."""
+    return CloudFile.not_deleted.filter(user=user, status=SUCCESS).exclude(
+        storage_class__in=RESTORE_REQUIRED_STORAGE_CLASSES
+    )
+
+
+def get_part_bytes(total_bytes: int, total_files: int) -> int:
+    expected_bytes = total_bytes + total_files * ENTRY_OVERHEAD_BYTES
+    return max(settings.CLOUD_STORAGE_ARCHIVE_EXPORT_PART_BYTES, math.ceil(expected_bytes / MAX_PARTS))
+
+
+def build_archive_key(user) -> str:
+    # Under the user's prefix, so an account deletion sweeps it with the files
+    return f"{USER_PREFIX.format(user.id)}/exports/{secrets.token_hex(16)}.zip"
+
+
+def request_archive_export(user) -> Tuple[ArchiveExport, bool]:
+    """
+    Register an export of the files the user has now, or return the one
+    still running. Returns the export and whether it was created.
+    """
+    with transaction.atomic():
+        # One export at a time per user
+        get_user_model().objects.select_for_update().filter(id=user.id).first()
+        export = ArchiveExport.objects.filter(
+            user=user,
+            status__in=[ArchiveExportStatus.PENDING.value, ArchiveExportStatus.RUNNING.value],
+        ).first()
+        if export:
+            return export, False
+
+        totals = get_export_files(user).aggregate(count=Count("id"), size=Sum("size"), max_id=Max("id"))
+        total_files, total_bytes = totals["count"], totals["size"] or 0
+        export = ArchiveExport.objects.create(
+            user=user,
+            s3_key=build_archive_key(user),
+            total_files=total_files,
+            total_bytes=total_bytes,
+            skipped_files=CloudFile.not_deleted.filter(
+                user=user, status=SUCCESS, storage_class__in=RESTORE_REQUIRED_STORAGE_CLASSES
+            ).count(),
+            checkpoint={
+                "part_bytes": get_part_bytes(total_bytes, total_files),
+                # Files uploaded after the request are not part of the export
+                "max_file_id": totals["max_id"] or 0,
+                "offset": 0,
+                "after_id": 0,
+                "current": None,
+                "directory_offset": None,
+                "directory_after_id": 0,
+                "directory_entries": 0,
+                "closed": False,
+            },
+        )
+    return export, True
+
+
+def get_entry_name(cloud_file: CloudFile) -> str:
+    parts = [part for part in (cloud_file.path or cloud_file.file_name).split("/") if part not in ("", ".", "..")]
+    return "/".join(parts) or str(cloud_file.id)
+
+
+def to_dos_datetime(value: datetime) -> Tuple[int, int]:
+    """(time, date) of `value` in UTC, in the MS-DOS format ZIP headers use."""
+    value = value.astimezone(dt_timezone.utc)
+    year = min(max(value.year, 1980), 2107)
+    dos_time = (value.hour << 11) | (value.minute << 5) | (value.second // 2)
+    dos_date = ((year - 1980) << 9) | (value.month << 5) | value.day
+    return dos_time, dos_date
+
+
+def build_local_header(name: str, modified_at: datetime) -> bytes:
+    encoded_name = name.encode("utf-8")
+    dos_time, dos_date = to_dos_datetime(modified_at)
+    extra = ZIP64_LOCAL_EXTRA.pack(ZIP64_EXTRA_ID, 16, 0, 0)
+    header = LOCAL_HEADER.pack(
+        0x04034B50, ZIP_VERSION, ZIP_FLAGS, 0, dos_time, dos_date,
+        0, MAX_UINT32, MAX_UINT32, len(encoded_name), len(extra),
+    )
+    return header + encoded_name + extra
+
+
+def build_data_descriptor(crc: int, size: int) -> bytes:
+    return DATA_DESCRIPTOR.pack(0x08074B50, crc, size, size)
+
+
+def build_central_record(entry: ArchiveExportEntry) -> bytes:
+    encoded_name = entry.name.encode("utf-8")
+    dos_time, dos_date = to_dos_datetime(entry.modified_at)
+    extra = ZIP64_CENTRAL_EXTRA.pack(ZIP64_EXTRA_ID, 24, entry.size, entry.size, entry.header_offset)
+    header = CENTRAL_HEADER.pack(
+        0x02014B50, ZIP_VERSION, ZIP_VERSION, ZIP_FLAGS, 0, dos_time, dos_date,
+        entry.crc32, MAX_UINT32, MAX_UINT32, len(encoded_name), len(extra), 0, 0, 0, 0, MAX_UINT32,
+    )
+    return header + encoded_name + extra
+
+
+def build_end_records(entries: int, directory_offset: int, directory_size: int, end_offset: int) -> bytes:
+    return (
+        ZIP64_END.pack(0x06064B50, 44, ZIP_VERSION, ZIP_VERSION, 0, 0, entries, entries, directory_size, directory_offset)
+        + ZIP64_LOCATOR.pack(0x07064B50, 0, end_offset, 1)
+        + END.pack(0x06054B50, 0, 0, MAX_UINT16, MAX_UINT16, MAX_UINT32, MAX_UINT32, 0)
+    )
+
+
+def read_body(body) -> Iterator[bytes]:
+    with closing(body):
+        while data := body.read(settings.CLOUD_STORAGE_ARCHIVE_EXPORT_READ_BYTES):
+            yield data
+
+
+def open_file_content(storage, cloud_file: CloudFile, start: int = 0) -> Iterator[bytes]:
+    """
+    The original bytes of `cloud_file` from `start`: from its chunks until
+    they are assembled, decoded when its object is compressed. Objects are
+    opened right away, so a missing one fails here rather than mid-entry.
+    """
+    manifest = getattr(cloud_file, "manifest", None)
+    if manifest is not None and manifest.materialized_at is None:
+        return stream_chunks(storage, cloud_file, start, cloud_file.size - start)
+
+    if cloud_file.content_encoding:
+        body = open_decoded(storage, cloud_file)
+        skip(body, start)
+    else:
+        body = get_region_storage(storage, cloud_file.region).open(cloud_file.s3_key, start=start)
+    return read_body(body)
+
+
+class ArchiveExportWriter:
+    """
+    Writes the archive of `export` into parts of its multipart upload,
+    checkpointing after each one. Stops after `max_parts` parts, so a task
+    run stays short; the next run picks up from the checkpoint.
+    """
+
+    def __init__(self, export: ArchiveExport, storage, max_parts: int):
+        self.export = export
+        self.storage = storage
+        self.target = get_region_storage(storage, export.region)
+        self.state = dict(export.checkpoint)
+        self.max_parts = max_parts
+        self.buffer = bytearray()
+        # Entries of files written since the last part, stored with the next one
+        self.pending_entries: List[ArchiveExportEntry] = []
+        self.stored_after_id = self.state["after_id"]
+        self.parts_written = 0
+
+    @property
+    def position(self) -> int:
+        return self.state["offset"] + len(self.buffer)
+
+    @property
+    def paused(self) -> bool:
+        return self.parts_written >= self.max_parts
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+
+    def maybe_flush(self) -> bool:
+        if len(self.buffer) < self.state["part_bytes"]:
+            return False
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Upload the buffer as the next part and checkpoint the state it ends at."""
+        number = self.export.parts_uploaded + 1
+        etag = self.target.upload_part(self.export.s3_key, self.export.upload_id, number, bytes(self.buffer))
+        self.state["offset"] += len(self.buffer)
+        self.buffer.clear()
+
+        with transaction.atomic():
+            saved = ArchiveExport.objects.filter(id=self.export.id, parts_uploaded=number - 1).update(
+                parts_uploaded=number,
+                checkpoint=self.state,
+                exported_files=self.export.exported_files,
+                exported_bytes=self.export.exported_bytes,
+                skipped_files=self.export.skipped_files,
+                updated_at=timezone.now(),
+            )
+            if not saved:
+                raise ArchiveExportSuperseded()
+            ArchiveExportPart.objects.create(export=self.export, number=number, etag=etag)
+            ArchiveExportEntry.objects.bulk_create(self.pending_entries)
+
+        self.export.parts_uploaded = number
+        self.export.checkpoint = dict(self.state)
+        self.pending_entries = []
+        self.stored_after_id = self.state["after_id"]
+        self.parts_written += 1
+
+    def assign_names(self, files: List[CloudFile]) -> Dict[int, str]:
+        """Entry names of `files`; a name already in the archive gets the file id appended."""
+        names = {cloud_file.id: get_entry_name(cloud_file) for cloud_file in files}
+        taken = set(
+            ArchiveExportEntry.objects.filter(export=self.export, name__in=set(names.values()))
+            .values_list("name", flat=True)
+        )
+        taken.update(entry.name for entry in self.pending_entries)
+
+        for file_id, name in names.items():
+            if name in taken:
+                stem, extension = posixpath.splitext(name)
+                name = names[file_id] = f"{stem} ({file_id}){extension}"
+            taken.add(name)
+        return names
+
+    def skip_file(self, cloud_file: CloudFile) -> None:
+        logger.warning(
+            "Object missing, file left out of the archive.",
+            extra={"export_id": self.export.id, "file_id": cloud_file.id},
+        )
+        self.export.skipped_files += 1
+        self.state["after_id"] = cloud_file.id
+
+    def write_files(self) -> bool:
+        """Write an entry per file; False when the run stopped before the last one."""
+        if self.state["current"] is not None and not self.resume_file():
+            return False
+
+        while not self.paused:
+            files = list(
+                get_export_files(self.export.user)
+                .filter(id__gt=self.state["after_id"], id__lte=self.state["max_file_id"])
+                .select_related("manifest")
+                .order_by("id")[:settings.CLOUD_STORAGE_ARCHIVE_EXPORT_BATCH_SIZE]
+            )
+            if not files:
+                return True
+
+            names = self.assign_names(files)
+            for cloud_file in files:
+                if not self.write_file(cloud_file, names[cloud_file.id]) or self.paused:
+                    return False
+        return False
+
+    def write_file(self, cloud_file: CloudFile, name: str) -> bool:
+        try:
+            chunks = open_file_content(self.storage, cloud_file)
+            first = next(chunks, b"")
+        except ObjectNotFoundError:
+            self.skip_file(cloud_file)
+            return True
+
+        self.state["current"] = {
+            "file_id": cloud_file.id,
+            "name": name,
+            "modified_at": cloud_file.created_at.isoformat(),
+            "header_offset": self.position,
+            "consumed": 0,
+            "crc": 0,
+        }
+        self.write(build_local_header(name, cloud_file.created_at))
+        return self.copy(first, chunks)
+
+    def resume_file(self) -> bool:
+        """Carry on with the file a previous run stopped in the middle of."""
+        current = self.state["current"]
+        cloud_file = CloudFile.objects.select_related("manifest").filter(id=current["file_id"]).first()
+        try:
+            if cloud_file is None:
+                raise ObjectNotFoundError()
+            chunks = open_file_content(self.storage, cloud_file, start=current["consumed"])
+            first = next(chunks, b"")
+        except ObjectNotFoundError:
+            # Its first bytes are already uploaded; the entry ends where they do
+            logger.warning(
+                "File removed during its export; its entry is cut short.",
+                extra={"export_id": self.export.id, "file_id": current["file_id"]},
+            )
+            self.finish_entry()
+            return True
+        return self.copy(first, chunks)
+
+    def copy(self, first: bytes, chunks: Iterator[bytes]) -> bool:
+        current = self.state["current"]
+        with closing(chunks):
+            for data in itertools.chain([first], chunks):
+                self.write(data)
+                current["consumed"] += len(data)
+                current["crc"] = zlib.crc32(data, current["crc"])
+                if self.maybe_flush() and self.paused:
+                    return False
+        self.finish_entry()
+        return True
+
+    def finish_entry(self) -> None:
+        current = self.state["current"]
+        self.write(build_data_descriptor(current["crc"], current["consumed"]))
+        self.pending_entries.append(
+            ArchiveExportEntry(
+                export=self.export,
+                file_id=current["file_id"],
+                name=current["name"],
+                crc32=current["crc"],
+                size=current["consumed"],
+                header_offset=current["header_offset"],
+                modified_at=datetime.fromisoformat(current["modified_at"]),
+            )
+        )
+        self.export.exported_files += 1
+        self.export.exported_bytes += current["consumed"]
+        self.state["after_id"] = current["file_id"]
+        self.state["current"] = None
+        self.maybe_flush()
+
+    def iter_entries(self) -> Iterator[ArchiveExportEntry]:
+        """
+        Entries not in the directory yet, by file id: the stored ones, read
+        in batches, then those written since the last part.
+        """
+        # A part uploaded meanwhile stores the pending entries; they are not read twice
+        unstored = [entry for entry in self.pending_entries if entry.file_id > self.state["directory_after_id"]]
+        stored_after_id = self.stored_after_id
+        after_id = self.state["directory_after_id"]
+        while True:
+            entries = list(
+                ArchiveExportEntry.objects.filter(
+                    export=self.export, file_id__gt=after_id, file_id__lte=stored_after_id
+                ).order_by("file_id")[:settings.CLOUD_STORAGE_ARCHIVE_EXPORT_BATCH_SIZE]
+            )
+            if not entries:
+                break
+            yield from entries
+            after_id = entries[-1].file_id
+        yield from unstored
+
+    def write_directory(self) -> bool:
+        """Write the central directory and the end records; False when the run stopped first."""
+        if self.state["directory_offset"] is None:
+            self.state["directory_offset"] = self.position
+
+        for entry in self.iter_entries():
+            self.write(build_central_record(entry))
+            self.state["directory_after_id"] = entry.file_id
+            self.state["directory_entries"] += 1
+            if self.maybe_flush() and self.paused:
+                return False
+
+        end_offset = self.position
+        self.write(
+            build_end_records(
+                self.state["directory_entries"],
+                self.state["directory_offset"],
+                end_offset - self.state["directory_offset"],
+                end_offset,
+            )
+        )
+        self.state["closed"] = True
+        self.flush()
+        return True
+
+
+def complete_archive_export(export: ArchiveExport, storage) -> None:
+    target = get_region_storage(storage, export.region)
+    parts = list(export.parts.order_by("number").values_list("number", "etag"))
+    try:
+        target.complete_multipart_upload(export.s3_key, export.upload_id, parts)
+    except StorageError:
+        # Completed by a run that stopped before saving it
+        if target.head(export.s3_key) is None:
+            raise
+
+    now = timezone.now()
+    export.status = ArchiveExportStatus.COMPLETED.value
+    export.archive_size = export.checkpoint["offset"]
+    export.checkpoint = {}
+    export.error_message = None
+    export.completed_at = now
+    export.expires_at = now + timedelta(days=settings.CLOUD_STORAGE_ARCHIVE_EXPORT_RETENTION_DAYS)
+    export.save()
+    export.entries.all().delete()
+    export.parts.all().delete()
+
+
+def run_archive_export(export: ArchiveExport, storage, max_parts: int) -> bool:
+    """
+    Write up to `max_parts` parts of the archive, checkpointing after each
+    one. Returns True once the archive is complete.
+    """
+    target = get_region_storage(storage, export.region)
+    if export.status == ArchiveExportStatus.PENDING.value:
+        export.status = ArchiveExportStatus.RUNNING.value
+        export.save(update_fields=["status", "updated_at"])
+
+    if not export.upload_id:
+        upload_id = target.create_multipart_upload(export.s3_key, content_type="application/zip")
+        if not ArchiveExport.objects.filter(id=export.id, upload_id="").update(upload_id=upload_id):
+            target.abort_multipart_upload(export.s3_key, upload_id)
+            raise ArchiveExportSuperseded()
+        export.upload_id = upload_id
+
+    writer = ArchiveExportWriter(export, storage, max_parts)
+    if not writer.state["closed"]:
+        if writer.state["directory_offset"] is None and not writer.write_files():
+            return False
+        if not writer.write_directory():
+            return False
+
+    complete_archive_export(export, storage)
+    logger.info(
+        "Archive export %s for user_id=%s: %s files, %s bytes, %s skipped.",
+        export.id, export.user_id, export.exported_files, export.archive_size, export.skipped_files,
+    )
+    return True
+
+
+def fail_archive_export(export: ArchiveExport, storage, error: str) -> None:
+    """Give up on an export and drop the parts uploaded for it."""
+    export.status = ArchiveExportStatus.FAILED.value
+    export.error_message = error
+    export.save(update_fields=["status", "error_message", "updated_at"])
+
+    if export.upload_id:
+        try:
+            get_region_storage(storage, export.region).abort_multipart_upload(export.s3_key, export.upload_id)
+        except StorageError as e:
+            logger.error(
+                "Failed to abort the upload of a failed archive export.",
+                extra={"export_id": export.id, "error": str(e)},
+            )
+    export.entries.all().delete()
+    export.parts.all().delete()
+
+
+def get_archive_download_url(storage, export: ArchiveExport):
+    if not export.is_available:
+        return None
+    return get_region_storage(storage, export.region).generate_presigned_download_url(
+        export.s3_key, check_exists=False
+    )
+
+
+def delete_expired_archive_exports(storage) -> int:
+    exports = list(
+        ArchiveExport.objects.filter(
+            status=ArchiveExportStatus.COMPLETED.value, expires_at__lt=timezone.now()
+        )
+    )
+    for export in exports:
+        get_region_storage(storage, export.region).delete_file(export.s3_key)
+        export.delete()
+    return len(exports)
@@ -0,0 +1,89 @@
+"""
+Chunked removal of everything a user stores: share links, files, folders
+and the S3 objects under the user's prefix.
+
+Each function does a bounded amount of work in its own short transaction and
+is safe to call again, so the account deletion pipeline can stop and resume
+at any point.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+from apps.cloud_storage.constants.cloud_files import USER_PREFIX
+from apps.cloud_storage.models import CloudFile, Folder, ShareLink
+
+logger = logging.getLogger("aerobox")
+
+
+def delete_user_share_links_chunk(user_id: int, chunk_size: int) -> int:
+    ids = list(
+        ShareLink.objects.filter(owner_id=user_id)
+        .order_by("id")
+        .values_list("id", flat=True)[:chunk_size]
+    )
+    if not ids:
+        return 0
+    ShareLink.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def delete_user_files_chunk(user_id: int, chunk_size: int) -> int:
+    ids = list(
+        CloudFile.objects.filter(user_id=user_id)
+        .order_by("id")
+        .values_list("id", flat=True)[:chunk_size]
+    )
+    if not ids:
+        return 0
+    CloudFile.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def delete_user_folders_chunk(user_id: int, chunk_size: int) -> int:
+    """
+    Delete leaf folders only, so a chunk never cascades into a whole subtree.
+    Parents become leaves and are picked up by the next chunks.
+    """
+    ids = list(
+        Folder.objects.filter(user_id=user_id, subfolders__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)[:chunk_size]
+    )
+    if not ids:
+        return 0
+    Folder.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def get_user_storage_prefix(user_id: int) -> str:
+    return f"{USER_PREFIX.format(user_id)}/"
+
+
+def delete_user_objects_batch(
+        storage, user_id: int, start_after: Optional[str] = None, max_keys: int = 1000
+) -> Tuple[int, Optional[str], bool]:
+    """
+    Delete one page of objects under the user's prefix with DeleteObjects.
+
+    Returns (deleted_count, last_key, has_more). `last_key` is the cursor to
+    pass back as `start_after`; keys that failed to delete are skipped past
+    and logged so a single bad object cannot stall the sweep.
+    """
+    keys, is_truncated = storage.list_keys(
+        prefix=get_user_storage_prefix(user_id),
+        start_after=start_after,
+        max_keys=max_keys,
+    )
+    if not keys:
+        return 0, start_after, False
+
+    failed_keys = storage.delete_files(keys)
+    if failed_keys:
+        logger.warning(
+            "Some objects could not be deleted for user_id=%s.",
+            user_id,
+            extra={"failed_keys": failed_keys},
+        )
+
+    return len(keys) - len(failed_keys), keys[-1], is_truncated
@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from apps.cloud_storage.constants.cloud_files import PENDING
+from apps.cloud_storage.integrations.async_storage import AsyncStorage
+from apps.cloud_storage.integrations.backends import get_region_storage, get_storage
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.finalize_uploads import (
+    FinalizeOutcome,
+    UploadedObject,
+    apply_uploaded_objects,
+    delete_rejected_objects,
+)
+
+
+class BatchFileUploadFinalizerService:
+    """
+    Finalize many uploads of one user in a single call.
+
+    HEADs run concurrently on a bounded thread pool, outside any transaction.
+    The PENDING rows are then locked and written with one bulk_update, with
+    the user's quota checked once for the whole batch.
+    """
+
+    def __init__(self, storage=None, max_workers: Optional[int] = None):
+        self.storage = storage or get_storage()
+        self.max_workers = max_workers or settings.CLOUD_STORAGE_FINALIZE_MAX_WORKERS
+
+    def finalize(self, user, file_ids: List[int]) -> List[FinalizeOutcome]:
+        keys_by_id = self.get_pending_keys(user, file_ids)
+        if not keys_by_id:
+            return []
+
+        heads = self.head_many(list(keys_by_id.values()))
+        outcomes = self.apply_heads(keys_by_id, heads)
+
+        delete_rejected_objects(self.storage, outcomes)
+        return outcomes
+
+    async def afinalize(self, user, file_ids: List[int]) -> List[FinalizeOutcome]:
+        """
+        Async variant of `finalize` for ASGI views: HEADs are awaited on the
+        storage executor and DB work runs through sync_to_async.
+        """
+        keys_by_id = await sync_to_async(self.get_pending_keys)(user, file_ids)
+        if not keys_by_id:
+            return []
+
+        storage = AsyncStorage(self.storage)
+        keys = list(keys_by_id.values())
+        results = await asyncio.gather(*(storage.run(self.head, key, region) for key, region in keys))
+        heads = {key: self.to_uploaded_object(meta) for (key, _region), meta in zip(keys, results)}
+
+        outcomes = await sync_to_async(self.apply_heads)(keys_by_id, heads)
+
+        await storage.run(delete_rejected_objects, self.storage, outcomes)
+        return outcomes
+
+    @staticmethod
+    def get_pending_keys(user, file_ids: List[int]) -> Dict[int, Tuple[str, str]]:
+        """{file id: (s3_key, region)} of the user's PENDING uploads among `file_ids`."""
+        return {
+            file_id: (s3_key, region)
+            for file_id, s3_key, region in (
+                # Chunked uploads are completed through their own endpoint
+                CloudFile.not_deleted.filter(user=user, id__in=file_ids, status=PENDING, manifest__isnull=True)
+                .values_list("id", "s3_key", "region")
+            )
+        }
+
+    @staticmethod
+    def apply_heads(
+            keys_by_id: Dict[int, Tuple[str, str]], heads: Dict[str, Optional[UploadedObject]]
+    ) -> List[FinalizeOutcome]:
+        with transaction.atomic():
+            pending_files = list(
+                CloudFile.not_deleted.select_for_update(of=("self",))
+                .select_related("user")
+                .filter(id__in=keys_by_id, status=PENDING)
+                .order_by("id")
+            )
+            return apply_uploaded_objects(
+                (cloud_file, heads.get(cloud_file.s3_key)) for cloud_file in pending_files
+            )
+
+    def head(self, key: str, region: str) -> Optional[dict]:
+        return get_region_storage(self.storage, region).head(key)
+
+    def head_many(self, keys: List[Tuple[str, str]]) -> Dict[str, Optional[UploadedObject]]:
+        workers = min(self.max_workers, len(keys))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda key_region: self.head(*key_region), keys)
+            return {
+                key: self.to_uploaded_object(meta)
+                for (key, _region), meta in zip(keys, results)
+            }
+
+    @staticmethod
+    def to_uploaded_object(meta: Optional[dict]) -> Optional[UploadedObject]:
+        if not meta:
+            return None
+        return UploadedObject(
+            size=meta["size"],
+            content_type=meta.get("content_type"),
+            metadata=meta.get("metadata", {}),
+        )
@@ -0,0 +1,277 @@
+"""
+Chunked (delta) uploads.
+
+The client splits a file with content-defined chunking and sends the
+ordered list of chunk hashes. Chunks are stored as the user's content
+objects, so only the ones the server has never seen need to be uploaded:
+editing a few bytes of a large file re-sends a few chunks, not the file.
+"""
+
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.constants.cloud_files import FAILED, PENDING, SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import FileUploadError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import ChunkManifest, CloudFile, ContentObject, ManifestChunk
+from apps.cloud_storage.services.files.content_objects import (
+    release_content_objects,
+    reserve_content_objects,
+)
+from apps.cloud_storage.services.files.create_presigned_upload import (
+    build_upload_path,
+    check_presigned_url,
+    get_max_upload_bytes,
+)
+from apps.cloud_storage.services.files.object_cache import discard_cached_object
+from apps.cloud_storage.utils.region_utils import get_region_bucket
+
+logger = logging.getLogger("aerobox")
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    sha256: str
+    size: int
+
+
+@dataclass(frozen=True)
+class PreparedChunkedUpload:
+    cloud_file: CloudFile
+    # One entry per chunk that still has to be uploaded: index, sha256, presigned-url
+    missing_chunks: List[dict]
+
+
+@dataclass(frozen=True)
+class ChunkedUploadOutcome:
+    status: str
+    error_code: str = None
+    # Indexes of chunks that are still not in storage
+    missing_chunks: List[int] = field(default_factory=list)
+
+
+def prepare_chunked_upload(storage, serializer, chunks: List[ChunkSpec], region: str = "") -> PreparedChunkedUpload:
+    """
+    Create the PENDING CloudFile with its manifest in `region`, take a
+    reference on every chunk and presign uploads for the chunks not stored
+    yet. Chunks the user already stored stay in their own region.
+    """
+    user = serializer.context["request"].user
+    ref_counts: Dict[str, int] = {}
+    for chunk in chunks:
+        ref_counts[chunk.sha256] = ref_counts.get(chunk.sha256, 0) + 1
+
+    with transaction.atomic():
+        cloud_file = serializer.save(
+            s3_key=build_upload_path(user, serializer.validated_data["file_name"]),
+            key_layout=settings.CLOUD_STORAGE_KEY_LAYOUT,
+            size=sum(chunk.size for chunk in chunks),
+            region=region,
+            bucket_name=get_region_bucket(region),
+        )
+        manifest = ChunkManifest.objects.create(cloud_file=cloud_file, chunk_count=len(chunks))
+        contents = reserve_content_objects(user, ref_counts, region)
+
+        offset = 0
+        manifest_chunks = []
+        for index, chunk in enumerate(chunks):
+            manifest_chunks.append(
+                ManifestChunk(
+                    manifest=manifest,
+                    content_object=contents[chunk.sha256],
+                    index=index,
+                    offset=offset,
+                    size=chunk.size,
+                )
+            )
+            offset += chunk.size
+        ManifestChunk.objects.bulk_create(manifest_chunks)
+
+        missing_chunks = presign_missing_chunks(storage, user, chunks, contents)
+
+    return PreparedChunkedUpload(cloud_file=cloud_file, missing_chunks=missing_chunks)
+
+
+def presign_missing_chunks(storage, user, chunks: List[ChunkSpec], contents) -> List[dict]:
+    missing_chunks = []
+    presigned = set()
+
+    for index, chunk in enumerate(chunks):
+        content = contents[chunk.sha256]
+        if content.status == SUCCESS or chunk.sha256 in presigned:
+            continue
+
+        try:
+            presigned_url = get_region_storage(storage, content.region).create_presigned_post_url(
+                object_key=content.s3_key,
+                user_id=user.id,
+                max_bytes=chunk.size,
+                content_type="application/octet-stream",
+                checksum_sha256=chunk.sha256,
+            )
+            check_presigned_url(presigned_url)
+        except Exception as e:
+            logger.error(f"Chunk upload error for path {content.s3_key}: {str(e)}", exc_info=True)
+            raise FileUploadError()
+
+        presigned.add(chunk.sha256)
+        missing_chunks.append({"index": index, "sha256": chunk.sha256, "presigned-url": presigned_url})
+
+    return missing_chunks
+
+
+def complete_chunked_upload(storage, cloud_file: CloudFile) -> ChunkedUploadOutcome:
+    """
+    Verify every chunk is in storage and mark the file SUCCESS.
+
+    Missing chunks keep the file PENDING so the client can upload them and
+    complete again. The file's logical size is charged against the quota.
+    """
+    manifest_chunks = list(
+        ManifestChunk.objects.filter(manifest__cloud_file=cloud_file)
+        .select_related("content_object")
+        .order_by("index")
+    )
+    pending = {
+        chunk.content_object.s3_key: chunk
+        for chunk in manifest_chunks
+        if chunk.content_object.status == PENDING
+    }
+    heads = head_many(storage, [(key, chunk.content_object.region) for key, chunk in pending.items()])
+
+    stored = [chunk for key, chunk in pending.items() if heads[key] and heads[key]["size"] == chunk.size]
+    for chunk in stored:
+        chunk.content_object.status = SUCCESS
+        chunk.content_object.size = chunk.size
+    ContentObject.objects.bulk_update([chunk.content_object for chunk in stored], ["status", "size"])
+
+    missing_keys = set(pending) - {chunk.content_object.s3_key for chunk in stored}
+    if missing_keys:
+        return ChunkedUploadOutcome(
+            status=PENDING,
+            error_code=CloudFileErrorCode.FILE_NOT_FOUND_IN_S3.value,
+            missing_chunks=[
+                chunk.index for chunk in manifest_chunks if chunk.content_object.s3_key in missing_keys
+            ],
+        )
+
+    if cloud_file.size > get_max_upload_bytes(cloud_file.user):
+        cloud_file.status = FAILED
+        cloud_file.error_code = CloudFileErrorCode.STORAGE_QUOTA_EXCEEDED.value
+        cloud_file.error_message = "User exceeded storage quota after final size verification."
+        cloud_file.save(update_fields=["status", "error_code", "error_message", "updated_at"])
+        return ChunkedUploadOutcome(status=FAILED, error_code=cloud_file.error_code)
+
+    cloud_file.status = SUCCESS
+    cloud_file.error_code = None
+    cloud_file.error_message = None
+    cloud_file.save(update_fields=["status", "error_code", "error_message", "updated_at"])
+    return ChunkedUploadOutcome(status=SUCCESS)
+
+
+def head_many(storage, keys: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """HEAD many (key, region) pairs concurrently; returns {key: head}."""
+    if not keys:
+        return {}
+    workers = min(settings.CLOUD_STORAGE_FINALIZE_MAX_WORKERS, len(keys))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        heads = executor.map(lambda key_region: get_region_storage(storage, key_region[1]).head(key_region[0]), keys)
+        return {key: head for (key, _region), head in zip(keys, heads)}
+
+
+def get_chunk_keys(cloud_file: CloudFile) -> List[Tuple[str, str]]:
+    """(s3_key, region) of the file's chunks, in order."""
+    return list(
+        ManifestChunk.objects.filter(manifest__cloud_file=cloud_file)
+        .order_by("index")
+        .values_list("content_object__s3_key", "content_object__region")
+    )
+
+
+class ChunkedFileReader(io.RawIOBase):
+    """
+    Read-only stream over the chunks of a file, in order, opening one
+    chunk at a time. Wrap it in `io.BufferedReader` for efficient reads.
+    """
+
+    def __init__(self, storage, chunk_keys: List[Tuple[str, str]]):
+        super().__init__()
+        self.storage = storage
+        self.chunk_keys = iter(chunk_keys)
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                chunk = next(self.chunk_keys, None)
+                if chunk is None:
+                    return 0
+                key, region = chunk
+                self.current = get_region_storage(self.storage, region).open(key)
+
+            data = self.current.read(len(buffer))
+            if data:
+                buffer[:len(data)] = data
+                return len(data)
+
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+def open_chunked_file(storage, cloud_file: CloudFile) -> io.BufferedReader:
+    return io.BufferedReader(
+        ChunkedFileReader(storage, get_chunk_keys(cloud_file)),
+        buffer_size=settings.CLOUD_STORAGE_CHUNKED_READ_BUFFER_BYTES,
+    )
+
+
+def materialize_chunked_file(storage, cloud_file: CloudFile) -> bool:
+    """
+    Assemble the chunks into one object at the file's `s3_key`, so regular
+    presigned downloads work. The chunks are kept for future delta uploads.
+    """
+    manifest = cloud_file.manifest
+    if manifest.materialized_at or cloud_file.status != SUCCESS:
+        return False
+
+    with open_chunked_file(storage, cloud_file) as reader:
+        get_region_storage(storage, cloud_file.region).save(
+            cloud_file.s3_key,
+            reader,
+            content_type=cloud_file.content_type,
+            metadata={"user-id": str(cloud_file.user_id)},
+        )
+
+    manifest.materialized_at = timezone.now()
+    manifest.save(update_fields=["materialized_at", "updated_at"])
+    return True
+
+
+def permanent_delete_chunked_file(storage, cloud_file: CloudFile) -> None:
+    """Delete the file, its assembled object and its chunk references."""
+    manifest = cloud_file.manifest
+    content_ids = list(manifest.chunks.values_list("content_object_id", flat=True))
+
+    with transaction.atomic():
+        if manifest.materialized_at:
+            get_region_storage(storage, cloud_file.region).delete_file(object_name=cloud_file.s3_key)
+            discard_cached_object(cloud_file.region, cloud_file.s3_key)
+        cloud_file.permanent_delete()
+        release_content_objects(storage, content_ids)
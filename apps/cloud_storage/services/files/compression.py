@@ -0,0 +1,236 @@
+"""
+Transparent compression of compressible uploads.
+
+After finalize, text-like files are re-encoded with CLOUD_STORAGE_COMPRESSION
+(gzip or zstd) and stored in place with a matching Content-Encoding. Their
+download URLs point at the API proxy rather than storage or the CDN, so
+clients get the original bytes and ranges of them. `size` stays the
+decoded size, which quota is counted on; `stored_size` is what the object
+takes.
+
+The row is marked encoded before the object is replaced, and readers check
+the body's magic bytes before decoding, so a download racing the rewrite
+gets the original bytes either way.
+"""
+
+import io
+import logging
+import zlib
+from contextlib import closing
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import Iterable
+
+import zstandard
+from django.conf import settings
+from django.db.models import Q
+
+from apps.cloud_storage.choices.content_encoding_choices import ContentEncoding
+from apps.cloud_storage.choices.storage_class_choices import StorageClass
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.object_cache import discard_cached_object
+
+logger = logging.getLogger("aerobox")
+
+COMPRESSIBLE_CONTENT_TYPES = {
+    "application/csv",
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "application/x-sh",
+    "application/x-yaml",
+    "application/xml",
+    "application/yaml",
+    "image/svg+xml",
+}
+ENCODING_MAGIC = {
+    ContentEncoding.GZIP: b"\x1f\x8b",
+    ContentEncoding.ZSTD: b"\x28\xb5\x2f\xfd",
+}
+
+
+@dataclass(frozen=True)
+class CompressionBatch:
+    last_id: int
+    scanned: int
+    compressed: int
+
+    @property
+    def done(self) -> bool:
+        return self.last_id is None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type.startswith("text/") or content_type in COMPRESSIBLE_CONTENT_TYPES
+
+
+def get_compressor(encoding: str):
+    if encoding == ContentEncoding.GZIP:
+        return zlib.compressobj(wbits=31)
+    return zstandard.ZstdCompressor().compressobj()
+
+
+def get_decompressor(encoding: str):
+    if encoding == ContentEncoding.GZIP:
+        return zlib.decompressobj(wbits=31)
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+class DecodingReader(io.RawIOBase):
+    """
+    Read-only stream of the original bytes of an object stored with
+    `encoding`. A body that does not start with the encoding's magic bytes
+    (not rewritten yet) is passed through; `encoded` tells which it was.
+    With `decode=False` the stored bytes are passed through either way.
+    """
+
+    def __init__(self, body, encoding: str, decode: bool = True):
+        super().__init__()
+        self.body = body
+        magic = ENCODING_MAGIC[encoding]
+        head = body.read(len(magic))
+        self.encoded = head == magic
+        self.decoder = get_decompressor(encoding) if self.encoded and decode else None
+        self.pending = memoryview(self.decode(head))
+        self.finished = False
+
+    def decode(self, data: bytes) -> bytes:
+        return self.decoder.decompress(data) if self.decoder else data
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            if self.finished:
+                return 0
+            data = self.body.read(settings.CLOUD_STORAGE_COMPRESSION_READ_BYTES)
+            if data:
+                self.pending = memoryview(self.decode(data))
+            else:
+                self.finished = True
+                self.pending = memoryview(self.decoder.flush() if self.decoder else b"")
+
+        length = min(len(buffer), len(self.pending))
+        buffer[:length] = self.pending[:length]
+        self.pending = self.pending[length:]
+        return length
+
+    def close(self):
+        self.body.close()
+        super().close()
+
+
+def open_decoded(storage, cloud_file: CloudFile):
+    """The file's original bytes, whether or not its object is compressed."""
+    body = get_region_storage(storage, cloud_file.region).open(cloud_file.s3_key)
+    if not cloud_file.content_encoding:
+        return body
+    return io.BufferedReader(DecodingReader(body, cloud_file.content_encoding))
+
+
+def get_compression_candidates():
+    """Plain uploads of a compressible type that were never considered for compression."""
+    compressible_types = Q(content_type__in=COMPRESSIBLE_CONTENT_TYPES) | Q(content_type__startswith="text/")
+    return CloudFile.not_deleted.filter(
+        compressible_types,
+        status=SUCCESS,
+        stored_size__isnull=True,
+        size__gte=settings.CLOUD_STORAGE_COMPRESSION_MIN_BYTES,
+        # Content-addressed and chunked objects are shared; compression is per file
+        content_object__isnull=True,
+        manifest__isnull=True,
+        storage_class=StorageClass.STANDARD,
+    )
+
+
+def encode_object(storage, key: str, encoding: str, output) -> int:
+    """Write the object at `key` encoded into `output`; returns the encoded size."""
+    compressor = get_compressor(encoding)
+    with closing(storage.open(key)) as body:
+        while data := body.read(settings.CLOUD_STORAGE_COMPRESSION_READ_BYTES):
+            output.write(compressor.compress(data))
+    output.write(compressor.flush())
+    return output.tell()
+
+
+def compress_file(storage, cloud_file: CloudFile, encoding: str) -> bool:
+    """
+    Replace the object of `cloud_file` with an encoded copy when that saves
+    enough space. Files not worth compressing are marked with their size
+    as stored size, so they are not considered again.
+    """
+    region_storage = get_region_storage(storage, cloud_file.region)
+    head = region_storage.head(cloud_file.s3_key)
+    if head is None:
+        logger.warning("Object missing, file not compressed.", extra={"file_id": cloud_file.id})
+        return False
+    if head.get("content_encoding"):
+        CloudFile.objects.filter(id=cloud_file.id).update(stored_size=head["size"])
+        return False
+
+    with SpooledTemporaryFile(max_size=settings.CLOUD_STORAGE_COMPRESSION_SPOOL_BYTES) as encoded:
+        stored_size = encode_object(region_storage, cloud_file.s3_key, encoding, encoded)
+        if stored_size > head["size"] * settings.CLOUD_STORAGE_COMPRESSION_MAX_RATIO:
+            CloudFile.objects.filter(id=cloud_file.id).update(stored_size=head["size"])
+            return False
+
+        # Marked first: readers pass objects through until they are rewritten
+        marked = CloudFile.objects.filter(id=cloud_file.id, stored_size__isnull=True).update(
+            content_encoding=encoding, stored_size=stored_size
+        )
+        if not marked:
+            return False
+
+        encoded.seek(0)
+        try:
+            region_storage.save(
+                cloud_file.s3_key,
+                encoded,
+                content_type=head.get("content_type"),
+                metadata=head.get("metadata"),
+                content_encoding=encoding,
+            )
+        except Exception:
+            CloudFile.objects.filter(id=cloud_file.id).update(
+                content_encoding=ContentEncoding.IDENTITY, stored_size=None
+            )
+            raise
+
+    discard_cached_object(cloud_file.region, cloud_file.s3_key)
+
+    if not CloudFile.objects.filter(id=cloud_file.id).exists():
+        # Permanently deleted while it was being rewritten
+        region_storage.delete_file(cloud_file.s3_key)
+        return False
+    return True
+
+
+def compress_files(storage, files: Iterable[CloudFile]) -> int:
+    encoding = settings.CLOUD_STORAGE_COMPRESSION
+    if not encoding:
+        return 0
+
+    compressed = 0
+    for cloud_file in files:
+        try:
+            compressed += compress_file(storage, cloud_file, encoding)
+        except ObjectNotFoundError:
+            logger.warning("Object missing, file not compressed.", extra={"file_id": cloud_file.id})
+    return compressed
+
+
+def compress_files_batch(storage, after_id=0, batch_size=None) -> CompressionBatch:
+    batch_size = batch_size or settings.CLOUD_STORAGE_COMPRESSION_BATCH_SIZE
+
+    files = list(get_compression_candidates().filter(id__gt=after_id).order_by("id")[:batch_size])
+
+    return CompressionBatch(
+        last_id=files[-1].id if len(files) == batch_size else None,
+        scanned=len(files),
+        compressed=compress_files(storage, files),
+    )
@@ -0,0 +1,123 @@
+"""
+Content-addressed storage: files of the same user with the same SHA-256
+share one object under `users/{id}/cas/{sha256}`.
+
+Every CloudFile pointing at a ContentObject holds one reference. A reference
+is taken when the file is created and released when the file is permanently
+deleted; the object leaves storage with the last reference.
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.object_cache import discard_cached_object
+from apps.cloud_storage.utils.path_utils import build_s3_path
+from apps.cloud_storage.utils.region_utils import get_region_bucket
+
+logger = logging.getLogger("aerobox")
+
+CONTENT_PREFIX = "cas"
+
+
+def build_content_key(user_id: int, sha256: str) -> str:
+    return build_s3_path(user_id=user_id, file_name=f"{CONTENT_PREFIX}/{sha256}")
+
+
+def reserve_content_object(user, sha256: str, region: str = "") -> ContentObject:
+    """Take a reference on the user's object for `sha256`, creating it if needed."""
+    return reserve_content_objects(user, {sha256: 1}, region)[sha256]
+
+
+def reserve_content_objects(user, ref_counts: Dict[str, int], region: str = "") -> Dict[str, ContentObject]:
+    """
+    Take `ref_counts[sha256]` references on each of the user's objects,
+    creating the missing ones in `region`, with a fixed number of queries.
+    Objects that already exist stay in the region they were stored in.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ContentObject.objects.bulk_create(
+            [
+                ContentObject(
+                    user=user,
+                    sha256=sha256,
+                    s3_key=build_content_key(user.id, sha256),
+                    key_layout=settings.CLOUD_STORAGE_KEY_LAYOUT,
+                    region=region,
+                    bucket_name=get_region_bucket(region),
+                )
+                for sha256 in ref_counts
+            ],
+            ignore_conflicts=True,
+        )
+        contents = {
+            content.sha256: content
+            for content in ContentObject.objects.select_for_update().filter(user=user, sha256__in=ref_counts)
+        }
+        for sha256, content in contents.items():
+            content.ref_count += ref_counts[sha256]
+            content.updated_at = now
+        ContentObject.objects.bulk_update(contents.values(), ["ref_count", "updated_at"])
+    return contents
+
+
+def release_content_objects(storage, content_ids: Iterable[int]) -> None:
+    """
+    Drop one reference per occurrence in `content_ids`; objects left without
+    references are deleted from storage and the database. Rows pointing at
+    them must already be gone.
+    """
+    released = Counter(content_ids)
+    with transaction.atomic():
+        contents = ContentObject.objects.select_for_update().filter(pk__in=released).order_by("pk")
+        for content in contents:
+            if content.ref_count <= released[content.pk]:
+                get_region_storage(storage, content.region).delete_file(object_name=content.s3_key)
+                discard_cached_object(content.region, content.s3_key)
+                content.delete()
+                continue
+            content.ref_count = F("ref_count") - released[content.pk]
+            content.save(update_fields=["ref_count", "updated_at"])
+
+
+def release_content_reservation(content: ContentObject) -> None:
+    """
+    Give back a reference taken by `reserve_content_object` when the file
+    that should have held it was never created.
+    """
+    with transaction.atomic():
+        content = ContentObject.objects.select_for_update().get(pk=content.pk)
+        if content.ref_count <= 1 and content.status == PENDING:
+            content.delete()
+            return
+        content.ref_count = F("ref_count") - 1
+        content.save(update_fields=["ref_count", "updated_at"])
+
+
+def activate_content_objects(cloud_files: Iterable[CloudFile]) -> None:
+    """Mark content objects as available once one of their uploads succeeded."""
+    for cloud_file in cloud_files:
+        if cloud_file.content_object_id and cloud_file.status == SUCCESS:
+            ContentObject.objects.filter(pk=cloud_file.content_object_id, status=PENDING).update(
+                status=SUCCESS, size=cloud_file.size
+            )
+
+
+def permanent_delete_content_file(storage, cloud_file: CloudFile) -> None:
+    """
+    Permanently delete a content-addressed file, removing the shared object
+    from storage only when this file held the last reference.
+    """
+    with transaction.atomic():
+        content_id = cloud_file.content_object_id
+        cloud_file.permanent_delete()
+        release_content_objects(storage, [content_id])
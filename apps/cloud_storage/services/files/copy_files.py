@@ -0,0 +1,380 @@
+"""
+Server-side copies of files and folder subtrees.
+
+Objects are copied inside their bucket on a bounded pool, without their
+bytes passing through the app, and the rows are created afterwards with
+bulk inserts: a failure leaves at most orphan objects, never a file
+pointing at nothing. Content-addressed files and the chunks of chunked
+files copy no bytes at all; the copy takes one more reference on them.
+
+Large copies run as a background job whose progress is kept in the cache.
+"""
+
+import logging
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.cloud_storage.choices.storage_class_choices import RESTORE_REQUIRED_STORAGE_CLASSES, StorageClass
+from apps.cloud_storage.constants.cloud_files import FAILED, PENDING, SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import CopySourceArchived, StorageQuotaExceeded
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError, StorageError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import ChunkManifest, CloudFile, Folder, ManifestChunk
+from apps.cloud_storage.services.files.content_objects import reserve_content_objects
+from apps.cloud_storage.services.files.create_presigned_upload import build_upload_path
+from apps.cloud_storage.services.files.finalize_uploads import QuotaBudget
+from apps.cloud_storage.utils.path_utils import build_object_path
+
+logger = logging.getLogger("aerobox")
+
+COPY_JOB_KEY = "file-copies:{}"
+COPY_JOB_TIMEOUT = 60 * 60 * 24
+# Job progress is written once every this many copied files
+COPY_PROGRESS_STEP = 50
+
+
+@dataclass(frozen=True)
+class CopyPlan:
+    user: object
+    files: List[CloudFile]
+    # Folder subtree to clone, parents before children; empty for file copies
+    folders: List[Folder] = field(default_factory=list)
+    # Parent of the copied folder, or folder receiving the copied files
+    target_folder: Optional[Folder] = None
+    # Name of the copied folder
+    name: Optional[str] = None
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(cloud_file.size for cloud_file in self.files)
+
+    @property
+    def runs_in_background(self) -> bool:
+        return (
+            len(self.files) > settings.CLOUD_STORAGE_COPY_SYNC_MAX_FILES
+            or self.total_bytes > settings.CLOUD_STORAGE_COPY_SYNC_MAX_BYTES
+        )
+
+
+@dataclass(frozen=True)
+class CopyResult:
+    files: List[CloudFile]
+    folder: Optional[Folder] = None
+    # Source files left out because their object is missing from storage
+    skipped_file_ids: List[int] = field(default_factory=list)
+    # Chunked copies with no assembled object yet
+    unmaterialized_file_ids: List[int] = field(default_factory=list)
+
+
+def get_copyable_files(user):
+    return (
+        CloudFile.not_deleted.filter(user=user, status=SUCCESS)
+        .select_related("content_object", "manifest")
+        .order_by("id")
+    )
+
+
+def has_own_object(cloud_file: CloudFile) -> bool:
+    """Whether the file's bytes sit in an object no other file uses."""
+    if cloud_file.content_object_id:
+        return False
+    manifest = getattr(cloud_file, "manifest", None)
+    return manifest is None or manifest.materialized_at is not None
+
+
+def get_folder_subtree(user, folder: Folder) -> List[Folder]:
+    """`folder` and all its descendants, parents before children, in one query."""
+    children = defaultdict(list)
+    for child in Folder.objects.filter(user=user, parent__isnull=False).order_by("id"):
+        children[child.parent_id].append(child)
+
+    subtree = [folder]
+    for current in subtree:
+        subtree.extend(children[current.id])
+    return subtree
+
+
+def check_copy_plan(plan: CopyPlan) -> None:
+    """Checked once, before anything is copied."""
+    if any(
+        has_own_object(cloud_file) and cloud_file.storage_class in RESTORE_REQUIRED_STORAGE_CLASSES
+        for cloud_file in plan.files
+    ):
+        raise CopySourceArchived()
+
+    remaining = QuotaBudget.get_remaining_bytes(plan.user)
+    if remaining is not None and plan.total_bytes > remaining:
+        raise StorageQuotaExceeded()
+
+
+def plan_file_copy(user, files: Iterable[CloudFile], target_folder: Optional[Folder] = None) -> CopyPlan:
+    plan = CopyPlan(user=user, files=list(files), target_folder=target_folder)
+    check_copy_plan(plan)
+    return plan
+
+
+def plan_folder_copy(user, folder: Folder, parent: Optional[Folder] = None, name: str = None) -> CopyPlan:
+    folders = get_folder_subtree(user, folder)
+    plan = CopyPlan(
+        user=user,
+        files=list(get_copyable_files(user).filter(folder_id__in=[f.id for f in folders])),
+        folders=folders,
+        target_folder=parent,
+        name=name or folder.name,
+    )
+    check_copy_plan(plan)
+    return plan
+
+
+def copy_object(storage, source_key: str, dest_key: str, region: str) -> bool:
+    try:
+        get_region_storage(storage, region).copy(source_key, dest_key)
+    except ObjectNotFoundError:
+        logger.warning("Object missing, file not copied.", extra={"s3_key": source_key, "region": region})
+        return False
+    return True
+
+
+def delete_copied_objects(storage, keys: Iterable[Tuple[str, str, str]]) -> None:
+    by_region = defaultdict(list)
+    for _source_key, dest_key, region in keys:
+        by_region[region].append(dest_key)
+
+    for region, dest_keys in by_region.items():
+        try:
+            get_region_storage(storage, region).delete_files(dest_keys)
+        except StorageError as e:
+            logger.error("Failed to delete copied objects.", extra={"region": region, "error": str(e)})
+
+
+def copy_objects(
+        storage,
+        keys: Dict[int, Tuple[str, str, str]],
+        on_copied: Callable[[], None] = None,
+) -> List[int]:
+    """
+    Copy `{file_id: (source_key, dest_key, region)}` on a bounded pool and
+    return the ids that were copied; missing sources are skipped. On any
+    other error the copies made so far are deleted and the error is raised.
+    """
+    if not keys:
+        return []
+
+    copied = []
+    error = None
+    with ThreadPoolExecutor(max_workers=min(settings.CLOUD_STORAGE_COPY_MAX_WORKERS, len(keys))) as executor:
+        futures = {executor.submit(copy_object, storage, *key): file_id for file_id, key in keys.items()}
+        for future in as_completed(futures):
+            try:
+                if future.result():
+                    copied.append(futures[future])
+            except StorageError as e:
+                error = error or e
+            if on_copied:
+                on_copied()
+
+    if error is not None:
+        delete_copied_objects(storage, [keys[file_id] for file_id in copied])
+        raise error
+    return copied
+
+
+def clone_folders(plan: CopyPlan) -> Dict[int, Folder]:
+    """Create the copied folder tree, one bulk insert per level. Maps old ids to copies."""
+    if not plan.folders:
+        return {}
+
+    root = plan.folders[0]
+    clones = {}
+    level = [root]
+    while level:
+        created = Folder.objects.bulk_create(
+            [
+                Folder(
+                    user=plan.user,
+                    name=plan.name if folder is root else folder.name,
+                    parent=plan.target_folder if folder is root else clones[folder.parent_id],
+                )
+                for folder in level
+            ]
+        )
+        clones.update(zip((folder.id for folder in level), created))
+        level = [folder for folder in plan.folders if folder.parent_id in clones and folder.id not in clones]
+    return clones
+
+
+def build_file_copy(plan: CopyPlan, source: CloudFile, folder: Optional[Folder], s3_key: Optional[str]) -> CloudFile:
+    shared = bool(source.content_object_id)
+    return CloudFile(
+        user=plan.user,
+        folder=folder,
+        file_name=source.file_name,
+        path=build_object_path(source.file_name, folder),
+        s3_key=source.s3_key if shared else s3_key,
+        key_layout=source.key_layout if shared else settings.CLOUD_STORAGE_KEY_LAYOUT,
+        region=source.region,
+        bucket_name=source.bucket_name,
+        content_object_id=source.content_object_id,
+        size=source.size,
+        stored_size=source.stored_size,
+        content_encoding=source.content_encoding,
+        content_type=source.content_type,
+        status=SUCCESS,
+        # Server-side copies land in the standard class
+        storage_class=source.storage_class if shared else StorageClass.STANDARD,
+        tiered_at=source.tiered_at if shared else None,
+        metadata=source.metadata,
+        captured_at=source.captured_at,
+        metadata_extracted_at=source.metadata_extracted_at,
+    )
+
+
+def create_file_copies(plan: CopyPlan, sources: List[CloudFile], keys: Dict[int, str]) -> CopyResult:
+    """
+    Insert the copied folders, files and manifests, and take the content
+    references the copies hold, with a fixed number of queries.
+    """
+    with transaction.atomic():
+        folders = clone_folders(plan)
+        copies = CloudFile.objects.bulk_create(
+            [
+                build_file_copy(plan, source, folders.get(source.folder_id, plan.target_folder), keys.get(source.id))
+                for source in sources
+            ]
+        )
+        copy_by_source = {source.id: copy for source, copy in zip(sources, copies)}
+
+        chunked = [source for source in sources if getattr(source, "manifest", None) is not None]
+        chunks = list(
+            ManifestChunk.objects.filter(manifest__cloud_file__in=chunked)
+            .select_related("manifest", "content_object")
+            .order_by("manifest_id", "index")
+        )
+
+        ref_counts = Counter(source.content_object.sha256 for source in sources if source.content_object_id)
+        ref_counts.update(chunk.content_object.sha256 for chunk in chunks)
+        if ref_counts:
+            reserve_content_objects(plan.user, ref_counts)
+
+        now = timezone.now()
+        manifests = ChunkManifest.objects.bulk_create(
+            [
+                ChunkManifest(
+                    cloud_file=copy_by_source[source.id],
+                    chunk_count=source.manifest.chunk_count,
+                    materialized_at=now if source.manifest.materialized_at else None,
+                )
+                for source in chunked
+            ]
+        )
+        manifest_by_source = {source.id: manifest for source, manifest in zip(chunked, manifests)}
+        ManifestChunk.objects.bulk_create(
+            [
+                ManifestChunk(
+                    manifest=manifest_by_source[chunk.manifest.cloud_file_id],
+                    content_object_id=chunk.content_object_id,
+                    index=chunk.index,
+                    offset=chunk.offset,
+                    size=chunk.size,
+                )
+                for chunk in chunks
+            ]
+        )
+
+    return CopyResult(
+        files=copies,
+        folder=folders.get(plan.folders[0].id) if plan.folders else None,
+        unmaterialized_file_ids=[
+            copy_by_source[source.id].id for source in chunked if not source.manifest.materialized_at
+        ],
+    )
+
+
+def execute_copy_plan(storage, plan: CopyPlan, on_copied: Callable[[], None] = None) -> CopyResult:
+    """Copy the objects of `plan`, then create the rows of the copies."""
+    keys = {
+        source.id: build_upload_path(plan.user, source.file_name)
+        for source in plan.files
+        if not source.content_object_id
+    }
+    object_keys = {
+        source.id: (source.s3_key, keys[source.id], source.region)
+        for source in plan.files
+        if has_own_object(source)
+    }
+    copied = set(copy_objects(storage, object_keys, on_copied))
+    skipped = [file_id for file_id in object_keys if file_id not in copied]
+
+    try:
+        result = create_file_copies(plan, [f for f in plan.files if f.id not in skipped], keys)
+    except Exception:
+        delete_copied_objects(storage, [object_keys[file_id] for file_id in copied])
+        raise
+
+    return CopyResult(
+        files=result.files,
+        folder=result.folder,
+        skipped_file_ids=skipped,
+        unmaterialized_file_ids=result.unmaterialized_file_ids,
+    )
+
+
+def start_copy_job(plan: CopyPlan) -> str:
+    job_id = uuid.uuid4().hex
+    cache.set(
+        COPY_JOB_KEY.format(job_id),
+        {"user_id": plan.user.id, "status": PENDING, "total": len(plan.files), "copied": 0},
+        COPY_JOB_TIMEOUT,
+    )
+    return job_id
+
+
+def update_copy_job(job_id: str, **fields) -> None:
+    job = cache.get(COPY_JOB_KEY.format(job_id))
+    if job is None:
+        return
+    job.update(fields)
+    cache.set(COPY_JOB_KEY.format(job_id), job, COPY_JOB_TIMEOUT)
+
+
+def get_copy_job(user, job_id: str) -> Optional[dict]:
+    job = cache.get(COPY_JOB_KEY.format(job_id))
+    if job is None or job["user_id"] != user.id:
+        return None
+    return job
+
+
+def run_copy_job(storage, job_id: str, plan: CopyPlan) -> CopyResult:
+    """Execute `plan`, recording progress and the outcome on the job."""
+    # Shared copies have no object to copy and are done right away
+    copied = len(plan.files) - sum(1 for source in plan.files if has_own_object(source))
+
+    def on_copied():
+        nonlocal copied
+        copied += 1
+        if copied % COPY_PROGRESS_STEP == 0:
+            update_copy_job(job_id, copied=copied)
+
+    try:
+        result = execute_copy_plan(storage, plan, on_copied)
+    except Exception as e:
+        update_copy_job(job_id, status=FAILED, error=str(e))
+        raise
+
+    update_copy_job(
+        job_id,
+        status=SUCCESS,
+        copied=len(result.files),
+        file_ids=[cloud_file.id for cloud_file in result.files],
+        folder_id=result.folder.id if result.folder else None,
+        skipped_file_ids=result.skipped_file_ids,
+    )
+    return result
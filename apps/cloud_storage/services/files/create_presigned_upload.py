@@ -1,11 +1,23 @@
 import logging
 from dataclasses import dataclass
+from typing import Optional
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
-from apps.cloud_storage.domain.exceptions.exceptions import FileUploadError
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import FileUploadError, StorageQuotaExceeded
+from apps.cloud_storage.integrations.async_storage import AsyncStorage
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import ContentObject
+from apps.cloud_storage.services.files.content_objects import (
+    release_content_reservation,
+    reserve_content_object,
+)
 from apps.cloud_storage.utils.hash_utils import generate_unique_hash
 from apps.cloud_storage.utils.path_utils import build_s3_path
+from apps.cloud_storage.utils.region_utils import get_region_bucket
 from apps.cloud_storage.utils.size_utils import get_user_used_bytes
 
 logger = logging.getLogger("aerobox")
@@ -14,17 +26,22 @@ logger = logging.getLogger("aerobox")
 @dataclass(frozen=True)
 class PreparedUpload:
     file_path: str
-    presigned_url: str
+    presigned_url: Optional[dict]
+    content_object: Optional[ContentObject] = None
+    # The bytes are already stored: nothing to upload, the file is ready
+    deduplicated: bool = False
+    region: str = ""
 
 
-def prepare_file_upload(storage, user, file_name, content_type):
-    # Generate path to upload
+def build_upload_path(user, file_name):
     hashed_file_name = generate_unique_hash(file_name)
-    file_path = build_s3_path(
+    return build_s3_path(
         user_id=user.id,
         file_name=hashed_file_name,
     )
 
+
+def get_max_upload_bytes(user):
     subscription = user.active_subscription
     plan = subscription.plan
 
@@ -40,23 +57,130 @@ def prepare_file_upload(storage, user, file_name, content_type):
     # Final allowed size = the minimum of:
     #   - remaining storage
     #   - per-file limit
-    max_bytes = min(available_storage_bytes, max_file_upload_bytes)
+    return min(available_storage_bytes, max_file_upload_bytes)
+
+
+def check_presigned_url(presigned_url):
+    if not presigned_url:
+        raise ValueError(
+            _(
+                "Something went wrong while preparing your file upload. Please try again."
+            )
+        )
+
+
+def reserve_upload_content(user, sha256, region=""):
+    """
+    Take a reference on the user's content object for `sha256`, or return
+    None when the upload is not content-addressed.
+
+    Reusing stored bytes still counts their full size against the quota.
+    """
+    if not sha256 or not settings.CLOUD_STORAGE_DEDUPLICATION_ENABLED:
+        return None
+
+    content = reserve_content_object(user, sha256, region)
+    if content.status == SUCCESS and content.size > get_max_upload_bytes(user):
+        release_content_reservation(content)
+        raise StorageQuotaExceeded()
+    return content
+
+
+def build_deduplicated_upload(content):
+    return PreparedUpload(
+        file_path=content.s3_key,
+        presigned_url=None,
+        content_object=content,
+        deduplicated=True,
+        region=content.region,
+    )
+
+
+def prepare_file_upload(storage, user, file_name, content_type, sha256=None, region=""):
+    """
+    Presign the upload of a new file to `region`. Bytes the user already
+    stored are reused in the region they live in.
+    """
+    content = reserve_upload_content(user, sha256, region)
+    if content is not None and content.status == SUCCESS:
+        return build_deduplicated_upload(content)
+
+    # Generate path to upload
+    file_path = content.s3_key if content else build_upload_path(user, file_name)
+    region = content.region if content else region
+    max_bytes = get_max_upload_bytes(user)
 
     try:
-        presigned_url = storage.create_presigned_post_url(
+        presigned_url = get_region_storage(storage, region).create_presigned_post_url(
             object_key=file_path,
             user_id=user.id,
             max_bytes=max_bytes,
             content_type=content_type,
+            checksum_sha256=sha256 if content else None,
         )
-        if not presigned_url:
-            raise ValueError(
-                _(
-                    "Something went wrong while preparing your file upload. Please try again."
-                )
-            )
+        check_presigned_url(presigned_url)
+    except Exception as e:
+        if content is not None:
+            release_content_reservation(content)
+        logger.error(f"File upload error for path {file_path}: {str(e)}", exc_info=True)
+        raise FileUploadError()
+
+    return PreparedUpload(
+        file_path=file_path, presigned_url=presigned_url, content_object=content, region=region
+    )
+
+
+async def aprepare_file_upload(storage, user, file_name, content_type, sha256=None, region=""):
+    """Async variant of `prepare_file_upload`; `storage` is an AsyncStorage."""
+    content = await sync_to_async(reserve_upload_content)(user, sha256, region)
+    if content is not None and content.status == SUCCESS:
+        return build_deduplicated_upload(content)
+
+    file_path = content.s3_key if content else build_upload_path(user, file_name)
+    region = content.region if content else region
+    max_bytes = await sync_to_async(get_max_upload_bytes)(user)
+
+    try:
+        upload_storage = AsyncStorage(get_region_storage(storage.storage, region))
+        presigned_url = await upload_storage.create_presigned_post_url(
+            object_key=file_path,
+            user_id=user.id,
+            max_bytes=max_bytes,
+            content_type=content_type,
+            checksum_sha256=sha256 if content else None,
+        )
+        check_presigned_url(presigned_url)
     except Exception as e:
+        if content is not None:
+            await sync_to_async(release_content_reservation)(content)
         logger.error(f"File upload error for path {file_path}: {str(e)}", exc_info=True)
         raise FileUploadError()
 
-    return PreparedUpload(file_path=file_path, presigned_url=presigned_url)
+    return PreparedUpload(
+        file_path=file_path, presigned_url=presigned_url, content_object=content, region=region
+    )
+
+
+def save_prepared_upload(serializer, result):
+    """
+    Save the CloudFile for a prepared upload. Deduplicated files are ready
+    right away; a failed save gives the content reference back.
+    """
+    content = result.content_object
+    extra = {
+        "s3_key": result.file_path,
+        "key_layout": content.key_layout if content else settings.CLOUD_STORAGE_KEY_LAYOUT,
+        "content_object": content,
+        "region": result.region,
+        "bucket_name": get_region_bucket(result.region),
+    }
+    if result.deduplicated:
+        extra["status"] = SUCCESS
+        extra["size"] = content.size
+
+    try:
+        return serializer.save(**extra)
+    except Exception:
+        if content is not None:
+            release_content_reservation(content)
+        raise
@@ -1,15 +1,34 @@
 import logging
 from datetime import timedelta
 
+from django.db.models import Q
 from django.utils import timezone
 
-from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.chunked_uploads import permanent_delete_chunked_file
+from apps.cloud_storage.services.files.content_objects import permanent_delete_content_file
+from apps.cloud_storage.services.files.object_cache import discard_cached_object
+from apps.cloud_storage.services.files.thumbnails import delete_file_thumbnails
 
 logger = logging.getLogger("aerobox")
 
 
 def permanent_delete_file(storage, file):
-    storage.delete_file(object_name=file.s3_key)
+    if file.content_object_id:
+        permanent_delete_content_file(storage, file)
+        # Shared thumbnails go with the object's last reference
+        if not ContentObject.objects.filter(pk=file.content_object_id).exists():
+            delete_file_thumbnails(storage, file)
+        return
+
+    delete_file_thumbnails(storage, file)
+    if hasattr(file, "manifest"):
+        permanent_delete_chunked_file(storage, file)
+        return
+
+    get_region_storage(storage, file.region).delete_file(object_name=file.s3_key)
+    discard_cached_object(file.region, file.s3_key)
     file.permanent_delete()
 
 
@@ -21,9 +40,29 @@ def permanently_delete_user_files(storage, user_id, older_than_days):
 
     failed_s3_keys = []
 
+    # Shared objects are only removed with their last reference
+    shared = Q(content_object__isnull=False) | Q(manifest__isnull=False)
+    for deleted_file in deleted_files.filter(shared):
+        try:
+            permanent_delete_file(storage, deleted_file)
+        except Exception as e:
+            failed_s3_keys.append(deleted_file.s3_key)
+            logger.error(
+                "Failed to delete file from S3.",
+                extra={
+                    "user_id": user_id,
+                    "file_id": deleted_file.id,
+                    "s3_key": deleted_file.s3_key,
+                    "error": str(e),
+                },
+            )
+
+    deleted_files = deleted_files.exclude(shared)
     for deleted_file in deleted_files:
         try:
-            storage.delete_file(object_name=deleted_file.s3_key)
+            get_region_storage(storage, deleted_file.region).delete_file(object_name=deleted_file.s3_key)
+            discard_cached_object(deleted_file.region, deleted_file.s3_key)
+            delete_file_thumbnails(storage, deleted_file)
         except Exception as e:
             failed_s3_keys.append(deleted_file.s3_key)
             logger.error(
@@ -0,0 +1,56 @@
+"""
+Download URLs, from the CDN when the plan or share link asks for it and a
+signer is configured, otherwise presigned straight from storage. Compressed
+files are the exception: they are streamed decoded through the API.
+"""
+
+from typing import Optional
+
+from django.urls import reverse
+
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.integrations.cdn import get_cdn_signer
+from apps.cloud_storage.models import CloudFile, ShareLink
+from apps.cloud_storage.utils.region_utils import is_default_region
+
+
+def wants_cdn(cloud_file: CloudFile, share_link: ShareLink = None) -> bool:
+    if share_link is not None and share_link.use_cdn is not None:
+        return share_link.use_cdn
+    plan = cloud_file.user.plan if cloud_file.user_id else None
+    return bool(plan and plan.cdn_downloads)
+
+
+def get_cdn_download_url(cloud_file: CloudFile, share_link: ShareLink = None) -> Optional[str]:
+    """
+    Signed CDN URL for the file, or None when it should come from storage.
+    The distribution fronts the default bucket, so files placed in other
+    regions are always served by their own bucket.
+    """
+    if not cloud_file.s3_key or cloud_file.content_encoding:
+        return None
+    signer = get_cdn_signer()
+    if signer is None or not is_default_region(cloud_file.region) or not wants_cdn(cloud_file, share_link):
+        return None
+    return signer.sign_download_url(cloud_file.s3_key)
+
+
+def get_decoded_download_url(request, cloud_file: CloudFile, share_link: ShareLink = None) -> Optional[str]:
+    """
+    API URL streaming a compressed file with its original bytes, or None for
+    other files. Storage and the CDN would hand out the encoded object, and
+    ranges of it, to clients that do not decode it.
+    """
+    if not cloud_file.content_encoding:
+        return None
+    if share_link is not None:
+        path = reverse("public-share-file-content", kwargs={"token": share_link.token, "file_id": cloud_file.id})
+    else:
+        path = reverse("storage-proxy-download", args=[cloud_file.pk])
+    return request.build_absolute_uri(path)
+
+
+def generate_download_url(storage, cloud_file: CloudFile, share_link: ShareLink = None) -> Optional[str]:
+    return get_cdn_download_url(cloud_file, share_link) or get_region_storage(
+        storage, cloud_file.region
+    ).generate_presigned_download_url(object_name=cloud_file.s3_key)
@@ -0,0 +1,128 @@
+"""
+Download bookkeeping: access recency for storage tiering, and making
+archived objects readable again.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from apps.cloud_storage.choices.storage_class_choices import RESTORE_REQUIRED_STORAGE_CLASSES
+from apps.cloud_storage.domain.exceptions.exceptions import FileRestoreInProgress
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile
+
+logger = logging.getLogger("aerobox")
+
+
+class AccessBuffer:
+    """
+    Per-process write-behind buffer of file access times.
+
+    Downloads only touch memory; the buffer is written with a single
+    bulk UPDATE once it is large enough, by a timer at most one flush
+    interval after its first entry, and at process exit. A crash loses at
+    most one flush window of recency, which tiering tolerates.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.accessed: Dict[int, datetime] = {}
+        self.last_flush = time.monotonic()
+        self.timer = None
+
+    def record(self, file_id: int, accessed_at: datetime) -> None:
+        interval = settings.CLOUD_STORAGE_ACCESS_FLUSH_SECONDS
+        with self.lock:
+            self.accessed[file_id] = accessed_at
+            due = (
+                len(self.accessed) >= settings.CLOUD_STORAGE_ACCESS_FLUSH_SIZE
+                or time.monotonic() - self.last_flush >= interval
+            )
+            if not due and self.timer is None:
+                # An idle worker may not record again for a long time
+                self.timer = threading.Timer(interval, self.flush_from_timer)
+                self.timer.daemon = True
+                self.timer.start()
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        with self.lock:
+            accessed, self.accessed = self.accessed, {}
+            self.last_flush = time.monotonic()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+        if not accessed:
+            return 0
+
+        files = [CloudFile(id=file_id, last_accessed_at=at) for file_id, at in accessed.items()]
+        try:
+            CloudFile.objects.bulk_update(files, ["last_accessed_at"], batch_size=500)
+        except Exception as e:
+            logger.error("Failed to flush file access times.", extra={"count": len(files), "error": str(e)})
+            return 0
+        return len(files)
+
+    def flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        finally:
+            connection.close()  # the timer thread's own connection
+
+
+access_buffer = AccessBuffer()
+atexit.register(access_buffer.flush)
+
+
+def record_file_access(cloud_file: CloudFile) -> None:
+    """Note a download of `cloud_file`; skipped if it was recorded recently."""
+    now = timezone.now()
+    resolution = timedelta(seconds=settings.CLOUD_STORAGE_ACCESS_RESOLUTION_SECONDS)
+    if cloud_file.last_accessed_at and now - cloud_file.last_accessed_at < resolution:
+        return
+
+    cloud_file.last_accessed_at = now
+    access_buffer.record(cloud_file.id, now)
+
+
+def ensure_file_readable(storage, cloud_file: CloudFile) -> None:
+    """
+    Raise FileRestoreInProgress while an archived object has no readable
+    copy, requesting the restore on first use. Restored files are moved
+    back to the standard class by `complete_file_restores`.
+    """
+    if cloud_file.storage_class not in RESTORE_REQUIRED_STORAGE_CLASSES:
+        return
+
+    storage = get_region_storage(storage, cloud_file.region)
+    head = storage.head(cloud_file.s3_key)
+    if head is None:
+        return  # the download URL lookup reports the missing object
+    if head.get("storage_class") not in RESTORE_REQUIRED_STORAGE_CLASSES or head.get("restore_ready"):
+        return
+
+    # Restored copies expire; ask again if ours may have
+    restore_expired_before = timezone.now() - timedelta(days=settings.CLOUD_STORAGE_RESTORE_DAYS)
+    if cloud_file.restore_requested_at is None or cloud_file.restore_requested_at < restore_expired_before:
+        storage.restore(cloud_file.s3_key, days=settings.CLOUD_STORAGE_RESTORE_DAYS)
+        cloud_file.restore_requested_at = timezone.now()
+        cloud_file.save(update_fields=["restore_requested_at"])
+        logger.info("Restore requested for archived file.", extra={"file_id": cloud_file.id})
+
+    raise FileRestoreInProgress()
+
+
+def prepare_file_download(storage, cloud_file: CloudFile) -> None:
+    """Call before handing out a download URL for `cloud_file`."""
+    record_file_access(cloud_file)
+    ensure_file_readable(storage, cloud_file)
@@ -2,7 +2,8 @@ from django.db import transaction
 
 from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
 from apps.cloud_storage.constants.cloud_files import FAILED
-from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.integrations.backends import get_region_storage, get_storage
+from apps.cloud_storage.services.files.content_objects import activate_content_objects
 from apps.cloud_storage.services.storage.cloud_file_sync_service import CloudFileSyncService
 from apps.cloud_storage.utils.size_utils import get_user_used_bytes
 
@@ -10,7 +11,7 @@ from apps.cloud_storage.utils.size_utils import get_user_used_bytes
 class FileUploadFinalizerService:
     def __init__(self, sync_service=None, storage=None):
         self.sync_service = sync_service or CloudFileSyncService()
-        self.storage = storage or S3StorageClient()
+        self.storage = storage or get_storage()
 
     @transaction.atomic
     def finalize(self, cloud_file):
@@ -34,7 +35,9 @@ class FileUploadFinalizerService:
             return False
 
         if size_changed and self.is_over_quota(cloud_file):
-            self.storage.delete_file(synced_file.s3_key)
+            # Shared content objects go away with their last reference
+            if not cloud_file.content_object_id:
+                get_region_storage(self.storage, synced_file.region).delete_file(synced_file.s3_key)
             self.mark_as_failed(
                 cloud_file,
                 error_code=CloudFileErrorCode.STORAGE_QUOTA_EXCEEDED.value,
@@ -42,6 +45,7 @@ class FileUploadFinalizerService:
             )
             return False
 
+        activate_content_objects([synced_file])
         return True
 
     @staticmethod
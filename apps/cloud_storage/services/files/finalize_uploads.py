@@ -0,0 +1,203 @@
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS, FAILED
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.content_objects import activate_content_objects
+from apps.cloud_storage.utils.size_utils import get_user_used_bytes
+
+logger = logging.getLogger("aerobox")
+
+FINALIZE_UPDATE_FIELDS = [
+    "size",
+    "content_type",
+    "metadata",
+    "status",
+    "error_code",
+    "error_message",
+    "updated_at",
+]
+
+
+@dataclass(frozen=True)
+class UploadedObject:
+    """What storage reports about an uploaded object."""
+
+    size: int
+    content_type: Optional[str] = None
+    metadata: Optional[dict] = None
+
+
+@dataclass(frozen=True)
+class FinalizeOutcome:
+    file_id: int
+    s3_key: str
+    status: str
+    error_code: Optional[str] = None
+    region: str = ""
+
+
+class QuotaBudget:
+    """
+    Remaining storage per user, computed once and consumed as files are
+    accepted, so a batch costs one aggregate per user instead of one per file.
+    """
+
+    def __init__(self):
+        self._remaining = {}
+
+    def consume(self, user, size: int) -> bool:
+        if user.id not in self._remaining:
+            self._remaining[user.id] = self.get_remaining_bytes(user)
+
+        remaining = self._remaining[user.id]
+        if remaining is None:
+            return True
+
+        if size > remaining:
+            return False
+
+        self._remaining[user.id] = remaining - size
+        return True
+
+    @staticmethod
+    def get_remaining_bytes(user) -> Optional[int]:
+        plan = user.plan
+        if not plan:
+            return 0
+
+        limit_bytes = plan.max_storage_bytes
+        if limit_bytes is None:
+            return None
+
+        return max(limit_bytes - get_user_used_bytes(user), 0)
+
+
+def apply_uploaded_objects(
+        uploads: Iterable[Tuple[CloudFile, Optional[UploadedObject]]],
+) -> List[FinalizeOutcome]:
+    """
+    Copy storage info onto PENDING files and mark them SUCCESS, or FAILED when
+    the object is missing (`None`) or the user's quota cannot hold them.
+    Everything is written with one bulk_update.
+    """
+    budget = QuotaBudget()
+    now = timezone.now()
+    to_update = []
+    outcomes = []
+
+    for cloud_file, uploaded in uploads:
+        cloud_file.updated_at = now
+
+        if uploaded is None:
+            cloud_file.status = FAILED
+            cloud_file.error_code = CloudFileErrorCode.FILE_NOT_FOUND_IN_S3.value
+            cloud_file.error_message = "File not found in storage during upload verification."
+        else:
+            cloud_file.size = uploaded.size
+            if uploaded.content_type:
+                cloud_file.content_type = uploaded.content_type
+            if uploaded.metadata is not None:
+                cloud_file.metadata = uploaded.metadata
+
+            if budget.consume(cloud_file.user, uploaded.size):
+                cloud_file.status = SUCCESS
+                cloud_file.error_code = None
+                cloud_file.error_message = None
+            else:
+                cloud_file.status = FAILED
+                cloud_file.error_code = CloudFileErrorCode.STORAGE_QUOTA_EXCEEDED.value
+                cloud_file.error_message = "User exceeded storage quota after final size verification."
+
+        to_update.append(cloud_file)
+        outcomes.append(
+            FinalizeOutcome(
+                file_id=cloud_file.id,
+                s3_key=cloud_file.s3_key,
+                status=cloud_file.status,
+                error_code=cloud_file.error_code,
+                region=cloud_file.region,
+            )
+        )
+
+    if to_update:
+        CloudFile.objects.bulk_update(to_update, FINALIZE_UPDATE_FIELDS)
+        activate_content_objects(to_update)
+
+    return outcomes
+
+
+def delete_rejected_objects(storage, outcomes: Iterable[FinalizeOutcome]) -> None:
+    """Remove objects that were uploaded but could not be kept."""
+    rejected = [
+        outcome for outcome in outcomes
+        if outcome.error_code == CloudFileErrorCode.STORAGE_QUOTA_EXCEEDED.value
+    ]
+    # Shared content objects go away with their last reference, not here
+    shared_keys = set(
+        ContentObject.objects.filter(s3_key__in=[o.s3_key for o in rejected]).values_list("s3_key", flat=True)
+    )
+
+    for outcome in rejected:
+        if outcome.s3_key in shared_keys:
+            continue
+        try:
+            get_region_storage(storage, outcome.region).delete_file(outcome.s3_key)
+        except Exception as e:
+            logger.error(
+                "Failed to delete over-quota upload from storage.",
+                extra={"file_id": outcome.file_id, "s3_key": outcome.s3_key, "error": str(e)},
+            )
+
+
+def finalize_uploads_from_events(storage, events, batch_size=None) -> List[FinalizeOutcome]:
+    """
+    Finalize PENDING files from S3 ObjectCreated events, matched by `s3_key`.
+
+    Size (and content type, when the producer sends it) come from the event,
+    so no HEAD request is needed. Keys without a PENDING file are ignored,
+    which makes redelivered events and client PATCHes harmless.
+    """
+    batch_size = batch_size or settings.CLOUD_STORAGE_FINALIZE_BATCH_SIZE
+
+    # Last event wins when the same key is reported more than once
+    events_by_key = {event.key: event for event in events}
+    keys = list(events_by_key)
+
+    outcomes = []
+    for i in range(0, len(keys), batch_size):
+        batch_keys = keys[i:i + batch_size]
+
+        with transaction.atomic():
+            pending_files = list(
+                CloudFile.not_deleted.select_for_update(skip_locked=True, of=("self",))
+                .select_related("user")
+                .filter(s3_key__in=batch_keys, status=PENDING)
+            )
+            batch_outcomes = apply_uploaded_objects(
+                (
+                    cloud_file,
+                    UploadedObject(
+                        size=events_by_key[cloud_file.s3_key].size,
+                        content_type=events_by_key[cloud_file.s3_key].content_type,
+                    ),
+                )
+                for cloud_file in pending_files
+            )
+
+        delete_rejected_objects(storage, batch_outcomes)
+        outcomes.extend(batch_outcomes)
+
+    logger.info(
+        "Finalized %s file(s) from %s S3 event(s).",
+        len(outcomes),
+        len(keys),
+    )
+    return outcomes
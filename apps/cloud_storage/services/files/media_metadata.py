@@ -0,0 +1,267 @@
+"""
+Media metadata (dimensions, capture date, page count, duration) read from
+stored objects without downloading them.
+
+Parsers get a seekable view of the object that fetches what they touch with
+ranged GETs, one CLOUD_STORAGE_METADATA_READ_BLOCK_BYTES block at a time:
+an image costs a request for its header, a PDF a few for its trailer and
+page tree, an MP4 one per box it steps over. Results are merged into
+`metadata["media"]`; the capture date is also stored in `captured_at`, so
+listings can be sorted by it in the database.
+"""
+
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, Iterable, Optional
+
+import mutagen
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from PIL import ExifTags, Image
+from pypdf import PdfReader
+
+from apps.cloud_storage.choices.storage_class_choices import RESTORE_REQUIRED_STORAGE_CLASSES
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import (
+    ObjectNotFoundError,
+    RangeReadLimitExceeded,
+    StorageUnavailableError,
+)
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile
+
+logger = logging.getLogger("aerobox")
+
+IMAGE_CONTENT_TYPES = {
+    "image/bmp",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/tiff",
+    "image/webp",
+}
+PDF_CONTENT_TYPES = {"application/pdf"}
+MEDIA_CONTENT_TYPE_PREFIXES = ("audio/", "video/")
+# EXIF orientations displayed rotated a quarter turn
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+@dataclass(frozen=True)
+class MetadataBatch:
+    last_id: int
+    scanned: int
+    extracted: int
+
+    @property
+    def done(self) -> bool:
+        return self.last_id is None
+
+
+class RangedObjectReader(io.RawIOBase):
+    """
+    Seekable, read-only view of a stored object where every read is a
+    ranged GET. Reads past CLOUD_STORAGE_METADATA_MAX_READ_BYTES in total
+    raise RangeReadLimitExceeded, so a parser cannot pull a whole file.
+    """
+
+    def __init__(self, storage, key: str, size: int):
+        super().__init__()
+        self.storage = storage
+        self.key = key
+        self.size = size
+        self.position = 0
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}.")
+        self.position = offset
+        return offset
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self.size - self.position)
+        if length <= 0:
+            return 0
+        if self.bytes_read + length > settings.CLOUD_STORAGE_METADATA_MAX_READ_BYTES:
+            raise RangeReadLimitExceeded()
+
+        data = self.storage.read_range(self.key, self.position, length)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        self.bytes_read += len(data)
+        return len(data)
+
+    def readall(self):
+        # One request for the rest of the object (or the limit error), not one per default-sized block
+        return self.read(max(self.size - self.position, 0))
+
+
+def open_ranged(storage, cloud_file: CloudFile) -> io.BufferedReader:
+    return io.BufferedReader(
+        RangedObjectReader(get_region_storage(storage, cloud_file.region), cloud_file.s3_key, cloud_file.size),
+        buffer_size=settings.CLOUD_STORAGE_METADATA_READ_BLOCK_BYTES,
+    )
+
+
+def parse_exif_datetime(value, offset=None) -> Optional[datetime]:
+    """EXIF "YYYY:MM:DD HH:MM:SS" in its recorded offset, UTC when none was recorded."""
+    try:
+        captured_at = datetime.strptime(value.strip("\x00 ")[:19], "%Y:%m:%d %H:%M:%S")
+    except (AttributeError, ValueError):
+        return None
+
+    tzinfo = dt_timezone.utc
+    if isinstance(offset, str):
+        try:
+            tzinfo = datetime.strptime(offset.strip("\x00 "), "%z").tzinfo
+        except ValueError:
+            pass
+    return captured_at.replace(tzinfo=tzinfo)
+
+
+def read_image_metadata(fileobj) -> dict:
+    with Image.open(fileobj) as image:
+        width, height = image.size
+        # PNG EXIF may sit after the pixel data; reading it would decode the whole image
+        exif = image.getexif() if image.format != "PNG" else Image.Exif()
+
+    if exif.get(ExifTags.Base.Orientation) in TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    media = {"width": width, "height": height}
+
+    exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+    captured_at = parse_exif_datetime(
+        exif_ifd.get(ExifTags.Base.DateTimeOriginal) or exif.get(ExifTags.Base.DateTime),
+        exif_ifd.get(ExifTags.Base.OffsetTimeOriginal),
+    )
+    if captured_at:
+        media["captured_at"] = captured_at.isoformat()
+
+    for name, tag in (("camera_make", ExifTags.Base.Make), ("camera_model", ExifTags.Base.Model)):
+        value = exif.get(tag)
+        if isinstance(value, str) and value.strip("\x00 "):
+            media[name] = value.strip("\x00 ")
+    return media
+
+
+def read_pdf_metadata(fileobj) -> dict:
+    return {"page_count": len(PdfReader(fileobj).pages)}
+
+
+def read_media_metadata(fileobj) -> dict:
+    media_file = mutagen.File(fileobj)
+    length = getattr(getattr(media_file, "info", None), "length", None)
+    return {"duration_seconds": round(length, 3)} if length else {}
+
+
+def get_extractor(content_type: str) -> Optional[Callable[[io.BufferedReader], dict]]:
+    if content_type in IMAGE_CONTENT_TYPES:
+        return read_image_metadata
+    if content_type in PDF_CONTENT_TYPES:
+        return read_pdf_metadata
+    if content_type.startswith(MEDIA_CONTENT_TYPE_PREFIXES):
+        return read_media_metadata
+    return None
+
+
+def get_metadata_candidates():
+    """Uploaded files of a supported type that were never read and can be read right away."""
+    supported_types = (
+        Q(content_type__in=IMAGE_CONTENT_TYPES | PDF_CONTENT_TYPES)
+        | Q(content_type__startswith=MEDIA_CONTENT_TYPE_PREFIXES[0])
+        | Q(content_type__startswith=MEDIA_CONTENT_TYPE_PREFIXES[1])
+    )
+    return (
+        CloudFile.not_deleted.filter(supported_types, status=SUCCESS, metadata_extracted_at__isnull=True)
+        # Chunked uploads have no single object until they are materialized
+        .filter(Q(manifest__isnull=True) | Q(manifest__materialized_at__isnull=False))
+        .exclude(storage_class__in=RESTORE_REQUIRED_STORAGE_CLASSES)
+    )
+
+
+def read_file_media(storage, cloud_file: CloudFile) -> Optional[dict]:
+    """
+    Media metadata of one file, read from storage. None when the object could
+    not be read and the file should be tried again; empty when it cannot be
+    parsed.
+    """
+    extractor = get_extractor(cloud_file.content_type)
+    if extractor is None:
+        return {}
+
+    try:
+        with open_ranged(storage, cloud_file) as fileobj:
+            return extractor(fileobj)
+    except StorageUnavailableError:
+        return None
+    except ObjectNotFoundError:
+        logger.warning("Object missing, metadata not extracted.", extra={"file_id": cloud_file.id})
+        return None
+    except RangeReadLimitExceeded:
+        logger.info("Metadata is beyond the ranged read limit.", extra={"file_id": cloud_file.id})
+        return {}
+    except Exception as e:
+        # The parsers raise a wide range of errors on malformed or unsupported files
+        logger.info("File metadata cannot be extracted.", extra={"file_id": cloud_file.id, "error": str(e)})
+        return {}
+
+
+def set_file_media(cloud_file: CloudFile, media: dict, extracted_at: datetime) -> None:
+    if media:
+        cloud_file.metadata = {**(cloud_file.metadata or {}), "media": media}
+    cloud_file.captured_at = parse_datetime(media["captured_at"]) if "captured_at" in media else None
+    cloud_file.metadata_extracted_at = extracted_at
+
+
+def extract_metadata(storage, files: Iterable[CloudFile]) -> int:
+    """
+    Read the media metadata of `files` concurrently and store it with one
+    bulk_update. Returns the number of files that got metadata.
+    """
+    files = list(files)
+    if not files:
+        return 0
+
+    workers = min(settings.CLOUD_STORAGE_METADATA_MAX_WORKERS, len(files))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda cloud_file: read_file_media(storage, cloud_file), files))
+
+    extracted_at = timezone.now()
+    read = []
+    for cloud_file, media in zip(files, results):
+        if media is not None:
+            set_file_media(cloud_file, media, extracted_at)
+            read.append(cloud_file)
+
+    CloudFile.objects.bulk_update(read, ["metadata", "captured_at", "metadata_extracted_at"])
+    return sum(1 for media in results if media)
+
+
+def extract_metadata_batch(storage, after_id=0, batch_size=None) -> MetadataBatch:
+    batch_size = batch_size or settings.CLOUD_STORAGE_METADATA_BATCH_SIZE
+
+    files = list(get_metadata_candidates().filter(id__gt=after_id).order_by("id")[:batch_size])
+
+    return MetadataBatch(
+        last_id=files[-1].id if len(files) == batch_size else None,
+        scanned=len(files),
+        extracted=extract_metadata(storage, files),
+    )
@@ -0,0 +1,181 @@
+"""
+Local cache of small, frequently downloaded objects.
+
+Proxied downloads of objects up to CLOUD_STORAGE_OBJECT_CACHE_MAX_OBJECT_BYTES
+are kept on local disk under CLOUD_STORAGE_OBJECT_CACHE_DIR, shared by the
+processes of a host and capped at CLOUD_STORAGE_OBJECT_CACHE_MAX_BYTES with
+least-recently-used eviction. A hit costs no presign, no object store round
+trip and no egress.
+
+Entries are named after the region and key of the object and the version of
+the file's bytes (its size and encoding), so an object compressed in place
+gets a new entry, and a deleted file is never looked up since its row is
+gone. Deletes on this host also drop their entries right away; stale
+entries left by other hosts age out of the LRU.
+
+Hits and misses are counted in the shared cache; `object_cache_stats`
+reports the offload ratio.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.cloud_storage.models import CloudFile
+
+logger = logging.getLogger("aerobox")
+
+STATS_CACHE_KEY = "object-cache:{}"
+STATS_COUNTERS = ("hits", "misses", "hit_bytes", "miss_bytes")
+
+
+class ObjectCache:
+    """Size-capped LRU of objects on local disk; recency is the entry's modification time."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def entry_prefix(self, region: str, key: str) -> str:
+        return hashlib.sha256(f"{region}:{key}".encode()).hexdigest()
+
+    def entry_path(self, region: str, key: str, version: str) -> Path:
+        version_hash = hashlib.sha256(version.encode()).hexdigest()[:16]
+        return self.directory / f"{self.entry_prefix(region, key)}-{version_hash}"
+
+    def open(self, region: str, key: str, version: str) -> Optional[BinaryIO]:
+        """The cached object, open for reading, or None. An open entry survives eviction."""
+        path = self.entry_path(region, key, version)
+        try:
+            fileobj = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted since; the open file is still readable
+        return fileobj
+
+    def put(self, region: str, key: str, version: str, data: bytes) -> None:
+        # Written aside and renamed, so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, self.entry_path(region, key, version))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def discard(self, region: str, key: str) -> None:
+        for path in self.directory.glob(f"{self.entry_prefix(region, key)}-*"):
+            path.unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        """Drop the least recently used entries until the cache fits in `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+
+
+def get_object_cache() -> Optional[ObjectCache]:
+    """The host's object cache, or None when CLOUD_STORAGE_OBJECT_CACHE_DIR is not set."""
+    if not settings.CLOUD_STORAGE_OBJECT_CACHE_DIR:
+        return None
+    return ObjectCache(Path(settings.CLOUD_STORAGE_OBJECT_CACHE_DIR), settings.CLOUD_STORAGE_OBJECT_CACHE_MAX_BYTES)
+
+
+def increment_stat(name: str, delta: int = 1) -> None:
+    cache_key = STATS_CACHE_KEY.format(name)
+    try:
+        cache.incr(cache_key, delta)
+    except ValueError:
+        if not cache.add(cache_key, delta, timeout=None):
+            cache.incr(cache_key, delta)
+
+
+def record_lookup(hit: bool, size: int) -> None:
+    try:
+        increment_stat("hits" if hit else "misses")
+        increment_stat("hit_bytes" if hit else "miss_bytes", size)
+    except Exception as e:
+        logger.warning("Failed to record object cache lookup.", extra={"error": str(e)})
+
+
+def get_object_cache_stats() -> dict:
+    values = cache.get_many([STATS_CACHE_KEY.format(name) for name in STATS_COUNTERS])
+    stats = {name: values.get(STATS_CACHE_KEY.format(name), 0) for name in STATS_COUNTERS}
+    lookups = stats["hits"] + stats["misses"]
+    transferred = stats["hit_bytes"] + stats["miss_bytes"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    stats["offload_ratio"] = stats["hit_bytes"] / transferred if transferred else 0.0
+    return stats
+
+
+def reset_object_cache_stats() -> None:
+    cache.delete_many([STATS_CACHE_KEY.format(name) for name in STATS_COUNTERS])
+
+
+def get_stored_size(cloud_file: CloudFile) -> int:
+    return cloud_file.stored_size if cloud_file.content_encoding else cloud_file.size
+
+
+def open_cached_object(region_storage, cloud_file: CloudFile) -> Optional[BinaryIO]:
+    """
+    The stored bytes of `cloud_file` from the object cache, fetching them on
+    a miss; None when the file is not cached (too large, cache disabled, or
+    the object already on local disk).
+    """
+    object_cache = get_object_cache()
+    size = get_stored_size(cloud_file)
+    if (
+            object_cache is None
+            or size > settings.CLOUD_STORAGE_OBJECT_CACHE_MAX_OBJECT_BYTES
+            or hasattr(region_storage, "get_local_path")
+    ):
+        return None
+
+    version = f"{cloud_file.size}:{cloud_file.content_encoding}"
+    cached = object_cache.open(cloud_file.region, cloud_file.s3_key, version)
+    record_lookup(cached is not None, size)
+    if cached is not None:
+        return cached
+
+    with closing(region_storage.open(cloud_file.s3_key)) as body:
+        data = body.read()
+    try:
+        object_cache.put(cloud_file.region, cloud_file.s3_key, version, data)
+    except OSError as e:
+        logger.warning("Failed to cache object.", extra={"file_id": cloud_file.id, "error": str(e)})
+    # Evicted right away when larger than the whole cache
+    return object_cache.open(cloud_file.region, cloud_file.s3_key, version) or io.BytesIO(data)
+
+
+def discard_cached_object(region: str, key: str) -> None:
+    """Drop this host's cached copy of an object that was deleted or replaced."""
+    object_cache = get_object_cache()
+    if object_cache is not None:
+        object_cache.discard(region, key)
@@ -0,0 +1,287 @@
+"""
+Downloads streamed through the app, for clients that cannot reach the object
+store directly and for backends without presigned URLs of their own.
+
+Bodies are relayed in CLOUD_STORAGE_PROXY_CHUNK_BYTES blocks, so a download
+holds one block in memory whatever the file size. A single `Range` is
+honoured, guarded by `If-Range`, so interrupted downloads resume where they
+stopped; whole objects on local disk are handed to the server as files so
+it can send them without copying. Small objects are served from the host's
+object cache (see `object_cache`).
+
+Compressed objects are relayed as stored when the client accepts their
+encoding and wants the whole file; otherwise they are decoded on the way,
+and ranges are counted in decoded bytes.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterator, Optional
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from apps.cloud_storage.domain.exceptions.file import RangeNotSatisfiableError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, ManifestChunk
+from apps.cloud_storage.services.files.compression import DecodingReader
+from apps.cloud_storage.services.files.object_cache import open_cached_object
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+@dataclass(frozen=True)
+class ByteRange:
+    start: int
+    length: int
+
+    @property
+    def end(self) -> int:
+        return self.start + self.length - 1
+
+
+def build_etag(region: str, key: str, size: int, content_encoding: str = "") -> str:
+    """
+    Strong validator of a file's bytes; objects are only rewritten in place
+    by compression, which keeps their decoded bytes. Each encoding sent is
+    its own representation, with its own validator.
+    """
+    version = f"{region}:{key}:{size}:{content_encoding}" if content_encoding else f"{region}:{key}:{size}"
+    return '"{}"'.format(hashlib.sha256(version.encode()).hexdigest()[:32])
+
+
+def accepts_encoding(header: Optional[str], encoding: str) -> bool:
+    """`Accept-Encoding` allows `encoding`, explicitly or by `*`, with a non-zero quality."""
+    accepted = {}
+    for item in (header or "").split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[ByteRange]:
+    """
+    The single byte range asked for in `header`, or None to send the whole
+    file. Multiple or malformed ranges are ignored, as HTTP allows.
+    """
+    match = RANGE_PATTERN.fullmatch(header.strip()) if header else None
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise RangeNotSatisfiableError()
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+
+    if start >= size:
+        raise RangeNotSatisfiableError()
+    return ByteRange(start=start, length=end - start + 1)
+
+
+def range_applies(if_range: Optional[str], etag: str, last_modified: Optional[datetime]) -> bool:
+    """`If-Range` holds: the client's partial copy is of the current bytes."""
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and last_modified is not None and int(last_modified.timestamp()) <= since
+
+
+def iter_body(body, length: int) -> Iterator[bytes]:
+    block_size = settings.CLOUD_STORAGE_PROXY_CHUNK_BYTES
+    try:
+        while length > 0:
+            data = body.read(min(block_size, length))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+    finally:
+        body.close()
+
+
+def stream_object(storage, key: str, start: int, length: int) -> Iterator[bytes]:
+    """Open the object right away, so a missing object fails before the response starts."""
+    if length <= 0:
+        return iter(())
+    return iter_body(storage.open(key, start=start, length=length), length)
+
+
+def stream_chunks(storage, cloud_file: CloudFile, start: int, length: int) -> Iterator[bytes]:
+    """Bytes `start`..`start + length` of an unmaterialized chunked file, opening only the chunks they span."""
+    chunks = (
+        ManifestChunk.objects.filter(
+            manifest__cloud_file=cloud_file,
+            offset__lt=start + length,
+        )
+        .order_by("index")
+        .values_list("offset", "size", "content_object__s3_key", "content_object__region")
+    )
+    for offset, size, key, region in chunks:
+        if offset + size <= start:
+            continue
+        chunk_start = max(start - offset, 0)
+        chunk_length = min(size - chunk_start, start + length - offset - chunk_start)
+        yield from stream_object(get_region_storage(storage, region), key, chunk_start, chunk_length)
+
+
+def build_streaming_response(
+        request,
+        open_range: Callable[[int, int], Iterator[bytes]],
+        *,
+        size: int,
+        content_type: str,
+        etag: str,
+        last_modified: Optional[datetime] = None,
+        file_name: str = None,
+        local_path=None,
+        local_file: BinaryIO = None,
+        content_encoding: str = None,
+):
+    """
+    Response for a download of `size` bytes, whole or the requested range.
+    `open_range(start, length)` yields the bytes; `local_path`, or the open
+    `local_file`, is served directly for whole-file requests.
+    `content_encoding` is sent for bytes relayed as stored.
+    """
+    byte_range = None
+    if range_applies(request.headers.get("If-Range"), etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except RangeNotSatisfiableError:
+            if local_file is not None:
+                local_file.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None and local_file is not None:
+        response = FileResponse(local_file, content_type=content_type)
+    elif byte_range is None and local_path is not None:
+        response = FileResponse(open(local_path, "rb"), content_type=content_type)
+    elif byte_range is None:
+        response = StreamingHttpResponse(open_range(0, size), content_type=content_type)
+        response["Content-Length"] = size
+    else:
+        response = StreamingHttpResponse(
+            open_range(byte_range.start, byte_range.length), status=206, content_type=content_type
+        )
+        response["Content-Length"] = byte_range.length
+        response["Content-Range"] = f"bytes {byte_range.start}-{byte_range.end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    if content_encoding:
+        response["Content-Encoding"] = content_encoding
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    if file_name:
+        response["Content-Disposition"] = content_disposition_header(True, file_name)
+    return response
+
+
+def skip(reader, length: int) -> None:
+    """Read past the first `length` bytes of a stream that cannot seek."""
+    block_size = settings.CLOUD_STORAGE_PROXY_CHUNK_BYTES
+    while length > 0:
+        data = reader.read(min(block_size, length))
+        if not data:
+            return
+        length -= len(data)
+
+
+def build_encoded_download_response(body, cloud_file: CloudFile, request):
+    """
+    Send a compressed file, read from `body`, as stored when the client
+    accepts its encoding and asks for the whole file, else decoded, whole or
+    the requested range.
+    """
+    encoding = cloud_file.content_encoding
+    relay = accepts_encoding(request.headers.get("Accept-Encoding"), encoding) and not request.headers.get("Range")
+    reader = DecodingReader(body, encoding, decode=not relay)
+
+    if relay and reader.encoded:
+        size = cloud_file.stored_size
+        etag = build_etag(cloud_file.region, cloud_file.s3_key, cloud_file.size, encoding)
+    else:
+        # Decoded, or not rewritten yet: the bytes are the original ones
+        size, encoding = cloud_file.size, None
+        etag = build_etag(cloud_file.region, cloud_file.s3_key, cloud_file.size)
+
+    def open_range(start, length):
+        skip(reader, start)
+        return iter_body(reader, length)
+
+    response = build_streaming_response(
+        request,
+        open_range,
+        size=size,
+        content_type=cloud_file.content_type or "application/octet-stream",
+        etag=etag,
+        last_modified=cloud_file.created_at,
+        file_name=cloud_file.file_name,
+        content_encoding=encoding,
+    )
+    if response.status_code == 416:
+        reader.close()
+    response["Vary"] = "Accept-Encoding"
+    return response
+
+
+def build_file_download_response(storage, cloud_file: CloudFile, request):
+    """
+    Stream `cloud_file` from the object cache or its object, or from its
+    chunks until they are materialized.
+    """
+    manifest = getattr(cloud_file, "manifest", None)
+    region_storage = get_region_storage(storage, cloud_file.region)
+
+    if manifest is not None and manifest.materialized_at is None:
+        def open_range(start, length):
+            return stream_chunks(storage, cloud_file, start, length)
+        cached = local_path = None
+    else:
+        cached = open_cached_object(region_storage, cloud_file)
+        if cloud_file.content_encoding:
+            body = cached if cached is not None else region_storage.open(cloud_file.s3_key)
+            return build_encoded_download_response(body, cloud_file, request)
+
+        def open_range(start, length):
+            if cached is not None:
+                cached.seek(start)
+                return iter_body(cached, length)
+            return stream_object(region_storage, cloud_file.s3_key, start, length)
+        get_local_path = getattr(region_storage, "get_local_path", None)
+        local_path = get_local_path(cloud_file.s3_key) if get_local_path else None
+
+    return build_streaming_response(
+        request,
+        open_range,
+        size=cloud_file.size,
+        content_type=cloud_file.content_type or "application/octet-stream",
+        etag=build_etag(cloud_file.region, cloud_file.s3_key, cloud_file.size),
+        last_modified=cloud_file.created_at,
+        file_name=cloud_file.file_name,
+        local_path=local_path,
+        local_file=cached,
+    )
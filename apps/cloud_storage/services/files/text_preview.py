@@ -0,0 +1,154 @@
+"""
+Previews of text, CSV and JSON files from their first bytes.
+
+Only the first CLOUD_STORAGE_PREVIEW_BYTES of the object are fetched, with a
+ranged read, so previewing a 2 GB log costs the same as a small one. Objects
+are only rewritten in place by compression, which keeps their decoded bytes,
+so region, key and size identify the content: previews are cached under them
+and shared by every file backed by the object.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+from contextlib import closing
+from itertools import islice
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import FilePreviewUnavailable
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.chunked_uploads import open_chunked_file
+from apps.cloud_storage.services.files.compression import open_decoded
+from apps.cloud_storage.services.files.file_access import ensure_file_readable
+
+PREVIEW_CACHE_KEY = "file-previews:{}"
+CSV_CONTENT_TYPES = {"application/csv", "text/csv", "text/tab-separated-values"}
+JSON_CONTENT_TYPES = {"application/json", "application/x-ndjson"}
+TEXT_CONTENT_TYPES = {
+    "application/javascript",
+    "application/x-sh",
+    "application/x-yaml",
+    "application/xml",
+    "application/yaml",
+}
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def get_preview_kind(content_type: str) -> Optional[str]:
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in CSV_CONTENT_TYPES:
+        return "csv"
+    if content_type in JSON_CONTENT_TYPES:
+        return "json"
+    if content_type.startswith("text/") or content_type in TEXT_CONTENT_TYPES:
+        return "text"
+    return None
+
+
+def build_preview_cache_key(cloud_file: CloudFile, kind: str) -> str:
+    version = ":".join(
+        str(part)
+        for part in (kind, cloud_file.region, cloud_file.s3_key, cloud_file.size, settings.CLOUD_STORAGE_PREVIEW_BYTES)
+    )
+    return PREVIEW_CACHE_KEY.format(hashlib.sha256(version.encode()).hexdigest())
+
+
+def read_head(storage, cloud_file: CloudFile, length: int) -> bytes:
+    manifest = getattr(cloud_file, "manifest", None)
+    if manifest is not None and manifest.materialized_at is None:
+        with open_chunked_file(storage, cloud_file) as reader:
+            return reader.read(length)
+    if cloud_file.content_encoding:
+        # Compressed objects are decoded from the start; only the head is read
+        with closing(open_decoded(storage, cloud_file)) as reader:
+            return reader.read(length)
+    return get_region_storage(storage, cloud_file.region).read_range(cloud_file.s3_key, 0, length)
+
+
+def decode_head(data: bytes, truncated: bool) -> Tuple[str, str]:
+    """
+    Decode the first bytes of a file: by its BOM, else as UTF-8, else as
+    Windows-1252. A multi-byte character cut off by the read is dropped.
+    """
+    encoding = next((encoding for bom, encoding in BOM_ENCODINGS if data.startswith(bom)), None)
+    if encoding:
+        candidates = [(encoding, "replace")]
+    elif b"\x00" in data:
+        raise FilePreviewUnavailable()
+    else:
+        candidates = [("utf-8", "strict"), ("cp1252", "replace")]
+
+    for encoding, errors in candidates:
+        decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        try:
+            return decoder.decode(data, final=not truncated), encoding
+        except UnicodeDecodeError:
+            continue
+    raise FilePreviewUnavailable()
+
+
+def parse_csv(text: str, content_type: str) -> Optional[dict]:
+    """Header and first rows of a CSV, or None when it does not parse."""
+    try:
+        dialect = csv.Sniffer().sniff(text[:settings.CLOUD_STORAGE_PREVIEW_SNIFF_CHARS], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel_tab if content_type == "text/tab-separated-values" else csv.excel
+
+    try:
+        rows = list(islice(csv.reader(io.StringIO(text), dialect), settings.CLOUD_STORAGE_PREVIEW_MAX_ROWS + 2))
+    except csv.Error:
+        return None
+
+    return {
+        "delimiter": dialect.delimiter,
+        "header": rows[0] if rows else [],
+        "rows": rows[1:settings.CLOUD_STORAGE_PREVIEW_MAX_ROWS + 1],
+        "more_rows": len(rows) > settings.CLOUD_STORAGE_PREVIEW_MAX_ROWS + 1,
+    }
+
+
+def render_preview(storage, cloud_file: CloudFile, kind: str) -> dict:
+    length = settings.CLOUD_STORAGE_PREVIEW_BYTES
+    data = read_head(storage, cloud_file, length)
+    truncated = cloud_file.size > length
+    text, encoding = decode_head(data, truncated)
+
+    if truncated and "\n" in text:
+        # The last line is cut off by the read
+        text = text[:text.rindex("\n") + 1]
+
+    preview = {"kind": kind, "encoding": encoding, "truncated": truncated}
+    if kind == "csv":
+        table = parse_csv(text, cloud_file.content_type)
+        if table is not None:
+            more_rows = table.pop("more_rows")
+            preview["truncated"] = truncated or more_rows
+            return {**preview, **table}
+        preview["kind"] = "text"
+
+    return {**preview, "text": text}
+
+
+def get_file_preview(storage, cloud_file: CloudFile) -> dict:
+    """Cached preview of `cloud_file`; FilePreviewUnavailable for files that are not text."""
+    kind = get_preview_kind(cloud_file.content_type or "")
+    if kind is None or cloud_file.status != SUCCESS:
+        raise FilePreviewUnavailable()
+
+    cache_key = build_preview_cache_key(cloud_file, kind)
+    preview = cache.get(cache_key)
+    if preview is None:
+        ensure_file_readable(storage, cloud_file)
+        preview = render_preview(storage, cloud_file, kind)
+        cache.set(cache_key, preview, settings.CLOUD_STORAGE_PREVIEW_CACHE_SECONDS)
+    return preview
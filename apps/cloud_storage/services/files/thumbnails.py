@@ -0,0 +1,219 @@
+"""
+Thumbnails for the file preview feature.
+
+The original is streamed from storage, decoded once and downscaled to each
+width the owner's plan asks for, largest first, so every rendition is made
+from the previous one. Renditions are stored next to the original under
+`{s3_key}.thumbs/`; files sharing an object share its thumbnails.
+"""
+
+import io
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from apps.cloud_storage.choices.storage_class_choices import RESTORE_REQUIRED_STORAGE_CLASSES
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.chunked_uploads import open_chunked_file
+
+logger = logging.getLogger("aerobox")
+
+THUMBNAIL_SOURCE_CONTENT_TYPES = {
+    "image/bmp",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/tiff",
+    "image/webp",
+}
+THUMBNAIL_FORMATS = {
+    "WEBP": ("webp", "image/webp"),
+    "JPEG": ("jpg", "image/jpeg"),
+}
+
+
+@dataclass(frozen=True)
+class ThumbnailBatch:
+    last_id: int
+    scanned: int
+    rendered: int
+
+    @property
+    def done(self) -> bool:
+        return self.last_id is None
+
+
+def build_thumbnail_key(s3_key: str, width: int, image_format: str) -> str:
+    extension, _content_type = THUMBNAIL_FORMATS[image_format]
+    return f"{s3_key}.thumbs/{width}.{extension}"
+
+
+def get_thumbnail_keys(cloud_file: CloudFile) -> List[str]:
+    thumbnails = cloud_file.thumbnails or {}
+    return [
+        build_thumbnail_key(cloud_file.s3_key, width, thumbnails["format"])
+        for width in thumbnails.get("sizes", [])
+    ]
+
+
+def get_thumbnail_urls(storage, cloud_file: CloudFile) -> Optional[Dict[str, str]]:
+    """Presigned URL per thumbnail width; no lookups, the thumbnails are known to exist."""
+    if not (cloud_file.thumbnails or {}).get("sizes"):
+        return None
+
+    region_storage = get_region_storage(storage, cloud_file.region)
+    return {
+        str(width): region_storage.generate_presigned_download_url(
+            object_name=build_thumbnail_key(cloud_file.s3_key, width, cloud_file.thumbnails["format"]),
+            check_exists=False,
+        )
+        for width in cloud_file.thumbnails["sizes"]
+    }
+
+
+def delete_file_thumbnails(storage, cloud_file: CloudFile) -> None:
+    keys = get_thumbnail_keys(cloud_file)
+    if keys:
+        get_region_storage(storage, cloud_file.region).delete_files(keys)
+
+
+def get_thumbnail_candidates():
+    """Uploaded images that were never rendered and can be read right away."""
+    return (
+        CloudFile.not_deleted.filter(
+            status=SUCCESS,
+            thumbnails__isnull=True,
+            content_type__in=THUMBNAIL_SOURCE_CONTENT_TYPES,
+            size__lte=settings.CLOUD_STORAGE_THUMBNAIL_MAX_SOURCE_BYTES,
+        )
+        .exclude(storage_class__in=RESTORE_REQUIRED_STORAGE_CLASSES)
+        .select_related("manifest")
+    )
+
+
+def render_thumbnails(image: Image.Image, widths: Iterable[int], image_format: str) -> Dict[int, bytes]:
+    """Encode `image` bounded to each width (never upscaled), largest first."""
+    widths = sorted(widths, reverse=True)
+    # JPEG originals decode straight at a reduced scale
+    image.draft("RGB", (widths[0], widths[0]))
+    image = ImageOps.exif_transpose(image)
+    if image_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+        keeps_alpha = image_format == "WEBP" and ("A" in image.getbands() or "transparency" in image.info)
+        image = image.convert("RGBA" if keeps_alpha else "RGB")
+
+    renditions = {}
+    for width in widths:
+        image.thumbnail((width, width))
+        output = io.BytesIO()
+        image.save(output, format=image_format, quality=settings.CLOUD_STORAGE_THUMBNAIL_QUALITY)
+        renditions[width] = output.getvalue()
+    return renditions
+
+
+def open_original(storage, cloud_file: CloudFile):
+    manifest = getattr(cloud_file, "manifest", None)
+    if manifest is not None and manifest.materialized_at is None:
+        return open_chunked_file(storage, cloud_file)
+    return get_region_storage(storage, cloud_file.region).open(cloud_file.s3_key)
+
+
+def read_original(storage, cloud_file: CloudFile) -> Image.Image:
+    body = open_original(storage, cloud_file)
+    try:
+        # Bounded by CLOUD_STORAGE_THUMBNAIL_MAX_SOURCE_BYTES
+        image = Image.open(io.BytesIO(body.read()))
+    finally:
+        body.close()
+
+    if image.width * image.height > settings.CLOUD_STORAGE_THUMBNAIL_MAX_PIXELS:
+        raise Image.DecompressionBombError(f"{image.width}x{image.height} image is too large to render.")
+    return image
+
+
+def set_thumbnails(cloud_file: CloudFile, thumbnails: dict) -> None:
+    """Record the thumbnails on every file backed by the same object."""
+    cloud_file.thumbnails = thumbnails
+    CloudFile.objects.filter(
+        Q(id=cloud_file.id) | Q(thumbnails__isnull=True),
+        s3_key=cloud_file.s3_key,
+        region=cloud_file.region,
+    ).update(thumbnails=thumbnails)
+
+
+def generate_file_thumbnails(storage, cloud_file: CloudFile, widths: List[int]) -> bool:
+    """
+    Render and store the thumbnails of `cloud_file`. Images that cannot be
+    decoded are marked with empty thumbnails so they are not retried.
+    """
+    rendered = (
+        CloudFile.objects.filter(s3_key=cloud_file.s3_key, region=cloud_file.region, thumbnails__isnull=False)
+        .exclude(id=cloud_file.id)
+        .values_list("thumbnails", flat=True)
+        .first()
+    )
+    if rendered is not None:
+        set_thumbnails(cloud_file, rendered)
+        return bool(rendered)
+
+    image_format = settings.CLOUD_STORAGE_THUMBNAIL_FORMAT
+    try:
+        renditions = render_thumbnails(read_original(storage, cloud_file), widths, image_format)
+    except ObjectNotFoundError:
+        logger.warning("Object missing, thumbnails not rendered.", extra={"file_id": cloud_file.id})
+        return False
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        logger.info("Image cannot be thumbnailed.", extra={"file_id": cloud_file.id, "error": str(e)})
+        set_thumbnails(cloud_file, {})
+        return False
+
+    _extension, content_type = THUMBNAIL_FORMATS[image_format]
+    region_storage = get_region_storage(storage, cloud_file.region)
+    for width, data in renditions.items():
+        region_storage.save(
+            build_thumbnail_key(cloud_file.s3_key, width, image_format),
+            io.BytesIO(data),
+            content_type=content_type,
+            metadata={"user-id": str(cloud_file.user_id)},
+        )
+
+    set_thumbnails(cloud_file, {"format": image_format, "sizes": sorted(renditions)})
+    return True
+
+
+def generate_thumbnails(storage, files: Iterable[CloudFile]) -> int:
+    """Render thumbnails for the files whose owner's plan includes file preview."""
+    sizes_by_user = {}
+    rendered = 0
+    for cloud_file in files:
+        if cloud_file.user_id not in sizes_by_user:
+            plan = cloud_file.user.plan if cloud_file.user_id else None
+            sizes_by_user[cloud_file.user_id] = plan.thumbnail_sizes if plan else []
+
+        widths = sizes_by_user[cloud_file.user_id]
+        if widths:
+            rendered += generate_file_thumbnails(storage, cloud_file, widths)
+    return rendered
+
+
+def generate_thumbnails_batch(storage, after_id=0, batch_size=None) -> ThumbnailBatch:
+    batch_size = batch_size or settings.CLOUD_STORAGE_THUMBNAIL_BATCH_SIZE
+
+    files = list(
+        get_thumbnail_candidates()
+        .select_related("user")
+        .filter(id__gt=after_id)
+        .order_by("id")[:batch_size]
+    )
+
+    return ThumbnailBatch(
+        last_id=files[-1].id if len(files) == batch_size else None,
+        scanned=len(files),
+        rendered=generate_thumbnails(storage, files),
+    )
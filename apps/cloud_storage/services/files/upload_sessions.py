@@ -0,0 +1,226 @@
+"""
+Upload sessions: one presigned POST policy for many uploads.
+
+Sync agents pushing thousands of small files get a single time-boxed policy
+accepting any key under a session prefix, instead of one `create` call per
+file. Nothing is written per file until objects arrive: their ObjectCreated
+events register them as files in the session's folder, charged to the
+session's byte budget and the user's quota. Uploads that do not fit either
+are deleted from storage and counted as rejected.
+"""
+
+import copy
+import logging
+import mimetypes
+import posixpath
+import re
+import secrets
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import FileUploadError, StorageQuotaExceeded
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, Folder, UploadSession
+from apps.cloud_storage.services.files.finalize_uploads import FinalizeOutcome, QuotaBudget
+from apps.cloud_storage.services.files.object_cache import discard_cached_object
+from apps.cloud_storage.services.files.thumbnails import delete_file_thumbnails
+from apps.cloud_storage.utils.path_utils import build_object_path, build_s3_path
+from apps.cloud_storage.utils.region_utils import get_region_bucket
+
+logger = logging.getLogger("aerobox")
+
+SESSION_KEY_PATTERN = re.compile(r"^(.*?/s-[0-9a-f]{32}/)(.+)$")
+
+
+@dataclass(frozen=True)
+class PreparedUploadSession:
+    session: UploadSession
+    policy: dict
+
+
+def get_session_budget(user, max_bytes: Optional[int]) -> int:
+    """Bytes a new session may register: what was asked for, within the default cap and the remaining quota."""
+    budget = settings.CLOUD_STORAGE_UPLOAD_SESSION_MAX_BYTES
+    if max_bytes:
+        budget = min(budget, max_bytes)
+    remaining = QuotaBudget.get_remaining_bytes(user)
+    if remaining is not None:
+        budget = min(budget, remaining)
+    return budget
+
+
+def create_upload_session(
+        storage,
+        user,
+        folder: Optional[Folder] = None,
+        max_bytes: Optional[int] = None,
+        region: str = "",
+) -> PreparedUploadSession:
+    budget = get_session_budget(user, max_bytes)
+    if budget <= 0:
+        raise StorageQuotaExceeded()
+
+    seconds = settings.CLOUD_STORAGE_UPLOAD_SESSION_SECONDS
+    session = UploadSession.objects.create(
+        user=user,
+        folder=folder,
+        key_prefix=build_s3_path(user_id=user.id, file_name=f"s-{secrets.token_hex(16)}") + "/",
+        key_layout=settings.CLOUD_STORAGE_KEY_LAYOUT,
+        region=region,
+        max_bytes=budget,
+        expires_at=timezone.now() + timedelta(seconds=seconds),
+    )
+
+    plan = user.plan
+    object_max_bytes = min(budget, plan.max_file_upload_size_bytes) if plan else budget
+    try:
+        policy = get_region_storage(storage, region).create_presigned_prefix_post(
+            key_prefix=session.key_prefix,
+            user_id=user.id,
+            max_bytes=object_max_bytes,
+            expires_in=seconds,
+        )
+    except Exception as e:
+        logger.error("Upload policy error for %s: %s", session.key_prefix, str(e), exc_info=True)
+        policy = None
+
+    if not policy:
+        session.delete()
+        raise FileUploadError()
+    return PreparedUploadSession(session=session, policy=policy)
+
+
+def close_upload_session(session: UploadSession) -> None:
+    """Stop registering uploads of the session; objects still arriving are rejected."""
+    if session.closed_at is None:
+        session.closed_at = timezone.now()
+        session.save(update_fields=["closed_at", "updated_at"])
+
+
+def build_session_file(session: UploadSession, key: str, name: str, event) -> CloudFile:
+    file_name = posixpath.basename(name)[:255]
+    content_type = event.content_type or mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+    return CloudFile(
+        user=session.user,
+        folder=session.folder,
+        file_name=file_name,
+        path=build_object_path(file_name, session.folder),
+        s3_key=key,
+        key_layout=session.key_layout,
+        region=session.region,
+        bucket_name=get_region_bucket(session.region),
+        size=event.size,
+        content_type=content_type[:50],
+        status=SUCCESS,
+    )
+
+
+def register_session_uploads(storage, events) -> List[FinalizeOutcome]:
+    """
+    Register objects uploaded with a session policy as files. Keys outside
+    any session, and keys already registered at the same size (redelivered
+    events), are skipped; a registered key uploaded again is charged its
+    size difference. Uploads past the session budget or the user's quota,
+    or arriving after the session was closed, are deleted, along with the
+    file they overwrote.
+    """
+    names: Dict[str, Dict[str, tuple]] = defaultdict(dict)
+    for event in events:
+        match = SESSION_KEY_PATTERN.match(event.key)
+        if match:
+            names[match.group(1)][event.key] = (match.group(2), event)
+    if not names:
+        return []
+
+    budget = QuotaBudget()
+    now = timezone.now()
+    rejected = []
+    replaced = []
+    with transaction.atomic():
+        sessions = list(
+            UploadSession.objects.select_for_update(of=("self",))
+            .select_related("user", "folder")
+            .filter(key_prefix__in=names)
+            .order_by("id")
+        )
+        # Read under the session locks, so concurrent redeliveries register a key once
+        keys = [key for session in sessions for key in names[session.key_prefix]]
+        registered = {cloud_file.s3_key: cloud_file for cloud_file in CloudFile.objects.filter(s3_key__in=keys)}
+
+        new_files = []
+        updated_files = []
+        overwritten_ids = []
+        for session in sessions:
+            for key, (name, event) in names[session.key_prefix].items():
+                cloud_file = registered.get(key)
+                if cloud_file is not None and cloud_file.size == event.size:
+                    continue
+
+                growth = event.size - (cloud_file.size if cloud_file is not None else 0)
+                session.updated_at = now
+                if (
+                        session.closed_at is not None
+                        or growth > session.remaining_bytes
+                        or not budget.consume(session.user, max(growth, 0))
+                ):
+                    session.rejected_count += 1
+                    rejected.append((session, key))
+                    if cloud_file is not None:
+                        # The object it pointed at is gone with the rejected upload
+                        session.used_bytes -= cloud_file.size
+                        session.file_count -= 1
+                        overwritten_ids.append(cloud_file.id)
+                        replaced.append(cloud_file)
+                    continue
+
+                session.used_bytes += growth
+                if cloud_file is None:
+                    session.file_count += 1
+                    new_files.append(build_session_file(session, key, name, event))
+                    continue
+
+                replaced.append(copy.copy(cloud_file))
+                cloud_file.size = event.size
+                cloud_file.thumbnails = None
+                cloud_file.updated_at = now
+                updated_files.append(cloud_file)
+
+        CloudFile.objects.bulk_create(new_files)
+        CloudFile.objects.bulk_update(updated_files, ["size", "thumbnails", "updated_at"])
+        CloudFile._base_manager.filter(id__in=overwritten_ids).delete()
+        UploadSession.objects.bulk_update(sessions, ["used_bytes", "file_count", "rejected_count", "updated_at"])
+
+    for session, key in rejected:
+        try:
+            get_region_storage(storage, session.region).delete_file(key)
+        except Exception as e:
+            logger.error(
+                "Failed to delete rejected session upload.",
+                extra={"session_id": session.id, "s3_key": key, "error": str(e)},
+            )
+
+    # Thumbnails and cached copies were made from the overwritten bytes
+    for cloud_file in replaced:
+        discard_cached_object(cloud_file.region, cloud_file.s3_key)
+        try:
+            delete_file_thumbnails(storage, cloud_file)
+        except Exception as e:
+            logger.error(
+                "Failed to delete thumbnails of an overwritten session upload.",
+                extra={"file_id": cloud_file.id, "error": str(e)},
+            )
+
+    outcomes = [
+        FinalizeOutcome(file_id=cloud_file.id, s3_key=cloud_file.s3_key, status=SUCCESS, region=cloud_file.region)
+        for cloud_file in new_files + updated_files
+    ]
+    if outcomes or rejected:
+        logger.info("Registered %s session upload(s), rejected %s.", len(outcomes), len(rejected))
+    return outcomes
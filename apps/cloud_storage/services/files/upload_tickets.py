@@ -0,0 +1,214 @@
+"""
+Stateless upload tickets: presign an upload without writing a row.
+
+The presign response carries a signed ticket with the file's name, folder,
+key and size cap, and the same ticket is stored as metadata on the uploaded
+object. The file is only created when the client finalizes the ticket or the
+object's ObjectCreated event arrives, whichever comes first, so abandoned
+uploads leave nothing in the database.
+"""
+
+import logging
+import mimetypes
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import transaction
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import FileUploadError, StorageQuotaExceeded
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, Folder
+from apps.cloud_storage.services.files.create_presigned_upload import check_presigned_url, get_max_upload_bytes
+from apps.cloud_storage.services.files.finalize_uploads import FinalizeOutcome, QuotaBudget, UploadedObject
+from apps.cloud_storage.utils.hash_utils import generate_unique_hash
+from apps.cloud_storage.utils.path_utils import build_object_path, build_s3_path
+from apps.cloud_storage.utils.region_utils import get_bucket_region, get_region_bucket
+
+logger = logging.getLogger("aerobox")
+
+UPLOAD_TICKET_SALT = "cloud_storage.upload_ticket"
+# Object metadata holding the ticket, read back when the ObjectCreated event arrives
+TICKET_METADATA_KEY = "upload-ticket"
+TICKET_KEY_PATTERN = re.compile(r"/t-[0-9a-f]{64}\.[^/]*$")
+
+
+@dataclass(frozen=True)
+class PreparedUploadTicket:
+    ticket: str
+    presigned_url: dict
+
+
+def sign_upload_ticket(user, key: str, file_name: str, content_type: str, folder, max_bytes: int, region: str) -> str:
+    return signing.dumps(
+        {
+            "user_id": user.id,
+            "key": key,
+            "key_layout": settings.CLOUD_STORAGE_KEY_LAYOUT,
+            "file_name": file_name,
+            "content_type": content_type,
+            "folder_id": folder.id if folder else None,
+            "max_bytes": max_bytes,
+            "region": region,
+        },
+        salt=UPLOAD_TICKET_SALT,
+        compress=True,
+    )
+
+
+def load_upload_ticket(token: str, max_age: Optional[int] = None) -> Optional[dict]:
+    """Return the ticket, or None if it is forged or older than `max_age` seconds."""
+    try:
+        return signing.loads(token, salt=UPLOAD_TICKET_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+
+
+def prepare_ticket_upload(storage, user, file_name, content_type, folder=None, region="") -> PreparedUploadTicket:
+    key = build_s3_path(user_id=user.id, file_name=f"t-{generate_unique_hash(file_name)}")
+    max_bytes = get_max_upload_bytes(user)
+    ticket = sign_upload_ticket(user, key, file_name, content_type, folder, max_bytes, region)
+
+    try:
+        presigned_url = get_region_storage(storage, region).create_presigned_post_url(
+            object_key=key,
+            user_id=user.id,
+            max_bytes=max_bytes,
+            content_type=content_type,
+            metadata={TICKET_METADATA_KEY: ticket},
+        )
+        check_presigned_url(presigned_url)
+    except Exception as e:
+        logger.error(f"File upload error for path {key}: {str(e)}", exc_info=True)
+        raise FileUploadError()
+
+    return PreparedUploadTicket(ticket=ticket, presigned_url=presigned_url)
+
+
+def build_ticket_file(user, ticket: dict, uploaded: UploadedObject, folders: dict) -> CloudFile:
+    # The folder may have been deleted since the ticket was issued
+    folder = folders.get(ticket["folder_id"])
+    content_type = (
+        uploaded.content_type
+        or ticket["content_type"]
+        or mimetypes.guess_type(ticket["file_name"])[0]
+        or "application/octet-stream"
+    )
+    return CloudFile(
+        user=user,
+        folder=folder,
+        file_name=ticket["file_name"],
+        path=build_object_path(ticket["file_name"], folder),
+        s3_key=ticket["key"],
+        key_layout=ticket["key_layout"],
+        region=ticket["region"],
+        bucket_name=get_region_bucket(ticket["region"]),
+        size=uploaded.size,
+        content_type=content_type[:50],
+        status=SUCCESS,
+    )
+
+
+def register_ticket_uploads(storage, uploads: Iterable[Tuple[dict, UploadedObject]]) -> List[FinalizeOutcome]:
+    """
+    Create the files of uploaded tickets. Keys already registered (the
+    client and the event both reporting the upload) are skipped; uploads
+    over the ticket's cap or the user's quota are deleted from storage.
+    """
+    by_user = defaultdict(dict)
+    for ticket, uploaded in uploads:
+        by_user[ticket["user_id"]][ticket["key"]] = (ticket, uploaded)
+    if not by_user:
+        return []
+
+    budget = QuotaBudget()
+    rejected = []
+    new_files = []
+    with transaction.atomic():
+        # Serializes registrations per user, so a key is registered once
+        users = list(get_user_model().objects.select_for_update().filter(id__in=by_user).order_by("id"))
+        keys = [key for user in users for key in by_user[user.id]]
+        registered = set(CloudFile.objects.filter(s3_key__in=keys).values_list("s3_key", flat=True))
+        folder_ids = {ticket["folder_id"] for user in users for ticket, _ in by_user[user.id].values()}
+        folders = {
+            folder.id: folder
+            for folder in Folder.objects.filter(id__in=folder_ids - {None}, user__in=users)
+        }
+
+        for user in users:
+            for key, (ticket, uploaded) in by_user[user.id].items():
+                if key in registered:
+                    continue
+                if uploaded.size > ticket["max_bytes"] or not budget.consume(user, uploaded.size):
+                    rejected.append(ticket)
+                    continue
+                new_files.append(build_ticket_file(user, ticket, uploaded, folders))
+
+        CloudFile.objects.bulk_create(new_files)
+
+    for ticket in rejected:
+        try:
+            get_region_storage(storage, ticket["region"]).delete_file(ticket["key"])
+        except Exception as e:
+            logger.error(
+                "Failed to delete rejected ticket upload.",
+                extra={"s3_key": ticket["key"], "error": str(e)},
+            )
+
+    if new_files or rejected:
+        logger.info("Registered %s ticket upload(s), rejected %s.", len(new_files), len(rejected))
+    return [
+        FinalizeOutcome(file_id=cloud_file.id, s3_key=cloud_file.s3_key, status=SUCCESS, region=cloud_file.region)
+        for cloud_file in new_files
+    ]
+
+
+def finalize_ticket_upload(storage, user, ticket: dict) -> Tuple[CloudFile, bool]:
+    """
+    Create the file of an uploaded ticket for the client. Returns the file
+    and whether it was created by this call rather than by its event.
+    """
+    head = get_region_storage(storage, ticket["region"]).head(ticket["key"])
+    if head is None:
+        raise ObjectNotFoundError()
+
+    outcomes = register_ticket_uploads(
+        storage, [(ticket, UploadedObject(size=head["size"], content_type=head.get("content_type")))]
+    )
+    cloud_file = CloudFile.objects.filter(user=user, s3_key=ticket["key"]).first()
+    if cloud_file is None:
+        raise StorageQuotaExceeded()
+    return cloud_file, bool(outcomes)
+
+
+def register_ticket_events(storage, events) -> List[FinalizeOutcome]:
+    """
+    Register ticket uploads reported by ObjectCreated events. The ticket is
+    read back from the object's metadata, so only keys of ticket uploads
+    that are not registered yet cost a HEAD request.
+    """
+    events_by_key = {event.key: event for event in events if TICKET_KEY_PATTERN.search(event.key)}
+    if not events_by_key:
+        return []
+
+    registered = set(CloudFile.objects.filter(s3_key__in=events_by_key).values_list("s3_key", flat=True))
+    uploads = []
+    for key, event in events_by_key.items():
+        if key in registered:
+            continue
+
+        head = get_region_storage(storage, get_bucket_region(event.bucket)).head(key)
+        # The presigned POST already bounded when the upload could happen
+        ticket = load_upload_ticket(((head or {}).get("metadata") or {}).get(TICKET_METADATA_KEY, ""))
+        if ticket is None or ticket["key"] != key:
+            logger.warning("Skipping ticket upload without a valid ticket.", extra={"s3_key": key})
+            continue
+        uploads.append((ticket, UploadedObject(size=event.size, content_type=event.content_type)))
+
+    return register_ticket_uploads(storage, uploads)
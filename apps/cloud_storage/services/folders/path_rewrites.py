@@ -0,0 +1,72 @@
+import time
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+
+from apps.cloud_storage.models import Folder
+from apps.cloud_storage.utils.task_utils import cache_lock
+
+PENDING_KEY = "folder-path-rewrites:{}:pending"
+LAST_REQUEST_KEY = "folder-path-rewrites:{}:last-request"
+LOCK_KEY = "folder-path-rewrites:{}"
+
+# Pending state outlives any sensible debounce window, but not forever
+STATE_TIMEOUT = 60 * 60
+
+
+def queue_folder_path_rewrite(user_id: int, folder_id: int) -> bool:
+    """
+    Add a folder to the user's pending path rewrites and restart the quiet
+    period. Returns False if the pending set could not be updated, in which
+    case the caller should rewrite the folder right away.
+    """
+    with cache_lock(LOCK_KEY.format(user_id)) as acquired:
+        if not acquired:
+            return False
+
+        pending = cache.get(PENDING_KEY.format(user_id)) or set()
+        pending.add(folder_id)
+        cache.set(PENDING_KEY.format(user_id), pending, STATE_TIMEOUT)
+        cache.set(LAST_REQUEST_KEY.format(user_id), time.time(), STATE_TIMEOUT)
+        return True
+
+
+def seconds_since_last_rewrite_request(user_id: int) -> Optional[float]:
+    last_request = cache.get(LAST_REQUEST_KEY.format(user_id))
+    if last_request is None:
+        return None
+    return time.time() - last_request
+
+
+def take_pending_folder_path_rewrites(user_id: int) -> Optional[set]:
+    """
+    Pop the user's pending folder ids. Returns None if the lock is busy,
+    meaning a request is being queued and a later flush will pick it up.
+    """
+    with cache_lock(LOCK_KEY.format(user_id)) as acquired:
+        if not acquired:
+            return None
+
+        pending = cache.get(PENDING_KEY.format(user_id)) or set()
+        cache.delete_many([PENDING_KEY.format(user_id), LAST_REQUEST_KEY.format(user_id)])
+        return pending
+
+
+def get_subtree_roots(user_id: int, folder_ids: Iterable[int]) -> List[int]:
+    """
+    Drop every folder that sits below another requested folder, as rewriting
+    the ancestor already covers it. Uses the tree as it is now, so folders
+    moved several times are placed where they ended up.
+    """
+    parents = dict(Folder.objects.filter(user_id=user_id).values_list("id", "parent_id"))
+    requested = {folder_id for folder_id in folder_ids if folder_id in parents}
+
+    roots = []
+    for folder_id in requested:
+        parent_id = parents[folder_id]
+        while parent_id is not None and parent_id not in requested:
+            parent_id = parents.get(parent_id)
+        if parent_id is None:
+            roots.append(folder_id)
+
+    return sorted(roots)
@@ -1,16 +1,16 @@
 from typing import Tuple
 
-from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.integrations.backends import get_region_storage, get_storage
 
 
 class CloudFileSyncService:
 
     def __init__(self):
-        self.storage = S3StorageClient()
+        self.storage = get_storage()
 
     def sync(self, cloud_file) -> Tuple:
         """Fetch S3 metadata and update the CloudFile instance."""
-        s3_meta = self.storage.head(cloud_file.s3_key)
+        s3_meta = get_region_storage(self.storage, cloud_file.region).head(cloud_file.s3_key)
 
         if not s3_meta:
             return None, None
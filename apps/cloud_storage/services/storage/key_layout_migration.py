@@ -0,0 +1,153 @@
+"""
+Moves stored objects to the key layout configured for new uploads.
+
+Objects are copied server-side, the row is repointed only if its key did
+not change meanwhile, and the old object is deleted last; a crash between
+steps leaves at most an orphan copy, never a row pointing at nothing.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from apps.cloud_storage.choices.storage_class_choices import StorageClass
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.thumbnails import delete_file_thumbnails
+from apps.cloud_storage.utils.path_utils import build_s3_path, get_s3_file_name
+
+logger = logging.getLogger("aerobox")
+
+
+@dataclass(frozen=True)
+class KeyLayoutBatch:
+    last_id: int
+    scanned: int
+    moved: int
+
+    @property
+    def done(self) -> bool:
+        return self.last_id is None
+
+
+def get_files_to_migrate(layout):
+    """Uploaded files with their own object under an older layout."""
+    return (
+        CloudFile.objects.filter(status=SUCCESS, user__isnull=False, content_object__isnull=True)
+        .exclude(key_layout=layout)
+        # Copies land in STANDARD; archived objects cannot even be copied
+        .filter(storage_class=StorageClass.STANDARD)
+        # Chunked files only have an object of their own once materialized
+        .filter(Q(manifest__isnull=True) | Q(manifest__materialized_at__isnull=False))
+    )
+
+
+def get_content_objects_to_migrate(layout):
+    return ContentObject.objects.filter(status=SUCCESS).exclude(key_layout=layout)
+
+
+def move_object(storage, old_key, new_key, repoint) -> bool:
+    """
+    Copy `old_key` to `new_key`, run `repoint()` and delete the old object.
+    `repoint` returns False when the row changed meanwhile; the copy is then dropped.
+    """
+    try:
+        storage.copy(old_key, new_key)
+    except ObjectNotFoundError:
+        logger.warning("Object missing, key layout not migrated.", extra={"s3_key": old_key})
+        return False
+
+    with transaction.atomic():
+        repointed = repoint()
+
+    if not repointed:
+        storage.delete_file(object_name=new_key)
+        return False
+
+    storage.delete_file(object_name=old_key)
+    return True
+
+
+def migrate_files_batch(storage, after_id=0, batch_size=None, layout=None) -> KeyLayoutBatch:
+    layout = layout or settings.CLOUD_STORAGE_KEY_LAYOUT
+    batch_size = batch_size or settings.CLOUD_STORAGE_KEY_LAYOUT_BATCH_SIZE
+
+    files = list(
+        get_files_to_migrate(layout)
+        .filter(id__gt=after_id)
+        .order_by("id")
+        .only("id", "user_id", "s3_key", "key_layout", "region", "thumbnails")[:batch_size]
+    )
+
+    moved = 0
+    for cloud_file in files:
+        file_name = get_s3_file_name(cloud_file.s3_key, cloud_file.user_id, cloud_file.key_layout)
+        new_key = build_s3_path(cloud_file.user_id, file_name, layout)
+
+        def repoint():
+            return CloudFile.objects.filter(
+                id=cloud_file.id, s3_key=cloud_file.s3_key, region=cloud_file.region
+            ).update(s3_key=new_key, key_layout=layout, thumbnails=None) == 1
+
+        region_storage = get_region_storage(storage, cloud_file.region)
+        if move_object(region_storage, cloud_file.s3_key, new_key, repoint):
+            # Thumbnails live next to the old key; they are rendered again by the backfill
+            delete_file_thumbnails(region_storage, cloud_file)
+            moved += 1
+
+    return KeyLayoutBatch(
+        last_id=files[-1].id if len(files) == batch_size else None,
+        scanned=len(files),
+        moved=moved,
+    )
+
+
+def migrate_content_objects_batch(storage, after_id=0, batch_size=None, layout=None) -> KeyLayoutBatch:
+    layout = layout or settings.CLOUD_STORAGE_KEY_LAYOUT
+    batch_size = batch_size or settings.CLOUD_STORAGE_KEY_LAYOUT_BATCH_SIZE
+
+    contents = list(
+        get_content_objects_to_migrate(layout)
+        .filter(id__gt=after_id)
+        .order_by("id")[:batch_size]
+    )
+
+    moved = 0
+    for content in contents:
+        file_name = get_s3_file_name(content.s3_key, content.user_id, content.key_layout)
+        new_key = build_s3_path(content.user_id, file_name, layout)
+        rendered = []
+
+        def repoint():
+            locked = (
+                ContentObject.objects.select_for_update()
+                .filter(id=content.id, s3_key=content.s3_key, region=content.region)
+                .first()
+            )
+            if locked is None:
+                return False
+            locked.s3_key = new_key
+            locked.key_layout = layout
+            locked.save(update_fields=["s3_key", "key_layout", "updated_at"])
+            files = CloudFile.objects.filter(content_object=locked)
+            rendered[:] = files.filter(thumbnails__isnull=False).only("id", "s3_key", "region", "thumbnails")
+            files.update(s3_key=new_key, key_layout=layout, thumbnails=None)
+            return True
+
+        region_storage = get_region_storage(storage, content.region)
+        if move_object(region_storage, content.s3_key, new_key, repoint):
+            # Thumbnails live next to the old key; they are rendered again by the backfill
+            for cloud_file in rendered:
+                delete_file_thumbnails(region_storage, cloud_file)
+            moved += 1
+
+    return KeyLayoutBatch(
+        last_id=contents[-1].id if len(contents) == batch_size else None,
+        scanned=len(contents),
+        moved=moved,
+    )
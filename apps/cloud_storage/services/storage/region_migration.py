@@ -0,0 +1,197 @@
+"""
+Moves a user's stored objects to another region.
+
+Objects keep their key. Each one is streamed into the target bucket, the
+row is repointed only if its key and region did not change meanwhile, and
+the source object is deleted last; a crash between steps leaves at most an
+orphan copy, never a row pointing at nothing.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from apps.cloud_storage.choices.storage_class_choices import StorageClass
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.thumbnails import delete_file_thumbnails
+from apps.cloud_storage.utils.region_utils import (
+    get_default_region,
+    get_region_aliases,
+    get_region_bucket,
+    is_default_region,
+    is_storage_region,
+)
+
+logger = logging.getLogger("aerobox")
+
+
+@dataclass(frozen=True)
+class RegionMoveBatch:
+    last_id: int
+    scanned: int
+    moved: int
+
+    @property
+    def done(self) -> bool:
+        return self.last_id is None
+
+
+def get_region_fields(region: str) -> dict:
+    region = get_default_region() if is_default_region(region) else region
+    return {"region": region, "bucket_name": get_region_bucket(region)}
+
+
+def start_user_region_move(user_id: int, region: str) -> int:
+    """
+    Send the user's new uploads to `region` and repoint the chunked files
+    that have no object of their own yet. Returns the number of those files.
+    """
+    if not is_storage_region(region):
+        raise ValueError(f"Unknown storage region '{region}'.")
+
+    get_user_model().objects.filter(id=user_id).update(storage_region=get_region_fields(region)["region"])
+    return (
+        CloudFile.objects.filter(user_id=user_id, manifest__isnull=False, manifest__materialized_at__isnull=True)
+        .exclude(region__in=get_region_aliases(region))
+        .update(**get_region_fields(region))
+    )
+
+
+def get_user_files_to_move(user_id: int, region: str):
+    """The user's uploaded files with their own object outside `region`."""
+    return (
+        CloudFile.objects.filter(user_id=user_id, status=SUCCESS, content_object__isnull=True)
+        .exclude(region__in=get_region_aliases(region))
+        # Archived objects cannot be read without a restore
+        .filter(storage_class=StorageClass.STANDARD)
+        .filter(Q(manifest__isnull=True) | Q(manifest__materialized_at__isnull=False))
+    )
+
+
+def get_user_content_objects_to_move(user_id: int, region: str):
+    return ContentObject.objects.filter(user_id=user_id, status=SUCCESS).exclude(
+        region__in=get_region_aliases(region)
+    )
+
+
+def copy_between_regions(source, target, key: str) -> None:
+    head = source.head(key)
+    if head is None:
+        raise ObjectNotFoundError()
+
+    body = source.open(key)
+    try:
+        target.save(
+            key,
+            body,
+            content_type=head.get("content_type"),
+            metadata=head.get("metadata"),
+            content_encoding=head.get("content_encoding"),
+        )
+    finally:
+        body.close()
+
+
+def move_object_to_region(storage, key, source_region, target_region, repoint) -> bool:
+    """
+    Copy `key` from `source_region` to `target_region`, run `repoint()` and
+    delete the source object. `repoint` returns False when the row changed
+    meanwhile; the copy is then dropped.
+    """
+    source = get_region_storage(storage, source_region)
+    target = get_region_storage(storage, target_region)
+    try:
+        copy_between_regions(source, target, key)
+    except ObjectNotFoundError:
+        logger.warning("Object missing, not moved to region.", extra={"s3_key": key, "region": target_region})
+        return False
+
+    with transaction.atomic():
+        repointed = repoint()
+
+    if not repointed:
+        target.delete_file(object_name=key)
+        return False
+
+    source.delete_file(object_name=key)
+    return True
+
+
+def move_user_files_batch(storage, user_id, region, after_id=0, batch_size=None) -> RegionMoveBatch:
+    batch_size = batch_size or settings.CLOUD_STORAGE_REGION_MOVE_BATCH_SIZE
+    fields = get_region_fields(region)
+
+    files = list(
+        get_user_files_to_move(user_id, region)
+        .filter(id__gt=after_id)
+        .order_by("id")
+        .only("id", "s3_key", "region", "thumbnails")[:batch_size]
+    )
+
+    moved = 0
+    for cloud_file in files:
+        def repoint():
+            return CloudFile.objects.filter(
+                id=cloud_file.id, s3_key=cloud_file.s3_key, region=cloud_file.region
+            ).update(**fields, thumbnails=None) == 1
+
+        if move_object_to_region(storage, cloud_file.s3_key, cloud_file.region, fields["region"], repoint):
+            # Thumbnails stay in the old region; they are rendered again by the backfill
+            delete_file_thumbnails(storage, cloud_file)
+            moved += 1
+
+    return RegionMoveBatch(
+        last_id=files[-1].id if len(files) == batch_size else None,
+        scanned=len(files),
+        moved=moved,
+    )
+
+
+def move_user_content_objects_batch(storage, user_id, region, after_id=0, batch_size=None) -> RegionMoveBatch:
+    batch_size = batch_size or settings.CLOUD_STORAGE_REGION_MOVE_BATCH_SIZE
+    fields = get_region_fields(region)
+
+    contents = list(
+        get_user_content_objects_to_move(user_id, region)
+        .filter(id__gt=after_id)
+        .order_by("id")[:batch_size]
+    )
+
+    moved = 0
+    for content in contents:
+        rendered = []
+
+        def repoint():
+            locked = (
+                ContentObject.objects.select_for_update()
+                .filter(id=content.id, s3_key=content.s3_key, region=content.region)
+                .first()
+            )
+            if locked is None:
+                return False
+            locked.region = fields["region"]
+            locked.bucket_name = fields["bucket_name"]
+            locked.save(update_fields=["region", "bucket_name", "updated_at"])
+            files = CloudFile.objects.filter(content_object=locked)
+            rendered[:] = files.filter(thumbnails__isnull=False).only("id", "s3_key", "region", "thumbnails")
+            files.update(**fields, thumbnails=None)
+            return True
+
+        if move_object_to_region(storage, content.s3_key, content.region, fields["region"], repoint):
+            # Thumbnails stay in the old region; they are rendered again by the backfill
+            for cloud_file in rendered:
+                delete_file_thumbnails(storage, cloud_file)
+            moved += 1
+
+    return RegionMoveBatch(
+        last_id=contents[-1].id if len(contents) == batch_size else None,
+        scanned=len(contents),
+        moved=moved,
+    )
@@ -0,0 +1,109 @@
+"""
+Access-recency storage tiering.
+
+Files a user has not downloaded for longer than their plan's
+`cold_storage_after_days` move to CLOUD_STORAGE_COLD_STORAGE_CLASS.
+Shared objects (deduplicated files and chunks) are never tiered: one
+reader's recency says nothing about the other references.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import DateTimeField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.cloud_storage.choices.storage_class_choices import (
+    RESTORE_REQUIRED_STORAGE_CLASSES,
+    StorageClass,
+)
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import StorageError, StorageUnavailableError
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.models import CloudFile
+from apps.subscriptions.choices.subscription_choices import SubscriptionStatusChoices
+from apps.subscriptions.models import Plan
+
+logger = logging.getLogger("aerobox")
+
+
+def get_tierable_files(plan, idle_since):
+    return (
+        CloudFile.not_deleted.filter(
+            status=SUCCESS,
+            storage_class=StorageClass.STANDARD,
+            content_object__isnull=True,
+            manifest__isnull=True,
+            size__gte=settings.CLOUD_STORAGE_COLD_MIN_BYTES,
+            user__subscriptions__plan=plan,
+            user__subscriptions__status=SubscriptionStatusChoices.ACTIVE.value,
+        )
+        .annotate(last_used_at=Coalesce("last_accessed_at", "created_at", output_field=DateTimeField()))
+        .filter(last_used_at__lt=idle_since)
+        .distinct()
+    )
+
+
+def set_file_storage_class(storage, cloud_file, storage_class) -> bool:
+    """Move the object and record it; False if the object could not be moved."""
+    try:
+        get_region_storage(storage, cloud_file.region).set_storage_class(cloud_file.s3_key, storage_class)
+    except StorageUnavailableError:
+        raise
+    except StorageError as e:
+        logger.error(
+            "Failed to change storage class.",
+            extra={"file_id": cloud_file.id, "storage_class": storage_class, "error": str(e)},
+        )
+        return False
+
+    is_cold = storage_class != StorageClass.STANDARD
+    CloudFile.objects.filter(id=cloud_file.id, s3_key=cloud_file.s3_key).update(
+        storage_class=storage_class,
+        tiered_at=timezone.now() if is_cold else None,
+        restore_requested_at=None,
+    )
+    return True
+
+
+def tier_cold_files(storage, batch_size=None) -> int:
+    """Move idle files of every plan with a threshold to the cold class."""
+    batch_size = batch_size or settings.CLOUD_STORAGE_TIERING_BATCH_SIZE
+    cold_class = settings.CLOUD_STORAGE_COLD_STORAGE_CLASS
+
+    moved = 0
+    for plan in Plan.objects.all():
+        days = plan.cold_storage_after_days
+        if days is None:
+            continue
+
+        files = get_tierable_files(plan, timezone.now() - timedelta(days=days))
+        after_id = 0
+        while batch := list(files.filter(id__gt=after_id).order_by("id").only("id", "s3_key", "region")[:batch_size]):
+            for cloud_file in batch:
+                moved += set_file_storage_class(storage, cloud_file, cold_class)
+            after_id = batch[-1].id
+
+    logger.info("Moved %s idle file(s) to %s.", moved, cold_class)
+    return moved
+
+
+def complete_file_restores(storage) -> int:
+    """
+    Move restored archived files back to the standard class; they were
+    just downloaded, so they are hot again.
+    """
+    completed = 0
+    for cloud_file in CloudFile.objects.filter(restore_requested_at__isnull=False).only("id", "s3_key", "region"):
+        head = get_region_storage(storage, cloud_file.region).head(cloud_file.s3_key)
+        if head is None:
+            CloudFile.objects.filter(id=cloud_file.id).update(restore_requested_at=None)
+            continue
+        if head.get("storage_class") in RESTORE_REQUIRED_STORAGE_CLASSES and not head.get("restore_ready"):
+            continue
+
+        completed += set_file_storage_class(storage, cloud_file, StorageClass.STANDARD)
+
+    return completed
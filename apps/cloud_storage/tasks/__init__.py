@@ -1 +1,11 @@
+from . import archive_exports
+from . import chunked_files
+from . import compression
 from . import delete_files
+from . import file_copies
+from . import finalize_uploads
+from . import key_layout
+from . import media_metadata
+from . import region_migration
+from . import storage_tiering
+from . import thumbnails
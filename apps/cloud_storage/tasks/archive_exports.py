@@ -0,0 +1,84 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from apps.cloud_storage.choices.archive_export_choices import ArchiveExportStatus
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.models import ArchiveExport
+from apps.cloud_storage.services.accounts.archive_export import (
+    ArchiveExportSuperseded,
+    delete_expired_archive_exports,
+    fail_archive_export,
+    run_archive_export,
+)
+from apps.cloud_storage.utils.task_utils import single_flight
+
+logger = logging.getLogger("aerobox")
+
+
+@shared_task(bind=True, acks_late=True, max_retries=5)
+def process_archive_export(self, export_id):
+    """
+    Write an account archive a few parts at a time, re-enqueueing itself
+    until done. The writer checkpoints after each part, so a lost worker
+    only costs the part in flight.
+    """
+    export = ArchiveExport.objects.select_related("user").filter(id=export_id).first()
+    if not export or export.is_finished:
+        return None
+
+    storage = get_storage()
+    try:
+        finished = run_archive_export(
+            export,
+            storage=storage,
+            max_parts=settings.CLOUD_STORAGE_ARCHIVE_EXPORT_PARTS_PER_TASK,
+        )
+    except ArchiveExportSuperseded:
+        # A duplicate delivery is writing the same export
+        return None
+    except Exception as exc:
+        logger.exception("Archive export step failed.", extra={"export_id": export_id})
+        if self.request.retries >= self.max_retries:
+            fail_archive_export(export, storage, str(exc))
+            return None
+        export.error_message = str(exc)
+        export.save(update_fields=["error_message", "updated_at"])
+        raise self.retry(exc=exc, countdown=60)
+
+    logger.info(
+        "Archive export progress for user_id=%s: files=%s/%s bytes=%s/%s parts=%s.",
+        export.user_id,
+        export.exported_files,
+        export.total_files,
+        export.exported_bytes,
+        export.total_bytes,
+        export.parts_uploaded,
+    )
+
+    if not finished:
+        process_archive_export.delay(export_id)
+
+    return finished
+
+
+@shared_task
+def resume_archive_exports():
+    """Re-enqueue exports whose worker went away without finishing."""
+    stale_before = timezone.now() - timedelta(minutes=settings.CLOUD_STORAGE_ARCHIVE_EXPORT_STALE_MINUTES)
+    export_ids = ArchiveExport.objects.filter(
+        status__in=[ArchiveExportStatus.PENDING.value, ArchiveExportStatus.RUNNING.value],
+        updated_at__lt=stale_before,
+    ).values_list("id", flat=True)
+
+    for export_id in export_ids:
+        process_archive_export.delay(export_id)
+
+
+@shared_task(bind=True)
+@single_flight(lambda: "delete-expired-archive-exports")
+def delete_expired_archive_exports_task(self):
+    return delete_expired_archive_exports(get_storage())
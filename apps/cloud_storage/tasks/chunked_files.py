@@ -0,0 +1,28 @@
+import logging
+
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.chunked_uploads import materialize_chunked_file
+from apps.cloud_storage.tasks.media_metadata import extract_metadata_task
+
+logger = logging.getLogger("aerobox")
+
+
+@shared_task
+def materialize_chunked_file_task(file_id):
+    cloud_file = (
+        CloudFile.not_deleted.select_related("manifest")
+        .filter(id=file_id, manifest__isnull=False)
+        .first()
+    )
+    if cloud_file is None:
+        logger.info("Chunked file %s no longer exists, nothing to materialize.", file_id)
+        return False
+
+    materialized = materialize_chunked_file(get_storage(), cloud_file)
+    if materialized:
+        # Metadata is read from the assembled object
+        extract_metadata_task.delay([file_id])
+    return materialized
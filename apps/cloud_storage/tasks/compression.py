@@ -0,0 +1,32 @@
+import logging
+
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.files.compression import (
+    compress_files,
+    compress_files_batch,
+    get_compression_candidates,
+)
+
+logger = logging.getLogger("aerobox")
+
+
+@shared_task
+def compress_files_task(file_ids):
+    return compress_files(get_storage(), get_compression_candidates().filter(id__in=file_ids))
+
+
+@shared_task
+def backfill_compression_task(after_id=0, batch_size=None):
+    """Compress one batch of existing files, then enqueue the next batch."""
+    batch = compress_files_batch(get_storage(), after_id=after_id, batch_size=batch_size)
+    logger.info(
+        "Compression backfill after id %s: compressed %s of %s.",
+        after_id, batch.compressed, batch.scanned,
+    )
+
+    if not batch.done:
+        backfill_compression_task.delay(batch.last_id, batch_size)
+
+    return batch.compressed
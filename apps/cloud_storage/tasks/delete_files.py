@@ -2,17 +2,30 @@ import logging
 
 from celery import shared_task, group
 
-from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.integrations.backends import get_storage
 from apps.cloud_storage.services.files.delete_file import permanently_delete_user_files
+from apps.cloud_storage.utils.task_utils import single_flight
 from apps.subscriptions.choices.subscription_choices import SubscriptionStatusChoices
 from apps.subscriptions.models import Subscription
 
 logger = logging.getLogger("aerobox")
 
 
-@shared_task
-def clear_all_deleted_files_from_user(user_id, older_than_days=None):
-    storage = S3StorageClient()
+def get_purge_days(call):
+    args, kwargs = call["args"], call["kwargs"]
+    return args[1] if len(args) > 1 else kwargs.get("older_than_days")
+
+
+def widest_purge(pending, new):
+    """The purge covering more files: a full one (None), else the one with fewer days."""
+    return min((pending, new), key=lambda call: -1 if get_purge_days(call) is None else get_purge_days(call))
+
+
+@shared_task(bind=True)
+# Keyed on the user only: a full purge and a retention purge walk the same rows
+@single_flight(lambda user_id, older_than_days=None: f"purge-user:{user_id}", merge=widest_purge)
+def clear_all_deleted_files_from_user(self, user_id, older_than_days=None):
+    storage = get_storage()
     permanently_delete_user_files(
         storage=storage,
         user_id=user_id,
@@ -0,0 +1,66 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from apps.cloud_storage.constants.cloud_files import FAILED
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.models import Folder
+from apps.cloud_storage.services.files.copy_files import (
+    CopyResult,
+    get_copyable_files,
+    plan_file_copy,
+    plan_folder_copy,
+    run_copy_job,
+    update_copy_job,
+)
+from apps.cloud_storage.tasks.chunked_files import materialize_chunked_file_task
+from apps.cloud_storage.tasks.file_processing import schedule_file_processing
+
+logger = logging.getLogger("aerobox")
+
+
+def schedule_copy_materialization(result: CopyResult) -> None:
+    """Assemble the chunked copies whose source had no assembled object either."""
+    if settings.CLOUD_STORAGE_CHUNKED_MATERIALIZE:
+        for file_id in result.unmaterialized_file_ids:
+            materialize_chunked_file_task.delay(file_id)
+
+
+def run_copy_task(job_id, build_plan) -> int:
+    try:
+        plan = build_plan()
+    except Exception as e:
+        update_copy_job(job_id, status=FAILED, error=str(e))
+        raise
+
+    result = run_copy_job(get_storage(), job_id, plan)
+    schedule_copy_materialization(result)
+    schedule_file_processing([cloud_file.id for cloud_file in result.files])
+    logger.info(
+        "Copy job %s for user_id=%s: %s files copied, %s skipped.",
+        job_id, plan.user.id, len(result.files), len(result.skipped_file_ids),
+    )
+    return len(result.files)
+
+
+@shared_task
+def copy_files_task(job_id, user_id, file_ids, target_folder_id=None):
+    def build_plan():
+        user = get_user_model().objects.get(id=user_id)
+        target_folder = Folder.objects.get(id=target_folder_id, user=user) if target_folder_id else None
+        return plan_file_copy(user, get_copyable_files(user).filter(id__in=file_ids), target_folder)
+
+    return run_copy_task(job_id, build_plan)
+
+
+@shared_task
+def copy_folder_task(job_id, user_id, folder_id, parent_id=None, name=None):
+    def build_plan():
+        user = get_user_model().objects.get(id=user_id)
+        folder = Folder.objects.get(id=folder_id, user=user)
+        parent = Folder.objects.get(id=parent_id, user=user) if parent_id else None
+        return plan_folder_copy(user, folder, parent, name)
+
+    return run_copy_task(job_id, build_plan)
@@ -1,9 +1,61 @@
+import logging
+
 from celery import shared_task
+from django.conf import settings
 
 from apps.cloud_storage.models import Folder
+from apps.cloud_storage.services.folders.path_rewrites import (
+    get_subtree_roots,
+    queue_folder_path_rewrite,
+    seconds_since_last_rewrite_request,
+    take_pending_folder_path_rewrites,
+)
+from apps.cloud_storage.utils.task_utils import single_flight
 
+logger = logging.getLogger("aerobox")
 
-@shared_task
-def update_folder_file_paths_task(folder_id, batch_size=1000):
+
+@shared_task(bind=True)
+@single_flight(lambda folder_id, batch_size=1000: f"folder-paths:{folder_id}")
+def update_folder_file_paths_task(self, folder_id, batch_size=1000):
     folder = Folder.objects.get(id=folder_id)
     folder.update_file_paths(batch_size=batch_size)
+
+
+@shared_task
+def flush_folder_path_rewrites_task(user_id):
+    """
+    Rewrite file paths for the folders a user renamed or moved, once they
+    have stopped reorganizing for CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS.
+    Nested requests collapse to their top-most folder.
+    """
+    elapsed = seconds_since_last_rewrite_request(user_id)
+    if elapsed is not None and elapsed < settings.CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS:
+        # A newer request scheduled its own flush
+        return
+
+    folder_ids = take_pending_folder_path_rewrites(user_id)
+    if not folder_ids:
+        return
+
+    root_ids = get_subtree_roots(user_id, folder_ids)
+    logger.info(
+        "Flushing folder path rewrites: %s requested, %s subtree(s) to rewrite.",
+        len(folder_ids),
+        len(root_ids),
+        extra={"user_id": user_id},
+    )
+    for folder_id in root_ids:
+        update_folder_file_paths_task.delay(folder_id)
+
+
+def schedule_folder_path_rewrite(folder):
+    """Debounced entry point for rewriting paths after a rename or move."""
+    if not queue_folder_path_rewrite(folder.user_id, folder.id):
+        update_folder_file_paths_task.delay(folder.id)
+        return
+
+    flush_folder_path_rewrites_task.apply_async(
+        args=(folder.user_id,),
+        countdown=settings.CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS,
+    )
@@ -0,0 +1,23 @@
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.tasks.compression import compress_files_task
+from apps.cloud_storage.tasks.media_metadata import extract_metadata_task
+from apps.cloud_storage.tasks.thumbnails import generate_thumbnails_task
+
+
+def schedule_file_processing(file_ids: Iterable[int]) -> None:
+    """Render thumbnails, read media metadata and compress new files once the transaction commits."""
+    file_ids = list(file_ids)
+    if file_ids:
+        transaction.on_commit(lambda: generate_thumbnails_task.delay(file_ids))
+        transaction.on_commit(lambda: extract_metadata_task.delay(file_ids))
+        if settings.CLOUD_STORAGE_COMPRESSION:
+            transaction.on_commit(lambda: compress_files_task.delay(file_ids))
+
+
+def schedule_outcome_processing(outcomes) -> None:
+    schedule_file_processing(outcome.file_id for outcome in outcomes if outcome.status == SUCCESS)
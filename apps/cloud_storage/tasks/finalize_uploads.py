@@ -0,0 +1,23 @@
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.integrations.s3.events import parse_s3_object_created_events
+from apps.cloud_storage.services.files.finalize_uploads import finalize_uploads_from_events
+from apps.cloud_storage.services.files.upload_sessions import register_session_uploads
+from apps.cloud_storage.services.files.upload_tickets import register_ticket_events
+from apps.cloud_storage.tasks.file_processing import schedule_outcome_processing
+
+
+@shared_task
+def finalize_uploads_from_s3_events_task(payload):
+    events = parse_s3_object_created_events(payload)
+    if not events:
+        return 0
+
+    storage = get_storage()
+    outcomes = finalize_uploads_from_events(storage=storage, events=events)
+    # Objects uploaded with a session policy or a ticket have no PENDING file to finalize
+    outcomes += register_session_uploads(storage, events)
+    outcomes += register_ticket_events(storage, events)
+    schedule_outcome_processing(outcomes)
+    return len(outcomes)
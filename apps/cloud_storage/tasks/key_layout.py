@@ -0,0 +1,39 @@
+import logging
+
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.storage.key_layout_migration import (
+    migrate_content_objects_batch,
+    migrate_files_batch,
+)
+
+logger = logging.getLogger("aerobox")
+
+FILES = "files"
+CONTENT_OBJECTS = "content_objects"
+
+MIGRATE_BATCH = {
+    FILES: migrate_files_batch,
+    CONTENT_OBJECTS: migrate_content_objects_batch,
+}
+
+
+@shared_task
+def migrate_key_layout_task(kind=FILES, after_id=0, batch_size=None):
+    """
+    Move one batch of objects to the current key layout, then enqueue the
+    next batch; files first, then content objects.
+    """
+    batch = MIGRATE_BATCH[kind](get_storage(), after_id=after_id, batch_size=batch_size)
+    logger.info(
+        "Key layout migration of %s after id %s: moved %s of %s.",
+        kind, after_id, batch.moved, batch.scanned,
+    )
+
+    if not batch.done:
+        migrate_key_layout_task.delay(kind, batch.last_id, batch_size)
+    elif kind == FILES:
+        migrate_key_layout_task.delay(CONTENT_OBJECTS, 0, batch_size)
+
+    return batch.moved
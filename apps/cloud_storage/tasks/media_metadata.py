@@ -0,0 +1,32 @@
+import logging
+
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.files.media_metadata import (
+    extract_metadata,
+    extract_metadata_batch,
+    get_metadata_candidates,
+)
+
+logger = logging.getLogger("aerobox")
+
+
+@shared_task
+def extract_metadata_task(file_ids):
+    return extract_metadata(get_storage(), get_metadata_candidates().filter(id__in=file_ids))
+
+
+@shared_task
+def backfill_metadata_task(after_id=0, batch_size=None):
+    """Read media metadata for one batch of existing files, then enqueue the next batch."""
+    batch = extract_metadata_batch(get_storage(), after_id=after_id, batch_size=batch_size)
+    logger.info(
+        "Metadata backfill after id %s: extracted %s of %s.",
+        after_id, batch.extracted, batch.scanned,
+    )
+
+    if not batch.done:
+        backfill_metadata_task.delay(batch.last_id, batch_size)
+
+    return batch.extracted
@@ -0,0 +1,39 @@
+import logging
+
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.storage.region_migration import (
+    move_user_content_objects_batch,
+    move_user_files_batch,
+)
+
+logger = logging.getLogger("aerobox")
+
+FILES = "files"
+CONTENT_OBJECTS = "content_objects"
+
+MOVE_BATCH = {
+    FILES: move_user_files_batch,
+    CONTENT_OBJECTS: move_user_content_objects_batch,
+}
+
+
+@shared_task
+def move_user_region_task(user_id, region, kind=FILES, after_id=0, batch_size=None):
+    """
+    Move one batch of the user's objects to `region`, then enqueue the next
+    batch; files first, then content objects.
+    """
+    batch = MOVE_BATCH[kind](get_storage(), user_id, region, after_id=after_id, batch_size=batch_size)
+    logger.info(
+        "Region move of %s for user_id=%s to %s after id %s: moved %s of %s.",
+        kind, user_id, region, after_id, batch.moved, batch.scanned,
+    )
+
+    if not batch.done:
+        move_user_region_task.delay(user_id, region, kind, batch.last_id, batch_size)
+    elif kind == FILES:
+        move_user_region_task.delay(user_id, region, CONTENT_OBJECTS, 0, batch_size)
+
+    return batch.moved
@@ -0,0 +1,20 @@
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.storage.storage_tiering import (
+    complete_file_restores,
+    tier_cold_files,
+)
+from apps.cloud_storage.utils.task_utils import single_flight
+
+
+@shared_task(bind=True)
+@single_flight(lambda: "tier-cold-files")
+def tier_cold_files_task(self):
+    return tier_cold_files(get_storage())
+
+
+@shared_task(bind=True)
+@single_flight(lambda: "complete-file-restores")
+def complete_file_restores_task(self):
+    return complete_file_restores(get_storage())
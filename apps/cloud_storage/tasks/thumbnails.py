@@ -0,0 +1,34 @@
+import logging
+
+from celery import shared_task
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.services.files.thumbnails import (
+    generate_thumbnails,
+    generate_thumbnails_batch,
+    get_thumbnail_candidates,
+)
+
+logger = logging.getLogger("aerobox")
+
+
+@shared_task
+def generate_thumbnails_task(file_ids):
+    files = get_thumbnail_candidates().select_related("user").filter(id__in=file_ids)
+    return generate_thumbnails(get_storage(), files)
+
+
+@shared_task
+def backfill_thumbnails_task(after_id=0, batch_size=None):
+    """Render thumbnails for one batch of existing images, then enqueue the next batch."""
+    batch = generate_thumbnails_batch(get_storage(), after_id=after_id, batch_size=batch_size)
+    logger.info(
+        "Thumbnail backfill after id %s: rendered %s of %s.",
+        after_id, batch.rendered, batch.scanned,
+    )
+
+    if not batch.done:
+        backfill_thumbnails_task.delay(batch.last_id, batch_size)
+
+    return batch.rendered
+
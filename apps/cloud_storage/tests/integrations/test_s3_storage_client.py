@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from botocore.exceptions import EndpointConnectionError
+from botocore.stub import Stubber
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.cloud_storage.api.exception_handler import storage_exception_handler
+from apps.cloud_storage.domain.exceptions.storage import StorageError, StorageUnavailableError
+from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.integrations.aws.circuit_breaker import CircuitBreaker
+
+
+@override_settings(AWS_S3_CIRCUIT_FAILURE_THRESHOLD=2)
+class S3StorageClientErrorTests(SimpleTestCase):
+
+    def setUp(self):
+        CircuitBreaker._registry.clear()
+        self.storage = S3StorageClient()
+        self.stubber = Stubber(self.storage.s3_client)
+        self.stubber.activate()
+
+    def tearDown(self):
+        self.stubber.deactivate()
+        CircuitBreaker._registry.clear()
+
+    def test_head_returns_none_when_object_is_missing(self):
+        self.stubber.add_client_error("head_object", service_error_code="404", http_status_code=404)
+
+        self.assertIsNone(self.storage.head("users/1/missing.txt"))
+
+    def test_head_raises_unavailable_on_server_error(self):
+        self.stubber.add_client_error("head_object", service_error_code="SlowDown", http_status_code=503)
+
+        with self.assertRaises(StorageUnavailableError):
+            self.storage.head("users/1/a.txt")
+
+    def test_head_raises_storage_error_on_access_denied(self):
+        self.stubber.add_client_error("head_object", service_error_code="403", http_status_code=403)
+
+        with self.assertRaises(StorageError) as ctx:
+            self.storage.head("users/1/a.txt")
+        self.assertNotIsInstance(ctx.exception, StorageUnavailableError)
+
+    def test_head_reports_storage_class_and_restore_state(self):
+        self.stubber.add_response(
+            "head_object",
+            {
+                "ContentLength": 5,
+                "StorageClass": "GLACIER",
+                "Restore": 'ongoing-request="false", expiry-date="Fri, 21 Dec 2012 00:00:00 GMT"',
+            },
+        )
+
+        head = self.storage.head("users/1/a.txt")
+
+        self.assertEqual(head["storage_class"], "GLACIER")
+        self.assertTrue(head["restore_ready"])
+
+    def test_restore_already_in_progress_is_not_an_error(self):
+        self.stubber.add_client_error(
+            "restore_object", service_error_code="RestoreAlreadyInProgress", http_status_code=409
+        )
+
+        self.storage.restore("users/1/a.txt", days=7)
+
+        self.stubber.assert_no_pending_responses()
+
+    def test_circuit_opens_and_fails_fast(self):
+        for _ in range(2):
+            self.stubber.add_client_error("head_object", http_status_code=500)
+            with self.assertRaises(StorageUnavailableError):
+                self.storage.head("users/1/a.txt")
+
+        # No stubbed response left: a real call would fail the stubber
+        with self.assertRaises(StorageUnavailableError):
+            self.storage.head("users/1/a.txt")
+        self.stubber.assert_no_pending_responses()
+
+    def test_connection_errors_count_as_unavailable(self):
+        error = EndpointConnectionError(endpoint_url="https://s3.test")
+
+        with patch.object(self.storage.s3_client, "head_object", side_effect=error):
+            with self.assertRaises(StorageUnavailableError):
+                self.storage.head("users/1/a.txt")
+
+        self.assertEqual(self.storage.breaker.failures, 1)
+
+    def test_unavailable_maps_to_503(self):
+        request = APIRequestFactory().get("/")
+
+        response = storage_exception_handler(StorageUnavailableError(), {"request": request})
+
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,159 @@
+import io
+import tempfile
+from urllib.parse import urlparse
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.integrations.local.storage import LocalStorageClient
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+class StorageBackendContract:
+    """Behaviour every non-S3 backend must share."""
+
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.storage = self.make_storage()
+
+    def test_save_and_head(self):
+        self.storage.save("users/1/a.txt", io.BytesIO(b"hello"), "text/plain", {"user-id": "1"})
+
+        self.assertEqual(
+            self.storage.head("users/1/a.txt"),
+            {
+                "size": 5,
+                "content_type": "text/plain",
+                "metadata": {"user-id": "1"},
+                "content_encoding": None,
+                "storage_class": "STANDARD",
+                "restore_ready": False,
+            },
+        )
+        self.assertIsNone(self.storage.head("users/1/missing.txt"))
+
+    def test_list_keys_pages_in_key_order(self):
+        for name in ["c", "a", "b"]:
+            self.storage.save(f"users/1/{name}", io.BytesIO(b"x"))
+        self.storage.save("users/2/a", io.BytesIO(b"x"))
+
+        self.assertEqual(self.storage.list_keys("users/1/", max_keys=2), (["users/1/a", "users/1/b"], True))
+        self.assertEqual(self.storage.list_keys("users/1/", start_after="users/1/b"), (["users/1/c"], False))
+
+    def test_list_keys_orders_nested_keys_like_s3(self):
+        for key in ["users/1/a/b", "users/1/a.txt", "users/1/a-b", "users/10/a", "users/1.txt"]:
+            self.storage.save(key, io.BytesIO(b"x"))
+
+        self.assertEqual(
+            self.storage.list_keys("users/1/"),
+            (["users/1/a-b", "users/1/a.txt", "users/1/a/b"], False),
+        )
+        self.assertEqual(
+            self.storage.list_keys("users/1", start_after="users/1/a.txt"),
+            (["users/1/a/b", "users/10/a"], False),
+        )
+
+    def test_delete_and_batch_delete(self):
+        for name in ["a", "b", "c"]:
+            self.storage.save(f"users/1/{name}", io.BytesIO(b"x"))
+
+        self.storage.delete_file("users/1/a")
+        self.assertEqual(self.storage.delete_files(["users/1/b", "users/1/c"]), [])
+        self.storage.delete_file("users/1/a")
+
+        self.assertEqual(self.storage.list_keys("users/1/"), ([], False))
+
+    def test_copy(self):
+        self.storage.save("users/1/a", io.BytesIO(b"data"), "text/plain")
+
+        self.storage.copy("users/1/a", "users/1/b")
+
+        with self.storage.open("users/1/b") as copied:
+            self.assertEqual(copied.read(), b"data")
+        with self.assertRaises(ObjectNotFoundError):
+            self.storage.copy("users/1/missing", "users/1/c")
+
+    def test_read_range(self):
+        self.storage.save("users/1/a", io.BytesIO(b"0123456789"))
+
+        self.assertEqual(self.storage.read_range("users/1/a", 2, 3), b"234")
+        self.assertEqual(self.storage.read_range("users/1/a", 8, 5), b"89")
+        self.assertEqual(self.storage.read_range("users/1/a", 20, 5), b"")
+        with self.assertRaises(ObjectNotFoundError):
+            self.storage.read_range("users/1/missing", 0, 1)
+
+    def test_download_url_only_for_existing_objects(self):
+        self.storage.save("users/1/a", io.BytesIO(b"data"))
+
+        self.assertIn("token=", self.storage.generate_presigned_download_url("users/1/a"))
+        self.assertIsNone(self.storage.generate_presigned_download_url("users/1/missing"))
+
+
+class LocalStorageClientTests(StorageBackendContract, SimpleTestCase):
+
+    def make_storage(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        return LocalStorageClient(root=self.tmp.name)
+
+
+class InMemoryStorageClientTests(StorageBackendContract, SimpleTestCase):
+
+    def make_storage(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        return InMemoryStorageClient(latency=0, jitter=0)
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+class SignedStorageViewsTests(SimpleTestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = get_storage()
+
+    def upload(self, presigned, content=b"hello", **overrides):
+        data = {**presigned["fields"], **overrides}
+        data["file"] = SimpleUploadedFile("a.txt", content)
+        return self.client.post(urlparse(presigned["url"]).path, data)
+
+    def test_upload_then_download(self):
+        presigned = self.storage.create_presigned_post_url("users/1/a.txt", 1, 100, "text/plain")
+
+        response = self.upload(presigned)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.storage.head("users/1/a.txt")["size"], 5)
+
+        url = urlparse(self.storage.generate_presigned_download_url("users/1/a.txt"))
+        response = self.client.get(f"{url.path}?{url.query}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"hello")
+
+    def test_upload_rejects_oversized_file(self):
+        presigned = self.storage.create_presigned_post_url("users/1/a.txt", 1, 3, "text/plain")
+
+        response = self.upload(presigned)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(self.storage.head("users/1/a.txt"))
+
+    def test_upload_rejects_tampered_key(self):
+        presigned = self.storage.create_presigned_post_url("users/1/a.txt", 1, 100, "text/plain")
+
+        response = self.upload(presigned, key="users/2/a.txt")
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_download_rejects_invalid_token(self):
+        response = self.client.get(reverse("signed-storage-download"), {"token": "forged"})
+
+        self.assertEqual(response.status_code, 403)
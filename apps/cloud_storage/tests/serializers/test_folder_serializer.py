@@ -194,7 +194,7 @@ class FolderSerializerTests(TestCase):
             self.assertFalse(serializer.is_valid(raise_exception=True))
             self.assertIn("name", serializer.errors)
 
-    @patch("apps.cloud_storage.api.serializers.folder_serializer.update_folder_file_paths_task.delay")
+    @patch("apps.cloud_storage.api.serializers.folder_serializer.schedule_folder_path_rewrite")
     def test_update_name_triggers_path_update(self, mock_task):
         serializer = self.serializer(
             instance=self.parent_folder,
@@ -206,9 +206,9 @@ class FolderSerializerTests(TestCase):
         folder = serializer.save()
 
         self.assertEqual(folder.name, "Renamed")
-        mock_task.assert_called_once_with(folder.id)
+        mock_task.assert_called_once_with(folder)
 
-    @patch("apps.cloud_storage.api.serializers.folder_serializer.update_folder_file_paths_task.delay")
+    @patch("apps.cloud_storage.api.serializers.folder_serializer.schedule_folder_path_rewrite")
     def test_update_parent_triggers_path_update(self, mock_task):
         new_parent = FolderFactory(name="NewParent", user=self.user)
         serializer = self.serializer(
@@ -221,9 +221,9 @@ class FolderSerializerTests(TestCase):
         folder = serializer.save()
 
         self.assertEqual(folder.parent, new_parent)
-        mock_task.assert_called_once_with(folder.id)
+        mock_task.assert_called_once_with(folder)
 
-    @patch("apps.cloud_storage.api.serializers.folder_serializer.update_folder_file_paths_task.delay")
+    @patch("apps.cloud_storage.api.serializers.folder_serializer.schedule_folder_path_rewrite")
     def test_update_name_and_parent_triggers_path_update_once(self, mock_task):
         new_parent = FolderFactory(name="NP", user=self.user)
         data = {"name": "Combo", "parent_id": new_parent.id}
@@ -238,9 +238,9 @@ class FolderSerializerTests(TestCase):
 
         self.assertEqual(folder.name, "Combo")
         self.assertEqual(folder.parent, new_parent)
-        mock_task.assert_called_once_with(folder.id)
+        mock_task.assert_called_once_with(folder)
 
-    @patch("apps.cloud_storage.api.serializers.folder_serializer.update_folder_file_paths_task.delay")
+    @patch("apps.cloud_storage.api.serializers.folder_serializer.schedule_folder_path_rewrite")
     def test_partial_update_without_name_or_parent_does_not_trigger_task(self, mock_task):
         serializer = self.serializer(instance=self.parent_folder, data={}, context=self.get_context(), partial=True)
         self.assertTrue(serializer.is_valid())
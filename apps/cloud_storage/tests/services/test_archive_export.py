@@ -0,0 +1,105 @@
+import gzip
+import io
+import uuid
+import zipfile
+
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.choices.archive_export_choices import ArchiveExportStatus
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.models import ArchiveExport
+from apps.cloud_storage.services.accounts.archive_export import (
+    get_archive_download_url,
+    request_archive_export,
+    run_archive_export,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+@override_settings(
+    CLOUD_STORAGE_BACKEND=MEMORY_BACKEND,
+    CLOUD_STORAGE_ARCHIVE_EXPORT_PART_BYTES=64,
+    CLOUD_STORAGE_ARCHIVE_EXPORT_READ_BYTES=16,
+    CLOUD_STORAGE_ARCHIVE_EXPORT_BATCH_SIZE=2,
+)
+class ArchiveExportTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def add_file(self, path, data, **kwargs):
+        key = f"users/{self.user.id}/objects/{uuid.uuid4().hex}"
+        stored = gzip.compress(data) if kwargs.get("content_encoding") else data
+        self.storage.save(key, io.BytesIO(stored))
+        return CloudFileFactory(
+            user=self.user, file_name=path.rsplit("/", 1)[-1], path=path, s3_key=key, size=len(data), **kwargs
+        )
+
+    def export_archive(self):
+        """Run the export one part per run, reloading it each time as a restarted worker would."""
+        export, created = request_archive_export(self.user)
+        self.assertTrue(created)
+        runs = 0
+        while not run_archive_export(ArchiveExport.objects.get(id=export.id), self.storage, max_parts=1):
+            runs += 1
+            self.assertLess(runs, 100)
+        export.refresh_from_db()
+        return export, runs
+
+    def read_archive(self, export):
+        return zipfile.ZipFile(io.BytesIO(self.storage._objects[export.s3_key]["data"]))
+
+    def test_archive_keeps_folders_and_original_bytes(self):
+        self.add_file("docs/notes.txt", b"notes " * 40)
+        self.add_file("docs/report.txt", b"report " * 30, content_encoding="gzip")
+        self.add_file("photo.jpg", b"\xff\xd8" * 25)
+        self.add_file("empty.txt", b"")
+
+        export, runs = self.export_archive()
+
+        archive = self.read_archive(export)
+        self.assertGreater(runs, 1)
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), ["docs/notes.txt", "docs/report.txt", "photo.jpg", "empty.txt"])
+        self.assertEqual(archive.read("docs/report.txt"), b"report " * 30)
+        self.assertEqual(archive.read("empty.txt"), b"")
+        self.assertEqual(export.status, ArchiveExportStatus.COMPLETED.value)
+        self.assertEqual(export.exported_files, 4)
+        self.assertEqual(export.archive_size, len(self.storage._objects[export.s3_key]["data"]))
+        self.assertFalse(export.entries.exists() or export.parts.exists())
+        self.assertIsNotNone(get_archive_download_url(self.storage, export))
+
+    def test_duplicate_names_get_the_file_id(self):
+        self.add_file("a.txt", b"first")
+        second = self.add_file("a.txt", b"second")
+
+        export, _runs = self.export_archive()
+
+        archive = self.read_archive(export)
+        self.assertEqual(archive.namelist(), ["a.txt", f"a ({second.id}).txt"])
+        self.assertEqual(archive.read("a.txt"), b"first")
+
+    def test_missing_and_archived_files_are_skipped(self):
+        self.add_file("kept.txt", b"kept")
+        missing = self.add_file("missing.txt", b"gone")
+        self.storage.delete_file(missing.s3_key)
+        self.add_file("cold.txt", b"cold", storage_class="GLACIER")
+
+        export, _runs = self.export_archive()
+
+        self.assertEqual(self.read_archive(export).namelist(), ["kept.txt"])
+        self.assertEqual((export.exported_files, export.skipped_files), (1, 2))
+
+    def test_one_export_runs_at_a_time(self):
+        export, created = request_archive_export(self.user)
+        again, created_again = request_archive_export(self.user)
+
+        self.assertEqual((created, created_again), (True, False))
+        self.assertEqual(again.id, export.id)
+        self.assertIsNone(get_archive_download_url(self.storage, export))
@@ -0,0 +1,78 @@
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS, FAILED
+from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.services.files.batch_file_upload_finalizer_service import (
+    BatchFileUploadFinalizerService,
+)
+from apps.cloud_storage.services.files.finalize_uploads import QuotaBudget
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class BatchFileUploadFinalizerServiceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        SubscriptionFreePlanFactory(user=cls.user)
+
+    def setUp(self):
+        self.storage = Mock(spec=S3StorageClient)
+        self.files = [
+            CloudFileFactory(user=self.user, status=PENDING, size=1, s3_key=f"users/1/{i}.txt")
+            for i in range(3)
+        ]
+
+    def heads(self, key):
+        return {"size": 10, "content_type": "text/plain", "metadata": {"key": key}}
+
+    def test_finalizes_all_files_with_head_info(self):
+        self.storage.head.side_effect = self.heads
+        service = BatchFileUploadFinalizerService(storage=self.storage, max_workers=2)
+
+        outcomes = service.finalize(self.user, [f.id for f in self.files])
+
+        self.assertEqual({o.status for o in outcomes}, {SUCCESS})
+        self.assertEqual(self.storage.head.call_count, 3)
+        for cloud_file in self.files:
+            cloud_file.refresh_from_db()
+            self.assertEqual(cloud_file.status, SUCCESS)
+            self.assertEqual(cloud_file.size, 10)
+            self.assertEqual(cloud_file.metadata, {"key": cloud_file.s3_key})
+
+    def test_missing_objects_are_marked_failed(self):
+        missing = self.files[0]
+        self.storage.head.side_effect = lambda key: None if key == missing.s3_key else self.heads(key)
+        service = BatchFileUploadFinalizerService(storage=self.storage)
+
+        service.finalize(self.user, [f.id for f in self.files])
+
+        missing.refresh_from_db()
+        self.assertEqual(missing.status, FAILED)
+        self.assertEqual(missing.error_code, CloudFileErrorCode.FILE_NOT_FOUND_IN_S3.value)
+        self.storage.delete_file.assert_not_called()
+
+    @patch.object(QuotaBudget, "get_remaining_bytes", return_value=25)
+    def test_quota_is_checked_once_for_the_batch(self, mock_remaining):
+        self.storage.head.side_effect = self.heads
+        service = BatchFileUploadFinalizerService(storage=self.storage)
+
+        outcomes = service.finalize(self.user, [f.id for f in self.files])
+
+        mock_remaining.assert_called_once()
+        self.assertEqual([o.status for o in outcomes], [SUCCESS, SUCCESS, FAILED])
+        self.storage.delete_file.assert_called_once_with(self.files[2].s3_key)
+
+    def test_other_users_files_are_ignored(self):
+        other_file = CloudFileFactory(status=PENDING, s3_key="users/2/other.txt")
+        service = BatchFileUploadFinalizerService(storage=self.storage)
+
+        outcomes = service.finalize(self.user, [other_file.id])
+
+        self.assertEqual(outcomes, [])
+        self.storage.head.assert_not_called()
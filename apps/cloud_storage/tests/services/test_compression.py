@@ -0,0 +1,91 @@
+import gzip
+import io
+import os
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.services.files.compression import compress_files, open_decoded
+from apps.cloud_storage.services.files.proxy_download import build_file_download_response
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+TEXT = b"timestamp;level;message\n" + b"2026-01-01T00:00:00;INFO;request served\n" * 200
+
+
+@override_settings(
+    CLOUD_STORAGE_BACKEND=MEMORY_BACKEND,
+    CLOUD_STORAGE_COMPRESSION="gzip",
+    CLOUD_STORAGE_COMPRESSION_READ_BYTES=512,
+    CLOUD_STORAGE_PROXY_CHUNK_BYTES=512,
+)
+class CompressionTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def create_file(self, name, data, content_type):
+        key = f"users/{self.user.id}/{name}"
+        self.storage.save(key, io.BytesIO(data), content_type=content_type, metadata={"user-id": str(self.user.id)})
+        return CloudFileFactory(
+            user=self.user, file_name=name, s3_key=key, size=len(data), content_type=content_type,
+        )
+
+    def download(self, cloud_file, **headers):
+        request = RequestFactory().get("/", headers=headers)
+        return build_file_download_response(self.storage, cloud_file, request)
+
+    def test_text_is_stored_compressed_with_its_logical_size(self):
+        cloud_file = self.create_file("app.log", TEXT, "text/plain")
+
+        self.assertEqual(compress_files(self.storage, [cloud_file]), 1)
+
+        cloud_file.refresh_from_db()
+        head = self.storage.head(cloud_file.s3_key)
+        self.assertEqual((cloud_file.content_encoding, cloud_file.size), ("gzip", len(TEXT)))
+        self.assertEqual(cloud_file.stored_size, head["size"])
+        self.assertLess(cloud_file.stored_size, len(TEXT) // 10)
+        self.assertEqual(head["content_encoding"], "gzip")
+        self.assertEqual(head["metadata"], {"user-id": str(self.user.id)})
+        with open_decoded(self.storage, cloud_file) as reader:
+            self.assertEqual(reader.read(), TEXT)
+
+    def test_incompressible_files_are_left_as_they_are(self):
+        data = os.urandom(5120)
+        cloud_file = self.create_file("random.txt", data, "text/plain")
+
+        self.assertEqual(compress_files(self.storage, [cloud_file]), 0)
+
+        cloud_file.refresh_from_db()
+        self.assertEqual((cloud_file.content_encoding, cloud_file.stored_size), ("", len(data)))
+        self.assertIsNone(self.storage.head(cloud_file.s3_key)["content_encoding"])
+
+    def test_downloads_are_relayed_or_decoded_by_accept_encoding(self):
+        cloud_file = self.create_file("app.log", TEXT, "text/plain")
+        compress_files(self.storage, [cloud_file])
+        cloud_file.refresh_from_db()
+
+        relayed = self.download(cloud_file, **{"Accept-Encoding": "gzip, br"})
+        decoded = self.download(cloud_file, **{"Accept-Encoding": "identity"})
+        ranged = self.download(cloud_file, Range="bytes=1000-1099", **{"Accept-Encoding": "gzip"})
+
+        self.assertEqual(relayed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(relayed.streaming_content)), TEXT)
+        self.assertFalse(decoded.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(decoded.streaming_content), TEXT)
+        self.assertNotEqual(relayed["ETag"], decoded["ETag"])
+        self.assertEqual(ranged.status_code, 206)
+        self.assertEqual(b"".join(ranged.streaming_content), TEXT[1000:1100])
+
+    def test_file_marked_before_its_object_is_rewritten_reads_as_is(self):
+        cloud_file = self.create_file("app.log", TEXT, "text/plain")
+        cloud_file.content_encoding, cloud_file.stored_size = "gzip", 100
+
+        response = self.download(cloud_file, **{"Accept-Encoding": "gzip"})
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), TEXT)
@@ -0,0 +1,167 @@
+import io
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import StorageQuotaExceeded
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.integrations.s3.events import S3ObjectCreatedEvent
+from apps.cloud_storage.models import ChunkManifest, CloudFile, ContentObject, ManifestChunk
+from apps.cloud_storage.services.files import create_presigned_upload
+from apps.cloud_storage.services.files.content_objects import (
+    build_content_key,
+    release_content_reservation,
+    reserve_content_object,
+)
+from apps.cloud_storage.services.files.create_presigned_upload import prepare_file_upload
+from apps.cloud_storage.services.files.delete_file import (
+    permanent_delete_file,
+    permanently_delete_user_files,
+)
+from apps.cloud_storage.services.files.finalize_uploads import finalize_uploads_from_events
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+SHA256 = "ab" * 32
+
+
+class ContentObjectTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        SubscriptionFreePlanFactory(user=self.user)
+        self.storage = Mock()
+        self.storage.create_presigned_post_url.return_value = {"url": "https://upload", "fields": {}}
+
+    def create_content(self, refs, status=SUCCESS, size=100):
+        content = ContentObject.objects.create(
+            user=self.user,
+            sha256=SHA256,
+            s3_key=build_content_key(self.user.id, SHA256),
+            size=size,
+            ref_count=refs,
+            status=status,
+        )
+        files = [
+            CloudFileFactory(user=self.user, s3_key=content.s3_key, content_object=content, size=size)
+            for _ in range(refs)
+        ]
+        return content, files
+
+    def test_first_upload_is_presigned_to_content_key_with_checksum(self):
+        result = prepare_file_upload(self.storage, self.user, "a.txt", "text/plain", sha256=SHA256)
+
+        self.assertFalse(result.deduplicated)
+        self.assertEqual(result.file_path, build_content_key(self.user.id, SHA256))
+        self.assertEqual(result.content_object.ref_count, 1)
+        self.assertEqual(result.content_object.status, PENDING)
+        self.storage.create_presigned_post_url.assert_called_once()
+        self.assertEqual(
+            self.storage.create_presigned_post_url.call_args.kwargs["checksum_sha256"], SHA256
+        )
+
+    def test_known_content_skips_upload(self):
+        content, _files = self.create_content(refs=1)
+
+        result = prepare_file_upload(self.storage, self.user, "copy.txt", "text/plain", sha256=SHA256)
+
+        self.assertTrue(result.deduplicated)
+        self.assertIsNone(result.presigned_url)
+        self.assertEqual(result.file_path, content.s3_key)
+        self.storage.create_presigned_post_url.assert_not_called()
+        content.refresh_from_db()
+        self.assertEqual(content.ref_count, 2)
+
+    def test_known_content_still_counts_against_quota(self):
+        content, _files = self.create_content(refs=1)
+
+        with patch.object(create_presigned_upload, "get_max_upload_bytes", return_value=99):
+            with self.assertRaises(StorageQuotaExceeded):
+                prepare_file_upload(self.storage, self.user, "copy.txt", "text/plain", sha256=SHA256)
+
+        content.refresh_from_db()
+        self.assertEqual(content.ref_count, 1)
+
+    def test_without_sha256_upload_is_not_content_addressed(self):
+        result = prepare_file_upload(self.storage, self.user, "a.txt", "text/plain")
+
+        self.assertIsNone(result.content_object)
+        self.assertNotIn("/cas/", result.file_path)
+        self.assertFalse(ContentObject.objects.exists())
+
+    def test_released_reservation_removes_pending_content(self):
+        content = reserve_content_object(self.user, SHA256)
+
+        release_content_reservation(content)
+
+        self.assertFalse(ContentObject.objects.exists())
+
+    def test_permanent_delete_keeps_object_while_referenced(self):
+        content, (first, second) = self.create_content(refs=2)
+
+        permanent_delete_file(self.storage, first)
+
+        self.storage.delete_file.assert_not_called()
+        content.refresh_from_db()
+        self.assertEqual(content.ref_count, 1)
+
+        permanent_delete_file(self.storage, second)
+
+        self.storage.delete_file.assert_called_once_with(object_name=content.s3_key)
+        self.assertFalse(ContentObject.objects.exists())
+        self.assertFalse(CloudFile.objects.filter(user=self.user).exists())
+
+    def test_purge_deletes_shared_object_with_last_reference(self):
+        content, files = self.create_content(refs=2)
+        own = CloudFileFactory(user=self.user, s3_key="users/1/own.txt")
+        for cloud_file in [*files, own]:
+            cloud_file.soft_delete()
+
+        permanently_delete_user_files(self.storage, self.user.id, older_than_days=None)
+
+        deleted_keys = [call.kwargs["object_name"] for call in self.storage.delete_file.call_args_list]
+        self.assertCountEqual(deleted_keys, [content.s3_key, own.s3_key])
+        self.assertFalse(ContentObject.objects.exists())
+        self.assertFalse(CloudFile.objects.filter(user=self.user).exists())
+
+    def test_finalized_upload_activates_content(self):
+        content, (cloud_file,) = self.create_content(refs=1, status=PENDING, size=0)
+        CloudFile.objects.filter(pk=cloud_file.pk).update(status=PENDING)
+
+        finalize_uploads_from_events(self.storage, [S3ObjectCreatedEvent(key=content.s3_key, size=42)])
+
+        content.refresh_from_db()
+        self.assertEqual(content.status, SUCCESS)
+        self.assertEqual(content.size, 42)
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+class ContentObjectUserDeleteTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def test_deleting_a_user_with_deduplicated_files_drops_their_objects(self):
+        content = ContentObject.objects.create(
+            user=self.user, sha256=SHA256, s3_key=build_content_key(self.user.id, SHA256), size=1, ref_count=1, status=SUCCESS,
+        )
+        self.storage.save(content.s3_key, io.BytesIO(b"x"))
+        deduplicated = CloudFileFactory(user=self.user, s3_key=content.s3_key, content_object=content)
+        manifest = ChunkManifest.objects.create(cloud_file=CloudFileFactory(user=self.user), chunk_count=1)
+        ManifestChunk.objects.create(manifest=manifest, content_object=content, index=0, offset=0, size=1)
+        plain = CloudFileFactory(user=self.user, s3_key=f"users/{self.user.id}/plain.txt")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        self.assertFalse(ContentObject.objects.exists())
+        self.assertFalse(CloudFile.objects.filter(id=deduplicated.id).exists())
+        self.assertFalse(ManifestChunk.objects.exists())
+        self.assertIsNone(CloudFile.objects.get(id=plain.id).user_id)
+        self.assertIsNone(self.storage.head(content.s3_key))
@@ -0,0 +1,103 @@
+import io
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import StorageQuotaExceeded
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.models import CloudFile, ContentObject, Folder
+from apps.cloud_storage.services.files.content_objects import build_content_key
+from apps.cloud_storage.services.files.copy_files import (
+    execute_copy_plan,
+    get_copy_job,
+    get_copyable_files,
+    plan_file_copy,
+    plan_folder_copy,
+    start_copy_job,
+)
+from apps.cloud_storage.tasks.file_copies import copy_folder_task
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.tests.factories.folder_factory import FolderFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+SHA256 = "cd" * 32
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+class CopyFilesTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.addCleanup(cache.clear)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+        SubscriptionFreePlanFactory(user=self.user)
+
+    def create_file(self, name="a.txt", folder=None):
+        key = f"users/{self.user.id}/{name}"
+        self.storage.save(key, io.BytesIO(name.encode()), content_type="text/plain")
+        return CloudFileFactory(user=self.user, folder=folder, file_name=name, s3_key=key, size=len(name))
+
+    def test_file_copy_gets_its_own_object(self):
+        source = self.create_file()
+        target = FolderFactory(user=self.user, name="docs")
+
+        plan = plan_file_copy(self.user, get_copyable_files(self.user).filter(id=source.id), target)
+        result = execute_copy_plan(self.storage, plan)
+
+        copy = result.files[0]
+        self.assertNotEqual(copy.s3_key, source.s3_key)
+        self.assertEqual((copy.folder, copy.path, copy.status), (target, "docs/a.txt", SUCCESS))
+        self.assertEqual(self.storage.open(copy.s3_key).read(), b"a.txt")
+
+    def test_folder_copy_clones_the_tree_and_rebuilds_paths(self):
+        root = FolderFactory(user=self.user, name="photos")
+        child = FolderFactory(user=self.user, name="2024", parent=root)
+        self.create_file("a.txt", folder=root)
+        self.create_file("b.txt", folder=child)
+
+        result = execute_copy_plan(self.storage, plan_folder_copy(self.user, root, name="photos-backup"))
+
+        self.assertEqual(result.folder.name, "photos-backup")
+        self.assertTrue(Folder.objects.filter(parent=result.folder, name="2024").exists())
+        self.assertEqual(
+            sorted(cloud_file.path for cloud_file in result.files),
+            ["photos-backup/2024/b.txt", "photos-backup/a.txt"],
+        )
+
+    def test_content_addressed_copy_takes_a_reference_instead_of_copying(self):
+        content = ContentObject.objects.create(
+            user=self.user, sha256=SHA256, s3_key=build_content_key(self.user.id, SHA256), size=3, ref_count=1,
+            status=SUCCESS,
+        )
+        source = CloudFileFactory(user=self.user, s3_key=content.s3_key, content_object=content, size=3)
+
+        result = execute_copy_plan(self.storage, plan_file_copy(self.user, [source]))
+
+        content.refresh_from_db()
+        self.assertEqual(content.ref_count, 2)
+        self.assertEqual(result.files[0].s3_key, content.s3_key)
+
+    def test_quota_is_checked_before_copying(self):
+        source = self.create_file()
+        CloudFile.objects.filter(id=source.id).update(size=self.user.plan.max_storage_bytes // 2 + 1)
+
+        with self.assertRaises(StorageQuotaExceeded):
+            plan_file_copy(self.user, get_copyable_files(self.user).filter(id=source.id))
+
+        self.assertEqual(CloudFile.objects.filter(user=self.user).count(), 1)
+
+    def test_background_copy_records_progress(self):
+        root = FolderFactory(user=self.user, name="photos")
+        self.create_file("a.txt", folder=root)
+        job_id = start_copy_job(plan_folder_copy(self.user, root, name="copy"))
+
+        copy_folder_task.delay(job_id, self.user.id, root.id, None, "copy")
+
+        job = get_copy_job(self.user, job_id)
+        self.assertEqual((job["status"], job["copied"], job["total"]), (SUCCESS, 1, 1))
+        self.assertTrue(CloudFile.objects.filter(id__in=job["file_ids"], path="copy/a.txt").exists())
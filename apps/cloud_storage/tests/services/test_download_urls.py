@@ -0,0 +1,127 @@
+from unittest.mock import Mock, PropertyMock, patch
+from urllib.parse import parse_qs, urlparse
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.cloud_storage.integrations.cdn import cloudfront
+from apps.cloud_storage.integrations.cdn.cloudfront import CloudFrontURLSigner
+from apps.cloud_storage.services.files.download_urls import (
+    generate_download_url,
+    get_cdn_download_url,
+    get_decoded_download_url,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.tests.factories.share_link_factory import ShareLinkFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.subscriptions.models import Plan
+from apps.users.factories.user_factory import UserFactory
+
+CDN_SETTINGS = {
+    "CLOUD_STORAGE_CDN_SIGNER": "apps.cloud_storage.integrations.cdn.cloudfront.CloudFrontURLSigner",
+    "CLOUD_STORAGE_CDN_DOMAIN": "cdn.example.com",
+    "CLOUD_STORAGE_CDN_KEYS": {"K-OLD": "old-pem", "K-NEW": "new-pem"},
+    "CLOUD_STORAGE_CDN_ACTIVE_KEY_ID": "K-NEW",
+}
+
+
+def fake_rsa_signer(pem):
+    return lambda message: pem.encode()
+
+
+@override_settings(**CDN_SETTINGS)
+@patch.object(cloudfront, "build_rsa_signer", fake_rsa_signer)
+class CloudFrontURLSignerTests(TestCase):
+
+    def test_url_is_signed_with_active_key(self):
+        url = CloudFrontURLSigner().sign_download_url("users/1/ab/file name.pdf", expires_in=60)
+
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        self.assertEqual(parsed.netloc, "cdn.example.com")
+        self.assertEqual(parsed.path, "/users/1/ab/file%20name.pdf")
+        self.assertEqual(query["Key-Pair-Id"], ["K-NEW"])
+        self.assertIn("Expires", query)
+        self.assertIn("Signature", query)
+
+    def test_missing_active_key_is_a_configuration_error(self):
+        with override_settings(CLOUD_STORAGE_CDN_ACTIVE_KEY_ID="K-GONE"):
+            with self.assertRaises(ImproperlyConfigured):
+                CloudFrontURLSigner()
+
+
+@override_settings(**CDN_SETTINGS)
+@patch.object(cloudfront, "build_rsa_signer", fake_rsa_signer)
+class DownloadUrlTests(APITestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        SubscriptionFreePlanFactory(user=self.user)
+        self.cloud_file = CloudFileFactory(user=self.user, s3_key=f"users/{self.user.id}/ab/report.pdf")
+        self.storage = Mock()
+        self.storage.generate_presigned_download_url.return_value = "https://s3/url"
+
+    def test_plan_without_cdn_uses_storage_url(self):
+        self.assertEqual(generate_download_url(self.storage, self.cloud_file), "https://s3/url")
+
+    @patch.object(Plan, "cdn_downloads", new_callable=PropertyMock, return_value=True)
+    def test_plan_with_cdn_signs_locally(self, _cdn):
+        url = generate_download_url(self.storage, self.cloud_file)
+
+        self.assertTrue(url.startswith("https://cdn.example.com/"))
+        self.storage.generate_presigned_download_url.assert_not_called()
+
+    @patch.object(Plan, "cdn_downloads", new_callable=PropertyMock, return_value=True)
+    def test_file_without_key_falls_back_to_storage_url(self, _cdn):
+        self.cloud_file.s3_key = None
+
+        self.assertEqual(generate_download_url(self.storage, self.cloud_file), "https://s3/url")
+
+    @patch.object(Plan, "cdn_downloads", new_callable=PropertyMock, return_value=True)
+    def test_compressed_files_are_served_decoded_by_the_api(self, _cdn):
+        self.cloud_file.content_encoding = "gzip"
+        share_link = ShareLinkFactory(owner=self.user, files=[self.cloud_file], use_cdn=True)
+        request = RequestFactory().get("/")
+
+        self.assertIsNone(get_cdn_download_url(self.cloud_file, share_link))
+        self.assertEqual(
+            get_decoded_download_url(request, self.cloud_file),
+            request.build_absolute_uri(reverse("storage-proxy-download", args=[self.cloud_file.pk])),
+        )
+        self.assertEqual(
+            get_decoded_download_url(request, self.cloud_file, share_link),
+            request.build_absolute_uri(
+                reverse("public-share-file-content", kwargs={"token": share_link.token, "file_id": self.cloud_file.id})
+            ),
+        )
+
+    @patch.object(Plan, "cdn_downloads", new_callable=PropertyMock, return_value=True)
+    def test_share_link_setting_overrides_plan(self, _cdn):
+        share_link = ShareLinkFactory(owner=self.user, files=[self.cloud_file], use_cdn=False)
+
+        url = generate_download_url(self.storage, self.cloud_file, share_link)
+
+        self.assertEqual(url, "https://s3/url")
+
+    @override_settings(CLOUD_STORAGE_CDN_SIGNER="")
+    def test_without_signer_storage_url_is_used(self):
+        share_link = ShareLinkFactory(owner=self.user, files=[self.cloud_file], use_cdn=True)
+
+        url = generate_download_url(self.storage, self.cloud_file, share_link)
+
+        self.assertEqual(url, "https://s3/url")
+
+    def test_public_share_download_uses_cdn_when_link_enables_it(self):
+        share_link = ShareLinkFactory(owner=self.user, files=[self.cloud_file], use_cdn=True)
+        url = reverse(
+            "public-share-file-download",
+            kwargs={"token": share_link.token, "file_id": self.cloud_file.id},
+        )
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["url"].startswith("https://cdn.example.com/"))
@@ -0,0 +1,146 @@
+import json
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS, FAILED
+from apps.cloud_storage.integrations.s3.events import (
+    S3ObjectCreatedEvent,
+    parse_s3_object_created_events,
+)
+from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.services.files.finalize_uploads import (
+    QuotaBudget,
+    finalize_uploads_from_events,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class ParseS3ObjectCreatedEventsTests(TestCase):
+
+    def test_parses_native_notification_records(self):
+        payload = {
+            "Records": [
+                {
+                    "eventName": "ObjectCreated:Post",
+                    "s3": {
+                        "bucket": {"name": "test-bucket"},
+                        "object": {"key": "users/1/my+file.txt", "size": 42, "eTag": "abc"},
+                    },
+                },
+                {
+                    "eventName": "ObjectRemoved:Delete",
+                    "s3": {"object": {"key": "users/1/other.txt", "size": 0}},
+                },
+            ]
+        }
+
+        events = parse_s3_object_created_events(payload)
+
+        self.assertEqual(
+            events,
+            [S3ObjectCreatedEvent(key="users/1/my file.txt", size=42, etag="abc", bucket="test-bucket")],
+        )
+
+    def test_parses_sns_envelope_and_eventbridge(self):
+        notification = {
+            "Records": [
+                {"eventName": "ObjectCreated:Put", "s3": {"object": {"key": "a.txt", "size": 1}}}
+            ]
+        }
+        sns = {"Type": "Notification", "Message": json.dumps(notification)}
+        eventbridge = {
+            "detail-type": "Object Created",
+            "detail": {"bucket": {"name": "b"}, "object": {"key": "b.txt", "size": 2}},
+        }
+
+        events = parse_s3_object_created_events([sns, eventbridge])
+
+        self.assertEqual([event.key for event in events], ["a.txt", "b.txt"])
+
+    def test_skips_records_without_size(self):
+        payload = {"Records": [{"eventName": "ObjectCreated:Put", "s3": {"object": {"key": "a.txt"}}}]}
+
+        self.assertEqual(parse_s3_object_created_events(payload), [])
+
+
+class FinalizeUploadsFromEventsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        SubscriptionFreePlanFactory(user=cls.user)
+
+    def setUp(self):
+        self.storage = Mock(spec=S3StorageClient)
+
+    def test_pending_files_are_marked_success_with_event_size(self):
+        files = [
+            CloudFileFactory(user=self.user, status=PENDING, size=1, s3_key=f"users/1/{i}.txt")
+            for i in range(3)
+        ]
+        events = [
+            S3ObjectCreatedEvent(key=f.s3_key, size=100 + i, content_type="text/plain")
+            for i, f in enumerate(files)
+        ]
+
+        outcomes = finalize_uploads_from_events(self.storage, events, batch_size=2)
+
+        self.assertEqual(len(outcomes), 3)
+        for i, cloud_file in enumerate(files):
+            cloud_file.refresh_from_db()
+            self.assertEqual(cloud_file.status, SUCCESS)
+            self.assertEqual(cloud_file.size, 100 + i)
+            self.assertEqual(cloud_file.content_type, "text/plain")
+        self.storage.head.assert_not_called()
+        self.storage.delete_file.assert_not_called()
+
+    def test_content_type_is_kept_when_event_has_none(self):
+        cloud_file = CloudFileFactory(
+            user=self.user, status=PENDING, content_type="image/png", s3_key="users/1/a.png"
+        )
+
+        finalize_uploads_from_events(self.storage, [S3ObjectCreatedEvent(key=cloud_file.s3_key, size=5)])
+
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.content_type, "image/png")
+        self.assertEqual(cloud_file.status, SUCCESS)
+
+    def test_unknown_and_already_finalized_keys_are_ignored(self):
+        done = CloudFileFactory(user=self.user, status=SUCCESS, size=7, s3_key="users/1/done.txt")
+
+        outcomes = finalize_uploads_from_events(
+            self.storage,
+            [
+                S3ObjectCreatedEvent(key=done.s3_key, size=999),
+                S3ObjectCreatedEvent(key="users/1/unknown.txt", size=1),
+            ],
+        )
+
+        self.assertEqual(outcomes, [])
+        done.refresh_from_db()
+        self.assertEqual(done.size, 7)
+
+    @patch.object(QuotaBudget, "get_remaining_bytes", return_value=150)
+    def test_files_over_quota_are_failed_and_deleted(self, mock_remaining):
+        first = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/first.txt")
+        second = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/second.txt")
+
+        finalize_uploads_from_events(
+            self.storage,
+            [
+                S3ObjectCreatedEvent(key=first.s3_key, size=100),
+                S3ObjectCreatedEvent(key=second.s3_key, size=100),
+            ],
+        )
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, SUCCESS)
+        self.assertEqual(second.status, FAILED)
+        self.assertEqual(second.error_code, CloudFileErrorCode.STORAGE_QUOTA_EXCEEDED.value)
+        self.storage.delete_file.assert_called_once_with(second.s3_key)
+        mock_remaining.assert_called_once()
@@ -0,0 +1,98 @@
+import io
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.choices.key_layout_choices import KeyLayout
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.storage.key_layout_migration import migrate_files_batch
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.utils.path_utils import build_s3_path
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND, CLOUD_STORAGE_KEY_LAYOUT=KeyLayout.SHARDED)
+class KeyLayoutMigrationTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def create_flat_file(self, name, **kwargs):
+        key = build_s3_path(self.user.id, name, KeyLayout.FLAT)
+        self.storage.save(key, io.BytesIO(name.encode()))
+        return CloudFileFactory(user=self.user, s3_key=key, key_layout=KeyLayout.FLAT, **kwargs)
+
+    def test_moves_files_in_batches(self):
+        files = [self.create_flat_file(f"{i}.txt", status=SUCCESS) for i in range(3)]
+
+        first = migrate_files_batch(self.storage, batch_size=2)
+        second = migrate_files_batch(self.storage, after_id=first.last_id, batch_size=2)
+
+        self.assertEqual((first.moved, second.moved), (2, 1))
+        self.assertFalse(first.done)
+        self.assertTrue(second.done)
+        for cloud_file in files:
+            old_key = cloud_file.s3_key
+            cloud_file.refresh_from_db()
+            self.assertEqual(cloud_file.key_layout, KeyLayout.SHARDED)
+            self.assertEqual(cloud_file.s3_key, build_s3_path(self.user.id, old_key.split("/")[-1], KeyLayout.SHARDED))
+            self.assertIsNone(self.storage.head(old_key))
+            self.assertIsNotNone(self.storage.head(cloud_file.s3_key))
+
+    def test_skips_pending_uploads(self):
+        pending = self.create_flat_file("pending.txt", status=PENDING)
+
+        migrate_files_batch(self.storage)
+
+        pending.refresh_from_db()
+        self.assertEqual(pending.key_layout, KeyLayout.FLAT)
+
+    def test_drops_copy_when_file_changed_meanwhile(self):
+        cloud_file = self.create_flat_file("a.txt", status=SUCCESS)
+        new_key = build_s3_path(self.user.id, "a.txt", KeyLayout.SHARDED)
+        copy = self.storage.copy
+
+        def copy_then_delete_row(source_key, dest_key):
+            copy(source_key, dest_key)
+            CloudFile.objects.filter(id=cloud_file.id).delete()
+
+        with patch.object(self.storage, "copy", side_effect=copy_then_delete_row):
+            batch = migrate_files_batch(self.storage)
+
+        self.assertEqual(batch.moved, 0)
+        self.assertIsNone(self.storage.head(new_key))
+
+    def test_command_moves_content_objects_and_their_files(self):
+        old_key = build_s3_path(self.user.id, "cas/abc", KeyLayout.FLAT)
+        self.storage.save(old_key, io.BytesIO(b"abc"))
+        content = ContentObject.objects.create(
+            user=self.user, sha256="abc", s3_key=old_key, key_layout=KeyLayout.FLAT, status=SUCCESS, ref_count=1
+        )
+        cloud_file = CloudFileFactory(
+            user=self.user,
+            s3_key=old_key,
+            key_layout=KeyLayout.FLAT,
+            content_object=content,
+            thumbnails={"format": "WEBP", "sizes": [200]},
+        )
+        self.storage.save(f"{old_key}.thumbs/200.webp", io.BytesIO(b"thumb"))
+
+        out = io.StringIO()
+        call_command("migrate_key_layout", stdout=out)
+
+        content.refresh_from_db()
+        cloud_file.refresh_from_db()
+        self.assertEqual(content.s3_key, build_s3_path(self.user.id, "cas/abc", KeyLayout.SHARDED))
+        self.assertEqual(cloud_file.s3_key, content.s3_key)
+        self.assertEqual(self.storage.open(content.s3_key).read(), b"abc")
+        self.assertIsNone(cloud_file.thumbnails)
+        self.assertIsNone(self.storage.head(f"{old_key}.thumbs/200.webp"))
+        self.assertIn("Moved 1 content objects", out.getvalue())
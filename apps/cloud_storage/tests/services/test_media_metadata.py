@@ -0,0 +1,122 @@
+import io
+import wave
+from datetime import datetime, timezone
+
+from django.test import TestCase, override_settings
+from PIL import ExifTags, Image
+from pypdf import PdfWriter
+
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.services.files.media_metadata import (
+    RangedObjectReader,
+    extract_metadata,
+    extract_metadata_batch,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+def build_jpeg(width, height, exif=None):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "blue").save(output, format="JPEG", exif=exif or Image.Exif())
+    return output.getvalue()
+
+
+def build_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=72, height=72)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def build_wav(seconds, rate=8000):
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(1)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x80" * rate * seconds)
+    return output.getvalue()
+
+
+class CountingStorage(InMemoryStorageClient):
+    def __init__(self):
+        super().__init__()
+        self.ranges = []
+
+    def read_range(self, key, start, length):
+        self.ranges.append((start, length))
+        return super().read_range(key, start, length)
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+class MediaMetadataTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def create_file(self, name, data, content_type):
+        key = f"users/{self.user.id}/{name}"
+        self.storage.save(key, io.BytesIO(data), content_type=content_type)
+        return CloudFileFactory(user=self.user, s3_key=key, size=len(data), content_type=content_type)
+
+    def test_image_size_and_exif_capture_date(self):
+        exif = Image.Exif()
+        exif[ExifTags.Base.DateTime] = "2024:05:01 10:30:00"
+        exif[ExifTags.Base.Make] = "Acme"
+        exif[ExifTags.Base.Orientation] = 6
+        cloud_file = self.create_file("photo.jpg", build_jpeg(40, 30, exif), "image/jpeg")
+
+        self.assertEqual(extract_metadata(self.storage, [cloud_file]), 1)
+
+        cloud_file.refresh_from_db()
+        self.assertEqual(
+            cloud_file.metadata["media"],
+            {"width": 30, "height": 40, "captured_at": "2024-05-01T10:30:00+00:00", "camera_make": "Acme"},
+        )
+        self.assertEqual(cloud_file.captured_at, datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc))
+
+    def test_pdf_page_count_and_audio_duration(self):
+        pdf = self.create_file("doc.pdf", build_pdf(3), "application/pdf")
+        audio = self.create_file("clip.wav", build_wav(2), "audio/wav")
+
+        extract_metadata(self.storage, [pdf, audio])
+
+        pdf.refresh_from_db()
+        audio.refresh_from_db()
+        self.assertEqual(pdf.metadata["media"], {"page_count": 3})
+        self.assertEqual(audio.metadata["media"], {"duration_seconds": 2.0})
+
+    @override_settings(CLOUD_STORAGE_METADATA_READ_BLOCK_BYTES=1024)
+    def test_reads_only_the_header_of_large_files(self):
+        data = build_wav(10)
+        storage = CountingStorage()
+        storage.save("users/1/clip.wav", io.BytesIO(data))
+
+        with io.BufferedReader(RangedObjectReader(storage, "users/1/clip.wav", len(data)), 1024) as reader:
+            self.assertEqual(reader.read(4), b"RIFF")
+            reader.seek(-4, io.SEEK_END)
+            reader.read(4)
+
+        self.assertEqual(storage.ranges, [(0, 1024), (len(data) - 4, 4)])
+
+    @override_settings(CLOUD_STORAGE_METADATA_MAX_READ_BYTES=64, CLOUD_STORAGE_METADATA_READ_BLOCK_BYTES=64)
+    def test_files_past_the_read_limit_are_not_retried(self):
+        self.create_file("doc.pdf", build_pdf(1), "application/pdf")
+
+        batch = extract_metadata_batch(self.storage)
+        self.assertEqual((batch.scanned, batch.extracted), (1, 0))
+
+        self.assertEqual(extract_metadata_batch(self.storage).scanned, 0)
+
+    def test_unsupported_types_are_skipped(self):
+        self.create_file("notes.txt", b"hello", "text/plain")
+
+        self.assertEqual(extract_metadata_batch(self.storage).scanned, 0)
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.cloud_storage.services.files.metadata_export import CSV, NDJSON, build_metadata_export_response
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class MetadataExportTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.first = CloudFileFactory(user=self.user, file_name="a.txt", size=10)
+        self.trashed = CloudFileFactory(user=self.user, file_name="b.txt", size=20, deleted_at=timezone.now())
+        CloudFileFactory(user=UserFactory(), file_name="other.txt")
+
+    def export(self, export_format):
+        response = build_metadata_export_response(self.user, export_format)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_has_one_object_per_file(self):
+        response, body = self.export(NDJSON)
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([(row["id"], row["file_name"], row["size"]) for row in rows], [
+            (self.first.id, "a.txt", 10),
+            (self.trashed.id, "b.txt", 20),
+        ])
+        self.assertIsNone(rows[0]["deleted_at"])
+        self.assertEqual(rows[1]["deleted_at"], self.trashed.deleted_at.isoformat())
+
+    def test_csv_has_a_header_and_one_line_per_file(self):
+        response, body = self.export(CSV)
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertTrue(response["Content-Disposition"].startswith("attachment"))
+        self.assertEqual([row["file_name"] for row in rows], ["a.txt", "b.txt"])
+        self.assertEqual(rows[0]["deleted_at"], "")
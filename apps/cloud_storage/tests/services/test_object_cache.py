@@ -0,0 +1,93 @@
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.http import FileResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.services.files.delete_file import permanent_delete_file
+from apps.cloud_storage.services.files.object_cache import ObjectCache, get_object_cache_stats
+from apps.cloud_storage.services.files.proxy_download import build_file_download_response
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+DATA = bytes(range(100))
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND, CLOUD_STORAGE_OBJECT_CACHE_MAX_OBJECT_BYTES=1024)
+class ObjectCacheTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.addCleanup(cache.clear)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name)
+        settings_override = override_settings(CLOUD_STORAGE_OBJECT_CACHE_DIR=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+        self.cloud_file = self.create_file("a.bin", DATA)
+
+    def create_file(self, name, data):
+        key = f"users/{self.user.id}/{name}"
+        self.storage.save(key, io.BytesIO(data))
+        return CloudFileFactory(
+            user=self.user, file_name=name, s3_key=key, size=len(data), content_type="application/octet-stream",
+        )
+
+    def download(self, cloud_file, **headers):
+        response = build_file_download_response(self.storage, cloud_file, RequestFactory().get("/", headers=headers))
+        self.addCleanup(response.close)
+        return response
+
+    def test_small_objects_are_served_from_the_cache_after_the_first_download(self):
+        first = b"".join(self.download(self.cloud_file).streaming_content)
+        self.storage.delete_file(self.cloud_file.s3_key)
+
+        response = self.download(self.cloud_file)
+        ranged = self.download(self.cloud_file, Range="bytes=10-19")
+
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual((first, b"".join(response.streaming_content)), (DATA, DATA))
+        self.assertEqual(b"".join(ranged.streaming_content), DATA[10:20])
+        stats = get_object_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertEqual(stats["offload_ratio"], 2 / 3)
+
+    def test_large_objects_are_not_cached(self):
+        large = self.create_file("large.bin", DATA * 20)
+
+        b"".join(self.download(large).streaming_content)
+
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+        self.assertEqual(get_object_cache_stats()["misses"], 0)
+
+    def test_deleted_files_leave_the_cache(self):
+        b"".join(self.download(self.cloud_file).streaming_content)
+        self.assertEqual(len(list(self.cache_dir.iterdir())), 1)
+
+        permanent_delete_file(self.storage, self.cloud_file)
+
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        object_cache = ObjectCache(self.cache_dir, max_bytes=250)
+        for used_at, key in enumerate(("a", "b")):
+            object_cache.put("", key, "1", DATA)
+            os.utime(object_cache.entry_path("", key, "1"), (used_at, used_at))
+        object_cache.open("", "a", "1").close()
+
+        object_cache.put("", "c", "1", DATA)
+
+        self.assertEqual(
+            sorted(path.name for path in self.cache_dir.iterdir()),
+            sorted(object_cache.entry_path("", key, "1").name for key in ("a", "c")),
+        )
@@ -0,0 +1,96 @@
+import io
+import tempfile
+
+from django.http import FileResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.cloud_storage.domain.exceptions.file import RangeNotSatisfiableError
+from apps.cloud_storage.integrations.local.storage import LocalStorageClient
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.services.files.proxy_download import (
+    ByteRange,
+    build_file_download_response,
+    parse_range,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+DATA = bytes(range(100))
+
+
+class ParseRangeTests(TestCase):
+
+    def test_ranges(self):
+        self.assertEqual(parse_range("bytes=10-19", 100), ByteRange(start=10, length=10))
+        self.assertEqual(parse_range("bytes=90-", 100), ByteRange(start=90, length=10))
+        self.assertEqual(parse_range("bytes=-5", 100), ByteRange(start=95, length=5))
+        self.assertEqual(parse_range("bytes=95-500", 100), ByteRange(start=95, length=5))
+
+    def test_multiple_or_malformed_ranges_send_the_whole_file(self):
+        for header in (None, "bytes=0-1,5-6", "items=0-1", "bytes=9-2"):
+            self.assertIsNone(parse_range(header, 100))
+
+    def test_range_past_the_end_is_not_satisfiable(self):
+        with self.assertRaises(RangeNotSatisfiableError):
+            parse_range("bytes=100-", 100)
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND, CLOUD_STORAGE_PROXY_CHUNK_BYTES=16)
+class ProxyDownloadTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        user = UserFactory()
+        self.storage.save(f"users/{user.id}/a.bin", io.BytesIO(DATA))
+        self.cloud_file = CloudFileFactory(
+            user=user, file_name="a.bin", s3_key=f"users/{user.id}/a.bin", size=len(DATA),
+            content_type="application/octet-stream",
+        )
+
+    def download(self, **headers):
+        request = RequestFactory().get("/", headers=headers)
+        return build_file_download_response(self.storage, self.cloud_file, request)
+
+    def test_whole_file_is_streamed_in_blocks(self):
+        response = self.download()
+
+        blocks = list(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(blocks), DATA)
+        self.assertEqual(max(len(block) for block in blocks), 16)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_range_resumes_a_download(self):
+        response = self.download(Range="bytes=40-", **{"If-Range": self.download()["ETag"]})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 40-99/100")
+        self.assertEqual(b"".join(response.streaming_content), DATA[40:])
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.download(Range="bytes=40-", **{"If-Range": '"stale"'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), DATA)
+
+    def test_unsatisfiable_range(self):
+        response = self.download(Range="bytes=200-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */100")
+
+    def test_local_disk_objects_are_sent_as_files(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.storage = LocalStorageClient(root=tmp.name)
+        self.storage.save(self.cloud_file.s3_key, io.BytesIO(DATA))
+
+        response = self.download()
+        self.addCleanup(response.close)
+
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(b"".join(response.streaming_content), DATA)
+        self.assertEqual(b"".join(self.download(Range="bytes=0-9").streaming_content), DATA[:10])
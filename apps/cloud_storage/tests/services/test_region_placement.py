@@ -0,0 +1,137 @@
+import io
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import UnknownStorageRegion
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.models import ContentObject
+from apps.cloud_storage.services.files.create_presigned_upload import prepare_file_upload
+from apps.cloud_storage.services.files.delete_file import permanent_delete_file
+from apps.cloud_storage.services.storage.region_migration import (
+    move_user_content_objects_batch,
+    move_user_files_batch,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.utils.region_utils import get_upload_region
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+REGION_SETTINGS = {
+    "CLOUD_STORAGE_BACKEND": MEMORY_BACKEND,
+    "AWS_S3_BUCKET_REGION": "us-east-1",
+    "AWS_S3_REGION_BUCKETS": {"eu-west-1": "test-bucket-eu"},
+}
+
+
+@override_settings(**REGION_SETTINGS)
+class UploadRegionTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+
+    def build_request(self, **headers):
+        request = RequestFactory().post("/", headers=headers)
+        request.user = self.user
+        return request
+
+    def test_header_wins_over_profile_region(self):
+        self.user.storage_region = "us-east-1"
+
+        self.assertEqual(get_upload_region(self.build_request(**{"X-Storage-Region": "eu-west-1"})), "eu-west-1")
+
+    def test_profile_region_is_used_without_header(self):
+        self.user.storage_region = "eu-west-1"
+
+        self.assertEqual(get_upload_region(self.build_request()), "eu-west-1")
+
+    def test_unknown_header_region_is_rejected(self):
+        with self.assertRaises(UnknownStorageRegion):
+            get_upload_region(self.build_request(**{"X-Storage-Region": "mars-1"}))
+
+
+@override_settings(**REGION_SETTINGS)
+class RegionStorageTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.eu_storage = get_region_storage(self.storage, "eu-west-1")
+        self.user = UserFactory()
+        SubscriptionFreePlanFactory(user=self.user)
+
+    def create_file(self, storage, region, name="a.txt"):
+        key = f"users/{self.user.id}/{name}"
+        storage.save(key, io.BytesIO(name.encode()), content_type="text/plain")
+        return CloudFileFactory(user=self.user, s3_key=key, region=region, status=SUCCESS)
+
+    def test_regions_keep_separate_objects(self):
+        self.eu_storage.save("users/1/a.txt", io.BytesIO(b"eu"))
+
+        self.assertIsNone(self.storage.head("users/1/a.txt"))
+        self.assertEqual(self.eu_storage.head("users/1/a.txt")["size"], 2)
+
+    def test_upload_is_presigned_in_its_region(self):
+        result = prepare_file_upload(self.storage, self.user, "a.txt", "text/plain", region="eu-west-1")
+
+        self.assertEqual(result.region, "eu-west-1")
+        self.assertIsNotNone(result.presigned_url)
+
+    def test_permanent_delete_goes_to_the_file_region(self):
+        cloud_file = self.create_file(self.eu_storage, "eu-west-1")
+        cloud_file.soft_delete()
+
+        permanent_delete_file(self.storage, cloud_file)
+
+        self.assertIsNone(self.eu_storage.head(cloud_file.s3_key))
+
+    def test_move_copies_object_and_repoints_file(self):
+        cloud_file = self.create_file(self.storage, "")
+
+        batch = move_user_files_batch(self.storage, self.user.id, "eu-west-1")
+
+        cloud_file.refresh_from_db()
+        self.assertEqual(batch.moved, 1)
+        self.assertEqual((cloud_file.region, cloud_file.bucket_name), ("eu-west-1", "test-bucket-eu"))
+        self.assertIsNone(self.storage.head(cloud_file.s3_key))
+        self.assertEqual(self.eu_storage.open(cloud_file.s3_key).read(), b"a.txt")
+
+    def test_move_repoints_content_objects_and_drops_their_thumbnails(self):
+        key = f"users/{self.user.id}/cas/abc"
+        self.storage.save(key, io.BytesIO(b"abc"))
+        self.storage.save(f"{key}.thumbs/200.webp", io.BytesIO(b"thumb"))
+        content = ContentObject.objects.create(user=self.user, sha256="abc", s3_key=key, status=SUCCESS, ref_count=1)
+        cloud_file = CloudFileFactory(
+            user=self.user,
+            s3_key=key,
+            status=SUCCESS,
+            content_object=content,
+            thumbnails={"format": "WEBP", "sizes": [200]},
+        )
+
+        batch = move_user_content_objects_batch(self.storage, self.user.id, "eu-west-1")
+
+        content.refresh_from_db()
+        cloud_file.refresh_from_db()
+        self.assertEqual(batch.moved, 1)
+        self.assertEqual((content.region, cloud_file.region), ("eu-west-1", "eu-west-1"))
+        self.assertIsNone(cloud_file.thumbnails)
+        self.assertEqual(self.eu_storage.open(key).read(), b"abc")
+        self.assertIsNone(self.storage.head(key))
+        self.assertIsNone(self.storage.head(f"{key}.thumbs/200.webp"))
+
+    def test_command_moves_files_and_sets_profile_region(self):
+        cloud_file = self.create_file(self.eu_storage, "eu-west-1")
+
+        call_command("move_user_region", self.user.id, "us-east-1", stdout=io.StringIO())
+
+        cloud_file.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(cloud_file.region, "us-east-1")
+        self.assertEqual(self.user.storage_region, "us-east-1")
+        self.assertIsNotNone(self.storage.head(cloud_file.s3_key))
+        self.assertIsNone(self.eu_storage.head(cloud_file.s3_key))
@@ -0,0 +1,156 @@
+import io
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.cloud_storage.choices.storage_class_choices import StorageClass
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.domain.exceptions.exceptions import FileRestoreInProgress
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.file_access import (
+    AccessBuffer,
+    ensure_file_readable,
+    record_file_access,
+)
+from apps.cloud_storage.services.storage.storage_tiering import (
+    complete_file_restores,
+    tier_cold_files,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+MB = 1000 * 1000
+
+
+class AccessBufferTests(TestCase):
+
+    @override_settings(CLOUD_STORAGE_ACCESS_FLUSH_SECONDS=3600, CLOUD_STORAGE_ACCESS_FLUSH_SIZE=2)
+    def test_access_times_are_written_in_batches(self):
+        files = CloudFileFactory.create_batch(2, last_accessed_at=None)
+        buffer = AccessBuffer()
+        now = timezone.now()
+
+        buffer.record(files[0].id, now)
+        self.assertFalse(CloudFile.objects.filter(last_accessed_at__isnull=False).exists())
+
+        with self.assertNumQueries(1):
+            buffer.record(files[1].id, now)
+        self.assertEqual(CloudFile.objects.filter(last_accessed_at=now).count(), 2)
+
+    @override_settings(CLOUD_STORAGE_ACCESS_FLUSH_SECONDS=30, CLOUD_STORAGE_ACCESS_FLUSH_SIZE=500)
+    def test_idle_buffer_is_flushed_by_a_timer(self):
+        cloud_file = CloudFileFactory(last_accessed_at=None)
+        buffer = AccessBuffer()
+        now = timezone.now()
+
+        with patch("apps.cloud_storage.services.files.file_access.threading.Timer") as timer:
+            buffer.record(cloud_file.id, now)
+            buffer.record(cloud_file.id, now)
+
+        timer.assert_called_once_with(30, buffer.flush_from_timer)
+        timer.return_value.start.assert_called_once()
+        cloud_file.refresh_from_db()
+        self.assertIsNone(cloud_file.last_accessed_at)
+
+        with patch("apps.cloud_storage.services.files.file_access.connection"):
+            buffer.flush_from_timer()
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.last_accessed_at, now)
+        self.assertIsNone(buffer.timer)
+
+    def test_recent_access_is_not_recorded_again(self):
+        cloud_file = CloudFileFactory(last_accessed_at=timezone.now() - timedelta(minutes=5))
+        recorded = cloud_file.last_accessed_at
+
+        record_file_access(cloud_file)
+
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.last_accessed_at, recorded)
+
+
+@override_settings(
+    CLOUD_STORAGE_BACKEND=MEMORY_BACKEND,
+    CLOUD_STORAGE_COLD_STORAGE_CLASS="GLACIER",
+    CLOUD_STORAGE_COLD_MIN_BYTES=0,
+)
+class StorageTieringTests(APITestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+        SubscriptionFreePlanFactory(user=self.user)
+
+    def create_file(self, idle_days, **kwargs):
+        cloud_file = CloudFileFactory(
+            user=self.user,
+            status=SUCCESS,
+            s3_key=f"users/{self.user.id}/{idle_days}.txt",
+            size=1 * MB,
+            last_accessed_at=timezone.now() - timedelta(days=idle_days),
+            **kwargs,
+        )
+        self.storage.save(cloud_file.s3_key, io.BytesIO(b"data"))
+        return cloud_file
+
+    @override_settings(CLOUD_STORAGE_COLD_AFTER_DAYS=30)
+    def test_idle_files_move_to_cold_class(self):
+        idle = self.create_file(idle_days=45)
+        recent = self.create_file(idle_days=2)
+
+        moved = tier_cold_files(self.storage)
+
+        self.assertEqual(moved, 1)
+        idle.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(idle.storage_class, StorageClass.GLACIER)
+        self.assertIsNotNone(idle.tiered_at)
+        self.assertEqual(self.storage.head(idle.s3_key)["storage_class"], "GLACIER")
+        self.assertEqual(recent.storage_class, StorageClass.STANDARD)
+
+    @override_settings(CLOUD_STORAGE_COLD_AFTER_DAYS=0)
+    def test_plans_without_threshold_are_skipped(self):
+        self.create_file(idle_days=400)
+
+        self.assertEqual(tier_cold_files(self.storage), 0)
+
+    def test_archived_file_download_requests_restore(self):
+        cloud_file = CloudFileFactory(user=self.user, storage_class=StorageClass.GLACIER)
+        storage = Mock()
+        storage.head.return_value = {"size": 1, "storage_class": "GLACIER", "restore_ready": False}
+
+        with self.assertRaises(FileRestoreInProgress):
+            ensure_file_readable(storage, cloud_file)
+        with self.assertRaises(FileRestoreInProgress):
+            ensure_file_readable(storage, cloud_file)
+
+        storage.restore.assert_called_once_with(cloud_file.s3_key, days=7)
+        cloud_file.refresh_from_db()
+        self.assertIsNotNone(cloud_file.restore_requested_at)
+
+    @override_settings(CLOUD_STORAGE_COLD_AFTER_DAYS=30)
+    def test_download_restores_and_returns_file_to_standard(self):
+        cloud_file = self.create_file(idle_days=45)
+        tier_cold_files(self.storage)
+        self.client.force_authenticate(user=self.user)
+        self.storage.set_storage_class(cloud_file.s3_key, "GLACIER")
+
+        response = self.client.get(reverse("storage-detail", args=[cloud_file.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["detail"].code, "file_restoring")
+
+        self.assertEqual(complete_file_restores(self.storage), 1)
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.storage_class, StorageClass.STANDARD)
+        self.assertIsNone(cloud_file.restore_requested_at)
+        self.assertGreater(cloud_file.last_accessed_at, timezone.now() - timedelta(minutes=1))
@@ -0,0 +1,63 @@
+import io
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.domain.exceptions.exceptions import FilePreviewUnavailable
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.services.files.text_preview import get_file_preview
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND, CLOUD_STORAGE_PREVIEW_BYTES=32)
+class TextPreviewTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.addCleanup(cache.clear)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def create_file(self, name, data, content_type):
+        key = f"users/{self.user.id}/{name}"
+        self.storage.save(key, io.BytesIO(data), content_type=content_type)
+        return CloudFileFactory(user=self.user, s3_key=key, size=len(data), content_type=content_type)
+
+    def test_csv_preview_has_header_and_rows(self):
+        cloud_file = self.create_file("data.csv", b"name;age\nann;31\nbob;42\n", "text/csv")
+
+        preview = get_file_preview(self.storage, cloud_file)
+
+        self.assertEqual(preview["header"], ["name", "age"])
+        self.assertEqual(preview["rows"], [["ann", "31"], ["bob", "42"]])
+        self.assertEqual((preview["delimiter"], preview["truncated"]), (";", False))
+
+    def test_large_file_is_cut_at_the_last_whole_line(self):
+        data = "première\n".encode() * 10
+        cloud_file = self.create_file("log.txt", data, "text/plain")
+
+        preview = get_file_preview(self.storage, cloud_file)
+
+        self.assertTrue(preview["truncated"])
+        self.assertEqual(preview["encoding"], "utf-8")
+        self.assertEqual(preview["text"], "première\n" * 3)
+
+    def test_binary_and_unsupported_files_are_rejected(self):
+        binary = self.create_file("data.txt", b"\x00\x01\x02", "text/plain")
+        image = self.create_file("photo.png", b"\x89PNG", "image/png")
+
+        for cloud_file in (binary, image):
+            with self.assertRaises(FilePreviewUnavailable):
+                get_file_preview(self.storage, cloud_file)
+
+    def test_preview_is_served_from_cache(self):
+        cloud_file = self.create_file("notes.txt", b"hello\n", "text/plain")
+        get_file_preview(self.storage, cloud_file)
+
+        self.storage.delete_file(cloud_file.s3_key)
+
+        self.assertEqual(get_file_preview(self.storage, cloud_file)["text"], "hello\n")
@@ -0,0 +1,83 @@
+import io
+
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.services.files.delete_file import permanent_delete_file
+from apps.cloud_storage.services.files.thumbnails import (
+    build_thumbnail_key,
+    generate_thumbnails,
+    generate_thumbnails_batch,
+    get_thumbnail_urls,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.features.choices.feature_code_choices import FeatureCodeChoices
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+def build_png(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(output, format="PNG")
+    return output.getvalue()
+
+
+@override_settings(
+    CLOUD_STORAGE_BACKEND=MEMORY_BACKEND,
+    CLOUD_STORAGE_THUMBNAIL_SIZES=[50, 200],
+    CLOUD_STORAGE_THUMBNAIL_FORMAT="WEBP",
+)
+class ThumbnailTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+        self.subscription = SubscriptionFreePlanFactory(user=self.user)
+
+    def create_image(self, data, content_type="image/png"):
+        key = f"users/{self.user.id}/photo.png"
+        self.storage.save(key, io.BytesIO(data), content_type=content_type)
+        return CloudFileFactory(user=self.user, s3_key=key, size=len(data), content_type=content_type)
+
+    def test_renders_each_size_without_upscaling(self):
+        cloud_file = self.create_image(build_png(400, 100))
+
+        generate_thumbnails(self.storage, [cloud_file])
+
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.thumbnails, {"format": "WEBP", "sizes": [50, 200]})
+        thumbnail = Image.open(self.storage.open(build_thumbnail_key(cloud_file.s3_key, 200, "WEBP")))
+        self.assertEqual(thumbnail.size, (200, 50))
+        self.assertEqual(set(get_thumbnail_urls(self.storage, cloud_file)), {"50", "200"})
+
+    def test_plan_without_file_preview_gets_no_thumbnails(self):
+        self.subscription.plan.features.remove(
+            *self.subscription.plan.features.filter(code=FeatureCodeChoices.FILE_PREVIEW)
+        )
+        cloud_file = self.create_image(build_png(100, 100))
+
+        self.assertEqual(generate_thumbnails(self.storage, [cloud_file]), 0)
+        cloud_file.refresh_from_db()
+        self.assertIsNone(cloud_file.thumbnails)
+
+    def test_undecodable_image_is_not_retried(self):
+        self.create_image(b"not an image")
+
+        batch = generate_thumbnails_batch(self.storage)
+        self.assertEqual((batch.scanned, batch.rendered), (1, 0))
+
+        self.assertEqual(generate_thumbnails_batch(self.storage).scanned, 0)
+
+    def test_permanent_delete_removes_thumbnails(self):
+        cloud_file = self.create_image(build_png(100, 100))
+        generate_thumbnails(self.storage, [cloud_file])
+        cloud_file.refresh_from_db()
+
+        permanent_delete_file(self.storage, cloud_file)
+
+        self.assertIsNone(self.storage.head(build_thumbnail_key(cloud_file.s3_key, 50, "WEBP")))
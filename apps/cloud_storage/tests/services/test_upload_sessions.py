@@ -0,0 +1,106 @@
+import io
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.integrations.s3.events import S3ObjectCreatedEvent
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.finalize_uploads import QuotaBudget
+from apps.cloud_storage.services.files.upload_sessions import (
+    close_upload_session,
+    create_upload_session,
+    register_session_uploads,
+)
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+@patch.object(QuotaBudget, "get_remaining_bytes", return_value=None)
+class UploadSessionTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def upload(self, session, name, size):
+        key = f"{session.key_prefix}{name}"
+        self.storage.save(key, io.BytesIO(b"x" * size))
+        return S3ObjectCreatedEvent(key=key, size=size)
+
+    def test_session_policy_accepts_any_name_under_the_prefix(self, mock_remaining):
+        result = create_upload_session(self.storage, self.user, max_bytes=1000)
+
+        self.assertEqual(result.session.max_bytes, 1000)
+        self.assertTrue(result.session.key_prefix.startswith(f"users/{self.user.id}/"))
+        self.assertEqual(result.policy["fields"]["key"], f"{result.session.key_prefix}${{filename}}")
+
+    def test_uploads_are_registered_once(self, mock_remaining):
+        session = create_upload_session(self.storage, self.user, max_bytes=1000).session
+        events = [self.upload(session, "a.txt", 10), self.upload(session, "docs/b.txt", 20)]
+
+        outcomes = register_session_uploads(self.storage, events)
+        redelivered = register_session_uploads(self.storage, events)
+
+        files = CloudFile.objects.filter(user=self.user).order_by("file_name")
+        self.assertEqual(len(outcomes), 2)
+        self.assertEqual(redelivered, [])
+        self.assertEqual([(f.file_name, f.size, f.status) for f in files], [("a.txt", 10, SUCCESS), ("b.txt", 20, SUCCESS)])
+        session.refresh_from_db()
+        self.assertEqual((session.used_bytes, session.file_count), (30, 2))
+
+    def test_uploads_over_budget_or_after_close_are_deleted(self, mock_remaining):
+        session = create_upload_session(self.storage, self.user, max_bytes=100).session
+        fits = self.upload(session, "a.txt", 80)
+        too_large = self.upload(session, "b.txt", 30)
+
+        register_session_uploads(self.storage, [fits, too_large])
+        close_upload_session(session)
+        late = self.upload(session, "c.txt", 1)
+        register_session_uploads(self.storage, [late])
+
+        self.assertEqual(list(CloudFile.objects.values_list("s3_key", flat=True)), [fits.key])
+        self.assertIsNone(self.storage.head(too_large.key))
+        self.assertIsNone(self.storage.head(late.key))
+        session.refresh_from_db()
+        self.assertEqual((session.file_count, session.rejected_count), (1, 2))
+
+    def test_overwrites_are_charged_their_growth(self, mock_remaining):
+        session = create_upload_session(self.storage, self.user, max_bytes=100).session
+        register_session_uploads(self.storage, [self.upload(session, "a.txt", 1)])
+
+        outcomes = register_session_uploads(self.storage, [self.upload(session, "a.txt", 60)])
+
+        cloud_file = CloudFile.objects.get(user=self.user)
+        self.assertEqual([outcome.file_id for outcome in outcomes], [cloud_file.id])
+        self.assertEqual(cloud_file.size, 60)
+        session.refresh_from_db()
+        self.assertEqual((session.used_bytes, session.file_count), (60, 1))
+
+    def test_overwrites_over_budget_or_after_close_are_deleted_with_their_file(self, mock_remaining):
+        session = create_upload_session(self.storage, self.user, max_bytes=100).session
+        register_session_uploads(
+            self.storage, [self.upload(session, "a.txt", 1), self.upload(session, "b.txt", 1)]
+        )
+
+        too_large = self.upload(session, "a.txt", 100)
+        register_session_uploads(self.storage, [too_large])
+        close_upload_session(session)
+        late = self.upload(session, "b.txt", 2)
+        register_session_uploads(self.storage, [late])
+
+        self.assertFalse(CloudFile._base_manager.exists())
+        self.assertIsNone(self.storage.head(too_large.key))
+        self.assertIsNone(self.storage.head(late.key))
+        session.refresh_from_db()
+        self.assertEqual((session.used_bytes, session.file_count, session.rejected_count), (0, 0, 2))
+
+    def test_keys_outside_sessions_are_ignored(self, mock_remaining):
+        event = S3ObjectCreatedEvent(key=f"users/{self.user.id}/a.txt", size=1)
+
+        self.assertEqual(register_session_uploads(self.storage, [event]), [])
@@ -0,0 +1,92 @@
+import io
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.domain.exceptions.exceptions import StorageQuotaExceeded
+from apps.cloud_storage.domain.exceptions.storage import ObjectNotFoundError
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.integrations.s3.events import S3ObjectCreatedEvent
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.services.files.finalize_uploads import QuotaBudget
+from apps.cloud_storage.services.files.upload_tickets import (
+    TICKET_METADATA_KEY,
+    finalize_ticket_upload,
+    load_upload_ticket,
+    prepare_ticket_upload,
+    register_ticket_events,
+)
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+@patch("apps.cloud_storage.services.files.upload_tickets.get_max_upload_bytes", return_value=1000)
+@patch.object(QuotaBudget, "get_remaining_bytes", return_value=None)
+class UploadTicketTests(TestCase):
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.storage = InMemoryStorageClient()
+        self.user = UserFactory()
+
+    def upload(self, size=10):
+        """Presign a ticket upload and store the object as the signed upload view would."""
+        result = prepare_ticket_upload(self.storage, self.user, "notes.txt", "text/plain")
+        ticket = load_upload_ticket(result.ticket)
+        fields = result.presigned_url["fields"]
+        self.storage.save(
+            ticket["key"],
+            io.BytesIO(b"x" * size),
+            content_type="text/plain",
+            metadata={TICKET_METADATA_KEY: fields[f"x-amz-meta-{TICKET_METADATA_KEY}"]},
+        )
+        return ticket
+
+    def test_presign_writes_no_row(self, mock_remaining, mock_max_bytes):
+        result = prepare_ticket_upload(self.storage, self.user, "notes.txt", "text/plain")
+
+        ticket = load_upload_ticket(result.ticket)
+        self.assertEqual(CloudFile.objects.count(), 0)
+        self.assertEqual((ticket["file_name"], ticket["max_bytes"]), ("notes.txt", 1000))
+        self.assertEqual(result.presigned_url["fields"]["key"], ticket["key"])
+
+    def test_finalize_creates_the_file_once(self, mock_remaining, mock_max_bytes):
+        ticket = self.upload()
+
+        cloud_file, created = finalize_ticket_upload(self.storage, self.user, ticket)
+        again, created_again = finalize_ticket_upload(self.storage, self.user, ticket)
+
+        self.assertEqual((created, created_again), (True, False))
+        self.assertEqual(again.id, cloud_file.id)
+        self.assertEqual((cloud_file.file_name, cloud_file.size, cloud_file.s3_key), ("notes.txt", 10, ticket["key"]))
+
+    def test_event_registers_the_file_from_object_metadata(self, mock_remaining, mock_max_bytes):
+        ticket = self.upload()
+        event = S3ObjectCreatedEvent(key=ticket["key"], size=10)
+
+        outcomes = register_ticket_events(self.storage, [event])
+        redelivered = register_ticket_events(self.storage, [event])
+        cloud_file, created = finalize_ticket_upload(self.storage, self.user, ticket)
+
+        self.assertEqual([o.file_id for o in outcomes], [cloud_file.id])
+        self.assertEqual(redelivered, [])
+        self.assertFalse(created)
+
+    def test_uploads_over_quota_are_deleted(self, mock_remaining, mock_max_bytes):
+        ticket = self.upload()
+        mock_remaining.return_value = 5
+
+        with self.assertRaises(StorageQuotaExceeded):
+            finalize_ticket_upload(self.storage, self.user, ticket)
+
+        self.assertIsNone(self.storage.head(ticket["key"]))
+        self.assertEqual(CloudFile.objects.count(), 0)
+
+    def test_finalize_before_upload_fails(self, mock_remaining, mock_max_bytes):
+        result = prepare_ticket_upload(self.storage, self.user, "notes.txt", "text/plain")
+
+        with self.assertRaises(ObjectNotFoundError):
+            finalize_ticket_upload(self.storage, self.user, load_upload_ticket(result.ticket))
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.cloud_storage.services.folders.path_rewrites import get_subtree_roots
+from apps.cloud_storage.tasks.file_path_updates import (
+    flush_folder_path_rewrites_task,
+    schedule_folder_path_rewrite,
+)
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.tests.factories.folder_factory import FolderFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class FolderPathRewriteDebounceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.root = FolderFactory(user=self.user, name="root")
+        self.child = FolderFactory(user=self.user, name="child", parent=self.root)
+        self.grandchild = FolderFactory(user=self.user, name="grandchild", parent=self.child)
+        self.other = FolderFactory(user=self.user, name="other")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_subtree_roots_drop_nested_folders(self):
+        roots = get_subtree_roots(
+            self.user.id, [self.child.id, self.grandchild.id, self.other.id]
+        )
+
+        self.assertEqual(roots, sorted([self.child.id, self.other.id]))
+
+    def test_subtree_roots_ignore_missing_and_foreign_folders(self):
+        foreign = FolderFactory()
+
+        roots = get_subtree_roots(self.user.id, [self.grandchild.id, foreign.id, 999999])
+
+        self.assertEqual(roots, [self.grandchild.id])
+
+    @override_settings(CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS=60)
+    @patch("apps.cloud_storage.tasks.file_path_updates.update_folder_file_paths_task.delay")
+    def test_flush_waits_for_quiet_period(self, mock_rewrite):
+        schedule_folder_path_rewrite(self.child)
+        schedule_folder_path_rewrite(self.grandchild)
+
+        mock_rewrite.assert_not_called()
+
+    @patch("apps.cloud_storage.tasks.file_path_updates.update_folder_file_paths_task.delay")
+    def test_flush_rewrites_each_subtree_once(self, mock_rewrite):
+        with override_settings(CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS=60):
+            schedule_folder_path_rewrite(self.grandchild)
+            schedule_folder_path_rewrite(self.child)
+            schedule_folder_path_rewrite(self.grandchild)
+            schedule_folder_path_rewrite(self.other)
+
+        flush_folder_path_rewrites_task(self.user.id)
+        flush_folder_path_rewrites_task(self.user.id)
+
+        self.assertEqual(
+            sorted(call.args[0] for call in mock_rewrite.call_args_list),
+            sorted([self.child.id, self.other.id]),
+        )
+
+    def test_rename_updates_nested_file_paths(self):
+        cloud_file = CloudFileFactory(user=self.user, folder=self.grandchild, file_name="a.txt")
+        self.root.name = "renamed"
+        self.root.save()
+
+        schedule_folder_path_rewrite(self.root)
+
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.path, "renamed/child/grandchild/a.txt")
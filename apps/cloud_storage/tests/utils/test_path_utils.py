@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase, override_settings
+
+from apps.cloud_storage.choices.key_layout_choices import KeyLayout
+from apps.cloud_storage.utils.path_utils import build_s3_path, get_key_shard, get_s3_file_name
+
+
+@override_settings(CLOUD_STORAGE_KEY_SHARD_CHARS=2)
+class BuildS3PathTests(SimpleTestCase):
+
+    def test_flat_layout(self):
+        self.assertEqual(build_s3_path(7, "abc.pdf", KeyLayout.FLAT), "users/7/abc.pdf")
+
+    def test_sharded_layout_adds_stable_hash_prefix(self):
+        key = build_s3_path(7, "abc.pdf", KeyLayout.SHARDED)
+
+        shard = get_key_shard("abc.pdf")
+        self.assertEqual(len(shard), 2)
+        self.assertEqual(key, f"users/7/{shard}/abc.pdf")
+        self.assertEqual(build_s3_path(7, "abc.pdf", KeyLayout.SHARDED), key)
+
+    def test_shards_spread_names(self):
+        shards = {get_key_shard(f"file-{i}.txt") for i in range(200)}
+
+        self.assertGreater(len(shards), 100)
+
+    @override_settings(CLOUD_STORAGE_KEY_LAYOUT=KeyLayout.FLAT)
+    def test_defaults_to_configured_layout(self):
+        self.assertEqual(build_s3_path(7, "abc.pdf"), "users/7/abc.pdf")
+
+    def test_get_s3_file_name_reverses_both_layouts(self):
+        for layout in KeyLayout:
+            key = build_s3_path(7, "cas/abc", layout)
+            self.assertEqual(get_s3_file_name(key, 7, layout), "cas/abc")
@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.timezone import now
+
+from apps.cloud_storage.tasks.delete_files import clear_all_deleted_files_from_user
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.utils.task_utils import cache_lock
+from apps.users.factories.user_factory import UserFactory
+
+
+class SingleFlightTaskTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.lock_key = f"single-flight:purge-user:{self.user.id}:lock"
+        self.rerun_key = f"single-flight:purge-user:{self.user.id}:rerun"
+        CloudFileFactory(user=self.user, s3_key="test/a.txt", deleted_at=now())
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("apps.cloud_storage.tasks.delete_files.permanently_delete_user_files")
+    def test_skips_and_flags_rerun_when_already_running(self, mock_delete):
+        cache.add(self.lock_key, 1)
+
+        clear_all_deleted_files_from_user(self.user.id)
+
+        mock_delete.assert_not_called()
+        self.assertTrue(cache.get(self.rerun_key))
+
+    @patch("apps.cloud_storage.tasks.delete_files.permanently_delete_user_files")
+    def test_releases_lock_after_run(self, mock_delete):
+        clear_all_deleted_files_from_user(self.user.id)
+
+        mock_delete.assert_called_once()
+        self.assertIsNone(cache.get(self.lock_key))
+        self.assertIsNone(cache.get(self.rerun_key))
+
+    @patch("apps.cloud_storage.tasks.delete_files.permanently_delete_user_files")
+    def test_releases_lock_when_task_fails(self, mock_delete):
+        mock_delete.side_effect = Exception("boom")
+
+        with self.assertRaises(Exception):
+            clear_all_deleted_files_from_user(self.user.id)
+
+        self.assertIsNone(cache.get(self.lock_key))
+
+    @patch("apps.cloud_storage.tasks.delete_files.permanently_delete_user_files")
+    def test_triggers_during_run_fold_into_one_rerun(self, mock_delete):
+        def retrigger(**kwargs):
+            if mock_delete.call_count == 1:
+                for _ in range(3):
+                    clear_all_deleted_files_from_user.delay(self.user.id)
+
+        mock_delete.side_effect = retrigger
+
+        clear_all_deleted_files_from_user(self.user.id)
+
+        self.assertEqual(mock_delete.call_count, 2)
+        self.assertIsNone(cache.get(self.lock_key))
+        self.assertIsNone(cache.get(self.rerun_key))
+
+    @patch("apps.cloud_storage.tasks.delete_files.permanently_delete_user_files")
+    def test_full_purge_during_retention_purge_reruns_as_full_purge(self, mock_delete):
+        def retrigger(**kwargs):
+            if mock_delete.call_count == 1:
+                clear_all_deleted_files_from_user.delay(self.user.id)
+
+        mock_delete.side_effect = retrigger
+
+        clear_all_deleted_files_from_user(self.user.id, 30)
+
+        self.assertEqual(
+            [call.kwargs["older_than_days"] for call in mock_delete.call_args_list],
+            [30, None],
+        )
+
+    @patch("apps.cloud_storage.tasks.delete_files.permanently_delete_user_files")
+    def test_retention_purge_after_a_pending_full_purge_keeps_the_full_purge(self, mock_delete):
+        def retrigger(**kwargs):
+            if mock_delete.call_count == 1:
+                clear_all_deleted_files_from_user.delay(self.user.id)
+                clear_all_deleted_files_from_user.delay(self.user.id, 30)
+
+        mock_delete.side_effect = retrigger
+
+        clear_all_deleted_files_from_user(self.user.id, 30)
+
+        self.assertEqual(
+            [call.kwargs["older_than_days"] for call in mock_delete.call_args_list],
+            [30, None],
+        )
+
+
+class CacheLockTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_busy_lock_is_not_waited_for(self):
+        cache.add("cache-lock:folders", "other")
+
+        with cache_lock("folders") as acquired:
+            self.assertFalse(acquired)
+
+        self.assertEqual(cache.get("cache-lock:folders"), "other")
+
+    def test_lock_taken_over_after_expiry_is_left_to_its_holder(self):
+        with cache_lock("folders") as acquired:
+            self.assertTrue(acquired)
+            cache.set("cache-lock:folders", "other")
+
+        self.assertEqual(cache.get("cache-lock:folders"), "other")
@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.cloud_storage.choices.cloud_file_error_code_choices import CloudFileErrorCode
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS, FAILED
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class CloudStorageBatchFinalizeViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        SubscriptionFreePlanFactory(user=cls.user)
+        cls.url = reverse("storage-batch-finalize")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    @patch("apps.cloud_storage.integrations.s3.storage.S3StorageClient.head")
+    def test_returns_outcome_per_file(self, mock_head):
+        ok = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/ok.txt")
+        missing = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/missing.txt")
+        done = CloudFileFactory(user=self.user, status=SUCCESS, s3_key="users/1/done.txt")
+        mock_head.side_effect = lambda key: (
+            {"size": 5, "content_type": "text/plain", "metadata": {}} if key == ok.s3_key else None
+        )
+
+        response = self.client.post(
+            self.url, {"file_ids": [ok.id, missing.id, done.id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {item["id"]: item for item in response.data["results"]}
+        self.assertEqual(results[ok.id]["status"], SUCCESS)
+        self.assertEqual(results[missing.id]["status"], FAILED)
+        self.assertEqual(results[missing.id]["code"], CloudFileErrorCode.FILE_NOT_FOUND_IN_S3.value)
+        self.assertEqual(results[done.id]["code"], "file_not_pending")
+
+    def test_empty_list_is_rejected(self):
+        response = self.client.post(self.url, {"file_ids": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unauthenticated_is_rejected(self):
+        self.client.force_authenticate(None)
+
+        response = self.client.post(self.url, {"file_ids": [1]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,136 @@
+import hashlib
+from urllib.parse import urlparse
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.cloud_storage.constants.cloud_files import SUCCESS
+from apps.cloud_storage.integrations.memory.storage import InMemoryStorageClient
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.content_objects import build_content_key
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+MEMORY_BACKEND = "apps.cloud_storage.integrations.memory.storage.InMemoryStorageClient"
+
+CHUNK_A = b"a" * 10
+CHUNK_B = b"b" * 20
+CHUNK_C = b"c" * 5
+
+
+def chunk_spec(data):
+    return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+
+@override_settings(CLOUD_STORAGE_BACKEND=MEMORY_BACKEND)
+class CloudStorageChunkedUploadTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        SubscriptionFreePlanFactory(user=cls.user)
+        cls.url = reverse("storage-chunked-create")
+
+    def setUp(self):
+        InMemoryStorageClient.reset()
+        self.addCleanup(InMemoryStorageClient.reset)
+        self.client.force_authenticate(user=self.user)
+
+    def start(self, chunks):
+        data = {
+            "file_name": "big.txt",
+            "content_type": "text/plain",
+            "size": sum(len(chunk) for chunk in chunks),
+            "chunks": [chunk_spec(chunk) for chunk in chunks],
+        }
+        return self.client.post(self.url, data, format="json")
+
+    def upload_missing(self, response, chunks):
+        for missing in response.data["missing-chunks"]:
+            presigned = missing["presigned-url"]
+            data = {**presigned["fields"], "file": SimpleUploadedFile("chunk", chunks[missing["index"]])}
+            upload = self.client.post(urlparse(presigned["url"]).path, data)
+            self.assertEqual(upload.status_code, 204)
+
+    def complete(self, file_id):
+        url = reverse("storage-chunked-complete", args=[file_id])
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url)
+
+    def test_only_unknown_chunks_are_uploaded(self):
+        first_version = [CHUNK_A, CHUNK_B, CHUNK_A]
+        response = self.start(first_version)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([m["index"] for m in response.data["missing-chunks"]], [0, 1])
+        self.upload_missing(response, first_version)
+        self.assertEqual(self.complete(response.data["file"]["id"]).status_code, status.HTTP_200_OK)
+
+        second_version = [CHUNK_A, CHUNK_C, CHUNK_B]
+        response = self.start(second_version)
+
+        self.assertEqual([m["index"] for m in response.data["missing-chunks"]], [1])
+
+    def test_complete_reports_missing_chunks(self):
+        response = self.start([CHUNK_A, CHUNK_B])
+        file_id = response.data["file"]["id"]
+
+        response = self.complete(file_id)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["missing-chunks"], [0, 1])
+        self.assertNotEqual(CloudFile.objects.get(id=file_id).status, SUCCESS)
+
+    def test_completed_file_is_materialized_and_streamable(self):
+        chunks = [CHUNK_A, CHUNK_B, CHUNK_A]
+        response = self.start(chunks)
+        file_id = response.data["file"]["id"]
+        self.upload_missing(response, chunks)
+
+        self.complete(file_id)
+
+        cloud_file = CloudFile.objects.get(id=file_id)
+        self.assertEqual(cloud_file.status, SUCCESS)
+        self.assertEqual(cloud_file.size, 40)
+        self.assertIsNotNone(cloud_file.manifest.materialized_at)
+        self.assertEqual(InMemoryStorageClient().open(cloud_file.s3_key).read(), CHUNK_A + CHUNK_B + CHUNK_A)
+
+        response = self.client.get(reverse("storage-chunked-download", args=[file_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CHUNK_A + CHUNK_B + CHUNK_A)
+
+    def test_rejects_chunks_not_matching_file_size(self):
+        data = {
+            "file_name": "big.txt",
+            "content_type": "text/plain",
+            "size": 99,
+            "chunks": [chunk_spec(CHUNK_A)],
+        }
+
+        response = self.client.post(self.url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CloudFile.objects.exists())
+
+    def test_permanent_delete_keeps_chunks_used_by_other_files(self):
+        chunks = [CHUNK_A, CHUNK_B]
+        first = self.start(chunks)
+        self.upload_missing(first, chunks)
+        self.complete(first.data["file"]["id"])
+        second = self.start([CHUNK_A])
+        self.complete(second.data["file"]["id"])
+
+        cloud_file = CloudFile.objects.get(id=first.data["file"]["id"])
+        cloud_file.soft_delete()
+        response = self.client.delete(reverse("storage-permanent-delete-file", args=[cloud_file.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        remaining = ContentObject.objects.get(user=self.user)
+        self.assertEqual(remaining.sha256, chunk_spec(CHUNK_A)["sha256"])
+        self.assertEqual(remaining.ref_count, 1)
+        storage = InMemoryStorageClient()
+        self.assertIsNone(storage.head(cloud_file.s3_key))
+        self.assertIsNone(storage.head(build_content_key(self.user.id, chunk_spec(CHUNK_B)["sha256"])))
@@ -5,9 +5,10 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.cloud_storage.constants.cloud_files import SUCCESS
 from apps.cloud_storage.domain.exceptions.exceptions import FileUploadError
 from apps.cloud_storage.integrations.s3.storage import S3StorageClient
-from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.models import CloudFile, ContentObject
 from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
 from apps.cloud_storage.tests.factories.folder_factory import FolderFactory
 from apps.cloud_storage.utils.path_utils import build_object_path
@@ -85,7 +86,10 @@ class CloudStoragePresignedURLTests(APITestCase):
         "create_presigned_post_url",
         return_value={"url": "https://s3-presigned-url.com", "fields": {}},
     )
-    @patch("apps.cloud_storage.services.files.create_presigned_upload.generate_unique_hash")
+    @patch(
+        "apps.cloud_storage.services.files.create_presigned_upload.generate_unique_hash",
+        return_value="hashed-name.png",
+    )
     def test_generate_unique_hash_called_on_file_creation(self, mock_generate_unique_hash, mock_s3):
         response = self.client.post(self.url, self.data, format="json")
 
@@ -270,3 +274,37 @@ class CloudStoragePresignedURLTests(APITestCase):
 
         _, kwargs = mock_create.call_args
         self.assertEqual(kwargs["max_bytes"], plan.max_file_upload_size_bytes)
+
+    def test_create_file_with_known_sha256_is_deduplicated(self):
+        sha256 = "cd" * 32
+        content = ContentObject.objects.create(
+            user=self.user,
+            sha256=sha256,
+            s3_key=f"users/{self.user.id}/cas/{sha256}",
+            size=321,
+            ref_count=1,
+            status=SUCCESS,
+        )
+        self.data["sha256"] = sha256.upper()
+
+        with patch.object(S3StorageClient, "create_presigned_post_url") as mock_s3:
+            response = self.client.post(self.url, self.data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data["deduplicated"])
+        self.assertIsNone(response.data["presigned-url"])
+        mock_s3.assert_not_called()
+
+        cloud_file = CloudFile.objects.get(id=response.data["file"]["id"])
+        self.assertEqual(cloud_file.content_object, content)
+        self.assertEqual(cloud_file.s3_key, content.s3_key)
+        self.assertEqual(cloud_file.status, SUCCESS)
+        self.assertEqual(cloud_file.size, 321)
+
+    def test_create_file_with_invalid_sha256(self):
+        self.data["sha256"] = "not-a-hash"
+
+        response = self.client.post(self.url, self.data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("sha256", response.data)
@@ -0,0 +1,161 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS
+from apps.cloud_storage.domain.exceptions.storage import StorageUnavailableError
+from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.models import CloudFile
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.tests.factories.folder_factory import FolderFactory
+from apps.cloud_storage.tests.factories.share_link_factory import ShareLinkFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class AsyncStorageViewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        SubscriptionFreePlanFactory(user=cls.user)
+        cls.folder = FolderFactory(user=cls.user)
+
+    def setUp(self):
+        self.auth = {"HTTP_AUTHORIZATION": f"Token {self.user.auth_token.key}"}
+
+
+class AsyncCloudFileCreateViewTests(AsyncStorageViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("async-storage-create")
+        self.data = {
+            "file_name": "test-image.png",
+            "folder": self.folder.id,
+            "size": 100,
+            "content_type": "image/png",
+        }
+
+    @patch.object(
+        S3StorageClient,
+        "create_presigned_post_url",
+        return_value={"url": "https://s3-presigned-url.com", "fields": {}},
+    )
+    def test_creates_file_and_returns_presigned_url(self, mock_presign):
+        response = self.client.post(self.url, self.data, content_type="application/json", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        body = response.json()
+        self.assertEqual(body["presigned-url"]["url"], "https://s3-presigned-url.com")
+        cloud_file = CloudFile.objects.get(id=body["file"]["id"])
+        self.assertEqual(cloud_file.user, self.user)
+        self.assertEqual(cloud_file.status, PENDING)
+        mock_presign.assert_called_once()
+
+    def test_invalid_data_returns_400(self):
+        self.data["content_type"] = "text/plain"
+
+        response = self.client.post(self.url, self.data, content_type="application/json", **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CloudFile.objects.exists())
+
+    def test_requires_token(self):
+        response = self.client.post(self.url, self.data, content_type="application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rejects_invalid_token(self):
+        response = self.client.post(
+            self.url, self.data, content_type="application/json", HTTP_AUTHORIZATION="Token nope"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AsyncCloudFileDetailViewTests(AsyncStorageViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cloud_file = CloudFileFactory(user=self.user, s3_key="users/1/a.png")
+        self.url = reverse("async-storage-detail", kwargs={"pk": self.cloud_file.id})
+
+    @patch.object(S3StorageClient, "generate_presigned_download_url", return_value="https://download")
+    def test_returns_file_with_download_url(self, mock_url):
+        response = self.client.get(self.url, **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], self.cloud_file.id)
+        self.assertEqual(response.json()["url"], "https://download")
+        mock_url.assert_called_once_with(object_name="users/1/a.png")
+
+    def test_other_users_file_returns_404(self):
+        other_file = CloudFileFactory()
+
+        response = self.client.get(
+            reverse("async-storage-detail", kwargs={"pk": other_file.id}), **self.auth
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch.object(S3StorageClient, "generate_presigned_download_url", side_effect=StorageUnavailableError())
+    def test_storage_outage_returns_503(self, mock_url):
+        response = self.client.get(self.url, **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class AsyncCloudFileBatchFinalizeViewTests(AsyncStorageViewTestCase):
+
+    @patch.object(S3StorageClient, "head")
+    def test_finalizes_pending_files(self, mock_head):
+        found = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/found")
+        missing = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/missing")
+        mock_head.side_effect = lambda key: (
+            {"size": 10, "content_type": "text/plain", "metadata": {}} if key == found.s3_key else None
+        )
+
+        response = self.client.post(
+            reverse("async-storage-batch-finalize"),
+            {"file_ids": [found.id, missing.id, 999999]},
+            content_type="application/json",
+            **self.auth,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual(results[0], {"id": found.id, "status": SUCCESS})
+        self.assertEqual(results[1]["code"], "file_not_found_in_s3")
+        self.assertEqual(results[2]["code"], "file_not_pending")
+        found.refresh_from_db()
+        self.assertEqual(found.size, 10)
+
+
+class AsyncPublicShareLinkFileDownloadViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.file = CloudFileFactory(file_name="test.txt", s3_key="users/1/test.txt")
+        cls.other_file = CloudFileFactory(file_name="other.txt")
+        cls.share_link = ShareLinkFactory(files=[cls.file])
+
+    def get_url(self, file_id):
+        return reverse(
+            "async-public-share-file-download",
+            kwargs={"token": self.share_link.token, "file_id": file_id},
+        )
+
+    @patch.object(S3StorageClient, "generate_presigned_download_url", return_value="https://download")
+    def test_returns_download_url(self, mock_url):
+        response = self.client.post(self.get_url(self.file.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"url": "https://download"})
+
+    def test_file_outside_share_link_returns_404(self):
+        response = self.client.post(self.get_url(self.other_file.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
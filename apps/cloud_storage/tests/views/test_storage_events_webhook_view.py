@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.cloud_storage.constants.cloud_files import PENDING, SUCCESS
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.subscriptions.factories.subscription import SubscriptionFreePlanFactory
+from apps.users.factories.user_factory import UserFactory
+
+
+class S3EventWebhookViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserFactory()
+        SubscriptionFreePlanFactory(user=cls.user)
+        cls.url = reverse("storage-events-s3")
+
+    def build_payload(self, key, size):
+        return {
+            "Records": [
+                {"eventName": "ObjectCreated:Post", "s3": {"object": {"key": key, "size": size}}}
+            ]
+        }
+
+    def test_valid_token_finalizes_pending_file(self):
+        cloud_file = CloudFileFactory(user=self.user, status=PENDING, s3_key="users/1/file.txt")
+
+        response = self.client.post(
+            self.url,
+            self.build_payload(cloud_file.s3_key, 321),
+            format="json",
+            HTTP_X_AEROBOX_EVENTS_TOKEN="test-events-secret",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        cloud_file.refresh_from_db()
+        self.assertEqual(cloud_file.status, SUCCESS)
+        self.assertEqual(cloud_file.size, 321)
+
+    @patch("apps.cloud_storage.api.views.storage_events.finalize_uploads_from_s3_events_task.delay")
+    def test_invalid_token_is_rejected(self, mock_delay):
+        response = self.client.post(
+            self.url,
+            self.build_payload("users/1/file.txt", 1),
+            format="json",
+            HTTP_X_AEROBOX_EVENTS_TOKEN="wrong",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        mock_delay.assert_not_called()
+
+    @patch("apps.cloud_storage.api.views.storage_events.finalize_uploads_from_s3_events_task.delay")
+    def test_invalid_json_returns_400(self, mock_delay):
+        response = self.client.generic(
+            "POST",
+            self.url,
+            "not-json",
+            content_type="application/json",
+            HTTP_X_AEROBOX_EVENTS_TOKEN="test-events-secret",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_delay.assert_not_called()
@@ -1,12 +1,38 @@
+import hashlib
+
+from django.conf import settings
+
+from apps.cloud_storage.choices.key_layout_choices import KeyLayout
 from apps.cloud_storage.constants.cloud_files import USER_PREFIX
 
 
-def build_s3_path(user_id, file_name):
-    """Builds the full S3 object path for storing a file."""
+def get_key_shard(file_name):
+    """Short, stable hash prefix spreading a user's objects over many S3 prefixes."""
+    digest = hashlib.sha256(file_name.encode("utf-8")).hexdigest()
+    return digest[:settings.CLOUD_STORAGE_KEY_SHARD_CHARS]
+
+
+def build_s3_path(user_id, file_name, layout=None):
+    """
+    Builds the full S3 object path for storing a file, using `layout` or
+    the layout configured for new objects (CLOUD_STORAGE_KEY_LAYOUT).
+    """
+    layout = layout or settings.CLOUD_STORAGE_KEY_LAYOUT
     user_prefix = USER_PREFIX.format(user_id)
+
+    if layout == KeyLayout.SHARDED:
+        return f"{user_prefix}/{get_key_shard(file_name)}/{file_name}".strip("/")
     return f"{user_prefix}/{file_name}".strip("/")
 
 
+def get_s3_file_name(s3_key, user_id, layout):
+    """Inverse of `build_s3_path`: the file name part of an object key."""
+    file_name = s3_key.removeprefix(f"{USER_PREFIX.format(user_id)}/")
+    if layout == KeyLayout.SHARDED:
+        file_name = file_name.split("/", 1)[1]
+    return file_name
+
+
 def build_object_path(file_name, folder=None):
     """
     Builds the full S3 object path for a file inside a folder (if provided),
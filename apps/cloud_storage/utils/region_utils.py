@@ -0,0 +1,59 @@
+from typing import List
+
+from django.conf import settings
+
+from apps.cloud_storage.domain.exceptions.exceptions import UnknownStorageRegion
+
+
+def get_default_region() -> str:
+    return settings.AWS_S3_BUCKET_REGION or ""
+
+
+def is_default_region(region: str) -> bool:
+    """Rows stored before multi-region placement have an empty region."""
+    return not region or region == get_default_region()
+
+
+def is_storage_region(region: str) -> bool:
+    return is_default_region(region) or region in settings.AWS_S3_REGION_BUCKETS
+
+
+def get_storage_regions() -> List[str]:
+    """Every region objects may live in, the default one first."""
+    return [get_default_region()] + [
+        region for region in settings.AWS_S3_REGION_BUCKETS if not is_default_region(region)
+    ]
+
+
+def get_region_aliases(region: str) -> List[str]:
+    """Values a row's `region` may hold for objects stored in `region`."""
+    if is_default_region(region):
+        return ["", get_default_region()]
+    return [region]
+
+
+def get_region_bucket(region: str) -> str:
+    if is_default_region(region):
+        return settings.AWS_STORAGE_BUCKET_NAME or ""
+    return settings.AWS_S3_REGION_BUCKETS[region]
+
+
+def get_bucket_region(bucket: str) -> str:
+    """Region whose bucket is `bucket`; the default one when it is unknown or empty."""
+    for region in get_storage_regions():
+        if bucket and get_region_bucket(region) == bucket:
+            return region
+    return get_default_region()
+
+
+def get_upload_region(request) -> str:
+    """
+    Region for a new upload: the region header when sent, else the user's
+    profile region, else the default one.
+    """
+    region = request.headers.get(settings.CLOUD_STORAGE_REGION_HEADER)
+    if region and not is_storage_region(region):
+        raise UnknownStorageRegion()
+
+    region = region or request.user.storage_region
+    return region if is_storage_region(region) else get_default_region()
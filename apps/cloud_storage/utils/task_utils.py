@@ -0,0 +1,98 @@
+import logging
+import secrets
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger("aerobox")
+
+
+def single_flight(key_func, merge=None, repeat=None, timeout=None):
+    """
+    Run a bound Celery task at most once at a time per key.
+
+    A run that finds the key locked leaves a "rerun" flag holding its
+    arguments and returns. When the running task finishes it releases the
+    lock and, if the flag was set, enqueues exactly one follow-up run with
+    the arguments of the latest trigger, so any number of triggers that
+    arrive while work is in progress fold into a single extra run.
+    `merge(pending, new)` picks the run to keep when triggers with different
+    arguments collide; each is a {"args", "kwargs"} dict.
+
+    `repeat(result)` returning True enqueues the same run again once the
+    lock is released, for tasks that do their work a slice at a time.
+    `timeout` bounds how long a dead worker's lock blocks new runs; it
+    defaults to CLOUD_STORAGE_TASK_LOCK_TIMEOUT.
+
+    Usage:
+        @shared_task(bind=True)
+        @single_flight(lambda user_id: f"purge-user:{user_id}")
+        def my_task(self, user_id): ...
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(task, *args, **kwargs):
+            key = key_func(*args, **kwargs)
+            lock_key = f"single-flight:{key}:lock"
+            rerun_key = f"single-flight:{key}:rerun"
+            lock_timeout = timeout or settings.CLOUD_STORAGE_TASK_LOCK_TIMEOUT
+
+            if not cache.add(lock_key, 1, lock_timeout):
+                rerun = {"args": args, "kwargs": kwargs}
+                pending = cache.get(rerun_key) if merge is not None else None
+                if pending is not None:
+                    rerun = merge(pending, rerun)
+                cache.set(rerun_key, rerun, lock_timeout)
+                # The holder may have released the lock before seeing the flag
+                if not cache.add(lock_key, 1, lock_timeout):
+                    logger.info("Task %s already running for %s, rerun scheduled.", task.name, key)
+                    return None
+                cache.delete(rerun_key)
+
+            result = None
+            try:
+                result = func(task, *args, **kwargs)
+                return result
+            finally:
+                cache.delete(lock_key)
+                rerun = cache.get(rerun_key)
+                if rerun is not None and cache.delete(rerun_key):
+                    logger.info("Re-running task %s for %s.", task.name, key)
+                    task.apply_async(args=rerun["args"], kwargs=rerun["kwargs"])
+                elif repeat is not None and repeat(result):
+                    task.apply_async(args=args, kwargs=kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def cache_lock(key, timeout=10, wait=0.0):
+    """
+    Short mutual-exclusion section backed by the cache.
+
+    Yields True once the lock is held, or False if it could not be taken
+    within `wait` seconds (one attempt by default, so request handlers never
+    stall on it); callers decide how to degrade in that case. The lock is
+    only released by its holder: one that outlived `timeout` and was taken
+    over is left to the new holder.
+    """
+    lock_key = f"cache-lock:{key}"
+    token = secrets.token_hex(8)
+    deadline = time.monotonic() + wait
+
+    acquired = cache.add(lock_key, token, timeout)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.005)
+        acquired = cache.add(lock_key, token, timeout)
+
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
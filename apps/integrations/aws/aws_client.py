@@ -1,34 +1,80 @@
+import os
+import threading
+
 import boto3
+from botocore.config import Config
 from django.conf import settings
 
 
 class AWSClient:
     _instances = {}
+    _instances_lock = threading.Lock()
 
-    def __new__(cls, service_name, *args, **kwargs):
+    def __new__(cls, service_name, region_name=None, *args, **kwargs):
         """
         Implement the singleton pattern for the AWS client,
-        making sure only one instance per service is created.
+        making sure only one instance per service and region is created.
         """
-        if service_name not in cls._instances:
-            cls._instances[service_name] = super(AWSClient, cls).__new__(cls)
-            cls._instances[service_name]._init_client(service_name)
-        return cls._instances[service_name]
+        region_name = region_name or settings.AWS_S3_BUCKET_REGION
+        key = (service_name, region_name)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                instance = super(AWSClient, cls).__new__(cls)
+                instance.service_name = service_name
+                instance.region_name = region_name
+                instance._reset()
+                cls._instances[key] = instance
+        return cls._instances[key]
+
+    def _reset(self):
+        self.client = None
+        self._pid = None
+        self._client_lock = threading.Lock()
 
-    def _init_client(self, service_name):
+    def _init_client(self):
         """
-        Initialize the boto3 client for the given AWS service.
-        This method is called only once per service.
+        Build the boto3 client for this service.
+
+        The pool is sized for the threads that share it, retries use adaptive
+        mode (client-side rate limiting on throttling) and connect/read
+        timeouts are bounded so a degraded endpoint cannot hang a request.
         """
-        self.client = boto3.client(
-            service_name,
+        config = Config(
+            max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+            read_timeout=settings.AWS_READ_TIMEOUT,
+            retries={
+                "mode": "adaptive",
+                "max_attempts": settings.AWS_RETRY_MAX_ATTEMPTS,
+            },
+        )
+        return boto3.session.Session().client(
+            self.service_name,
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_S3_BUCKET_REGION
+            region_name=self.region_name,
+            config=config,
         )
 
     def get_client(self):
         """
-        Return the initialized boto3 client.
+        Return the boto3 client, creating it on first use in this process.
+        Clients (and their connection pools) are never shared across a fork.
         """
+        pid = os.getpid()
+        if self.client is None or self._pid != pid:
+            with self._client_lock:
+                if self.client is None or self._pid != pid:
+                    self.client = self._init_client()
+                    self._pid = pid
         return self.client
+
+    @classmethod
+    def reset_after_fork(cls):
+        for instance in cls._instances.values():
+            instance._reset()
+        cls._instances_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=AWSClient.reset_after_fork)
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger("aerobox")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-process circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail immediately with CircuitOpenError. Once `reset_timeout` seconds have
+    passed a single trial call is let through: success closes the circuit,
+    failure opens it again.
+
+    `is_failure(exc)` decides which exceptions count against the dependency;
+    anything else (e.g. a 404) is passed through and counts as a success.
+    """
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30, is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda exc: True)
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, name, **kwargs):
+        """Return the shared breaker for `name`, creating it on first use."""
+        with cls._registry_lock:
+            if name not in cls._registry:
+                cls._registry[name] = cls(name, **kwargs)
+            return cls._registry[name]
+
+    def call(self, func, *args, **kwargs):
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as exc:
+            if self.is_failure(exc):
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        self._record_success()
+        return result
+
+    def _before_call(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return
+            raise CircuitOpenError(f"Circuit '{self.name}' is open.")
+
+    def _record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit '%s' closed.", self.name)
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def _record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.error(
+                        "Circuit '%s' opened after %s failure(s).", self.name, self.failures
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.integrations.aws.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+def fail():
+    raise OSError("down")
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.breaker.call(fail)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: "ok")
+
+    def test_success_resets_failure_count(self):
+        with self.assertRaises(OSError):
+            self.breaker.call(fail)
+        self.breaker.call(lambda: "ok")
+        with self.assertRaises(OSError):
+            self.breaker.call(fail)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_ignored_errors_do_not_open_circuit(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, is_failure=lambda exc: False)
+
+        with self.assertRaises(OSError):
+            breaker.call(fail)
+
+        self.assertEqual(breaker.state, CLOSED)
+
+    @patch("apps.integrations.aws.circuit_breaker.time.monotonic")
+    def test_half_open_trial_closes_or_reopens(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.breaker.call(fail)
+
+        mock_monotonic.return_value = 131
+        with self.assertRaises(OSError):
+            self.breaker.call(fail)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        mock_monotonic.return_value = 162
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    @patch("apps.integrations.aws.circuit_breaker.time.monotonic")
+    def test_only_one_trial_call_while_half_open(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                self.breaker.call(fail)
+
+        mock_monotonic.return_value = 131
+
+        def concurrent_call():
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.call(lambda: "ok")
+            return "trial"
+
+        self.assertEqual(self.breaker.call(concurrent_call), "trial")
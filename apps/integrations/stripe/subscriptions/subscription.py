@@ -40,3 +40,28 @@ def get_stripe_subscription(stripe_subscription_id):
         )
 
     return None
+
+
+def cancel_stripe_subscription(stripe_subscription_id) -> bool:
+    """
+    Cancel a Stripe subscription immediately.
+
+    Returns True when the subscription is cancelled or no longer exists on
+    Stripe, so callers can retry safely. Other Stripe errors are raised.
+    """
+    try:
+        stripe.Subscription.cancel(stripe_subscription_id)
+        return True
+
+    except stripe.error.InvalidRequestError as e:
+        if getattr(e, "code", None) == "resource_missing":
+            logger.info(
+                "Stripe subscription already gone, nothing to cancel.",
+                extra={"stripe_subscription_id": stripe_subscription_id},
+            )
+            return True
+        logger.error(
+            "Stripe rejected the subscription cancellation.",
+            extra={"stripe_subscription_id": stripe_subscription_id, "error": str(e)},
+        )
+        raise
@@ -1,6 +1,7 @@
 import logging
-from typing import Tuple
+from typing import List, Tuple
 
+from django.conf import settings
 from django.db import models
 
 from apps.features.choices.feature_code_choices import FeatureCodeChoices
@@ -86,6 +87,42 @@ class Plan(Timestampable):
         except (TypeError, ValueError):
             return None
 
+    @property
+    def cold_storage_after_days(self):
+        """
+        Days without downloads before a file moves to cold storage, from the
+        cloud storage feature metadata. None (or 0) disables tiering.
+        """
+        meta = self.effective_feature_metadata(FeatureCodeChoices.CLOUD_STORAGE.value)
+        days = meta.get("cold_storage_after_days", settings.CLOUD_STORAGE_COLD_AFTER_DAYS)
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            return None
+        return days if days > 0 else None
+
+    @property
+    def cdn_downloads(self) -> bool:
+        """Whether downloads are served from the CDN (cloud storage metadata)."""
+        meta = self.effective_feature_metadata(FeatureCodeChoices.CLOUD_STORAGE.value)
+        return bool(meta.get("cdn_downloads", False))
+
+    @property
+    def thumbnail_sizes(self) -> List[int]:
+        """
+        Thumbnail widths rendered for the plan's images, from the file preview
+        feature metadata. Empty when the plan has no file preview.
+        """
+        if not self.features.filter(code=FeatureCodeChoices.FILE_PREVIEW.value).exists():
+            return []
+
+        meta = self.effective_feature_metadata(FeatureCodeChoices.FILE_PREVIEW.value)
+        sizes = meta.get("thumbnail_sizes", settings.CLOUD_STORAGE_THUMBNAIL_SIZES)
+        try:
+            return sorted({int(size) for size in sizes if int(size) > 0})
+        except (TypeError, ValueError):
+            return []
+
     @property
     def file_sharing_config(self):
         return self.effective_feature_metadata(FeatureCodeChoices.FILE_SHARING.value)
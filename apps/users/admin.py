@@ -1,9 +1,38 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
+from django.utils.translation import gettext_lazy as _
 
-from .models import User
+from .models import AccountDeletion, User
 
 
 @admin.register(User)
 class UserAdmin(DjangoUserAdmin):
-    pass
+    fieldsets = DjangoUserAdmin.fieldsets + (
+        (_("Storage"), {"fields": ("storage_region",)}),
+    )
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user_id",
+        "username",
+        "status",
+        "step",
+        "files_deleted",
+        "objects_deleted",
+        "updated_at",
+    )
+    list_filter = ("status", "step")
+    readonly_fields = (
+        "share_links_deleted",
+        "files_deleted",
+        "folders_deleted",
+        "objects_deleted",
+        "object_region",
+        "object_cursor",
+        "completed_at",
+        "created_at",
+        "updated_at",
+    )
@@ -3,6 +3,8 @@ from django.contrib.auth.password_validation import validate_password
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
+from apps.cloud_storage.utils.region_utils import is_storage_region
+
 User = get_user_model()
 
 
@@ -56,10 +58,16 @@ class UserSerializer(serializers.ModelSerializer):
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ["username"]
+        fields = ["username", "storage_region"]
+
+    def validate_storage_region(self, value):
+        # Existing files stay where they are; new uploads go to the new region
+        if value and not is_storage_region(value):
+            raise serializers.ValidationError(_("This storage region is not available."))
+        return value
 
 
 class UserDetailsSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ["username", "email"]
+        fields = ["username", "email", "storage_region"]
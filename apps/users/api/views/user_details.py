@@ -1,7 +1,11 @@
+from rest_framework import status
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from apps.users.api.serializers.user_serializer import UserDetailsSerializer
+from apps.users.services.account_deletion import request_account_deletion
+from apps.users.tasks.account_deletion import process_account_deletion
 from config.api_docs.custom_extensions import api_users_tag
 
 
@@ -12,3 +16,17 @@ class UserDetailsView(RetrieveAPIView):
 
     def get_object(self):
         return self.request.user
+
+    def delete(self, request, *args, **kwargs):
+        """
+        Delete the account and everything it stores. The user is logged out
+        immediately; files, folders, share links and stored objects are
+        removed in the background.
+        """
+        deletion = request_account_deletion(request.user)
+        process_account_deletion.delay(deletion.id)
+
+        return Response(
+            {"id": deletion.id, "status": deletion.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
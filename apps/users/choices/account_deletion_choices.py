@@ -0,0 +1,21 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class AccountDeletionStatusChoices(models.TextChoices):
+    PENDING = "pending", _("Pending")
+    RUNNING = "running", _("Running")
+    COMPLETED = "completed", _("Completed")
+    FAILED = "failed", _("Failed")
+
+
+class AccountDeletionStepChoices(models.TextChoices):
+    """Steps run in declaration order."""
+
+    CANCEL_SUBSCRIPTION = "cancel_subscription", _("Cancel subscription")
+    DELETE_SHARE_LINKS = "delete_share_links", _("Delete share links")
+    DELETE_FILES = "delete_files", _("Delete files")
+    DELETE_FOLDERS = "delete_folders", _("Delete folders")
+    DELETE_OBJECTS = "delete_objects", _("Delete stored objects")
+    DELETE_USER = "delete_user", _("Delete user")
+    DONE = "done", _("Done")
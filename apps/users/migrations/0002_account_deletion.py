@@ -0,0 +1,79 @@
+# Generated by Django 4.2.15 on 2026-10-19 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountDeletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("user_id", models.BigIntegerField(db_index=True)),
+                ("username", models.CharField(max_length=150)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "step",
+                    models.CharField(
+                        choices=[
+                            ("cancel_subscription", "Cancel subscription"),
+                            ("delete_share_links", "Delete share links"),
+                            ("delete_files", "Delete files"),
+                            ("delete_folders", "Delete folders"),
+                            ("delete_objects", "Delete stored objects"),
+                            ("delete_user", "Delete user"),
+                            ("done", "Done"),
+                        ],
+                        default="cancel_subscription",
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "object_cursor",
+                    models.CharField(
+                        blank=True,
+                        help_text="Last S3 key processed, used to resume the object sweep.",
+                        max_length=1024,
+                        null=True,
+                    ),
+                ),
+                ("share_links_deleted", models.PositiveBigIntegerField(default=0)),
+                ("files_deleted", models.PositiveBigIntegerField(default=0)),
+                ("folders_deleted", models.PositiveBigIntegerField(default=0)),
+                ("objects_deleted", models.PositiveBigIntegerField(default=0)),
+                ("error_message", models.TextField(blank=True, null=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Account Deletion",
+                "verbose_name_plural": "Account Deletions",
+            },
+        ),
+    ]
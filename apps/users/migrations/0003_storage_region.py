@@ -0,0 +1,33 @@
+# Generated by Django 4.2.15 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_account_deletion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="accountdeletion",
+            name="object_region",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Region whose objects are being swept.",
+                max_length=32,
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="storage_region",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Region new uploads are stored in. Empty means the default region.",
+                max_length=32,
+            ),
+        ),
+    ]
@@ -1 +1,2 @@
 from .user import User
+from .account_deletion import AccountDeletion
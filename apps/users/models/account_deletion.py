@@ -0,0 +1,60 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.users.choices.account_deletion_choices import (
+    AccountDeletionStatusChoices,
+    AccountDeletionStepChoices,
+)
+from config.models import Timestampable
+
+
+class AccountDeletion(Timestampable):
+    """
+    Progress of an account removal. The row outlives the user on purpose, so
+    `user_id` is a plain column rather than a foreign key.
+    """
+
+    user_id = models.BigIntegerField(db_index=True)
+    username = models.CharField(max_length=150)
+    status = models.CharField(
+        max_length=10,
+        choices=AccountDeletionStatusChoices.choices,
+        default=AccountDeletionStatusChoices.PENDING.value,
+    )
+    step = models.CharField(
+        max_length=32,
+        choices=AccountDeletionStepChoices.choices,
+        default=AccountDeletionStepChoices.CANCEL_SUBSCRIPTION.value,
+    )
+    object_region = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text=_("Region whose objects are being swept."),
+    )
+    object_cursor = models.CharField(
+        max_length=1024,
+        null=True,
+        blank=True,
+        help_text=_("Last S3 key processed, used to resume the object sweep."),
+    )
+    share_links_deleted = models.PositiveBigIntegerField(default=0)
+    files_deleted = models.PositiveBigIntegerField(default=0)
+    folders_deleted = models.PositiveBigIntegerField(default=0)
+    objects_deleted = models.PositiveBigIntegerField(default=0)
+    error_message = models.TextField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Account Deletion")
+        verbose_name_plural = _("Account Deletions")
+
+    def __str__(self):
+        return f"{self.username} (ID:{self.user_id}) - {self.status}/{self.step}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (
+            AccountDeletionStatusChoices.COMPLETED.value,
+            AccountDeletionStatusChoices.FAILED.value,
+        )
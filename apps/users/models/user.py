@@ -2,8 +2,10 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.db import models
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 from apps.cloud_storage.domain.exceptions.share_link import (
     FolderSharingNotAllowed,
@@ -15,6 +17,12 @@ from apps.subscriptions.choices.subscription_choices import SubscriptionStatusCh
 
 
 class User(AbstractUser):
+    storage_region = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text=_("Region new uploads are stored in. Empty means the default region."),
+    )
 
     @property
     def active_subscription(self):
@@ -0,0 +1,145 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from apps.cloud_storage.integrations.backends import get_region_storage
+from apps.cloud_storage.services.accounts.purge_user_storage import (
+    delete_user_share_links_chunk,
+    delete_user_files_chunk,
+    delete_user_folders_chunk,
+    delete_user_objects_batch,
+)
+from apps.cloud_storage.utils.region_utils import get_storage_regions
+from apps.integrations.stripe.subscriptions.subscription import cancel_stripe_subscription
+from apps.subscriptions.choices.subscription_choices import SubscriptionStatusChoices
+from apps.subscriptions.models import Subscription
+from apps.users.choices.account_deletion_choices import (
+    AccountDeletionStatusChoices,
+    AccountDeletionStepChoices,
+)
+from apps.users.models import AccountDeletion, User
+
+logger = logging.getLogger("aerobox")
+
+STEP_ORDER = list(AccountDeletionStepChoices.values)
+
+
+def request_account_deletion(user) -> AccountDeletion:
+    """
+    Lock the user out and register the deletion. The heavy work is done by
+    the `process_account_deletion` task.
+    """
+    with transaction.atomic():
+        deletion = (
+            AccountDeletion.objects.filter(user_id=user.id)
+            .exclude(status=AccountDeletionStatusChoices.FAILED.value)
+            .first()
+        )
+        if deletion:
+            return deletion
+
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        Token.objects.filter(user=user).delete()
+
+        return AccountDeletion.objects.create(user_id=user.id, username=user.username)
+
+
+def run_account_deletion(deletion: AccountDeletion, storage, chunk_size: int, max_chunks: int) -> bool:
+    """
+    Run up to `max_chunks` units of work, saving progress after each one.
+    Returns True once the account is fully removed.
+    """
+    if deletion.status == AccountDeletionStatusChoices.PENDING.value:
+        deletion.status = AccountDeletionStatusChoices.RUNNING.value
+        deletion.save(update_fields=["status", "updated_at"])
+
+    for _ in range(max_chunks):
+        if deletion.step == AccountDeletionStepChoices.DONE.value:
+            break
+
+        handler = STEP_HANDLERS[deletion.step]
+        if handler(deletion, storage, chunk_size):
+            deletion.step = STEP_ORDER[STEP_ORDER.index(deletion.step) + 1]
+        deletion.save()
+
+    if deletion.step == AccountDeletionStepChoices.DONE.value:
+        deletion.status = AccountDeletionStatusChoices.COMPLETED.value
+        deletion.completed_at = timezone.now()
+        deletion.error_message = None
+        deletion.save(update_fields=["status", "completed_at", "error_message", "updated_at"])
+        return True
+
+    return False
+
+
+def cancel_subscriptions_step(deletion, storage, chunk_size) -> bool:
+    subscriptions = Subscription.objects.filter(
+        user_id=deletion.user_id, stripe_subscription_id__isnull=False
+    ).exclude(status=SubscriptionStatusChoices.CANCELED.value)
+
+    for subscription in subscriptions:
+        cancel_stripe_subscription(subscription.stripe_subscription_id)
+        subscription.status = SubscriptionStatusChoices.CANCELED.value
+        subscription.save(update_fields=["status", "updated_at"])
+
+    return True
+
+
+def delete_share_links_step(deletion, storage, chunk_size) -> bool:
+    deleted = delete_user_share_links_chunk(deletion.user_id, chunk_size)
+    deletion.share_links_deleted += deleted
+    return deleted < chunk_size
+
+
+def delete_files_step(deletion, storage, chunk_size) -> bool:
+    deleted = delete_user_files_chunk(deletion.user_id, chunk_size)
+    deletion.files_deleted += deleted
+    return deleted < chunk_size
+
+
+def delete_folders_step(deletion, storage, chunk_size) -> bool:
+    deleted = delete_user_folders_chunk(deletion.user_id, chunk_size)
+    deletion.folders_deleted += deleted
+    return deleted == 0
+
+
+def delete_objects_step(deletion, storage, chunk_size) -> bool:
+    """Sweep the user's prefix in every storage region, one page at a time."""
+    regions = get_storage_regions()
+    region = deletion.object_region or regions[0]
+
+    deleted, last_key, has_more = delete_user_objects_batch(
+        get_region_storage(storage, region),
+        user_id=deletion.user_id,
+        start_after=deletion.object_cursor,
+        max_keys=min(chunk_size, 1000),
+    )
+    deletion.objects_deleted += deleted
+    deletion.object_cursor = last_key
+    if has_more:
+        return False
+
+    next_index = regions.index(region) + 1 if region in regions else len(regions)
+    if next_index < len(regions):
+        deletion.object_region = regions[next_index]
+        deletion.object_cursor = None
+        return False
+    return True
+
+
+def delete_user_step(deletion, storage, chunk_size) -> bool:
+    User.objects.filter(id=deletion.user_id).delete()
+    return True
+
+
+STEP_HANDLERS = {
+    AccountDeletionStepChoices.CANCEL_SUBSCRIPTION.value: cancel_subscriptions_step,
+    AccountDeletionStepChoices.DELETE_SHARE_LINKS.value: delete_share_links_step,
+    AccountDeletionStepChoices.DELETE_FILES.value: delete_files_step,
+    AccountDeletionStepChoices.DELETE_FOLDERS.value: delete_folders_step,
+    AccountDeletionStepChoices.DELETE_OBJECTS.value: delete_objects_step,
+    AccountDeletionStepChoices.DELETE_USER.value: delete_user_step,
+}
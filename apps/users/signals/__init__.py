@@ -1,3 +1,4 @@
 from apps.users.signals.create_basic_subscription import *
 from apps.users.signals.create_profile import *
 from apps.users.signals.create_token import *
+from apps.users.signals.delete_content_objects import *
@@ -0,0 +1,51 @@
+import logging
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from apps.cloud_storage.integrations.backends import get_region_storage, get_storage
+from apps.cloud_storage.models import CloudFile, ContentObject
+from apps.cloud_storage.services.files.object_cache import discard_cached_object
+
+logger = logging.getLogger("aerobox")
+
+User = get_user_model()
+
+
+@receiver(pre_delete, sender=User)
+def delete_content_objects(sender, instance, *args, **kwargs):
+    """
+    A user deleted outside the account deletion pipeline (admin,
+    `User.delete()`) takes their deduplicated objects along: the files
+    backed by them are deleted with the user, and the objects leave storage
+    once the deletion commits. Other files keep their rows, without owner.
+    """
+    keys_by_region = defaultdict(list)
+    for region, key in ContentObject.objects.filter(user=instance).values_list("region", "s3_key"):
+        keys_by_region[region].append(key)
+    if not keys_by_region:
+        return
+
+    CloudFile._base_manager.filter(user=instance, content_object__isnull=False).delete()
+    user_id = instance.id
+
+    def delete_objects():
+        storage = get_storage()
+        for region, keys in keys_by_region.items():
+            region_storage = get_region_storage(storage, region)
+            failed = []
+            # DeleteObjects takes at most 1000 keys
+            for start in range(0, len(keys), 1000):
+                failed += region_storage.delete_files(keys[start:start + 1000])
+            for key in keys:
+                discard_cached_object(region, key)
+            if failed:
+                logger.error(
+                    "Failed to delete content objects of a deleted user.",
+                    extra={"user_id": user_id, "region": region, "keys": failed},
+                )
+
+    transaction.on_commit(delete_objects)
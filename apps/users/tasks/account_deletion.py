@@ -0,0 +1,81 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from apps.cloud_storage.integrations.backends import get_storage
+from apps.cloud_storage.utils.task_utils import single_flight
+from apps.users.choices.account_deletion_choices import AccountDeletionStatusChoices
+from apps.users.models import AccountDeletion
+from apps.users.services.account_deletion import run_account_deletion
+
+logger = logging.getLogger("aerobox")
+
+
+@shared_task(bind=True, acks_late=True, max_retries=5)
+@single_flight(
+    lambda deletion_id: f"account-deletion:{deletion_id}",
+    # Re-enqueued once the lock is released, so the next slice is not folded into a rerun
+    repeat=lambda finished: finished is False,
+    # A message redelivered after a crash waits no longer than a stale job would
+    timeout=settings.ACCOUNT_DELETION_STALE_MINUTES * 60,
+)
+def process_account_deletion(self, deletion_id):
+    """
+    Work through an account deletion a few chunks at a time, re-enqueueing
+    itself until done. Progress lives on the AccountDeletion row, so a lost
+    worker only costs the chunk in flight. Runs for the same deletion (a
+    resume racing a live worker) fold into one.
+    """
+    deletion = AccountDeletion.objects.filter(id=deletion_id).first()
+    if not deletion or deletion.is_finished:
+        return None
+
+    try:
+        finished = run_account_deletion(
+            deletion,
+            storage=get_storage(),
+            chunk_size=settings.ACCOUNT_DELETION_CHUNK_SIZE,
+            max_chunks=settings.ACCOUNT_DELETION_CHUNKS_PER_TASK,
+        )
+    except Exception as exc:
+        logger.exception(
+            "Account deletion step failed.",
+            extra={"deletion_id": deletion_id, "step": deletion.step},
+        )
+        deletion.error_message = str(exc)
+        if self.request.retries >= self.max_retries:
+            deletion.status = AccountDeletionStatusChoices.FAILED.value
+        deletion.save(update_fields=["error_message", "status", "updated_at"])
+        if deletion.status == AccountDeletionStatusChoices.FAILED.value:
+            return None
+        raise self.retry(exc=exc, countdown=60)
+
+    logger.info(
+        "Account deletion progress for user_id=%s: step=%s share_links=%s files=%s folders=%s objects=%s.",
+        deletion.user_id,
+        deletion.step,
+        deletion.share_links_deleted,
+        deletion.files_deleted,
+        deletion.folders_deleted,
+        deletion.objects_deleted,
+    )
+    return finished
+
+
+@shared_task
+def resume_account_deletions():
+    """Re-enqueue deletions whose worker went away without finishing."""
+    stale_before = timezone.now() - timedelta(minutes=settings.ACCOUNT_DELETION_STALE_MINUTES)
+    deletion_ids = AccountDeletion.objects.filter(
+        status__in=[
+            AccountDeletionStatusChoices.PENDING.value,
+            AccountDeletionStatusChoices.RUNNING.value,
+        ],
+        updated_at__lt=stale_before,
+    ).values_list("id", flat=True)
+
+    for deletion_id in deletion_ids:
+        process_account_deletion.delay(deletion_id)
@@ -0,0 +1,115 @@
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from apps.cloud_storage.integrations.s3.storage import S3StorageClient
+from apps.cloud_storage.models import CloudFile, Folder, ShareLink
+from apps.cloud_storage.tests.factories.cloud_file_factory import CloudFileFactory
+from apps.cloud_storage.tests.factories.folder_factory import FolderFactory
+from apps.cloud_storage.tests.factories.share_link_factory import ShareLinkFactory
+from apps.subscriptions.choices.subscription_choices import SubscriptionStatusChoices
+from apps.subscriptions.factories.subscription import SubscriptionFactory
+from apps.users.choices.account_deletion_choices import (
+    AccountDeletionStatusChoices,
+    AccountDeletionStepChoices,
+)
+from apps.users.factories.user_factory import UserFactory
+from apps.users.models import AccountDeletion, User
+from apps.users.services.account_deletion import (
+    request_account_deletion,
+    run_account_deletion,
+)
+from apps.users.tasks.account_deletion import process_account_deletion
+
+
+class RequestAccountDeletionTests(TestCase):
+
+    def test_deactivates_user_and_revokes_token(self):
+        user = UserFactory()
+        self.assertTrue(Token.objects.filter(user=user).exists())
+
+        deletion = request_account_deletion(user)
+
+        user.refresh_from_db()
+        self.assertFalse(user.is_active)
+        self.assertFalse(Token.objects.filter(user=user).exists())
+        self.assertEqual(deletion.user_id, user.id)
+        self.assertEqual(deletion.status, AccountDeletionStatusChoices.PENDING.value)
+
+    def test_returns_existing_deletion_when_requested_twice(self):
+        user = UserFactory()
+
+        first = request_account_deletion(user)
+        second = request_account_deletion(user)
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(AccountDeletion.objects.count(), 1)
+
+
+@patch("apps.users.services.account_deletion.cancel_stripe_subscription", return_value=True)
+class RunAccountDeletionTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.subscription = SubscriptionFactory(user=self.user, stripe_subscription_id="sub_123")
+        root = FolderFactory(user=self.user)
+        child = FolderFactory(user=self.user, parent=root)
+        for i in range(5):
+            CloudFileFactory(user=self.user, folder=child, s3_key=f"users/{self.user.id}/{i}.txt")
+        ShareLinkFactory(owner=self.user, folders=[root])
+        self.deletion = request_account_deletion(self.user)
+
+        self.storage = Mock(spec=S3StorageClient)
+        self.storage.list_keys.side_effect = [
+            ([f"users/{self.user.id}/0.txt", f"users/{self.user.id}/1.txt"], True),
+            ([f"users/{self.user.id}/2.txt"], False),
+        ]
+        self.storage.delete_files.return_value = []
+
+    def test_removes_everything_in_chunks(self, mock_cancel):
+        finished = False
+        while not finished:
+            finished = run_account_deletion(self.deletion, self.storage, chunk_size=2, max_chunks=1)
+
+        self.deletion.refresh_from_db()
+        self.assertEqual(self.deletion.status, AccountDeletionStatusChoices.COMPLETED.value)
+        self.assertEqual(self.deletion.step, AccountDeletionStepChoices.DONE.value)
+        self.assertEqual(self.deletion.files_deleted, 5)
+        self.assertEqual(self.deletion.folders_deleted, 2)
+        self.assertEqual(self.deletion.share_links_deleted, 1)
+        self.assertEqual(self.deletion.objects_deleted, 3)
+
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
+        self.assertFalse(CloudFile.objects.filter(user_id=self.user.id).exists())
+        self.assertFalse(Folder.objects.filter(user_id=self.user.id).exists())
+        self.assertFalse(ShareLink.objects.filter(owner_id=self.user.id).exists())
+        mock_cancel.assert_called_once_with("sub_123")
+
+        # The object sweep resumes after the last key it processed
+        self.assertEqual(
+            self.storage.list_keys.call_args_list[1].kwargs["start_after"],
+            f"users/{self.user.id}/1.txt",
+        )
+
+    def test_progress_is_saved_between_runs(self, mock_cancel):
+        run_account_deletion(self.deletion, self.storage, chunk_size=2, max_chunks=3)
+
+        deletion = AccountDeletion.objects.get(id=self.deletion.id)
+        self.assertEqual(deletion.status, AccountDeletionStatusChoices.RUNNING.value)
+        self.assertEqual(deletion.step, AccountDeletionStepChoices.DELETE_FILES.value)
+        self.assertEqual(deletion.files_deleted, 2)
+
+        self.subscription.refresh_from_db()
+        self.assertEqual(self.subscription.status, SubscriptionStatusChoices.CANCELED.value)
+
+    @override_settings(ACCOUNT_DELETION_CHUNK_SIZE=2, ACCOUNT_DELETION_CHUNKS_PER_TASK=2)
+    @patch("apps.users.tasks.account_deletion.get_storage")
+    def test_task_reenqueues_itself_until_done(self, mock_get_storage, mock_cancel):
+        mock_get_storage.return_value = self.storage
+
+        process_account_deletion(self.deletion.id)
+
+        self.deletion.refresh_from_db()
+        self.assertEqual(self.deletion.status, AccountDeletionStatusChoices.COMPLETED.value)
+        self.assertFalse(User.objects.filter(id=self.user.id).exists())
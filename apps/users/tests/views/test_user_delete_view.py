@@ -0,0 +1,38 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.users.factories.user_factory import UserFactory
+from apps.users.models import AccountDeletion
+
+
+class UserDeleteViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse("users:user-details")
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(self.user)
+
+    @patch("apps.users.api.views.user_details.process_account_deletion.delay")
+    def test_delete_starts_account_deletion(self, mock_delay):
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        deletion = AccountDeletion.objects.get(user_id=self.user.id)
+        self.assertEqual(response.data["id"], deletion.id)
+        mock_delay.assert_called_once_with(deletion.id)
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+    def test_delete_requires_auth(self):
+        self.client.force_authenticate(None)
+
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
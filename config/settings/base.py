@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import json
 import os
 from pathlib import Path
 
@@ -171,6 +172,7 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    "EXCEPTION_HANDLER": "apps.cloud_storage.api.exception_handler.storage_exception_handler",
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 25,
@@ -205,6 +207,165 @@ AWS_S3_BUCKET_REGION = os.environ.get("AWS_S3_BUCKET_REGION", None)
 AWS_S3_BASE_URL = f"https://{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_BUCKET_REGION}.amazonaws.com"
 
 AWS_PRESIGNED_EXPIRATION_TIME = 300
+# Multi-region placement: extra {region: bucket} pairs next to the default bucket.
+# Uploads go to the region named in CLOUD_STORAGE_REGION_HEADER, else the
+# user's `storage_region`, else the default bucket; files record where they went.
+AWS_S3_REGION_BUCKETS = json.loads(os.getenv("AWS_S3_REGION_BUCKETS", "{}"))
+
+# Cloud storage
+# Object store backend: S3StorageClient, LocalStorageClient or InMemoryStorageClient
+CLOUD_STORAGE_BACKEND = os.getenv(
+    "CLOUD_STORAGE_BACKEND", "apps.cloud_storage.integrations.s3.storage.S3StorageClient"
+)
+# Local and in-memory backends: where files go, and the public base of their signed URLs
+CLOUD_STORAGE_LOCAL_ROOT = os.getenv("CLOUD_STORAGE_LOCAL_ROOT", str(BASE_DIR.parent / "storage"))
+CLOUD_STORAGE_SIGNED_URL_BASE = os.getenv("CLOUD_STORAGE_SIGNED_URL_BASE", "http://localhost:8000")
+# In-memory backend latency injection, per operation
+CLOUD_STORAGE_MEMORY_LATENCY_SECONDS = float(os.getenv("CLOUD_STORAGE_MEMORY_LATENCY_SECONDS", 0))
+CLOUD_STORAGE_MEMORY_LATENCY_JITTER_SECONDS = float(os.getenv("CLOUD_STORAGE_MEMORY_LATENCY_JITTER_SECONDS", 0))
+# Shared secret expected in the X-Aerobox-Events-Token header of S3 event webhooks
+CLOUD_STORAGE_EVENTS_WEBHOOK_SECRET = os.getenv("CLOUD_STORAGE_EVENTS_WEBHOOK_SECRET", "")
+# SQS queue receiving S3 ObjectCreated notifications (consume_s3_events command)
+CLOUD_STORAGE_EVENTS_QUEUE_URL = os.getenv("CLOUD_STORAGE_EVENTS_QUEUE_URL", "")
+CLOUD_STORAGE_FINALIZE_BATCH_SIZE = 500
+# Batch finalize endpoint: max files per request and concurrent HEADs per request
+CLOUD_STORAGE_FINALIZE_BATCH_MAX_FILES = 500
+CLOUD_STORAGE_FINALIZE_MAX_WORKERS = 16
+# Threads serving blocking storage calls for async (ASGI) views, per process
+CLOUD_STORAGE_ASYNC_MAX_WORKERS = int(os.getenv("CLOUD_STORAGE_ASYNC_MAX_WORKERS", 64))
+# Uploads sent with a SHA-256 reuse the user's existing object with the same bytes
+CLOUD_STORAGE_DEDUPLICATION_ENABLED = os.getenv("CLOUD_STORAGE_DEDUPLICATION_ENABLED", "true").lower() == "true"
+# Chunked (delta) uploads: chunk size cap, chunks per file, and whether completed
+# files are assembled into a single object for plain presigned downloads
+CLOUD_STORAGE_CHUNK_MAX_BYTES = 64 * 1024 * 1024
+CLOUD_STORAGE_CHUNKED_MAX_CHUNKS = 10_000
+CLOUD_STORAGE_CHUNKED_MATERIALIZE = os.getenv("CLOUD_STORAGE_CHUNKED_MATERIALIZE", "true").lower() == "true"
+CLOUD_STORAGE_CHUNKED_READ_BUFFER_BYTES = 1024 * 1024
+# Object key layout for new uploads (see KeyLayout) and hex chars in the shard prefix.
+# Existing objects keep their key until moved with `manage.py migrate_key_layout`.
+CLOUD_STORAGE_KEY_LAYOUT = int(os.getenv("CLOUD_STORAGE_KEY_LAYOUT", 2))
+CLOUD_STORAGE_KEY_SHARD_CHARS = 2
+CLOUD_STORAGE_KEY_LAYOUT_BATCH_SIZE = 200
+# Download recency: timestamps are buffered per process and flushed in one UPDATE
+# at most CLOUD_STORAGE_ACCESS_FLUSH_SECONDS after the first one, or every
+# CLOUD_STORAGE_ACCESS_FLUSH_SIZE files;
+# a file is re-recorded at most once per CLOUD_STORAGE_ACCESS_RESOLUTION_SECONDS
+CLOUD_STORAGE_ACCESS_FLUSH_SECONDS = 30
+CLOUD_STORAGE_ACCESS_FLUSH_SIZE = 500
+CLOUD_STORAGE_ACCESS_RESOLUTION_SECONDS = 60 * 60
+# Tiering: files idle for longer than the plan's `cold_storage_after_days`
+# (default below) move to the cold class; smaller objects stay, as cold
+# classes bill a minimum object size
+CLOUD_STORAGE_COLD_AFTER_DAYS = int(os.getenv("CLOUD_STORAGE_COLD_AFTER_DAYS", 90))
+CLOUD_STORAGE_COLD_STORAGE_CLASS = os.getenv("CLOUD_STORAGE_COLD_STORAGE_CLASS", "GLACIER_IR")
+CLOUD_STORAGE_COLD_MIN_BYTES = 128 * 1024
+CLOUD_STORAGE_TIERING_BATCH_SIZE = 500
+# Archived (GLACIER / DEEP_ARCHIVE) objects are restored on first download
+CLOUD_STORAGE_RESTORE_DAYS = 7
+CLOUD_STORAGE_RESTORE_TIER = "Standard"
+# CDN delivery: signer class (e.g. ...integrations.cdn.cloudfront.CloudFrontURLSigner),
+# empty to always hand out storage URLs. Plans opt in with metadata "cdn_downloads".
+CLOUD_STORAGE_CDN_SIGNER = os.getenv("CLOUD_STORAGE_CDN_SIGNER", "")
+CLOUD_STORAGE_CDN_DOMAIN = os.getenv("CLOUD_STORAGE_CDN_DOMAIN", "")
+# {key id: PEM private key}; keep the previous key until its URLs expire
+CLOUD_STORAGE_CDN_KEYS = json.loads(os.getenv("CLOUD_STORAGE_CDN_KEYS", "{}"))
+CLOUD_STORAGE_CDN_ACTIVE_KEY_ID = os.getenv("CLOUD_STORAGE_CDN_ACTIVE_KEY_ID", "")
+CLOUD_STORAGE_CDN_URL_EXPIRATION = int(os.getenv("CLOUD_STORAGE_CDN_URL_EXPIRATION", AWS_PRESIGNED_EXPIRATION_TIME))
+# Per-upload region override, and objects moved per batch by `manage.py move_user_region`
+CLOUD_STORAGE_REGION_HEADER = "X-Storage-Region"
+CLOUD_STORAGE_REGION_MOVE_BATCH_SIZE = 200
+# Thumbnails (file preview feature): widths rendered unless the plan's file preview
+# metadata sets "thumbnail_sizes", output format (WEBP or JPEG) and quality, and
+# the largest originals that are decoded
+CLOUD_STORAGE_THUMBNAIL_SIZES = [200, 800]
+CLOUD_STORAGE_THUMBNAIL_FORMAT = os.getenv("CLOUD_STORAGE_THUMBNAIL_FORMAT", "WEBP")
+CLOUD_STORAGE_THUMBNAIL_QUALITY = 80
+CLOUD_STORAGE_THUMBNAIL_MAX_SOURCE_BYTES = 50 * 1024 * 1024
+CLOUD_STORAGE_THUMBNAIL_MAX_PIXELS = 50_000_000
+CLOUD_STORAGE_THUMBNAIL_BATCH_SIZE = 100
+# Media metadata read from stored objects with ranged GETs: bytes fetched per
+# request, total bytes one file may read, and files read concurrently per batch
+CLOUD_STORAGE_METADATA_READ_BLOCK_BYTES = 64 * 1024
+CLOUD_STORAGE_METADATA_MAX_READ_BYTES = 4 * 1024 * 1024
+CLOUD_STORAGE_METADATA_MAX_WORKERS = 16
+CLOUD_STORAGE_METADATA_BATCH_SIZE = 200
+# Text, CSV and JSON previews: bytes read from the start of the file, characters
+# used to detect the CSV dialect, CSV rows returned, and how long a preview is cached
+CLOUD_STORAGE_PREVIEW_BYTES = 64 * 1024
+CLOUD_STORAGE_PREVIEW_SNIFF_CHARS = 8 * 1024
+CLOUD_STORAGE_PREVIEW_MAX_ROWS = 100
+CLOUD_STORAGE_PREVIEW_CACHE_SECONDS = 60 * 60 * 24
+# Proxy downloads streamed through the API for clients that cannot reach the
+# object store, and bytes relayed per block (the memory a download holds)
+CLOUD_STORAGE_PROXY_DOWNLOADS = os.getenv("CLOUD_STORAGE_PROXY_DOWNLOADS", "false").lower() == "true"
+CLOUD_STORAGE_PROXY_CHUNK_BYTES = 256 * 1024
+# Host-local cache of small objects for proxied downloads: directory (empty
+# disables it), total bytes kept, and the largest object cached
+CLOUD_STORAGE_OBJECT_CACHE_DIR = os.getenv("CLOUD_STORAGE_OBJECT_CACHE_DIR", "")
+CLOUD_STORAGE_OBJECT_CACHE_MAX_BYTES = int(os.getenv("CLOUD_STORAGE_OBJECT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+CLOUD_STORAGE_OBJECT_CACHE_MAX_OBJECT_BYTES = 1024 * 1024
+# Transparent compression of text-like uploads: encoding ("gzip", "zstd", or
+# empty, the default, to disable; compressed files are downloaded through the
+# API instead of presigned or CDN URLs), smallest file considered, largest stored/original ratio
+# worth keeping, bytes read per block, bytes of encoded output held in memory
+# before spilling to a temporary file, and files per backfill batch
+CLOUD_STORAGE_COMPRESSION = os.getenv("CLOUD_STORAGE_COMPRESSION", "")
+CLOUD_STORAGE_COMPRESSION_MIN_BYTES = 4 * 1024
+CLOUD_STORAGE_COMPRESSION_MAX_RATIO = 0.9
+CLOUD_STORAGE_COMPRESSION_READ_BYTES = 256 * 1024
+CLOUD_STORAGE_COMPRESSION_SPOOL_BYTES = 16 * 1024 * 1024
+CLOUD_STORAGE_COMPRESSION_BATCH_SIZE = 100
+# Upload sessions: how long one upload policy stays valid, and the most bytes
+# a session may register
+CLOUD_STORAGE_UPLOAD_SESSION_SECONDS = 60 * 60
+CLOUD_STORAGE_UPLOAD_SESSION_MAX_BYTES = 50 * 1024 * 1024 * 1024
+# Upload tickets: how long a signed ticket may be finalized after it was issued
+CLOUD_STORAGE_UPLOAD_TICKET_SECONDS = 24 * 60 * 60
+# Metadata exports: rows fetched per round trip of the server-side cursor
+CLOUD_STORAGE_EXPORT_CHUNK_SIZE = 2000
+# Account archive exports: smallest multipart part (grown to fit large
+# accounts in the part limit), bytes read from an object at a time, files
+# per batch, parts written per task run, minutes without progress before a
+# job is re-enqueued, and days a finished archive can be downloaded
+CLOUD_STORAGE_ARCHIVE_EXPORT_PART_BYTES = 16 * 1024 * 1024
+CLOUD_STORAGE_ARCHIVE_EXPORT_READ_BYTES = 1024 * 1024
+CLOUD_STORAGE_ARCHIVE_EXPORT_BATCH_SIZE = 500
+CLOUD_STORAGE_ARCHIVE_EXPORT_PARTS_PER_TASK = 64
+CLOUD_STORAGE_ARCHIVE_EXPORT_STALE_MINUTES = 30
+CLOUD_STORAGE_ARCHIVE_EXPORT_RETENTION_DAYS = 7
+# Server-side copies: concurrent object copies, and the size above which a copy
+# runs as a background job with progress instead of inside the request
+CLOUD_STORAGE_COPY_MAX_WORKERS = 16
+CLOUD_STORAGE_COPY_SYNC_MAX_FILES = 100
+CLOUD_STORAGE_COPY_SYNC_MAX_BYTES = 1024 ** 3
+# Upper bound a single-flight task lock is held if a worker dies mid-run
+CLOUD_STORAGE_TASK_LOCK_TIMEOUT = 60 * 30
+# Quiet period before folder renames/moves of a user are turned into path rewrites
+CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS = 10
+
+# AWS clients
+# Connection pool per client; size it to the threads sharing a process
+AWS_MAX_POOL_CONNECTIONS = int(
+    os.getenv(
+        "AWS_MAX_POOL_CONNECTIONS",
+        max(
+            CLOUD_STORAGE_FINALIZE_MAX_WORKERS,
+            CLOUD_STORAGE_ASYNC_MAX_WORKERS,
+            CLOUD_STORAGE_COPY_MAX_WORKERS,
+            CLOUD_STORAGE_METADATA_MAX_WORKERS,
+            10,
+        ),
+    )
+)
+AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", 2))
+AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", 10))
+AWS_RETRY_MAX_ATTEMPTS = int(os.getenv("AWS_RETRY_MAX_ATTEMPTS", 4))
+# Managed S3 copies switch to multipart UploadPartCopy above the threshold (CopyObject caps at 5 GB)
+AWS_S3_MULTIPART_COPY_THRESHOLD = 5 * 1024 ** 3
+AWS_S3_MULTIPART_COPY_PART_BYTES = 512 * 1024 ** 2
+# S3 circuit breaker: consecutive failures before failing fast, and cool-down
+AWS_S3_CIRCUIT_FAILURE_THRESHOLD = 5
+AWS_S3_CIRCUIT_RESET_SECONDS = 30
 
 # Redis
 REDIS_PROTOCOL = os.getenv("REDIS_PROTOCOL", "rediss")
@@ -213,6 +374,15 @@ REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = os.getenv("REDIS_PORT", "6379")
 REDIS_URL = f"{REDIS_PROTOCOL}://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}"
 
+# Cache
+REDIS_DB_CACHE = os.getenv("REDIS_DB_CACHE", "1")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"{REDIS_URL}/{REDIS_DB_CACHE}",
+    }
+}
+
 # Celery settings
 REDIS_DB_CELERY = os.getenv("REDIS_DB_CELERY")
 CELERY_BROKER_URL = f"{REDIS_URL}/{REDIS_DB_CELERY}"
@@ -227,6 +397,26 @@ CELERY_BEAT_SCHEDULE = {
         "task": "apps.cloud_storage.tasks.delete_files.delete_old_files",
         "schedule": crontab(hour="02", minute="00"),
     },
+    "resume_account_deletions": {
+        "task": "apps.users.tasks.account_deletion.resume_account_deletions",
+        "schedule": crontab(minute="*/15"),
+    },
+    "tier_cold_files": {
+        "task": "apps.cloud_storage.tasks.storage_tiering.tier_cold_files_task",
+        "schedule": crontab(hour="03", minute="00"),
+    },
+    "complete_file_restores": {
+        "task": "apps.cloud_storage.tasks.storage_tiering.complete_file_restores_task",
+        "schedule": crontab(minute="*/15"),
+    },
+    "resume_archive_exports": {
+        "task": "apps.cloud_storage.tasks.archive_exports.resume_archive_exports",
+        "schedule": crontab(minute="*/15"),
+    },
+    "delete_expired_archive_exports": {
+        "task": "apps.cloud_storage.tasks.archive_exports.delete_expired_archive_exports_task",
+        "schedule": crontab(hour="04", minute="00"),
+    },
 }
 
 FRONTEND_DOMAIN = os.environ.get("FRONTEND_DOMAIN", "")
@@ -238,3 +428,8 @@ STRIPE_API_VERSION = "2025-04-30.basil"
 
 # Features
 DEFAULT_SHARELINK_EXPIRATION_MINUTES = 60 * 24
+
+# Account deletion
+ACCOUNT_DELETION_CHUNK_SIZE = 1000
+ACCOUNT_DELETION_CHUNKS_PER_TASK = 20
+ACCOUNT_DELETION_STALE_MINUTES = 15
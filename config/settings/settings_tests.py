@@ -34,11 +34,20 @@ LOGGING = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
 
 # AWS S3
 AWS_STORAGE_BUCKET_NAME = "test-bucket"
 AWS_S3_BASE_URL = f"https://{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_BUCKET_REGION}.amazonaws.com"
 
+CLOUD_STORAGE_EVENTS_WEBHOOK_SECRET = "test-events-secret"
+CLOUD_STORAGE_PATH_REWRITE_DEBOUNCE_SECONDS = 0
+CLOUD_STORAGE_ACCESS_FLUSH_SECONDS = 0
+
 # Celery
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
@@ -50,5 +59,6 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-    ]
+    ],
+    "EXCEPTION_HANDLER": "apps.cloud_storage.api.exception_handler.storage_exception_handler",
 }